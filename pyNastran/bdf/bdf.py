@@ -674,7 +674,7 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             'material_ids', 'caero_ids', 'is_long_ids',
             'nnodes', 'ncoords', 'nelements', 'nproperties',
             'nmaterials', 'ncaeros', 'nid_map',
-            'is_bdf_vectorized',
+            'is_bdf_vectorized', 'spatial_index',
 
             'point_ids', 'subcases',
             '_card_parser', '_card_parser_b', '_card_parser_prepare',
@@ -711,6 +711,7 @@ class BDF_(BDFMethods, GetCard, AddCards, WriteMesh, UnXrefMesh):
             self.nodes[nid] = node
         for eid, elem in iteritems(replace_model.elements):
             self.elements[eid] = elem
+        self.invalidate_spatial_index()
         for eid, elem in iteritems(replace_model.rigid_elements):
             self.rigid_elements[eid] = elem
         for pid, prop in iteritems(replace_model.properties):
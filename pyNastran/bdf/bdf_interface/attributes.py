@@ -18,6 +18,10 @@ class BDFAttributes(object):
         self.__init_attributes()
         self._is_cards_dict = False
 
+        # bumped when the nodes/coords/elements are added or edited,
+        # which invalidates the cached spatial index
+        self._spatial_index_version = 0
+
         self.set_as_msc()
 
         self.units = []  # type: List[str]
@@ -66,7 +70,7 @@ class BDFAttributes(object):
             'nnodes', 'ncoords', 'nelements', 'nproperties',
             'nmaterials', 'ncaeros',
 
-            'point_ids', 'subcases',
+            'point_ids', 'subcases', 'spatial_index',
             '_card_parser', '_card_parser_b',
             'object_methods', 'object_attributes',
         ]
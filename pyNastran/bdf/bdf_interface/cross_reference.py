@@ -222,6 +222,7 @@ class XrefMesh(BDFAttributes):
 
         for coord in itervalues(self.coords):
             coord.setup()
+        self._spatial_index_version += 1
 
     def _cross_reference_aero(self, check_caero_element_ids=False):
         # type: () -> None
@@ -11,6 +11,8 @@ reading/writing/accessing of BDF data.  Such methods include:
       change all nodes to a specific coordinate system
   - unresolve_grids
       puts all nodes back to original coordinate system
+  - spatial_index
+      cached node/element kdtrees for proximity queries
 """
 from __future__ import (nested_scopes, generators, division, absolute_import,
                         print_function, unicode_literals)
@@ -40,10 +42,36 @@ class BDFMethods(BDFAttributes):
             include_grav=False, xyz_cid0=None)
         sum_forces_moments(p0, loadcase_id, include_grav=False,
             xyz_cid0=None)
+        spatial_index
+        invalidate_spatial_index()
     """
 
     def __init__(self):
         BDFAttributes.__init__(self)
+        self._spatial_index = None
+
+    @property
+    def spatial_index(self):
+        """
+        Gets the cached SpatialIndex, which supports nearest, radius, box
+        and elements_containing_point queries on the nodes/elements.
+
+        The index is rebuilt if the number of nodes, elements or
+        coordinate systems changes, if nodes/elements/coords are added or
+        the coords are cross-referenced, or if ``invalidate_spatial_index``
+        is called.  Call ``invalidate_spatial_index`` after editing a
+        GRID's xyz/cp or a coordinate system in place.
+        """
+        from pyNastran.bdf.mesh_utils.spatial_index import SpatialIndex
+        spatial_index = getattr(self, '_spatial_index', None)
+        if spatial_index is None or not spatial_index.is_valid():
+            spatial_index = SpatialIndex(self)
+            self._spatial_index = spatial_index
+        return spatial_index
+
+    def invalidate_spatial_index(self):
+        """marks the cached SpatialIndex as stale (e.g., after moving a GRID)"""
+        self._spatial_index_version += 1
 
     def get_area_breakdown(self, property_ids=None, sum_bar_area=True):
         """
@@ -725,6 +753,8 @@ class BDFMethods(BDFAttributes):
             coord_to = self.coords[grid.cp]
             grid.xyz += coord_from.transform_node_from_local_to_local(
                 coord_to, dxyz2)
+        if dxyzs:
+            self.invalidate_spatial_index()
 
         if xref:
             for key, dvxrel2 in iteritems(dvxrel2s):
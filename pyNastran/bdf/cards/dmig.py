@@ -1,12 +1,12 @@
 # pylint: disable=R0902,R0904,R0914
 from __future__ import (nested_scopes, generators, division, absolute_import,
                         print_function, unicode_literals)
-from math import sin, cos, radians, atan2, sqrt, degrees
+from math import sin, cos, radians
 from six import iteritems
 from six.moves import zip, range
 
 import numpy as np
-from numpy import array, zeros
+from numpy import zeros
 from scipy.sparse import coo_matrix  # type: ignore
 
 from pyNastran.utils import integer_types
@@ -286,11 +286,12 @@ class NastranMatrix(BaseCard):
         return matrix_type
 
     def finalize(self):
-        self.GCi = np.asarray(self.GCi)
-        self.GCj = np.asarray(self.GCj)
-        self.Real = np.asarray(self.Real)
+        """converts the (grid, component) pairs and values to typed arrays"""
+        self.GCi = np.asarray(self.GCi, dtype='int32')
+        self.GCj = np.asarray(self.GCj, dtype='int32')
+        self.Real = np.asarray(self.Real, dtype='float64')
         if self.is_complex:
-            self.Complex = np.asarray(self.Complex)
+            self.Complex = np.asarray(self.Complex, dtype='float64')
 
     @property
     def shape(self):
@@ -392,7 +393,7 @@ class NastranMatrix(BaseCard):
         #if self.is_complex:
             #self.Complex(double(card, v, 'complex')
 
-    def get_matrix(self, is_sparse=False, apply_symmetry=True):
+    def get_matrix(self, is_sparse=False, apply_symmetry=True, dof_map=None):
         """
         Builds the Matrix
 
@@ -404,19 +405,22 @@ class NastranMatrix(BaseCard):
         apply_symmetry : bool; default=True
             If the matrix is symmetric (ifo=6), returns a symmetric matrix.
             Supported as there are symmetric matrix routines.
+        dof_map : (ndof, 2) int ndarray; dict[(nid, comp)] = idof; default=None
+            maps the (grid, component) pairs to global DOF indices, so
+            the matrix is (ndof, ndof) (e.g., to add a K2GG to the Kgg)
+            None : the rows/columns are in the order they're first used
 
         Returns
         -------
-        M : numpy.ndarray or scipy.coomatrix
+        M : numpy.ndarray or scipy.sparse.csr_matrix
             the matrix
         rows : dict[int] = [int, int]
             dictionary of keys=rowID, values=(Grid,Component) for the matrix
         cols: dict[int] = [int, int]
             dictionary of keys=columnID, values=(Grid,Component) for the matrix
-
-        .. warning:: is_sparse=True WILL fail
         """
-        return get_matrix(self, is_sparse=is_sparse, apply_symmetry=apply_symmetry)
+        return get_matrix(self, is_sparse=is_sparse, apply_symmetry=apply_symmetry,
+                          dof_map=dof_map)
 
     @property
     def is_real(self):
@@ -545,133 +549,87 @@ class NastranMatrix(BaseCard):
         else:
             msg += print_card_16(list_fields)
 
+        if size == 8:
+            print_card = print_card_8
+        elif is_double:
+            print_card = print_card_double
+        else:
+            print_card = print_card_16
+
+        GCi = np.asarray(self.GCi)
+        GCj = np.asarray(self.GCj)
+        nterms = len(GCi)
+        if nterms == 0:
+            return msg
+
         if self.is_complex:
+            reals = np.asarray(self.Real)
+            complexs = np.asarray(self.Complex)
             if self.is_polar:
-                for (GCi, GCj, reali, complexi) in zip(self.GCi, self.GCj, self.Real, self.Complex):
-                    magi = sqrt(reali**2 + complexi**2)
-                    if reali == 0.0:
-                        phasei = 0.0
-                    else:
-                        phasei = degrees(atan2(complexi, reali))
-                    list_fields = [self.type, self.name, GCj[0], GCj[1],
-                                   None, GCi[0], GCi[1], magi, phasei]
-                    if size == 8:
-                        msg += print_card_8(list_fields)
-                    elif is_double:
-                        msg += print_card_double(list_fields)
-                    else:
-                        msg += print_card_16(list_fields)
+                values1 = np.hypot(reals, complexs)
+                values2 = np.degrees(np.arctan2(complexs, reals))
             else:
-                for (GCi, GCj, reali, complexi) in zip(self.GCi, self.GCj, self.Real, self.Complex):
-                    list_fields = [self.type, self.name, GCj[0], GCj[1],
-                                   None, GCi[0], GCi[1], reali, complexi]
-                    if size == 8:
-                        msg += print_card_8(list_fields)
-                    elif is_double:
-                        msg += print_card_double(list_fields)
-                    else:
-                        msg += print_card_16(list_fields)
+                values1 = reals
+                values2 = complexs
+            values2 = values2.tolist()
         else:
-            for (GCi, GCj, reali) in zip(self.GCi, self.GCj, self.Real):
-                list_fields = [self.type, self.name, GCj[0], GCj[1],
-                               None, GCi[0], GCi[1], reali, None]
-                if size == 8:
-                    msg += print_card_8(list_fields)
-                elif is_double:
-                    msg += print_card_double(list_fields)
-                else:
-                    msg += print_card_16(list_fields)
-
-        #msg += '\n\nGCi[0]=%s\n' % self.GCi[0]
-        #msg += 'GCj[0]=%s\n' % self.GCj[0]
-        #msg += 'Real[0]=%s\n' % self.Real[0]
-        #assert isinstance(self.GCi[0], (list, np.ndarray)), msg
-        #assert isinstance(self.GCj[0], (list, np.ndarray)), msg
-        #assert isinstance(self.Real[0], (list, np.ndarray)), msg
-
+            values1 = self.Real
+            values2 = [None] * nterms
+        values1 = np.asarray(values1).tolist()
+
+        # a card is written for each run of terms in the same column,
+        # so the order of the terms is preserved
+        is_new_column = np.ones(nterms, dtype='bool')
+        is_new_column[1:] = (GCj[1:, :] != GCj[:-1, :]).any(axis=1)
+        istarts = np.flatnonzero(is_new_column).tolist()
+        iends = istarts[1:] + [nterms]
+
+        gcj = GCj.tolist()
+        gci = GCi.tolist()
+        cards = [msg]
+        for istart, iend in zip(istarts, iends):
+            list_fields = [self.type, self.name, gcj[istart][0], gcj[istart][1], None]
+            for i in range(istart, iend):
+                list_fields += [gci[i][0], gci[i][1], values1[i], values2[i]]
+            cards.append(print_card(list_fields))
+        msg = ''.join(cards)
         return msg
 
 def get_row_col_map(GCi, GCj, ifo):
-    rows = {}
-    rows_reversed = {}
+    """
+    Gets the row/column maps in the order that the (grid, component)
+    pairs are first used
 
-    cols = {}
-    cols_reversed = {}
-    ndim = len(GCi.shape)
-    #print('ndim=%s' % ndim)
-    #print('GCj=%s' % GCj)
-    #print('GCi=%s' % GCi)
-    if ndim == 1:
-        i = 0
-        #nrows = np.unique(GCi)
-        #ncols = np.unique(GCj)
-        for gci in GCi:
-            if gci not in rows:
-                rows[gci] = i
-                rows_reversed[i] = gci
-                i += 1
+    Parameters
+    ----------
+    GCi / GCj : (n, 2) int ndarray; (n, ) int ndarray
+        the (grid, component) pairs or the row/column ids (DMI)
+    ifo : int
+        the matrix form; 6=symmetric
 
-        if ifo == 6:
-            # symmetric
-            for gcj in GCj:
-                if gcj not in rows:
-                    #print('row.gcj = %s' % str(gcj))
-                    rows[gcj] = i
-                    rows_reversed[i] = gcj
-                    i += 1
-            cols = rows
-            cols_reversed = rows_reversed
-        else:
-            j = 0
-            for gcj in GCj:
-                if gcj not in cols:
-                    cols[gcj] = j
-                    cols_reversed[j] = gcj
-                    j += 1
+    Returns
+    -------
+    nrows / ncols : int
+        the size of the matrix
+    ndim : int
+        1 : DMI style row/column ids
+        2 : (grid, component) pairs
+    rows / cols : dict[(nid, comp)] = int
+        the row/column index of each (grid, component) pair
+    rows_reversed / cols_reversed : dict[int] = (nid, comp)
+        the (grid, component) pair of each row/column index
+    """
+    GCi = np.asarray(GCi)
+    GCj = np.asarray(GCj)
+    ndim = len(GCi.shape)
+    row_gc, col_gc = _get_row_col_index(GCi, GCj, ifo)[:2]
+    rows_reversed = _get_index_map(row_gc)
+    if ifo == 6:
+        cols_reversed = rows_reversed
     else:
-        #print('i0=%s j0=%s' % (i, j))
-        #nrows = len(GCi)
-        #ncols = len(GCj)
-        #rows_array = np.zeros((nrows, 2), dtype='int32')
-        #cols_array = np.zeros((ncols, 2), dtype='int32')
-        #for i, (nid, comp) in enumerate(GCi):
-            ##print('i=%s nid=%s comp=%s nrows=%s rows_array.shape=%s' % (
-                ##i, nid, comp, nrows, str(rows_array.shape)))
-            #rows_array[i, :] = [nid, comp]
-        #print('rows_array = \n%s' % rows_array)
-
-        #for j, (nid, comp) in enumerate(GCj):
-            #cols_array[j, :] = [nid, comp]
-        #print('cols_array = \n%s' % cols_array)
-
-        i = 0
-        for (nid, comp) in GCi:
-            gci = (nid, comp)
-            if gci not in rows:
-                #print('row.gci = %s' % str(gci))
-                rows[gci] = i
-                rows_reversed[i] = gci
-                i += 1
-        if ifo == 6:
-            # symmetric
-            for (nid, comp) in GCj:
-                gcj = (nid, comp)
-                if gcj not in rows:
-                    #print('row.gcj = %s' % str(gcj))
-                    rows[gcj] = i
-                    rows_reversed[i] = gcj
-                    i += 1
-            cols = rows
-            cols_reversed = rows_reversed
-        else:
-            j = 0
-            for (nid, comp) in GCj:
-                gcj = (nid, comp)
-                if gcj not in cols:
-                    #print('col.gcj = %s' % str(gcj))
-                    cols[gcj] = j
-                    cols_reversed[j] = gcj
-                    j += 1
+        cols_reversed = _get_index_map(col_gc)
+    rows = {gc: i for i, gc in iteritems(rows_reversed)}
+    cols = rows if ifo == 6 else {gc: j for j, gc in iteritems(cols_reversed)}
 
     nrows = len(rows)
     ncols = len(cols)
@@ -679,171 +637,142 @@ def get_row_col_map(GCi, GCj, ifo):
     assert ncols > 0, 'ncols=%s' % ncols
     return nrows, ncols, ndim, rows, cols, rows_reversed, cols_reversed
 
-def _fill_sparse_matrix(self, nrows, ncols):
-    """helper method for get_matrix"""
-    GCj = array(self.GCj, dtype='int32') - 1
-    GCi = array(self.GCi, dtype='int32') - 1
-    reals = array(self.Real, dtype='float32')
+def _get_dof_keys(GC):
+    """flattens the (grid, component) pairs into sortable int64 keys"""
+    GC = np.asarray(GC)
+    if GC.ndim == 1:
+        return GC.astype('int64')
+    return GC[:, 0].astype('int64') * 10 + GC[:, 1]
 
-    # TODO: matrix size:  is this correct?
-    nrows = max(GCi) + 1
-    ncols = max(GCj) + 1
-
-    dtype = self._get_dtype(self.tin)
-    # TODO: no check for symmetry
-    # TODO: no check for dtype
-    if self.is_complex:
-        complexs = array(self.Complex, dtype='float32')
-        data = array([reals, complexs]).astype(complex)
-    else:
-        data = reals
+def _get_first_used(GC):
+    """
+    Gets the unique (grid, component) pairs in the order they're first used
 
-    if self.matrix_form in [1, 6]:
-        nrows = max(nrows, ncols)
-        ncols = nrows
+    Returns
+    -------
+    gc : (nunique, 2) int ndarray; (nunique, ) int ndarray
+        the unique (grid, component) pairs
+    index : (n, ) int ndarray
+        the location of each pair in gc
+    """
+    keys = _get_dof_keys(GC)
+    index, inverse = np.unique(keys, return_index=True, return_inverse=True)[1:]
+    ifirst = np.argsort(index)
+    rank = np.empty(len(index), dtype='int32')
+    rank[ifirst] = np.arange(len(index), dtype='int32')
+    return GC[index[ifirst]], rank[inverse]
+
+def _search_keys(dof_keys, keys):
+    """
+    Vectorized lookup of keys in an unsorted array of unique keys
 
-    #A = coo_matrix( (entries,(rows,cols)),shape=(nrows,ncols),dtype=dtype) # test
-    M = coo_matrix((data, (self.GCi, self.GCj)),
-                   shape=(nrows, ncols), dtype=dtype)
-    #M = coo_matrix( (data,(self.GCi,self.GCj)),shape=(i,j)) # old
-    #M = coo_matrix( (data,(self.GCi,self.GCj)),shape=(nrows,ncols))
-    #print(M.todense())
-    #print(M)
-    return M
+    Returns
+    -------
+    index : (n, ) int ndarray
+        the location of each key in dof_keys
+    is_found : (n, ) bool ndarray
+        is the key in dof_keys
+    """
+    isort = np.argsort(dof_keys, kind='mergesort')
+    sorted_keys = dof_keys[isort]
+    isearch = np.searchsorted(sorted_keys, keys)
+    isearch[isearch == len(sorted_keys)] = 0
+    is_found = sorted_keys[isearch] == keys if len(sorted_keys) else np.zeros(len(keys), 'bool')
+    return isort[isearch], is_found
+
+def _get_index_map(GC):
+    """makes the {index : (nid, comp)} dictionary"""
+    if GC.ndim == 1:
+        return dict(enumerate(GC.tolist()))
+    return dict(enumerate(map(tuple, GC.tolist())))
+
+def _get_row_col_index(GCi, GCj, ifo, dof_map=None):
+    """
+    Maps the (grid, component) pairs of each term to a row/column index
 
+    Parameters
+    ----------
+    GCi / GCj : (n, 2) int ndarray; (n, ) int ndarray
+        the (grid, component) pairs or the row/column ids (DMI)
+    ifo : int
+        the matrix form; 6=symmetric
+    dof_map : (ndof, 2) int ndarray; dict[(nid, comp)] = idof; default=None
+        the global DOF of each (grid, component) pair
+        None : the rows/columns are in the order they're first used
 
-def _fill_dense_rectangular_matrix(self, nrows, ncols, ndim, rows, cols, apply_symmetry):
-    """helper method for get_matrix"""
-    is_sparse = False
-    if self.is_complex:
-        M = zeros((nrows, ncols), dtype='complex128')
-        if self.matrix_form == 6 and apply_symmetry:  # symmetric
-            for (gcj, gci, reali, complexi) in zip(self.GCj, self.GCi,
-                                                   self.Real, self.Complex):
-                i = rows[(gci[0], gci[1])]
-                j = cols[(gcj[0], gcj[1])]
-                M[i, j] = complex(reali, complexi)
-                M[j, i] = complex(reali, complexi)
-        else:
-            for (gcj, gci, reali, complexi) in zip(self.GCj, self.GCi,
-                                                   self.Real, self.Complex):
-                i = rows[(gci[0], gci[1])]
-                j = cols[(gcj[0], gcj[1])]
-                M[i, j] = complex(reali, complexi)
-    else:
-        M = zeros((nrows, ncols), dtype='float64')
-        if self.matrix_form == 6 and apply_symmetry:  # symmetric
-            try:
-                for (gcj, gci, reali) in zip(self.GCj, self.GCi, self.Real):
-                    i = rows[(gci[0], gci[1])]
-                    j = cols[(gcj[0], gcj[1])]
-                    M[i, j] = reali
-                    M[j, i] = reali
-            except IndexError:
-                msg = ('name=%s ndim=%s i=%s j=%s matrix_type=%s '
-                       'is_polar=%s ncols=%s M.shape=%s\n' % (
-                           self.name, ndim, i, j, self.matrix_type,
-                           self.is_polar, self.ncols, M.shape))
-                msg += 'Rows:\n'
-                for i, row in enumerate(rows):
-                    msg += 'i=%s row=%s\n' % (i, row)
-                raise RuntimeError(msg)
+    Returns
+    -------
+    row_gc / col_gc : (nrows, 2) / (ncols, 2) int ndarray
+        the (grid, component) pair of each row/column
+    irow / jcol : (n, ) int ndarray
+        the row/column index of each term
+    """
+    if dof_map is None:
+        if ifo == 6:
+            row_gc, index = _get_first_used(np.concatenate([GCi, GCj]))
+            col_gc = row_gc
+            nterms = len(GCi)
+            irow = index[:nterms]
+            jcol = index[nterms:]
         else:
-            try:
-                for (gcj, gci, reali) in zip(self.GCj, self.GCi, self.Real):
-                    i = rows[(gci[0], gci[1])]
-                    j = cols[(gcj[0], gcj[1])]
-                    M[i, j] = reali
-            except KeyError:
-                msg = ('name=%s ndim=%s gci=%s gcj=%s matrix_type=%s '
-                       'is_polar=%s is_sparse=%s ncols=%s M.shape=%s\n\n' % (
-                           self.name, ndim, str(gci), str(gcj), self.matrix_type,
-                           self.is_polar, is_sparse, self.ncols, M.shape))
-
-                gci2 = (gci[0], gci[1])
-                gcj2 = (gcj[0], gcj[1])
-                if gci2 in rows:
-                    msg += 'gci/row_key=%s found\n' % str(gci2)
-                else:
-                    msg += 'gci/row_key=%s not found\n' % str(gci2)
-                    msg += 'Rows:\n'
-                    for i, row in enumerate(rows):
-                        msg += '  i=%s row=%s\n' % (i, row)
-
-                if gcj2 in cols:
-                    msg += '\ngcj/col_key=%s found\n' % str(gcj2)
-                else:
-                    msg += '\ngcj/col_key=%s not found\n' % str(gcj2)
-                    msg += 'Cols:\n'
-                    for j, col in enumerate(cols):
-                        msg += '  j=%s row=%s\n' % (j, col)
-
-                msg += '\n'
-                print(msg)
-
-                raise KeyError(msg)
-            except IndexError:
-                msg = ('name=%s ndim=%s i=%s j=%s matrix_type=%s '
-                       'is_polar=%s is_sparse=%s ncols=%s M.shape=%s\n' % (
-                           self.name, ndim, i, j, self.matrix_type,
-                           self.is_polar, is_sparse, self.ncols, M.shape))
-                msg += 'Rows:\n'
-                for i, row in enumerate(rows):
-                    msg += '  i=%s row=%s\n' % (i, row)
-
-                msg += '\nCols:\n'
-                for j, row in enumerate(cols):
-                    msg += '  j=%s row=%s\n' % (j, col)
-                raise RuntimeError(msg)
-    return M
-
-
-def _fill_dense_column_matrix(self, nrows, ncols, ndim, rows, cols, apply_symmetry):
-    """helper method for get_matrix"""
-    is_sparse = False
+            row_gc, irow = _get_first_used(GCi)
+            col_gc, jcol = _get_first_used(GCj)
+        return row_gc, col_gc, irow, jcol
+
+    if isinstance(dof_map, dict):
+        gcs = np.array(list(dof_map.keys()), dtype='int32')
+        idofs = np.array(list(dof_map.values()), dtype='int32')
+        isort = np.argsort(idofs)
+        assert np.array_equal(idofs[isort], np.arange(len(idofs))), 'the DOFs must be 0 to ndof-1'
+        dof_map = gcs[isort]
+    row_gc = col_gc = np.asarray(dof_map, dtype='int32')
+
+    dof_keys = _get_dof_keys(row_gc)
+    irow, is_found_i = _search_keys(dof_keys, _get_dof_keys(GCi))
+    jcol, is_found_j = _search_keys(dof_keys, _get_dof_keys(GCj))
+    if not (is_found_i.all() and is_found_j.all()):
+        missing = np.unique(np.concatenate([
+            _get_dof_keys(GCi[~is_found_i]), _get_dof_keys(GCj[~is_found_j])]))
+        if GCi.ndim == 2:
+            missing = np.column_stack([missing // 10, missing % 10])
+        raise KeyError('(grid, component) pairs are not in the dof_map:\n%s' % missing)
+    return row_gc, col_gc, irow, jcol
+
+def _get_matrix_terms(self, irow, jcol, ncols, dtype, apply_symmetry):
+    """
+    Gets the values of the matrix, where a repeated term overwrites the
+    previous one.  For a symmetric matrix, the transpose of each
+    off-diagonal term is added, unless it was explicitly defined.
+    """
     if self.is_complex:
-        M = zeros((nrows, ncols), dtype='complex128')
-        if self.matrix_form == 6 and apply_symmetry:  # symmetric
-            assert nrows == ncols, 'nrows=%s ncols=%s' % (nrows, ncols)
-            for (gcj, gci, reali, complexi) in zip(self.GCj, self.GCi,
-                                                   self.Real, self.Complex):
-                i = rows[gci]
-                j = cols[gcj]
-                M[i, j] = complex(reali, complexi)
-                M[j, i] = complex(reali, complexi)
-        else:
-            for (gcj, gci, reali, complexi) in zip(self.GCj, self.GCi,
-                                                   self.Real, self.Complex):
-                i = rows[gci]
-                j = cols[gcj]
+        data = np.asarray(self.Real) + 1j * np.asarray(self.Complex)
     else:
-        #print('nrows=%s ncols=%s' % (nrows, ncols))
-        M = zeros((nrows, ncols), dtype='float64')
-        if self.matrix_form == 6 and apply_symmetry:  # symmetric
-            assert nrows == ncols, 'nrows=%s ncols=%s' % (nrows, ncols)
-            for (gcj, gci, reali) in zip(self.GCj, self.GCi, self.Real):
-                i = rows[gci]
-                j = cols[gcj]
-                M[i, j] = reali
-                M[j, i] = reali
-        else:
-            try:
-                for (gcj, gci, reali) in zip(self.GCj, self.GCi, self.Real):
-                    i = rows[gci]
-                    j = cols[gcj]
-                    M[i, j] = reali
-            except IndexError:
-                msg = ('name=%s ndim=%s i=%s j=%s matrix_type=%s '
-                       'is_polar=%s is_sparse=%s ncols=%s M.shape=%s\n' % (
-                           self.name, ndim, i, j, self.matrix_type,
-                           self.is_polar, is_sparse, self.ncols, M.shape))
-                msg += 'Rows:\n'
-                for i, row in enumerate(rows):
-                    msg += '  i=%s row=%s\n' % (i, row)
-                raise RuntimeError(msg)
-    return M
-
-def get_matrix(self, is_sparse=False, apply_symmetry=True):
+        data = np.asarray(self.Real)
+    data = data.astype(dtype, copy=False)
+
+    # the last occurrence of a term wins
+    keys = irow.astype('int64') * ncols + jcol
+    nterms = len(keys)
+    ilast = nterms - 1 - np.unique(keys[::-1], return_index=True)[1]
+    if len(ilast) < nterms:
+        ilast.sort()
+        irow = irow[ilast]
+        jcol = jcol[ilast]
+        keys = keys[ilast]
+        data = data[ilast]
+
+    if self.matrix_form == 6 and apply_symmetry:
+        is_offdiagonal = irow != jcol
+        irow_t = jcol[is_offdiagonal]
+        jcol_t = irow[is_offdiagonal]
+        keys_t = irow_t.astype('int64') * ncols + jcol_t
+        is_implicit = ~np.in1d(keys_t, keys)
+        irow = np.hstack([irow, irow_t[is_implicit]])
+        jcol = np.hstack([jcol, jcol_t[is_implicit]])
+        data = np.hstack([data, data[is_offdiagonal][is_implicit]])
+    return irow, jcol, data
+
+def get_matrix(self, is_sparse=False, apply_symmetry=True, dof_map=None):
     """
     Builds the Matrix
 
@@ -855,49 +784,45 @@ def get_matrix(self, is_sparse=False, apply_symmetry=True):
     apply_symmetry: bool
         If the matrix is symmetric (matrix_form=6), returns a symmetric matrix.
         Supported as there are symmetric matrix routines.
-        TODO: unused...
+    dof_map : (ndof, 2) int ndarray; dict[(nid, comp)] = idof; default=None
+        maps the (grid, component) pairs to global DOF indices, so the
+        matrix is (ndof, ndof)
+        None : the rows/columns are in the order they're first used
 
     Returns
     -------
-    M : ndarray
+    M : ndarray; csr_matrix
         the matrix
-    rows : Dict[(nid, nid)] = float
+        dense : float64/complex128
+        sparse : the precision of the matrix (TIN)
+    rows : Dict[int] = (nid, nid)
         dictionary of keys=rowID,    values=(Grid,Component) for the matrix
-    cols : Dict[](int, int)] = float
+    cols : Dict[int] = (nid, nid)
         dictionary of keys=columnID, values=(Grid,Component) for the matrix
-
-    .. warning:: is_sparse=True WILL fail
     """
-    nrows, ncols, ndim, rows, cols, rows_reversed, cols_reversed = get_row_col_map(
-        self.GCi, self.GCj, self.matrix_form)
-    #print('rows = ', rows)
-    #print('cols = ', cols)
-    #print('i=%s j=%s' % (i, j))
-    #nrows = len(rows2)
-    #ncols = len(cols2)
-
-    #A = ss.lil_matrix((3,3), dtype='d') # double precision
-    #rows = []
-    #cols = []
-    #data = []
-    #for i in range(3):
-       #for j in range(3):
-           #k = float((i+1)*(j+1))
-           #rows.append(i)
-           #cols.append(j)
-           #data.append(k)
-           #A[i,j] = k
-
-    #is_sparse = False
+    GCi = np.asarray(self.GCi)
+    GCj = np.asarray(self.GCj)
+    row_gc, col_gc, irow, jcol = _get_row_col_index(
+        GCi, GCj, self.matrix_form, dof_map=dof_map)
+    nrows = len(row_gc)
+    ncols = len(col_gc)
+    assert nrows > 0, 'nrows=%s' % nrows
+    assert ncols > 0, 'ncols=%s' % ncols
+
     if is_sparse:
-        M = _fill_sparse_matrix(self, nrows, ncols)
+        dtype = self.tin_dtype
     else:
-        if ndim == 1:
-            M = _fill_dense_column_matrix(self, nrows, ncols, ndim, rows, cols, apply_symmetry)
-        else:
-            M = _fill_dense_rectangular_matrix(self, nrows, ncols, ndim, rows, cols, apply_symmetry)
+        dtype = 'complex128' if self.is_complex else 'float64'
+    irow, jcol, data = _get_matrix_terms(self, irow, jcol, ncols, dtype, apply_symmetry)
 
-    #print(M)
+    if is_sparse:
+        M = coo_matrix((data, (irow, jcol)), shape=(nrows, ncols), dtype=dtype).tocsr()
+    else:
+        M = zeros((nrows, ncols), dtype=dtype)
+        M[irow, jcol] = data
+
+    rows_reversed = _get_index_map(row_gc)
+    cols_reversed = rows_reversed if col_gc is row_gc else _get_index_map(col_gc)
     return (M, rows_reversed, cols_reversed)
 
 
@@ -1626,11 +1551,12 @@ class DMI(NastranMatrix):
                    GCj, GCi, Real, Complex, comment=comment, finalize=False)
 
     def finalize(self):
-        self.GCi = np.asarray(self.GCi)
-        self.GCj = np.asarray(self.GCj)
-        self.Real = np.asarray(self.Real)
+        """converts the row/column ids and values to typed arrays"""
+        self.GCi = np.asarray(self.GCi, dtype='int32')
+        self.GCj = np.asarray(self.GCj, dtype='int32')
+        self.Real = np.asarray(self.Real, dtype='float64')
         if self.is_complex:
-            self.Complex = np.asarray(self.Complex)
+            self.Complex = np.asarray(self.Complex, dtype='float64')
 
     @property
     def is_polar(self):
@@ -1784,58 +1710,53 @@ class DMI(NastranMatrix):
         return self._write_card(print_card_8)
 
     def _get_real_fields(self, func):
-        msg = ''
-        uGCj = np.unique(self.GCj)
-        for gcj in uGCj:
-            i = np.where(gcj == self.GCj)[0]
-            gcis = self.GCi[i]
-            reals = self.Real[i]
-            isort = np.argsort(gcis)
-            list_fields = ['DMI', self.name, gcj]
-
-            # will always write the first one
-            gci_last = -1
-            for gci, real in zip(gcis[isort], reals[isort]):
-                if gci == gci_last + 1:
-                    pass
-                else:
-                    list_fields.append(gci)
-                list_fields.append(real)
-                gci_last = gci
-            msg += func(list_fields)
-        return msg
+        return self._get_column_fields(func, is_complex=False)
 
     def _get_complex_fields(self, func):
-        msg = ''
-        uGCj = np.unique(self.GCj)
-        for gcj in uGCj:
-            i = np.where(gcj == self.GCj)[0]
-            gcis = self.GCi[i]
-            reals = self.Real[i]
-            complexs = self.Complex[i]
-            isort = np.argsort(gcis)
-            list_fields = ['DMI', self.name, gcj]
-
-            # will always write the first one
-            gci_last = -1
-            #print('gcis=%s \nreals=%s \ncomplexs=%s' % (
-                #gcis[isort], reals[isort], complexs[isort]))
-            if max(gcis) == min(gcis):
-                list_fields += [gcis[0]]
-                for reali, complexi in zip(reals, complexs):
-                    list_fields.extend([reali, complexi])
-                msg += func(list_fields)
-            else:
-                for gci, real, complexi in zip(gcis[isort], reals[isort], complexs[isort]):
-                    if gci != gci_last + 1:
-                        pass
-                    else:
-                        list_fields.append(gci)
-                    list_fields.append(real)
-                    list_fields.append(complexi)
-                    gci_last = gci
-                msg += func(list_fields)
-        return msg
+        return self._get_column_fields(func, is_complex=True)
+
+    def _get_column_fields(self, func, is_complex):
+        """
+        Writes a DMI card for each column, with the terms sorted by row.
+
+        A row id is only written for a real term when the rows aren't
+        consecutive.  Complex terms always have a row id.
+        """
+        GCi = np.asarray(self.GCi)
+        GCj = np.asarray(self.GCj)
+        nterms = len(GCi)
+        if nterms == 0:
+            return ''
+
+        isort = np.lexsort((GCi, GCj))
+        gcis = GCi[isort]
+        gcjs = GCj[isort]
+        reals = np.asarray(self.Real)[isort].tolist()
+        is_row_written = np.ones(nterms, dtype='bool')
+        if is_complex:
+            complexs = np.asarray(self.Complex)[isort].tolist()
+        else:
+            is_row_written[1:] = (gcis[1:] != gcis[:-1] + 1) | (gcjs[1:] != gcjs[:-1])
+
+        is_new_column = np.ones(nterms, dtype='bool')
+        is_new_column[1:] = gcjs[1:] != gcjs[:-1]
+        istarts = np.flatnonzero(is_new_column).tolist()
+        iends = istarts[1:] + [nterms]
+        is_row_written = is_row_written.tolist()
+        gcis = gcis.tolist()
+        gcjs = gcjs.tolist()
+
+        cards = []
+        for istart, iend in zip(istarts, iends):
+            list_fields = ['DMI', self.name, gcjs[istart]]
+            for i in range(istart, iend):
+                if is_row_written[i]:
+                    list_fields.append(gcis[i])
+                list_fields.append(reals[i])
+                if is_complex:
+                    list_fields.append(complexs[i])
+            cards.append(func(list_fields))
+        return ''.join(cards)
 
     def write_card_16(self):
         """writes the card in single precision"""
@@ -501,6 +501,38 @@ DMI         W2GJ       1       1 1.54685.1353939.1312423.0986108.0621382
         dmik.get_matrix()
         save_load_deck(model)
 
+    def test_dmig_dof_map(self):
+        """tests the DOF mapping and the sparse DMIG"""
+        model = BDF(debug=False)
+        GCj = [[1, 1], [1, 2], [1, 3], [1, 3]]
+        GCi = [[1, 1], [1, 1], [1, 2], [1, 3]]
+        reals = [1.0, 0.5, 2.0, 3.0]
+        dmig = model.add_dmig('K2GG', 6, 2, 0, 0, None, GCj, GCi, reals)
+        assert dmig.GCi.dtype.name == 'int32', dmig.GCi.dtype
+        assert dmig.Real.dtype.name == 'float64', dmig.Real.dtype
+
+        dof_map = array([[2, 1], [1, 3], [1, 1], [1, 2]])
+        kgg_expected = array([
+            [0., 0., 0., 0.],
+            [0., 3., 0., 2.],
+            [0., 0., 1., 0.5],
+            [0., 2., 0.5, 0.],
+        ])
+        kgg, rows, cols = dmig.get_matrix(dof_map=dof_map)
+        assert array_equal(kgg, kgg_expected), kgg
+        assert rows == {0: (2, 1), 1: (1, 3), 2: (1, 1), 3: (1, 2)}, rows
+        assert cols == rows, cols
+
+        dof_map_dict = {(2, 1): 0, (1, 3): 1, (1, 1): 2, (1, 2): 3}
+        kgg_sparse = dmig.get_matrix(is_sparse=True, dof_map=dof_map_dict)[0]
+        assert kgg_sparse.format == 'csr', kgg_sparse.format
+        assert kgg_sparse.dtype.name == 'float64', kgg_sparse.dtype
+        assert array_equal(kgg_sparse.toarray(), kgg_expected)
+
+        with self.assertRaises(KeyError):
+            dmig.get_matrix(dof_map=dof_map[:3, :])
+        save_load_deck(model)
+
     def test_dti_units(self):
         """tests DTI,UNITS"""
         model = BDF(debug=False)
@@ -6,7 +6,8 @@ defines:
                                   size=8, is_double=False,
                                   remove_collapsed_elements=False,
                                   avoid_collapsed_elements=False,
-                                  crash_on_collapse=False, log=None, debug=True)
+                                  crash_on_collapse=False, log=None, debug=True,
+                                  method='neq_max', ntile_nodes=1000000)
 """
 from __future__ import print_function
 from six import iteritems, string_types, PY2
@@ -27,7 +28,8 @@ def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
                           size=8, is_double=False,
                           remove_collapsed_elements=False,
                           avoid_collapsed_elements=False,
-                          crash_on_collapse=False, log=None, debug=True):
+                          crash_on_collapse=False, log=None, debug=True,
+                          method='neq_max', ntile_nodes=1000000):
     """
     Equivalences nodes; keeps the lower node id; creates two nodes with the same
 
@@ -43,7 +45,8 @@ def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
     renumber_nodes : bool
         should the nodes be renumbered (default=False)
     neq_max : int
-        the number of "close" points (default=4)
+        the number of "close" points (default=4);
+        only used for method='neq_max'
     xref bool: bool
         does the model need to be cross_referenced
         (default=True; only applies to model option)
@@ -71,6 +74,14 @@ def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
         bdf debugging
     log : logger(); default=None
         bdf logging
+    method : str; default='neq_max'
+        'neq_max' : a single kdtree is built and the neq_max closest
+                    points to each node are checked
+        'tiled' : the model is split into overlapping slabs of at most
+                  ntile_nodes nodes, all pairs within tol are found, and
+                  clusters of any size are collapsed to the lowest node id
+    ntile_nodes : int; default=1000000
+        the number of nodes per kdtree; only used for method='tiled'
 
     Returns
     -------
@@ -90,12 +101,27 @@ def bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
     nodes_xyz, model, nids, inew = _eq_nodes_setup(
         bdf_filename, tol, renumber_nodes=renumber_nodes,
         xref=xref, node_set=node_set, debug=debug)
-    ieq, slots = _eq_nodes_build_tree(nodes_xyz, nids, tol,
-                                      inew=inew, node_set=node_set,
-                                      neq_max=neq_max)[1:]
 
-    nid_pairs = _eq_nodes_find_pairs(nids, slots, ieq, node_set=node_set)
-    _eq_nodes_final(nid_pairs, model, tol, node_set=node_set)
+    if method == 'neq_max':
+        kdt = None
+        if node_set is None:
+            # all the GRIDs are used, so reuse the model's cached node tree
+            spatial_index = model.spatial_index
+            assert np.array_equal(spatial_index.nids, nids), 'the node ids are not sorted'
+            nodes_xyz = spatial_index.xyz_cid0
+            kdt = spatial_index.node_tree
+        ieq, slots = _eq_nodes_build_tree(nodes_xyz, nids, tol,
+                                          inew=inew, node_set=node_set,
+                                          neq_max=neq_max, kdt=kdt)[1:]
+
+        nid_pairs = _eq_nodes_find_pairs(nids, slots, ieq, node_set=node_set)
+        _eq_nodes_final(nid_pairs, model, tol, node_set=node_set)
+    elif method == 'tiled':
+        ipairs = _eq_nodes_find_pairs_tiled(nodes_xyz, tol, ntile_nodes=ntile_nodes)
+        nids_new = _eq_nodes_get_clusters(nids, ipairs)
+        _eq_nodes_final_clusters(model, nids, nids_new)
+    else:
+        raise NotImplementedError("method=%r; expected 'neq_max' or 'tiled'" % method)
 
     if bdf_filename_out is not None:
         model.write_bdf(bdf_filename_out, size=size, is_double=is_double)
@@ -130,9 +156,6 @@ def _eq_nodes_setup(bdf_filename, tol,
         model = bdf_filename
         model.cross_reference(xref=xref)
 
-    coord_ids = model.coord_ids
-    needs_get_position = True if coord_ids == [0] else False
-
     # quads / tris
     #nids_quads = []
     #eids_quads = []
@@ -190,12 +213,7 @@ def _eq_nodes_setup(bdf_filename, tol,
             nids = array([node.nid for nid, node in sorted(iteritems(model.nodes))], dtype='int32')
         all_nids = nids
 
-    if needs_get_position:
-        nodes_xyz = array([model.nodes[nid].get_position()
-                           for nid in nids], dtype='float32')
-    else:
-        nodes_xyz = array([model.nodes[nid].xyz
-                           for nid in nids], dtype='float32')
+    nodes_xyz = _get_xyz_cid0(model, nids, fdtype='float32')
 
     if node_set is not None:
         assert nodes_xyz.shape[0] == len(nids)
@@ -245,6 +263,36 @@ def _eq_nodes_setup(bdf_filename, tol,
     return nodes_xyz, model, nids, inew
 
 
+def _get_xyz_cid0(model, nids, fdtype='float32'):
+    """
+    Gets the global xyz locations for the requested nodes without
+    calling ``get_position`` on each node
+
+    Parameters
+    ----------
+    model : BDF()
+        a cross-referenced model
+    nids : (nnodes, ) int ndarray
+        the sorted node ids to extract
+    fdtype : str; default='float32'
+        the data type of the output array
+
+    Returns
+    -------
+    nodes_xyz : (nnodes, 3) float ndarray
+        the nodes in the global frame
+    """
+    out = model.get_displacement_index_xyz_cp_cd(fdtype='float64', sort_ids=True)
+    icp_transform, xyz_cp, nid_cp_cd = out[1:]
+    all_nids = nid_cp_cd[:, 0]
+    xyz_cid0 = model.transform_xyzcp_to_xyz_cid(
+        xyz_cp, all_nids, icp_transform, cid=0, in_place=True)
+
+    inid = searchsorted(all_nids, nids)
+    assert np.array_equal(all_nids[inid], nids), 'some nodes are not defined'
+    return xyz_cid0[inid, :].astype(fdtype)
+
+
 def _eq_nodes_find_pairs(nids, slots, ieq, node_set=None):
     """helper function for `bdf_equivalence_nodes`"""
     irows, icols = slots
@@ -301,9 +349,117 @@ def _eq_nodes_final(nid_pairs, model, tol, node_set=None):
         assert node2.seid == node1.seid
         # node2.new_nid = node1.nid
         #skip_nodes.append(nid2)
+    model.invalidate_spatial_index()
     return
 
-def _eq_nodes_build_tree(nodes_xyz, nids, tol, inew=None, node_set=None, neq_max=4, msg=''):
+def _eq_nodes_find_pairs_tiled(nodes_xyz, tol, ntile_nodes=1000000):
+    """
+    Finds all the node pairs within tol while limiting the size of any
+    single kdtree.
+
+    The nodes are sorted along the axis with the largest extent and
+    split into slabs of ntile_nodes.  Each slab is padded with the
+    following nodes that are within tol of the slab, so pairs that
+    straddle a slab boundary are still found.
+
+    Parameters
+    ----------
+    nodes_xyz : (nnodes, 3) float ndarray
+        the nodes in the global frame
+    tol : float
+        the spherical tolerance
+    ntile_nodes : int; default=1000000
+        the number of nodes in the core of each slab
+
+    Returns
+    -------
+    ipairs : (npairs, 2) int ndarray
+        the indices into nodes_xyz of the pairs;
+        a pair may be repeated
+    """
+    assert isinstance(tol, float), 'tol=%r' % tol
+    assert ntile_nodes > 0, 'ntile_nodes=%r' % ntile_nodes
+    nnodes = nodes_xyz.shape[0]
+    assert nnodes > 0, 'nnodes=0'
+
+    # slab along the longest axis, so a slab contains the fewest padding nodes
+    iaxis = (nodes_xyz.max(axis=0) - nodes_xyz.min(axis=0)).argmax()
+    isort = nodes_xyz[:, iaxis].argsort(kind='mergesort')
+    axis_sorted = nodes_xyz[isort, iaxis]
+
+    ipairs_list = []
+    for istart in range(0, nnodes, ntile_nodes):
+        iend = min(istart + ntile_nodes, nnodes)
+
+        # pad the slab with the nodes that are within tol of the last node
+        iend_pad = searchsorted(axis_sorted, axis_sorted[iend - 1] + tol, side='right')
+        islab = isort[istart:iend_pad]
+        kdt = _get_tree(nodes_xyz[islab, :], msg=' in slab %s:%s' % (istart, iend_pad))
+        ipairs = kdt.query_pairs(tol, output_type='ndarray')
+        if len(ipairs) == 0:
+            continue
+
+        # pairs that only involve padding nodes are found by the next slab
+        ncore = iend - istart
+        ipairs = ipairs[ipairs.min(axis=1) < ncore, :]
+        ipairs_list.append(islab[ipairs])
+
+    if len(ipairs_list) == 0:
+        return np.zeros((0, 2), dtype=isort.dtype)
+    return np.vstack(ipairs_list)
+
+
+def _eq_nodes_get_clusters(nids, ipairs):
+    """
+    Collapses chains of pairs into clusters (e.g., 1-2, 2-3 collapses
+    1, 2, 3 to 1), so clusters of any size are merged consistently.
+
+    Parameters
+    ----------
+    nids : (nnodes, ) int ndarray
+        the sorted node ids
+    ipairs : (npairs, 2) int ndarray
+        the indices into nids of the pairs
+
+    Returns
+    -------
+    nids_new : (nnodes, ) int ndarray
+        the lowest node id in the cluster of each node
+    """
+    from scipy.sparse import coo_matrix
+    from scipy.sparse.csgraph import connected_components
+
+    nnodes = len(nids)
+    if len(ipairs) == 0:
+        return nids.copy()
+
+    ones = np.ones(ipairs.shape[0], dtype='int8')
+    graph = coo_matrix((ones, (ipairs[:, 0], ipairs[:, 1])), shape=(nnodes, nnodes))
+    labels = connected_components(graph, directed=False)[1]
+
+    # nids is sorted, so the first node in a cluster has the lowest id
+    iroot = unique(labels, return_index=True)[1]
+    nids_new = nids[iroot[labels]]
+    return nids_new
+
+
+def _eq_nodes_final_clusters(model, nids, nids_new):
+    """apply nodal equivalencing to model using the cluster map"""
+    imerged = np.where(nids != nids_new)[0]
+    for nid2, nid1 in zip(nids[imerged], nids_new[imerged]):
+        node1 = model.nodes[nid1]
+        node2 = model.nodes[nid2]
+        node2.nid = node1.nid
+        node2.xyz = node1.xyz
+        node2.cp = node1.cp
+        assert node2.cd == node1.cd
+        assert node2.ps == node1.ps
+        assert node2.seid == node1.seid
+    model.invalidate_spatial_index()
+
+
+def _eq_nodes_build_tree(nodes_xyz, nids, tol, inew=None, node_set=None, neq_max=4, msg='',
+                         kdt=None):
     """
     helper function for `bdf_equivalence_nodes`
 
@@ -311,9 +467,13 @@ def _eq_nodes_build_tree(nodes_xyz, nids, tol, inew=None, node_set=None, neq_max
     ----------
     msg : str; default=''
         custom message used for errors
+    kdt : cKDTree(); default=None
+        the kdtree of nodes_xyz (e.g., model.spatial_index.node_tree)
+        None : build the kdtree
     """
     assert isinstance(tol, float), 'tol=%r' % tol
-    kdt = _get_tree(nodes_xyz, msg=msg)
+    if kdt is None:
+        kdt = _get_tree(nodes_xyz, msg=msg)
 
     # check the closest 10 nodes for equality
     deq, ieq = kdt.query(nodes_xyz[inew, :], k=neq_max, distance_upper_bound=tol)
@@ -4,8 +4,11 @@ defines:
              is_double=False, cards_to_skip=None, log=None, skip_case_control_deck=False)
 """
 from __future__ import print_function
+from itertools import chain
 from six.moves import StringIO
 from six import string_types, iteritems
+import numpy as np
+
 from pyNastran.bdf.mesh_utils.bdf_renumber import bdf_renumber
 from pyNastran.bdf.bdf import BDF, read_bdf
 
@@ -109,45 +112,25 @@ def bdf_merge(bdf_filenames, bdf_filename_out=None, renumber=True, encoding=None
             'mid' : max(model.material_ids) + 1,
             'set_id' : max(model.sets.keys()) + 1 if model.sets else 1,
             'spline_id' : max(model.splines.keys()) + 1 if model.splines else 1,
+            'mpc_id' : max(chain(model.mpcs.keys(), model.mpcadds.keys())) + 1
+                       if (model.mpcs or model.mpcadds) else 1,
         }
         #for param, val in sorted(iteritems(starting_id_dict)):
             #print('  %-3s %s' % (param, val))
 
         model.log.info('secondary=%s' % bdf_filename)
-        model2 = BDF(debug=False)
+        model2 = BDF(debug=False, log=model.log)
+        model2.disable_cards(cards_to_skip)
+        model2.read_bdf(bdf_filename, encoding=encoding, validate=False)
         if skip_case_control_deck:
             model2.case_control_deck = CaseControlDeck([], log=None)
-        model2.disable_cards(cards_to_skip)
 
-        bdf_dump = StringIO() # 'bdf_merge_temp.bdf'
-        _, mapperi = bdf_renumber(bdf_filename, bdf_dump, starting_id_dict=starting_id_dict,
+        # renumber in place; the cross-referenced cards pick up the new ids,
+        # so there's no need to write/reread the secondary model
+        _, mapperi = bdf_renumber(model2, None, starting_id_dict=starting_id_dict,
                                   size=size, is_double=is_double, cards_to_skip=cards_to_skip)
-        bdf_dump.seek(0)
-
         mappers.append(mapperi)
-        model2 = BDF(debug=False)
-        model2.disable_cards(cards_to_skip)
-        model2.read_bdf(bdf_dump)
-
-        #model.log.info('model2.node_ids = %s' % np.array(model2.node_ids))
-        for data_member in data_members:
-            data1 = getattr(model, data_member)
-            data2 = getattr(model2, data_member)
-            if isinstance(data1, dict):
-                #model.log.info('  working on %s' % (data_member))
-                for key, value in iteritems(data2):
-                    if data_member in 'coords' and key == 0:
-                        continue
-                    if isinstance(value, list):
-                        assert key not in data1, key
-                        data1[key] = value
-
-                    else:
-                        assert key not in data1, key
-                        data1[key] = value
-                        #print('   %s' % key)
-            else:
-                raise NotImplementedError(type(data1))
+        _add_renumbered_model(model, model2, mapperi, data_members, bdf_filename)
     #if bdf_filenames_out:
         #model.write_bdf(bdf_filenames_out, size=size)
 
@@ -182,6 +165,41 @@ def bdf_merge(bdf_filenames, bdf_filename_out=None, renumber=True, encoding=None
                                      mapper_renumber=mapper_renumber)
     return model, mappers_final
 
+def _add_renumbered_model(model, model2, mapper, data_members, bdf_filename):
+    """
+    Adds the cards from a renumbered model to the merged model.
+
+    The dictionaries of model2 are still keyed by the original ids, so
+    the mapper is used to get the new ids.  All the id collisions are
+    found before any cards are added, so they can be reported at once.
+    """
+    data2_new = {}
+    msg = ''
+    for data_member in data_members:
+        data1 = getattr(model, data_member)
+        data2 = getattr(model2, data_member)
+        if not isinstance(data1, dict):
+            raise NotImplementedError(type(data1))
+        id_map = mapper[data_member]
+        new_data = {id_map.get(key, key) : value for key, value in iteritems(data2)}
+        if data_member == 'coords':
+            new_data.pop(0, None)
+
+        keys1 = np.array(list(data1.keys()), dtype='int64')
+        keys2 = np.array(list(new_data.keys()), dtype='int64')
+        collisions = np.intersect1d(keys1, keys2)
+        if len(collisions):
+            msg += '  %s: ids=%s\n' % (data_member, collisions.tolist())
+        data2_new[data_member] = new_data
+
+    if msg:
+        msg = 'id collision merging %s\n%s' % (bdf_filename, msg)
+        raise RuntimeError(msg)
+
+    for data_member, new_data in iteritems(data2_new):
+        getattr(model, data_member).update(new_data)
+
+
 def _assemble_mapper(mappers, mapper_0, data_members, mapper_renumber=None):
     """
     Assemble final mappings from all original ids to the ids in the merged and possibly
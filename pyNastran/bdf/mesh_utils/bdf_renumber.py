@@ -306,7 +306,6 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
     nid_map = {}
     properties_map = {}
     properties_mass_map = {}
-    reverse_nid_map = {}
     eid_map = {}
     rigid_elements_map = {}
     nsm_map = {}
@@ -337,44 +336,18 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
     spoints = list(model.spoints.keys())
     epoints = list(model.epoints.keys())
 
-    nids = model.nodes.keys()
+    nids = list(model.nodes.keys())
 
-    nids_spoints_epoints = sorted(chain(nids, spoints, epoints))
-    #spoints_nids.sort()
-    i = 1
-    #nnodes = len(spoints_nids)
-
-    i = 1
-    #j = 1
-    #print(spoints_nids)
-    #k = 0
     #model.log.debug(starting_id_dict)
     if 'nid' in starting_id_dict and nid is not None:
-        i = nid
-        #banned_nodes = spoints
-        for nidi in nids_spoints_epoints:
-            if nidi in spoints or nidi in epoints:
-                pass
-                #print('sid=%s -> %s' % (nid, i))
-                #i += 1
-            else:
-                while i in spoints or i in epoints:
-                    #print('*bump')
-                    i += 1
-                #print('nid=%s -> %s' % (nid, i))
-                nid_map[nidi] = i
-                reverse_nid_map[i] = nidi
-                i += 1
-        #for nid in sorted(nids):
-            #nid_map[nid] = i
-            #reverse_nid_map[i] = nid
-            #i += 1
-        #print(nid_map)
-        #print(reverse_nid_map)
+        # SPOINTs/EPOINTs keep their ids, so the GRIDs skip over them
+        nids_old, nids_new = _get_nid_map_arrays(nids, spoints + epoints, nid)
+        nids_old_list = nids_old.tolist()
+        nids_new_list = nids_new.tolist()
+        nid_map = dict(zip(nids_old_list, nids_new_list))
     else:
-        for nid in nids_spoints_epoints:
-            nid_map[nid] = nid
-            reverse_nid_map[nid] = nid
+        nids_spoints_epoints = sorted(chain(nids, spoints, epoints))
+        nid_map = dict(zip(nids_spoints_epoints, nids_spoints_epoints))
 
     all_materials = (
         model.materials,
@@ -408,11 +381,9 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
             mid_map[midi] = mid + i
 
     if 'nid' in starting_id_dict and nid is not None:
-        #spoints2 = arange(1, len(spoints) + 1)
-        for nid, node in sorted(iteritems(model.nodes)):
-            nid_new = nid_map[nid]
-            #print('nid=%s -> %s' % (nid,nid_new))
-            node.nid = nid_new
+        nodes = model.nodes
+        for nid, nid_new in zip(nids_old_list, nids_new_list):
+            nodes[nid].nid = nid_new
 
     if 'pid' in starting_id_dict and pid is not None:
         # properties
@@ -721,6 +692,79 @@ def bdf_renumber(bdf_filename, bdf_filename_out, size=8, is_double=False,
                         interspersed=False, close=close)
     return model, mapper
 
+def _get_nid_map_arrays(nids, banned_ids, nid_start):
+    """
+    Creates the GRID id map as sorted arrays; helper method for ``bdf_renumber``.
+
+    The GRIDs are numbered consecutively starting from nid_start, but
+    skip any id that is already used by an SPOINT/EPOINT.
+
+    Parameters
+    ----------
+    nids : List[int] / (nnodes, ) int ndarray
+        the GRID ids
+    banned_ids : List[int] / (nbanned, ) int ndarray
+        the SPOINT/EPOINT ids
+    nid_start : int
+        the first GRID id
+
+    Returns
+    -------
+    nids_old : (nnodes, ) int ndarray
+        the sorted original GRID ids
+    nids_new : (nnodes, ) int ndarray
+        the new GRID ids corresponding to nids_old
+    """
+    nids_old = np.unique(np.asarray(nids, dtype='int64'))
+    banned = np.unique(np.asarray(banned_ids, dtype='int64'))
+    banned = banned[banned >= nid_start]
+
+    # the k-th new id is the k-th integer >= nid_start that isn't banned;
+    # nfree_before[j] is the number of free ids that come before banned[j]
+    inew = np.arange(len(nids_old), dtype='int64')
+    nfree_before = banned - nid_start - np.arange(len(banned), dtype='int64')
+    nbanned_before = np.searchsorted(nfree_before, inew, side='right')
+    nids_new = nid_start + inew + nbanned_before
+    return nids_old, nids_new
+
+
+def _remap_ids(ids, ids_old, ids_new):
+    """
+    Maps an array of ids using the sorted ids_old -> ids_new arrays;
+    helper method for ``bdf_renumber``.
+
+    Parameters
+    ----------
+    ids : (n, ) int ndarray
+        the ids to map
+    ids_old : (nmap, ) int ndarray
+        the sorted original ids
+    ids_new : (nmap, ) int ndarray
+        the new ids corresponding to ids_old
+
+    Returns
+    -------
+    ids2 : (nfound, ) int ndarray
+        the mapped ids that were found
+    missing : (nmissing, ) int ndarray
+        the ids that aren't in ids_old
+    """
+    ids = np.asarray(ids)
+    if len(ids_old) == 0:
+        return ids[:0], ids
+    iold = np.searchsorted(ids_old, ids)
+    iold[iold == len(ids_old)] = 0
+    is_found = ids_old[iold] == ids
+    return ids_new[iold[is_found]], ids[~is_found]
+
+
+def _map_to_arrays(id_map):
+    """converts a {old_id : new_id} dict into sorted (ids_old, ids_new) arrays"""
+    ids_old = np.array(sorted(id_map), dtype='int64')
+    ids_new = np.array([id_map[idi] for idi in ids_old.tolist()], dtype='int64')
+    return ids_old, ids_new
+
+
 def _update_case_control(model, mapper):
     """
     Updates the case control deck; helper method for ``bdf_renumber``.
@@ -750,8 +794,8 @@ def _update_case_control(model, mapper):
         'OUTRCV', 'TEMPERATURE(INITIAL)',
     ]
 
-    nid_map = mapper['nodes']
-    eid_map = mapper['elements']
+    nids_old, nids_new = _map_to_arrays(mapper['nodes'])
+    eids_old, eids_new = _map_to_arrays(mapper['elements'])
     skip_keys = [
         'TITLE', 'ECHO', 'ANALYSIS', 'SUBTITLE', 'LABEL', 'SUBSEQ', 'OUTPUT',
         'TCURVE', 'XTITLE', 'YTITLE', 'AECONFIG', 'AESYMXZ', 'MAXLINES', 'PARAM', 'CONTOUR',
@@ -834,25 +878,19 @@ def _update_case_control(model, mapper):
                                 key, options, param_type, value))
                             raise NotImplementedError(key)
 
-                        values2 = []
                         if key in elemental_quantities:
                             # renumber eids
-                            for eid in seti2:
-                                if eid not in eid_map:
-                                    model.log.warning("  couldn't find eid=%s...dropping" % eid)
-                                    continue
-                                eid_new = eid_map[eid]
-                                values2.append(eid_new)
-                            #print('updating element SET %r' % options)
+                            values2, missing = _remap_ids(seti2, eids_old, eids_new)
+                            if len(missing):
+                                model.log.warning("  couldn't find eids=%s...dropping" % (
+                                    missing.tolist()))
                         else:
                             # renumber nids
-                            for nid in seti2:
-                                if nid not in nid_map:
-                                    model.log.warning("  couldn't find nid=%s...dropping" % nid)
-                                    continue
-                                nid_new = nid_map[nid]
-                                values2.append(nid_new)
-                            #print('updating node SET %r' % options)
+                            values2, missing = _remap_ids(seti2, nids_old, nids_new)
+                            if len(missing):
+                                model.log.warning("  couldn't find nids=%s...dropping" % (
+                                    missing.tolist()))
+                        values2 = values2.tolist()
 
                         param_type = 'SET-type'
                         #print('adding seti=%r values2=%r seti_key=%r param_type=%r'  % (
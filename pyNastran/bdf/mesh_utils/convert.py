@@ -75,6 +75,7 @@ def _convert_nodes(model, xyz_scale):
         else:
             # only scale R
             node.xyz[0] *= xyz_scale
+    model.invalidate_spatial_index()
 
 def _convert_coordinates(model, xyz_scale):
     """converts the coordinate systems"""
@@ -1,6 +1,7 @@
 """
 defines:
     * nids_close = find_closest_nodes(nodes_xyz, nids, xyz_compare, neq_max, tol)
+    * nids_close = find_closest_nodes(model, None, xyz_compare, neq_max, tol)
     * ieq = find_closest_nodes_index(nodes_xyz, xyz_compare, neq_max, tol)
 """
 from __future__ import print_function
@@ -16,10 +17,13 @@ def find_closest_nodes(nodes_xyz, nids, xyz_compare, neq_max=1, tol=None, msg=''
 
     Parameters
     ----------
-    nodes_xyz : (Nnodes, 3) float ndarray
-        the source points (e.g., xyz_cid0)
-    nids : (Nnodes, ) int ndarray
-        the source node ids (e.g.; nid_cp_cid[:, 0])
+    nodes_xyz : (Nnodes, 3) float ndarray / BDF()
+        ndarray : the source points (e.g., xyz_cid0)
+        BDF : the GRIDs of the model; the cached model.spatial_index
+              is used, so the kdtree isn't rebuilt on every call
+    nids : (Nnodes, ) int ndarray / None
+        the source node ids (e.g.; nid_cp_cid[:, 0]);
+        None if nodes_xyz is a BDF
     xyz_compare : (Ncompare, 3) float ndarray
         the xyz points to compare to; xyz_to_find
     tol : float; default=None
@@ -40,6 +44,14 @@ def find_closest_nodes(nodes_xyz, nids, xyz_compare, neq_max=1, tol=None, msg=''
             neq_max, type(neq_max), msg)
         raise TypeError(msgi)
     #ieq = find_closest_nodes_index(nodes_xyz, xyz_compare, neq_max, tol)
+    kdt = None
+    if not isinstance(nodes_xyz, np.ndarray):
+        assert nids is None, 'nids must be None when a BDF is passed in'
+        spatial_index = nodes_xyz.spatial_index
+        nodes_xyz = spatial_index.xyz_cid0
+        nids = spatial_index.nids
+        kdt = spatial_index.node_tree
+
     if tol is None:
         xyz_max = nodes_xyz.max(axis=0)
         xyz_min = nodes_xyz.min(axis=0)
@@ -48,7 +60,7 @@ def find_closest_nodes(nodes_xyz, nids, xyz_compare, neq_max=1, tol=None, msg=''
         tol = 2. * dxyz
 
     ieq = _not_equal_nodes_build_tree(nodes_xyz, xyz_compare, tol,
-                                      neq_max=neq_max, msg=msg)[1]
+                                      neq_max=neq_max, msg=msg, kdt=kdt)[1]
     ncompare = xyz_compare.shape[0]
     assert len(ieq) == ncompare, 'increase the tolerance so you can find nodes; tol=%r' % tol
     try:
@@ -95,7 +107,7 @@ def find_closest_nodes_index(nodes_xyz, xyz_compare, neq_max, tol, msg=''):
     return ieq
 
 
-def _not_equal_nodes_build_tree(nodes_xyz, xyz_compare, tol, neq_max=4, msg=''):
+def _not_equal_nodes_build_tree(nodes_xyz, xyz_compare, tol, neq_max=4, msg='', kdt=None):
     """
     helper function for `bdf_equivalence_nodes`
 
@@ -111,6 +123,9 @@ def _not_equal_nodes_build_tree(nodes_xyz, xyz_compare, tol, neq_max=4, msg=''):
         the number of close nodes
     msg : str; default=''
         error message
+    kdt : cKDTree(); default=None
+        the kdtree of nodes_xyz (e.g., model.spatial_index.node_tree)
+        None : build the kdtree
 
     Returns
     -------
@@ -136,7 +151,8 @@ def _not_equal_nodes_build_tree(nodes_xyz, xyz_compare, tol, neq_max=4, msg=''):
         msgi = 'nodes_xyz.shape=%s xyz_compare.shape=%s%s' % (
             str(nodes_xyz.shape), str(xyz_compare.shape), msg)
         raise RuntimeError(msgi)
-    kdt = _get_tree(nodes_xyz, msg=msg)
+    if kdt is None:
+        kdt = _get_tree(nodes_xyz, msg=msg)
     # check the closest 10 nodes for equality
     deq, ieq = kdt.query(xyz_compare, k=neq_max, distance_upper_bound=tol)
     #print(deq)
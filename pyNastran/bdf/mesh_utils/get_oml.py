@@ -5,7 +5,7 @@ defines:
 """
 from __future__ import print_function
 from copy import deepcopy
-from six import iteritems
+from six import iteritems, string_types
 import numpy as np
 
 from pyNastran.bdf.bdf import read_bdf
@@ -41,7 +41,10 @@ def get_oml_eids(bdf_filename, eid_start, theta_tol=30.,
     #---------------------------------
     theta_tol = np.radians(theta_tol)
 
-    model = read_bdf(bdf_filename, xref=True)
+    if isinstance(bdf_filename, string_types):
+        model = read_bdf(bdf_filename, xref=True)
+    else:
+        model = bdf_filename
     maps = model._get_maps(
         eids=None, map_names=None,
         consider_0d=False, consider_0d_rigid=False,
@@ -1,14 +1,17 @@
 """
 Defines:
  - pierce_shell_model(bdf_filename, xyz_points, tol=1.0)
+ - pierce_shell_model_rays(bdf_filename, origins, directions, hits='nearest')
+ - AABBTree(triangles, leaf_size=8)
+ - triangle_intersection_array(origins, directions, v0, v1, v2)
 """
 from itertools import count
-from typing import List, Optional
+from typing import Any, List, Optional, Tuple, Union
 from six import iteritems
-from six.moves import zip
+from six.moves import zip, range
 import numpy as np
 from pyNastran.bdf.bdf import BDF, read_bdf
-from pyNastran.bdf.mesh_utils.bdf_equivalence import _get_tree
+from pyNastran.bdf.mesh_utils.bdf_equivalence import _get_tree, _get_xyz_cid0
 
 
 def quad_intersection(orig, direction, v0, v1, v2, v3):
@@ -79,7 +82,7 @@ def triangle_intersection(orig, direction, v0, v1, v2):
 
 
 def pierce_shell_model(bdf_filename, xyz_points, tol=1.0):
-    # type: (Union[BDF, str], Any, float) -> List[int], np.ndarray, List[List[int]]
+    # type: (Union[BDF, str], Any, float) -> Tuple[List[int], np.ndarray, List[List[int]]]
     """
     Pierces a shell model with a <0., 0., 1.> vector.  In other words,
     models are pierced in the xy plane.
@@ -230,3 +233,395 @@ def pierce_shell_model(bdf_filename, xyz_points, tol=1.0):
     model.log.info('node_ids=%s' % node_ids)
 
     return eids_pierce, xyz_pierces_max, node_ids
+
+
+def triangle_intersection_array(origins, directions, v0, v1, v2, tol=1e-8):
+    # type: (np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray, float) -> Any
+    """
+    Vectorized Moller-Trumbore ray/triangle intersection
+
+    Parameters
+    ----------
+    origins : (n, 3) float ndarray
+        the ray origins
+    directions : (n, 3) float ndarray
+        the ray directions (need not be unit vectors)
+    v0, v1, v2 : (n, 3) float ndarray
+        the xyz points of the triangles
+    tol : float; default=1e-8
+        rays where the abs(determinant) is smaller than tol are
+        considered parallel to the triangle
+
+    Returns
+    -------
+    t : (n, ) float ndarray
+        the distance along each ray (in units of the direction vector);
+        xyz_pierce = origins + t * directions
+    is_hit : (n, ) bool ndarray
+        is the pierce point within the triangle
+    """
+    e1 = v1 - v0
+    e2 = v2 - v0
+    pvec = np.cross(directions, e2)
+    det = (e1 * pvec).sum(axis=1)
+    is_hit = np.abs(det) >= tol
+
+    # avoid dividing by zero for the parallel rays; they're filtered by is_hit
+    inv_det = 1. / np.where(is_hit, det, 1.)
+    tvec = origins - v0
+    u = (tvec * pvec).sum(axis=1) * inv_det
+    qvec = np.cross(tvec, e1)
+    v = (directions * qvec).sum(axis=1) * inv_det
+    t = (e2 * qvec).sum(axis=1) * inv_det
+    is_hit &= (u >= 0.) & (u <= 1.) & (v >= 0.) & (u + v <= 1.)
+    return t, is_hit
+
+
+class AABBTree(object):
+    """
+    Axis-aligned bounding box tree over a set of triangles that supports
+    batched ray queries
+
+    The tree is stored as flat arrays, so the rays are traversed one tree
+    level at a time for all the rays at once.
+    """
+    def __init__(self, triangles, leaf_size=8):
+        """
+        Creates the AABBTree
+
+        Parameters
+        ----------
+        triangles : (ntris, 3, 3) float ndarray
+            the xyz points of each triangle
+        leaf_size : int; default=8
+            the max number of triangles in a leaf
+        """
+        triangles = np.asarray(triangles, dtype='float64')
+        assert triangles.ndim == 3 and triangles.shape[1:] == (3, 3), triangles.shape
+        ntris = triangles.shape[0]
+        assert ntris > 0, 'ntris=0'
+        assert leaf_size > 0, 'leaf_size=%r' % leaf_size
+        self.triangles = triangles
+        self.leaf_size = leaf_size
+
+        tri_min = triangles.min(axis=1)
+        tri_max = triangles.max(axis=1)
+        centroids = triangles.mean(axis=1)
+
+        # the triangles of node i are order[start[i]:end[i]];
+        # a binary tree with at least 1 triangle per leaf has < 2*ntris nodes
+        nnodes_max = 2 * ntris
+        order = np.arange(ntris)
+        node_min = np.zeros((nnodes_max, 3), dtype='float64')
+        node_max = np.zeros((nnodes_max, 3), dtype='float64')
+        left = np.full(nnodes_max, -1, dtype='int64')
+        right = np.full(nnodes_max, -1, dtype='int64')
+        start = np.zeros(nnodes_max, dtype='int64')
+        end = np.zeros(nnodes_max, dtype='int64')
+
+        # (node_id, istart, iend)
+        stack = [(0, 0, ntris)]
+        nnodes = 1
+        while stack:
+            inode, istart, iend = stack.pop()
+            itris = order[istart:iend]
+            node_min[inode, :] = tri_min[itris, :].min(axis=0)
+            node_max[inode, :] = tri_max[itris, :].max(axis=0)
+            start[inode] = istart
+            end[inode] = iend
+
+            ntrisi = iend - istart
+            if ntrisi <= leaf_size:
+                continue
+
+            # split at the median centroid along the longest axis
+            centroidsi = centroids[itris, :]
+            iaxis = (centroidsi.max(axis=0) - centroidsi.min(axis=0)).argmax()
+            nleft = ntrisi // 2
+            isplit = np.argpartition(centroidsi[:, iaxis], nleft)
+            order[istart:iend] = itris[isplit]
+
+            ileft = nnodes
+            iright = nnodes + 1
+            nnodes += 2
+            left[inode] = ileft
+            right[inode] = iright
+            stack.append((ileft, istart, istart + nleft))
+            stack.append((iright, istart + nleft, iend))
+
+        self.order = order
+        self.node_min = node_min[:nnodes, :]
+        self.node_max = node_max[:nnodes, :]
+        self.left = left[:nnodes]
+        self.right = right[:nnodes]
+        self.start = start[:nnodes]
+        self.end = end[:nnodes]
+
+    @property
+    def nnodes(self):
+        """the number of nodes in the tree"""
+        return len(self.left)
+
+    def intersect(self, origins, directions, hits='nearest',
+                  tmin=0., tmax=np.inf, chunk_size=100000):
+        """
+        Intersects a set of rays with the triangles
+
+        Parameters
+        ----------
+        origins : (nrays, 3) float ndarray
+            the ray origins
+        directions : (nrays, 3) float ndarray; (3, ) float ndarray
+            the ray directions
+        hits : str; default='nearest'
+            'nearest' : only return the closest hit with t >= tmin
+            'all' : return all hits with tmin <= t <= tmax
+        tmin / tmax : float; default=0. / inf
+            the range of the ray parameter to consider;
+            use tmin=-inf to find hits behind the origin
+        chunk_size : int; default=100000
+            the number of rays to process at once
+
+        Returns
+        -------
+        hits='nearest'
+            itri : (nrays, ) int ndarray
+                the index of the pierced triangle; -1 for a miss
+            t : (nrays, ) float ndarray
+                the ray parameter; nan for a miss
+        hits='all'
+            iray : (nhits, ) int ndarray
+                the index of the ray
+            itri : (nhits, ) int ndarray
+                the index of the pierced triangle
+            t : (nhits, ) float ndarray
+                the ray parameter
+        """
+        origins = np.atleast_2d(np.asarray(origins, dtype='float64'))
+        directions = np.asarray(directions, dtype='float64')
+        nrays = origins.shape[0]
+        if directions.ndim == 1:
+            directions = np.tile(directions, (nrays, 1))
+        assert origins.shape == directions.shape, 'origins.shape=%s directions.shape=%s' % (
+            str(origins.shape), str(directions.shape))
+        if hits not in ['nearest', 'all']:
+            raise NotImplementedError("hits=%r; expected 'nearest' or 'all'" % hits)
+
+        if hits == 'nearest':
+            itri = np.full(nrays, -1, dtype='int64')
+            t = np.full(nrays, np.nan, dtype='float64')
+            for i0 in range(0, nrays, chunk_size):
+                i1 = min(i0 + chunk_size, nrays)
+                itri[i0:i1], t[i0:i1] = self._intersect_chunk(
+                    origins[i0:i1, :], directions[i0:i1, :], True, tmin, tmax)
+            return itri, t
+
+        irays = []
+        itris = []
+        ts = []
+        for i0 in range(0, nrays, chunk_size):
+            i1 = min(i0 + chunk_size, nrays)
+            irayi, itrii, ti = self._intersect_chunk(
+                origins[i0:i1, :], directions[i0:i1, :], False, tmin, tmax)
+            irays.append(irayi + i0)
+            itris.append(itrii)
+            ts.append(ti)
+        iray = np.hstack(irays)
+        itri = np.hstack(itris)
+        t = np.hstack(ts)
+        isort = np.lexsort((t, iray))
+        return iray[isort], itri[isort], t[isort]
+
+    def _intersect_chunk(self, origins, directions, is_nearest, tmin, tmax):
+        """helper for ``intersect``"""
+        nrays = origins.shape[0]
+        tri = self.triangles
+
+        # avoid 0 * inf in the slab test for axis-aligned rays
+        dirs_safe = np.where(np.abs(directions) < 1e-30, 1e-30, directions)
+        inv_dirs = 1. / dirs_safe
+        tbest = np.full(nrays, tmax, dtype='float64')
+        itri_best = np.full(nrays, -1, dtype='int64')
+        irays_all = []
+        itris_all = []
+        ts_all = []
+
+        iray = np.arange(nrays)
+        inode = np.zeros(nrays, dtype='int64')
+        while len(iray):
+            # ray/box slab test for every (ray, node) pair
+            origin = origins[iray, :]
+            inv_dir = inv_dirs[iray, :]
+            t1 = (self.node_min[inode, :] - origin) * inv_dir
+            t2 = (self.node_max[inode, :] - origin) * inv_dir
+            tnear = np.minimum(t1, t2).max(axis=1)
+            tfar = np.maximum(t1, t2).min(axis=1)
+            is_hit = (tnear <= tfar) & (tfar >= tmin) & (tnear <= tbest[iray])
+            iray = iray[is_hit]
+            inode = inode[is_hit]
+
+            is_leaf = self.left[inode] < 0
+            if is_leaf.any():
+                iray_leaf = iray[is_leaf]
+                inode_leaf = inode[is_leaf]
+                istart = self.start[inode_leaf]
+                ntrisi = self.end[inode_leaf] - istart
+
+                # expand the (ray, leaf) pairs into (ray, triangle) pairs
+                iray_tri = np.repeat(iray_leaf, ntrisi)
+                offsets = np.arange(ntrisi.sum()) - np.repeat(ntrisi.cumsum() - ntrisi, ntrisi)
+                itri = self.order[np.repeat(istart, ntrisi) + offsets]
+                ti, is_pierced = triangle_intersection_array(
+                    origins[iray_tri, :], directions[iray_tri, :],
+                    tri[itri, 0, :], tri[itri, 1, :], tri[itri, 2, :])
+                is_pierced &= (ti >= tmin) & (ti <= tbest[iray_tri])
+                iray_tri = iray_tri[is_pierced]
+                itri = itri[is_pierced]
+                ti = ti[is_pierced]
+
+                if is_nearest:
+                    if len(ti):
+                        # the closest hit for each ray in this level
+                        isort = np.lexsort((ti, iray_tri))
+                        iray_sorted = iray_tri[isort]
+                        ifirst = np.unique(iray_sorted, return_index=True)[1]
+                        iray_min = iray_sorted[ifirst]
+                        imin = isort[ifirst]
+                        is_better = ti[imin] < tbest[iray_min]
+                        iray_min = iray_min[is_better]
+                        imin = imin[is_better]
+                        tbest[iray_min] = ti[imin]
+                        itri_best[iray_min] = itri[imin]
+                else:
+                    irays_all.append(iray_tri)
+                    itris_all.append(itri)
+                    ts_all.append(ti)
+
+            # descend into the children
+            is_branch = ~is_leaf
+            iray_branch = iray[is_branch]
+            inode_branch = inode[is_branch]
+            iray = np.hstack([iray_branch, iray_branch])
+            inode = np.hstack([self.left[inode_branch], self.right[inode_branch]])
+
+        if is_nearest:
+            tbest[itri_best < 0] = np.nan
+            return itri_best, tbest
+
+        if irays_all:
+            return np.hstack(irays_all), np.hstack(itris_all), np.hstack(ts_all)
+        return (np.zeros(0, dtype='int64'), np.zeros(0, dtype='int64'),
+                np.zeros(0, dtype='float64'))
+
+
+def get_shell_triangles(model):
+    """
+    Triangulates the shell elements of a model using the corner nodes
+
+    Parameters
+    ----------
+    model : BDF()
+        a cross-referenced model
+
+    Returns
+    -------
+    eids : (ntris, ) int ndarray
+        the element id of each triangle (quads have 2 triangles)
+    triangles : (ntris, 3, 3) float ndarray
+        the xyz points of each triangle in the global frame
+    """
+    tri_types = ['CTRIA3', 'CTRIA6', 'CTRIAR']
+    quad_types = ['CQUAD4', 'CQUAD8', 'CQUADR', 'CQUAD']
+    tri_eids = []
+    tri_nids = []
+    quad_eids = []
+    quad_nids = []
+    for eid, elem in sorted(iteritems(model.elements)):
+        if elem.type in tri_types:
+            tri_eids.append(eid)
+            tri_nids.append(elem.node_ids[:3])
+        elif elem.type in quad_types:
+            quad_eids.append(eid)
+            quad_nids.append(elem.node_ids[:4])
+
+    tri_nids = np.array(tri_nids, dtype='int64').reshape(len(tri_eids), 3)
+    quad_nids = np.array(quad_nids, dtype='int64').reshape(len(quad_eids), 4)
+    eids = np.hstack([tri_eids, quad_eids, quad_eids]).astype('int64')
+    assert len(eids) > 0, 'no shell elements were found'
+
+    # quads are split into (n1, n2, n3) and (n1, n3, n4)
+    nids = np.vstack([
+        tri_nids,
+        quad_nids[:, [0, 1, 2]],
+        quad_nids[:, [0, 2, 3]],
+    ])
+    all_nids = np.array(sorted(model.nodes.keys()), dtype='int64')
+    xyz_cid0 = _get_xyz_cid0(model, all_nids, fdtype='float64')
+    inids = np.searchsorted(all_nids, nids)
+    triangles = xyz_cid0[inids, :]
+    return eids, triangles
+
+
+def pierce_shell_model_rays(bdf_filename, origins, directions, hits='nearest',
+                            tmin=0., tmax=np.inf, leaf_size=8):
+    """
+    Pierces the shell elements of a model with arbitrary rays
+
+    Parameters
+    ----------
+    bdf_filename : str / BDF()
+        the model to run
+    origins : (nrays, 3) float ndarray
+        the ray origins
+    directions : (nrays, 3) float ndarray; (3, ) float ndarray
+        the ray directions
+    hits : str; default='nearest'
+        'nearest' : only return the closest hit with t >= tmin
+        'all' : return all hits with tmin <= t <= tmax
+    tmin / tmax : float; default=0. / inf
+        the range of the ray parameter to consider
+    leaf_size : int; default=8
+        the max number of triangles in an AABBTree leaf
+
+    Returns
+    -------
+    hits='nearest'
+        eids : (nrays, ) int ndarray
+            the pierced element id; -1 for a miss
+        xyz : (nrays, 3) float ndarray
+            the pierce points; nan for a miss
+        t : (nrays, ) float ndarray
+            the ray parameter; nan for a miss
+    hits='all'
+        iray : (nhits, ) int ndarray
+            the index of the ray, which is sorted by iray and then t
+        eids : (nhits, ) int ndarray
+            the pierced element id
+        xyz : (nhits, 3) float ndarray
+            the pierce points
+        t : (nhits, ) float ndarray
+            the ray parameter
+    """
+    if isinstance(bdf_filename, BDF):
+        model = bdf_filename
+    else:
+        model = read_bdf(bdf_filename)
+
+    origins = np.atleast_2d(np.asarray(origins, dtype='float64'))
+    directions = np.asarray(directions, dtype='float64')
+    if directions.ndim == 1:
+        directions = np.tile(directions, (origins.shape[0], 1))
+
+    eids_tri, triangles = get_shell_triangles(model)
+    tree = AABBTree(triangles, leaf_size=leaf_size)
+    if hits == 'nearest':
+        itri, t = tree.intersect(origins, directions, hits=hits, tmin=tmin, tmax=tmax)
+        is_hit = itri >= 0
+        eids = np.full(len(itri), -1, dtype=eids_tri.dtype)
+        eids[is_hit] = eids_tri[itri[is_hit]]
+        xyz = origins + t[:, np.newaxis] * directions
+        return eids, xyz, t
+
+    iray, itri, t = tree.intersect(origins, directions, hits=hits, tmin=tmin, tmax=tmax)
+    xyz = origins[iray, :] + t[:, np.newaxis] * directions[iray, :]
+    return iray, eids_tri[itri], xyz, t
@@ -0,0 +1,343 @@
+"""
+defines:
+ - SpatialIndex(model)
+
+The SpatialIndex is cached on the model (``model.spatial_index``), so
+repeated proximity queries don't rebuild the kdtrees.
+"""
+from __future__ import print_function
+from itertools import chain
+from six import iteritems
+import numpy as np
+
+from pyNastran.bdf.mesh_utils.bdf_equivalence import _get_tree, _get_xyz_cid0
+
+
+class SpatialIndex(object):
+    """
+    Node/element kdtrees and element bounding boxes for a BDF model
+
+    The node and element data is extracted the first time it's needed.
+    The index is rebuilt by ``model.spatial_index`` when the number of
+    nodes, elements or coordinate systems changes or when the model's
+    spatial index version is bumped (e.g., by adding a card or by
+    ``model.invalidate_spatial_index()``).
+
+    Element centroids are the average of the element's nodes, which is
+    sufficient for spatial searching.
+    """
+    def __init__(self, model):
+        """
+        Creates the SpatialIndex
+
+        Parameters
+        ----------
+        model : BDF()
+            a cross-referenced model
+        """
+        self.model = model
+        self.key = _get_index_key(model)
+        self._nids = None
+        self._xyz_cid0 = None
+        self._node_tree = None
+
+        self._eids = None
+        self._centroids = None
+        self._element_min = None
+        self._element_max = None
+        self._element_radius = None
+        self._element_tree = None
+        self._element_radius_trees = None
+
+    def is_valid(self):
+        """is the index consistent with the model"""
+        return self.key == _get_index_key(self.model)
+
+    @property
+    def nids(self):
+        """the sorted GRID ids"""
+        if self._nids is None:
+            self._build_nodes()
+        return self._nids
+
+    @property
+    def xyz_cid0(self):
+        """the GRID locations in the global frame"""
+        if self._xyz_cid0 is None:
+            self._build_nodes()
+        return self._xyz_cid0
+
+    @property
+    def eids(self):
+        """the sorted element ids with GRIDs"""
+        if self._eids is None:
+            self._build_elements()
+        return self._eids
+
+    @property
+    def centroids(self):
+        """the element centroids in the global frame"""
+        if self._centroids is None:
+            self._build_elements()
+        return self._centroids
+
+    @property
+    def node_tree(self):
+        """the kdtree of the GRIDs"""
+        if self._node_tree is None:
+            self._node_tree = _get_tree(self.xyz_cid0, msg=' for the node spatial index')
+        return self._node_tree
+
+    @property
+    def element_tree(self):
+        """the kdtree of the element centroids"""
+        if self._element_tree is None:
+            self._element_tree = _get_tree(self.centroids, msg=' for the element spatial index')
+        return self._element_tree
+
+    def _build_nodes(self):
+        """extracts the node ids and locations"""
+        nids = np.array(sorted(self.model.nodes.keys()), dtype='int32')
+        assert len(nids) > 0, 'nnodes=0'
+        self._nids = nids
+        self._xyz_cid0 = _get_xyz_cid0(self.model, nids, fdtype='float64')
+
+    def _build_elements(self):
+        """extracts the element centroids and bounding boxes"""
+        nids = self.nids
+        xyz_cid0 = self.xyz_cid0
+
+        eids = []
+        element_nids = []
+        for eid, elem in sorted(iteritems(self.model.elements)):
+            try:
+                nidsi = [nid for nid in elem.node_ids if nid is not None]
+            except AttributeError:
+                # no nodes (e.g., GENEL)
+                continue
+            if not nidsi:
+                continue
+            eids.append(eid)
+            element_nids.append(nidsi)
+        assert len(eids) > 0, 'nelements=0'
+
+        # pad the connectivity, so everything is vectorized
+        nelements = len(eids)
+        nnodes_per_element = np.array([len(nidsi) for nidsi in element_nids])
+        nnodes_max = nnodes_per_element.max()
+        padded_nids = np.full((nelements, nnodes_max), nids[0], dtype='int32')
+        is_node = np.arange(nnodes_max) < nnodes_per_element[:, np.newaxis]
+        padded_nids[is_node] = np.hstack(element_nids)
+
+        # scalar points (e.g., SPOINTs on CELASx) aren't in the node list
+        inids = np.searchsorted(nids, padded_nids)
+        inids[inids == len(nids)] = 0
+        is_node &= nids[inids] == padded_nids
+        has_nodes = is_node.any(axis=1)
+        is_node = is_node[has_nodes, :]
+        inids = inids[has_nodes, :]
+
+        xyz = xyz_cid0[inids, :]
+        mask = ~is_node[:, :, np.newaxis]
+        nnodes = is_node.sum(axis=1)[:, np.newaxis]
+        centroids = np.where(mask, 0., xyz).sum(axis=1) / nnodes
+        element_min = np.where(mask, np.inf, xyz).min(axis=1)
+        element_max = np.where(mask, -np.inf, xyz).max(axis=1)
+
+        self._eids = np.array(eids, dtype='int32')[has_nodes]
+        self._centroids = centroids
+        self._element_min = element_min
+        self._element_max = element_max
+
+        # the max distance from a centroid to the corner of its box
+        self._element_radius = np.linalg.norm(
+            np.maximum(element_max - centroids, centroids - element_min), axis=1)
+
+    def nearest(self, xyz, k=1, use='nodes', distance_upper_bound=np.inf):
+        """
+        Finds the k closest nodes/elements (by centroid)
+
+        Parameters
+        ----------
+        xyz : (npoints, 3) float ndarray
+            the points to find
+        k : int; default=1
+            the number of close points to find
+        use : str; default='nodes'
+            'nodes' or 'elements'
+        distance_upper_bound : float; default=inf
+            the max distance to consider
+
+        Returns
+        -------
+        ids : (npoints, ) or (npoints, k) int ndarray
+            the node/element ids; -1 if there is no id within
+            distance_upper_bound
+        distance : (npoints, ) or (npoints, k) float ndarray
+            the distance to the node/centroid; inf if there is no id
+        """
+        ids_all, tree = self._get_ids_tree(use)
+        xyz = np.atleast_2d(xyz)
+        distance, i = tree.query(xyz, k=k, distance_upper_bound=distance_upper_bound)
+        is_found = i < len(ids_all)
+        ids = np.full(i.shape, -1, dtype=ids_all.dtype)
+        ids[is_found] = ids_all[i[is_found]]
+        return ids, distance
+
+    def radius(self, xyz, radius, use='nodes'):
+        """
+        Finds the nodes/elements (by centroid) within a radius
+
+        Parameters
+        ----------
+        xyz : (npoints, 3) float ndarray
+            the points to find
+        radius : float
+            the search radius
+        use : str; default='nodes'
+            'nodes' or 'elements'
+
+        Returns
+        -------
+        ids : List[(n, ) int ndarray]
+            the sorted node/element ids for each point
+        """
+        ids_all, tree = self._get_ids_tree(use)
+        xyz = np.atleast_2d(xyz)
+        results = tree.query_ball_point(xyz, radius)
+        return [np.sort(ids_all[np.array(result, dtype='int32')]) for result in results]
+
+    def box(self, xyz_min, xyz_max, use='nodes'):
+        """
+        Finds the nodes (or elements whose bounding boxes overlap)
+        within an axis-aligned box
+
+        Parameters
+        ----------
+        xyz_min / xyz_max : (3, ) float ndarray
+            the corners of the box
+        use : str; default='nodes'
+            'nodes' or 'elements'
+
+        Returns
+        -------
+        ids : (n, ) int ndarray
+            the sorted node/element ids
+        """
+        xyz_min = np.asarray(xyz_min, dtype='float64')
+        xyz_max = np.asarray(xyz_max, dtype='float64')
+        if use == 'nodes':
+            xyz = self.xyz_cid0
+            is_inside = ((xyz >= xyz_min) & (xyz <= xyz_max)).all(axis=1)
+            return self.nids[is_inside]
+        elif use == 'elements':
+            if self._element_min is None:
+                self._build_elements()
+            is_inside = ((self._element_max >= xyz_min) &
+                         (self._element_min <= xyz_max)).all(axis=1)
+            return self.eids[is_inside]
+        raise NotImplementedError("use=%r; expected 'nodes' or 'elements'" % use)
+
+    def elements_containing_point(self, xyz, tol=0.):
+        """
+        Finds the elements whose bounding box contains a point
+
+        Parameters
+        ----------
+        xyz : (npoints, 3) float ndarray
+            the points to find
+        tol : float; default=0.
+            the amount to grow each bounding box by
+
+        Returns
+        -------
+        eids : List[(n, ) int ndarray]
+            the sorted candidate element ids for each point
+
+        .. note:: this is a bounding box check; for shells, use
+                  ``pierce_shell_model_rays`` to get the pierce point
+        """
+        xyz = np.atleast_2d(np.asarray(xyz, dtype='float64'))
+        npoints = xyz.shape[0]
+
+        # gather the (point, element) candidates for each size of element,
+        # so a few large elements don't inflate the search radius of the
+        # small ones
+        ipoints = []
+        ielements = []
+        for ielements_radius, tree, radius in self._get_element_radius_trees():
+            # growing the box by tol moves the corner by sqrt(3)*tol
+            results = tree.query_ball_point(xyz, radius + np.sqrt(3.) * tol)
+            nresults = np.fromiter(
+                (len(result) for result in results), dtype='int32', count=npoints)
+            ipoints.append(np.repeat(np.arange(npoints, dtype='int32'), nresults))
+            ielements.append(ielements_radius[
+                np.fromiter(chain.from_iterable(results), dtype='int32',
+                            count=nresults.sum())])
+        ipoint = np.hstack(ipoints)
+        ielement = np.hstack(ielements)
+
+        # the bounding box check
+        xyzi = xyz[ipoint, :]
+        is_inside = ((self._element_min[ielement, :] - tol <= xyzi) &
+                     (self._element_max[ielement, :] + tol >= xyzi)).all(axis=1)
+        ipoint = ipoint[is_inside]
+        eids = self.eids[ielement[is_inside]]
+
+        # sort by point, then element id and split by point
+        isort = np.lexsort((eids, ipoint))
+        ipoint = ipoint[isort]
+        eids = eids[isort]
+        isplit = np.searchsorted(ipoint, np.arange(1, npoints))
+        return np.split(eids, isplit)
+
+    def _get_element_radius_trees(self):
+        """
+        Gets the element centroid kdtrees grouped by the binary exponent
+        of the element's bounding radius
+
+        Returns
+        -------
+        radius_trees : List[(ielements, tree, radius)]
+            ielements : (n, ) int ndarray
+                the element indices
+            tree : cKDTree
+                the kdtree of the element centroids
+            radius : float
+                the max bounding radius of the elements
+        """
+        if self._element_radius_trees is None:
+            centroids = self.centroids
+            element_radius = self._element_radius
+            exponents = np.frexp(element_radius)[1]
+            radius_trees = []
+            for exponent in np.unique(exponents):
+                ielements = np.where(exponents == exponent)[0]
+                tree = _get_tree(centroids[ielements, :], msg=' for the element spatial index')
+                radius_trees.append((ielements, tree, element_radius[ielements].max()))
+            self._element_radius_trees = radius_trees
+        return self._element_radius_trees
+
+    def _get_ids_tree(self, use):
+        """gets the ids and the kdtree for nodes/elements"""
+        if use == 'nodes':
+            return self.nids, self.node_tree
+        elif use == 'elements':
+            return self.eids, self.element_tree
+        raise NotImplementedError("use=%r; expected 'nodes' or 'elements'" % use)
+
+    def __repr__(self):
+        msg = 'SpatialIndex(nnodes=%s, nelements=%s)' % self.key[:2]
+        return msg
+
+
+def _get_index_key(model):
+    """
+    the model state that invalidates the index when changed
+
+    The counts catch deleted cards and the version is bumped when cards
+    are added, the coords are cross-referenced or the nodes are moved
+    (see ``BDF.invalidate_spatial_index``), so the check is O(1).
+    """
+    return (len(model.nodes), len(model.elements), len(model.coords),
+            model._spatial_index_version)
@@ -18,14 +18,16 @@ from pyNastran.bdf.mesh_utils.bdf_equivalence import bdf_equivalence_nodes
 from pyNastran.bdf.mesh_utils.collapse_bad_quads import convert_bad_quads_to_tris
 from pyNastran.bdf.mesh_utils.delete_bad_elements import get_bad_shells
 from pyNastran.bdf.mesh_utils.export_mcids import export_mcids
+from pyNastran.bdf.mesh_utils.find_closest_nodes import find_closest_nodes
 from pyNastran.bdf.mesh_utils.split_cbars_by_pin_flag import split_cbars_by_pin_flag
 from pyNastran.bdf.mesh_utils.split_elements import split_line_elements
-from pyNastran.bdf.mesh_utils.pierce_shells import pierce_shell_model, quad_intersection, triangle_intersection
+from pyNastran.bdf.mesh_utils.pierce_shells import (
+    pierce_shell_model, pierce_shell_model_rays, quad_intersection, triangle_intersection)
 from pyNastran.utils.log import SimpleLogger
 
 # testing these imports are up to date
 from pyNastran.bdf.mesh_utils.bdf_renumber import bdf_renumber
-from pyNastran.bdf.mesh_utils.bdf_merge import bdf_merge
+from pyNastran.bdf.mesh_utils.bdf_merge import bdf_merge, _add_renumbered_model
 from pyNastran.bdf.mesh_utils.delete_bad_elements import delete_bad_shells
 
 pkg_path = pyNastran.__path__[0]
@@ -351,6 +353,47 @@ class TestMeshUtils(unittest.TestCase):
         os.remove(bdf_filename)
         os.remove(bdf_filename_out)
 
+    def test_eq5_tiled(self):
+        """the tiled method collapses clusters that span multiple slabs"""
+        msg = 'CEND\n'
+        msg += 'BEGIN BULK\n'
+        msg += 'GRID,1, , 0.,   0.,   0.\n'
+        msg += 'GRID,20,, 1.,   0.,   0.\n'
+        msg += 'GRID,3, , 1.01, 0.,   0.\n'
+        msg += 'GRID,41,, 1.,   1.,   0.\n'
+        msg += 'GRID,4, , 1.,   1.,   0.\n'
+        msg += 'GRID,40,, 1.,   1.,   0.\n'
+        msg += 'GRID,42,, 1.,   1.,   0.\n'
+        msg += 'GRID,43,, 1.,   1.,   0.\n'
+        msg += 'GRID,44,, 1.,   1.,   0.\n'
+        msg += 'GRID,5, , 0.,   1.,   0.\n'
+        msg += 'GRID,6, , 0.,   1.01, 0.\n'
+        msg += 'CTRIA3,1, 100,1,20,6\n'
+        msg += 'CTRIA3,10,100,3,44,5\n'
+        msg += 'PSHELL,100,1000,0.1\n'
+        msg += 'MAT1,1000,3.0,, 0.3\n'
+        msg += 'ENDDATA'
+        bdf_filename = 'nonunique_tiled.bdf'
+        bdf_filename_out = 'unique_tiled.bdf'
+
+        with codec_open(bdf_filename, 'w') as bdf_file:
+            bdf_file.write(msg)
+
+        tol = 0.2
+        model = bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
+                                      renumber_nodes=False, xref=True,
+                                      crash_on_collapse=False,
+                                      log=log, debug=False,
+                                      method='tiled', ntile_nodes=2)
+        assert model.elements[10].node_ids == [3, 4, 5], model.elements[10].node_ids
+
+        model = BDF(log=log, debug=False)
+        model.read_bdf(bdf_filename_out)
+        nids = list(model.nodes.keys())
+        assert sorted(nids) == [1, 3, 4, 5], nids
+        os.remove(bdf_filename)
+        os.remove(bdf_filename_out)
+
     def test_fix_bad_quads(self):
         """split high interior angle quads"""
         msg = [
@@ -450,6 +493,34 @@ class TestMeshUtils(unittest.TestCase):
         read_bdf(bdf_filename_out2, log=log)
         read_bdf(bdf_filename_out3, log=log)
 
+    def test_merge_collision(self):
+        """merging overlapping ids without renumbering lists all the collisions"""
+        data_members = ['coords', 'nodes', 'elements', 'properties', 'materials']
+        models = []
+        for nid0 in [1, 3]:
+            model = BDF(log=log)
+            for nid in range(nid0, nid0 + 4):
+                model.add_grid(nid, [float(nid), 0., 0.])
+            model.add_conrod(nid0, 100, [nid0, nid0 + 1], A=1.0)
+            model.add_pshell(10, mid1=100, t=0.1)
+            model.add_mat1(100, 3.0e7, None, 0.3)
+            models.append(model)
+        model, model2 = models
+        mapper = {data_member : {} for data_member in data_members}
+
+        with self.assertRaises(RuntimeError) as context:
+            _add_renumbered_model(model, model2, mapper, data_members, 'model2.bdf')
+        msg = str(context.exception)
+        assert 'model2.bdf' in msg, msg
+        assert 'nodes: ids=[3, 4]' in msg, msg
+        assert 'properties: ids=[10]' in msg, msg
+        assert 'materials: ids=[100]' in msg, msg
+        assert 'elements' not in msg, msg
+
+        # nothing is added if there is a collision
+        assert sorted(model.nodes) == [1, 2, 3, 4], sorted(model.nodes)
+        assert sorted(model.elements) == [1], sorted(model.elements)
+
     def test_export_mcids(self):
         """creates material coordinate systems"""
         bdf_filename = os.path.abspath(os.path.join(
@@ -748,6 +819,112 @@ class TestMeshUtils(unittest.TestCase):
         ]
         pierce_shell_model(model, xyz_points)
 
+        origins = [
+            [0.4, 0.6, -1.],
+            [0.4, 0.6, 2.],
+            [-1., -1., 0.],
+            [11.5, 0.25, 1.],
+        ]
+        directions = [
+            [0., 0., 1.],
+            [0., 0., -1.],
+            [0., 0., 1.],
+            [-1., 0., -1.],  # oblique
+        ]
+        eids, xyz, t = pierce_shell_model_rays(model, origins, directions)
+        assert np.array_equal(eids, [1, 2, -1, 4]), eids
+        assert np.allclose(t[[0, 1, 3]], [1., 1., 1.]), t
+        assert np.allclose(xyz[0, :], [0.4, 0.6, 0.]), xyz
+        assert np.allclose(xyz[3, :], [10.5, 0.25, 0.]), xyz
+
+        iray, eids, xyz, t = pierce_shell_model_rays(model, origins, directions, hits='all')
+        assert np.array_equal(iray, [0, 0, 0, 1, 1, 1, 3]), iray
+        assert np.array_equal(eids, [1, 3, 2, 2, 3, 1, 4]), eids
+        assert np.allclose(t, [1., 1.5, 2., 1., 1.5, 2., 1.]), t
+
+    def test_spatial_index(self):
+        """tests the cached model.spatial_index"""
+        model = BDF(log=log)
+        pid = 10
+        mid1 = 100
+        model.add_grid(1, [0., 0., 0.])
+        model.add_grid(2, [1., 0., 0.])
+        model.add_grid(3, [1., 1., 0.])
+        model.add_grid(4, [0., 1., 0.])
+        model.add_grid(5, [2., 0., 0.])
+        model.add_grid(6, [2., 1., 0.])
+        model.add_cquad4(1, pid, [1, 2, 3, 4])
+        model.add_ctria3(2, pid, [2, 5, 6])
+        model.add_pshell(pid, mid1=mid1, t=2.)
+        model.add_mat1(mid1, 1.0, None, 0.3, rho=1.0)
+        model.cross_reference()
+
+        spatial_index = model.spatial_index
+        assert model.spatial_index is spatial_index
+
+        nids, distance = spatial_index.nearest([[0.9, 0.1, 0.], [5., 5., 5.]],
+                                               distance_upper_bound=1.)
+        assert np.array_equal(nids, [2, -1]), nids
+        nids = spatial_index.radius([0., 0., 0.], 1.01)[0]
+        assert np.array_equal(nids, [1, 2, 4]), nids
+        nids = spatial_index.box([0.5, -0.1, -0.1], [2.1, 0.1, 0.1])
+        assert np.array_equal(nids, [2, 5]), nids
+
+        eids, distance = spatial_index.nearest([1.9, 0.5, 0.], use='elements')
+        assert np.array_equal(eids, [2]), eids
+        eids = spatial_index.box([1.5, 0.5, 0.], [1.6, 0.6, 0.], use='elements')
+        assert np.array_equal(eids, [2]), eids
+        eids = spatial_index.elements_containing_point([[1., 0.5, 0.], [0.5, 0.5, 0.]])
+        assert np.array_equal(eids[0], [1, 2]), eids
+        assert np.array_equal(eids[1], [1]), eids
+
+        # find_closest_nodes reuses the cached node tree
+        nids = find_closest_nodes(model, None, np.array([[0.9, 0.1, 0.], [2.1, 1.1, 0.]]))
+        assert np.array_equal(nids, [2, 6]), nids
+        assert model.spatial_index is spatial_index
+
+        # adding a node invalidates the index
+        model.add_grid(7, [3., 0., 0.])
+        assert model.spatial_index is not spatial_index
+        nids = model.spatial_index.nearest([3., 0., 0.])[0]
+        assert np.array_equal(nids, [7]), nids
+
+        # moving a node requires invalidating the index
+        spatial_index = model.spatial_index
+        model.nodes[7].xyz = np.array([4., 0., 0.])
+        assert model.spatial_index is spatial_index
+        model.invalidate_spatial_index()
+        assert model.spatial_index is not spatial_index
+        nids = model.spatial_index.nearest([3.9, 0., 0.])[0]
+        assert np.array_equal(nids, [7]), nids
+
+        # cross-referencing a redefined coordinate system invalidates it
+        model.add_cord2r(1, origin=[0., 0., 0.], zaxis=[0., 0., 1.], xzplane=[1., 0., 0.])
+        model.nodes[7].cp = 1
+        model.cross_reference()
+        spatial_index = model.spatial_index
+        assert model.spatial_index is spatial_index
+        model.coords[1].e1 = np.array([0., 10., 0.])
+        model.coords[1].e2 = np.array([0., 10., 1.])
+        model.coords[1].e3 = np.array([1., 10., 0.])
+        model.cross_reference()
+        assert model.spatial_index is not spatial_index
+        nids = model.spatial_index.nearest([4., 10., 0.])[0]
+        assert np.array_equal(nids, [7]), nids
+
+        # a large element doesn't change the small element candidates
+        model.add_grid(8, [100., 100., 0.])
+        model.add_ctria3(3, pid, [1, 2, 8])
+        model.cross_reference()
+        eids = model.spatial_index.elements_containing_point(
+            [[1., 0.5, 0.], [0.5, 0.5, 0.], [50., 60., 0.], [-1., -1., 0.]])
+        assert np.array_equal(eids[0], [1, 2, 3]), eids
+        assert np.array_equal(eids[1], [1, 3]), eids
+        assert np.array_equal(eids[2], [3]), eids
+        assert len(eids[3]) == 0, eids
+        eids = model.spatial_index.elements_containing_point([-0.1, 0.5, 0.], tol=0.2)
+        assert np.array_equal(eids[0], [1, 3]), eids
+
     #def test_intersect(self):
         #p0 = np.array([0,0,0], 'd')
         #p1 = np.array([1,0,0], 'd')
@@ -2,7 +2,9 @@ from __future__ import print_function
 import os
 import unittest
 from pyNastran.bdf.bdf import BDF, get_logger2
-from pyNastran.bdf.mesh_utils.bdf_renumber import bdf_renumber
+import numpy as np
+from pyNastran.bdf.mesh_utils.bdf_renumber import (
+    bdf_renumber, _get_nid_map_arrays, _remap_ids)
 #from pyNastran.utils.dev import get_files_of_type
 
 import pyNastran
@@ -99,6 +101,21 @@ class TestRenumber(unittest.TestCase):
         bdf_filename_check = os.path.join(dirname, 'Simple_Example_check.bdf')
         check_renumber(bdf_filename, bdf_filename_renumber, bdf_filename_check)
 
+    def test_renumber_nid_map_arrays(self):
+        """GRIDs skip the SPOINT/EPOINT ids"""
+        nids = [10, 30, 20, 33]
+        spoints = [4, 5, 6, 7, 8, 11, 1, 2]
+        nids_old, nids_new = _get_nid_map_arrays(nids, spoints, 1)
+        assert np.array_equal(nids_old, [10, 20, 30, 33]), nids_old
+        assert np.array_equal(nids_new, [3, 9, 10, 12]), nids_new
+
+        nids_old, nids_new = _get_nid_map_arrays(nids, spoints, 100)
+        assert np.array_equal(nids_new, [100, 101, 102, 103]), nids_new
+
+        ids2, missing = _remap_ids([33, 10, 99], nids_old, nids_new)
+        assert np.array_equal(ids2, [103, 100]), ids2
+        assert np.array_equal(missing, [99]), missing
+
     #def test_renumber_05(self):
         #dirname = os.path.join(UNIT_PATH, 'obscure')
         #bdf_filenames = get_files_of_type(dirname, extension='.bdf')
@@ -60,7 +60,7 @@ def cmd_line_equivalence():  # pragma: no cover
     from docopt import docopt
     import pyNastran
     msg = "Usage:\n"
-    msg += "  bdf equivalence IN_BDF_FILENAME EQ_TOL  [-o OUT_BDF_FILENAME]\n"
+    msg += "  bdf equivalence IN_BDF_FILENAME EQ_TOL  [-o OUT_BDF_FILENAME] [--tiled] [--ntile NTILE]\n"
 
     msg += '  bdf equivalence -h | --help\n'
     msg += '  bdf equivalence -v | --version\n'
@@ -73,7 +73,10 @@ def cmd_line_equivalence():  # pragma: no cover
     msg += '\n'
 
     msg += 'Options:\n'
-    msg += "  -o OUT, --output OUT_BDF_FILENAME  path to output BDF/DAT/NAS file\n\n"
+    msg += "  -o OUT, --output OUT_BDF_FILENAME  path to output BDF/DAT/NAS file\n"
+    msg += "  --tiled          find all pairs using overlapping slabs of nodes and\n"
+    msg += "                   collapse clusters of any size (for very large models)\n"
+    msg += "  --ntile NTILE    the number of nodes per slab (default=1000000)\n\n"
 
     msg += 'Info:\n'
     msg += '  -h, --help      show this help message and exit\n'
@@ -93,6 +96,10 @@ def cmd_line_equivalence():  # pragma: no cover
     if bdf_filename_out is None:
         bdf_filename_out = 'merged.bdf'
     tol = data['EQ_TOL']
+    method = 'tiled' if data['--tiled'] else 'neq_max'
+    ntile_nodes = 1000000
+    if data['--ntile'] is not None:
+        ntile_nodes = int(data['--ntile'])
     size = 16
     from pyNastran.bdf.mesh_utils.bdf_equivalence import bdf_equivalence_nodes
     bdf_equivalence_nodes(bdf_filename, bdf_filename_out, tol,
@@ -103,7 +110,8 @@ def cmd_line_equivalence():  # pragma: no cover
                           remove_collapsed_elements=False,
                           avoid_collapsed_elements=False,
                           crash_on_collapse=False,
-                          debug=True)
+                          debug=True,
+                          method=method, ntile_nodes=ntile_nodes)
 
 def cmd_line_bin():  # pragma: no cover
     """bins the model into nbins"""
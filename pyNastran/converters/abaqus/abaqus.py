@@ -2,6 +2,7 @@
 Defines the Abaqus class
 """
 from __future__ import print_function
+import os
 from six import iteritems
 import numpy as np
 from pyNastran.utils.log import get_logger2
@@ -9,18 +10,54 @@ from pyNastran.converters.abaqus.abaqus_cards import Material, Part, SolidSectio
 
 def read_abaqus(abaqus_inp_filename, log=None, debug=False):
     """reads an abaqus model"""
-    model = Abaqus(log=None, debug=False)
+    model = Abaqus(log=log, debug=debug)
     model.read_abaqus_inp(abaqus_inp_filename)
     return model
 
-def _clean_lines(lines):
-    """removes comment lines and concatenates include files"""
+#: the number of nodes for the common element types; the element lines
+#: of these types may be continued onto the following line
+ELEMENT_NNODES = {
+    # bars/springs/masses
+    'mass' : 1, 'rotaryi' : 1,
+    'r2d2' : 2, 'conn2d2' : 2, 'conn3d2' : 2, 't2d2' : 2, 't3d2' : 2,
+    'b21' : 2, 'b31' : 2,
+
+    # shells
+    'cpe3' : 3, 'cps3' : 3, 'cax3' : 3, 's3' : 3, 's3r' : 3, 'm3d3' : 3,
+    'cpe4' : 4, 'cpe4r' : 4, 'cps4' : 4, 'cps4r' : 4, 'cax4' : 4, 'cax4r' : 4,
+    'coh2d4' : 4, 'cohax4' : 4, 's4' : 4, 's4r' : 4, 'm3d4' : 4, 'm3d4r' : 4,
+    'cpe6' : 6, 'cps6' : 6, 'cax6' : 6, 'stri65' : 6,
+    'cpe8' : 8, 'cpe8r' : 8, 'cps8' : 8, 'cps8r' : 8, 'cax8' : 8, 'cax8r' : 8,
+    's8r' : 8,
+
+    # solids
+    'c3d4' : 4, 'c3d4h' : 4, 'c3d6' : 6, 'c3d8' : 8, 'c3d8r' : 8, 'c3d8h' : 8,
+    'c3d8i' : 8, 'coh3d8' : 8, 'c3d10' : 10, 'c3d10h' : 10, 'c3d10m' : 10,
+    'c3d15' : 15, 'c3d20' : 20, 'c3d20r' : 20, 'c3d20h' : 20,
+}
+
+def _clean_lines(lines, dirname=''):
+    """
+    removes comments/blank lines and concatenates include files
+
+    Parameters
+    ----------
+    lines : List[str]
+        the lines of the file
+    dirname : str; default=''
+        the directory of the file, which include files are relative to
+
+    Returns
+    -------
+    lines2 : List[str]
+        the stripped lines
+    """
     lines2 = []
     for line in lines:
         line2 = line.strip().split('**', 1)[0]
         #print(line2)
         if line2:
-            if 'include' in line2.lower():
+            if line2[0] == '*' and line2[1:].lstrip().lower().startswith('include'):
                 sline = line2.split(',')
                 assert len(sline) == 2, sline
                 assert '=' in sline[1], sline
@@ -28,18 +65,97 @@ def _clean_lines(lines):
                 assert len(sline2) == 2, sline2
                 base, inc_filename = sline2
                 base = base.strip()
-                inc_filename = inc_filename.strip()
+                inc_filename = inc_filename.strip().strip('"\'')
                 assert base.lower() == 'input', 'base=%r' % base.lower()
 
+                inc_filename = os.path.join(dirname, inc_filename)
                 with open(inc_filename, 'r') as inc_file:
                     inc_lines = inc_file.readlines()
-                inc_lines = _clean_lines(inc_lines)
+                inc_lines = _clean_lines(inc_lines, os.path.dirname(inc_filename))
                 lines2 += inc_lines
                 continue
 
-            lines2.append(line)
+            lines2.append(line2)
     return lines2
 
+def _get_block_end(lines, iline):
+    """gets the line number of the next keyword (or the end of the file)"""
+    nlines = len(lines)
+    while iline < nlines and not lines[iline].startswith('*'):
+        iline += 1
+    return iline
+
+def _fromstring(lines, dtype):
+    """parses the comma/space separated values on the lines in one shot"""
+    return np.fromstring(' '.join(lines).replace(',', ' '), dtype=dtype, sep=' ')
+
+def read_node_block(lines, iline0, iline1):
+    """
+    Reads a *Node block
+
+    Parameters
+    ----------
+    lines : List[str]
+        the cleaned lines
+    iline0 / iline1 : int
+        the data lines are lines[iline0:iline1]
+
+    Returns
+    -------
+    nids : (nnodes, ) int32 ndarray
+        the node ids
+    xyz : (nnodes, 3) float32 ndarray
+        the node locations; z=0. for 2d nodes
+    """
+    nnodes = iline1 - iline0
+    if nnodes == 0:
+        return np.zeros(0, dtype='int32'), np.zeros((0, 3), dtype='float32')
+
+    # 3 values for 2d nodes; 4 for 3d nodes
+    nvalues = len(lines[iline0].rstrip(', ').split(','))
+    if nvalues not in [3, 4]:
+        raise NotImplementedError('nid,x,y(,z) is expected; line=%r' % lines[iline0])
+    data = _fromstring(lines[iline0:iline1], 'float64')
+    if data.size != nnodes * nvalues:
+        msg = 'expected %i values in *Node block; found %i\nline0=%r' % (
+            nnodes * nvalues, data.size, lines[iline0])
+        raise RuntimeError(msg)
+    data = data.reshape(nnodes, nvalues)
+    nids = data[:, 0].astype('int32')
+    xyz = np.zeros((nnodes, 3), dtype='float32')
+    xyz[:, :nvalues - 1] = data[:, 1:]
+    return nids, xyz
+
+def read_element_block(lines, iline0, iline1, etype):
+    """
+    Reads an *Element block
+
+    Parameters
+    ----------
+    lines : List[str]
+        the cleaned lines
+    iline0 / iline1 : int
+        the data lines are lines[iline0:iline1]
+    etype : str
+        the lowercase element type (e.g., 'c3d8r')
+
+    Returns
+    -------
+    elements : (nelements, nnodes + 1) int32 ndarray
+        the element id and node ids
+    """
+    if etype in ELEMENT_NNODES:
+        nvalues = ELEMENT_NNODES[etype] + 1
+    else:
+        # unknown element types can't be continued onto another line
+        nvalues = len(lines[iline0].rstrip(', ').split(','))
+
+    data = _fromstring(lines[iline0:iline1], 'int32')
+    if data.size % nvalues:
+        msg = 'etype=%r expects %i values per element; found %i values\nline0=%r' % (
+            etype, nvalues, data.size, lines[iline0])
+        raise RuntimeError(msg)
+    return data.reshape(data.size // nvalues, nvalues)
 
 class Abaqus(object):
     """defines the abaqus reader"""
@@ -61,7 +177,7 @@ class Abaqus(object):
         with open(abaqus_inp_filename, 'r') as abaqus_inp:
             lines = abaqus_inp.readlines()
 
-        lines = _clean_lines(lines)
+        lines = _clean_lines(lines, os.path.dirname(abaqus_inp_filename))
 
         ilines = []
         iline = 0
@@ -519,12 +635,8 @@ class Abaqus(object):
                     iline += 1
                     line0 = lines[iline].strip().lower()
             elif '*element' in line0:
-                #iline += 1
-                #line0 = lines[iline].strip().lower()
-                line0, iline, etype, elements = self._read_elements(lines, line0, iline)
-                element_types[etype] = elements
-                iline += 1
-                line0 = lines[iline].strip().lower()
+                line0, iline, etype, elements = self._read_elements(lines, line0, iline + 1)
+                _add_elements(element_types, etype, elements)
                 #print('line_end =', line0)
             else:
                 raise NotImplementedError('\nword=%r\nline=%r' % (word, line0))
@@ -543,7 +655,7 @@ class Abaqus(object):
 
         iline += 1
         line0 = lines[iline].strip().lower()
-        assert line0 == '*node', line0
+        assert line0.startswith('*node'), line0
 
 
         #iline += 1
@@ -563,40 +675,15 @@ class Abaqus(object):
             iline += 1 # skips over the header line
             self.log.debug('  ' + line0)
             if '*node' in line0:
-                #print('  Node iline=%s' % iline)
-                line0 = lines[iline].strip().lower()
-                #print('  node line0 =', line0)
-                is_failed = False
-                #if len(nids) > 0:
-                    #nids0 = copy.deepcopy(nids)
-                    #nids = []
-                    #is_failed = False
-
-                #print('  ', line0)
-                while not line0.startswith('*'):
-                    sline = line0.split(',')
-                    nids.append(sline[0])
-                    nsline = len(sline)
-                    if nsline == 3:
-                        sline.append(0.)
-                        nodes.append(sline[1:])
-                    elif nsline == 4:
-                        nodes.append(sline[1:])
-                    else:
-                        raise NotImplementedError(sline)
-
-                    iline += 1
-                    line0 = lines[iline].strip().lower()
-                nnodes = len(nids)
-                if is_failed:
-                    msg = 'nids will overwrite nids0!\n'
-                    #msg += 'nids0 = %s\n' % nids0
-                    msg += 'nids = %s\n' % nids
-                    raise RuntimeError(msg)
+                iline1 = _get_block_end(lines, iline)
+                nidsi, nodesi = read_node_block(lines, iline, iline1)
+                nids.append(nidsi)
+                nodes.append(nodesi)
+                iline = iline1
 
             elif '*element' in line0:
                 line0, iline, etype, elements = self._read_elements(lines, line0, iline)
-                element_types[etype] = elements
+                _add_elements(element_types, etype, elements)
 
             elif '*nset' in line0:
                 params_map = get_param_map(word)
@@ -681,6 +768,9 @@ class Abaqus(object):
 
         if self.debug:
             self.log.debug('part_name = %r' % part_name)
+        if nids:
+            nids = np.hstack(nids)
+            nodes = np.vstack(nodes)
         part = Part(part_name, nids, nodes, element_types, node_sets, element_sets,
                     solid_sections, self.log)
         self.part_name = None
@@ -688,38 +778,41 @@ class Abaqus(object):
 
     def _read_elements(self, lines, line0, iline):
         """
-        '*element, type=mass, elset=topc_inertia-2_mass_'
+        Reads an *Element block
+
+        Parameters
+        ----------
+        lines : List[str]
+            the cleaned lines
+        line0 : str
+            the lowercase header line
+            (e.g., '*element, type=mass, elset=topc_inertia-2_mass_')
+        iline : int
+            the first data line
+
+        Returns
+        -------
+        line0 : str
+            the lowercase keyword line after the block
+        iline : int
+            the line number of line0
+        etype : str
+            the lowercase element type
+        elements : (nelements, nnodes + 1) int32 ndarray
+            the element id and node ids
         """
-        #print('------------------')
-        #print('%s: %s' % (self.part_name, line0))
-        sline = line0.split(',')[1:]
-        allowed_element_types = [
-            'r2d2', 'conn2d2',
-            'cpe3', 'cpe4', 'cpe4r', 'coh2d4', 'c3d10h', 'cohax4',
-            'cax3', 'cax4r', 'cps4r', 'mass', 'rotaryi']
-        if len(sline) != 1:
+        param_map = get_param_map(line0.strip('*'))
+        if 'type' not in param_map:
             raise RuntimeError("looking for element_type (e.g., '*Element, type=R2D2')\n"
-                               "line0=%r\nsline=%s" % (line0, sline))
-        etype_sline = sline[0]
-        assert 'type' in etype_sline, etype_sline
-        etype = etype_sline.split('=')[1]
-        if etype not in allowed_element_types:
-            msg = 'etype=%s allowed=[%s]' % (etype, ','.join(allowed_element_types))
-            raise RuntimeError(msg)
-
+                               "line0=%r" % line0)
+        etype = param_map['type']
         if self.debug:
             self.log.debug('    etype = %r' % etype)
 
-        #iline += 1
-        line0 = lines[iline].strip().lower()
-
-        elements = []
-        while not line0.startswith('*'):
-            #print(line0)
-            elements.append(line0.split(','))
-            iline += 1
-            line0 = lines[iline].strip().lower()
-        #print('elements =', elements)
+        iline1 = _get_block_end(lines, iline)
+        elements = read_element_block(lines, iline, iline1, etype)
+        iline = iline1
+        line0 = lines[iline].strip().lower() if iline < len(lines) else ''
         return line0, iline, etype, elements
 
     def read_step(self, lines, iline, line0, istep):
@@ -847,6 +940,12 @@ class Abaqus(object):
         self.log.debug('  end of step %i...' % istep)
         return iline, line0
 
+def _add_elements(element_types, etype, elements):
+    """adds an element block; multiple blocks of the same type are stacked"""
+    if etype in element_types:
+        elements = np.vstack([element_types[etype], elements])
+    element_types[etype] = elements
+
 def read_set(lines, iline, line0, params_map):
     """reads a set"""
     set_ids = []
@@ -57,11 +57,32 @@ class Part(object):
     """a Part object is a series of nodes & elements (of various types)"""
     def __init__(self, name, nids, nodes, element_types, node_sets, element_sets,
                  solid_sections, log):
-        """creates a Part object"""
+        """
+        creates a Part object
+
+        Parameters
+        ----------
+        name : str
+            the name of the part
+        nids : (nnodes, ) int ndarray
+            the node ids
+        nodes : (nnodes, 3) float ndarray
+            the node locations
+        element_types : dict[etype] = elements
+            etype : str
+                the lowercase element type (e.g., 'cpe4')
+            elements : (nelements, nnodes + 1) int ndarray
+                the element id and the node ids
+        """
         self.name = name
         self.log = log
         self.solid_sections = solid_sections
 
+        #: all the elements, including the ones without a named attribute
+        self.element_types = {
+            etype : np.asarray(elements, dtype='int32')
+            for etype, elements in iteritems(element_types)}
+
         try:
             self.nids = np.array(nids, dtype='int32')
         except ValueError:
@@ -2,6 +2,8 @@ from __future__ import print_function
 import os
 import unittest
 
+import numpy as np
+
 from pyNastran.converters.abaqus.abaqus import read_abaqus
 
 class TestAbaqus(unittest.TestCase):
@@ -29,5 +31,42 @@ class TestAbaqus(unittest.TestCase):
         read_abaqus(abaqus_filename, debug=False)
         os.remove(abaqus_filename)
 
+    def test_abaqus_2(self):
+        """*Include, 2d nodes, continued elements, and repeated element blocks"""
+        include_lines = [
+            '** the nodes',
+            '3, 1., 1.',
+            '4, 0., 1.',
+        ]
+        lines = [
+            '*Part, name=dummy',
+            '*Node',
+            '1, 0., 0.',
+            '2, 1., 0. ** comment',
+            '*Include, input=test_nodes.inp',
+            '*Element, type=CPE3, elset=tris',
+            '1, 1, 2, 3',
+            '*Element, type=CPE3',
+            '2, 1, 3, 4',
+            '*Element, type=C3D8',
+            '3, 1, 2, 3,',
+            '4, 1, 2, 3, 4',
+            '*End Part',
+        ]
+        abaqus_filename = 'test2.inp'
+        with open('test_nodes.inp', 'w') as include_file:
+            include_file.write('\n'.join(include_lines))
+        with open(abaqus_filename, 'w') as abaqus_file:
+            abaqus_file.write('\n'.join(lines))
+        model = read_abaqus(abaqus_filename, debug=False)
+        os.remove(abaqus_filename)
+        os.remove('test_nodes.inp')
+
+        part = model.parts['dummy']
+        assert np.array_equal(part.nids, [1, 2, 3, 4]), part.nids
+        assert np.array_equal(part.nodes[2], [1., 1., 0.]), part.nodes
+        assert np.array_equal(part.cpe3, [[1, 1, 2, 3], [2, 1, 3, 4]]), part.cpe3
+        assert np.array_equal(part.element_types['c3d8'], [[3, 1, 2, 3, 4, 1, 2, 3, 4]])
+
 if __name__ == '__main__':  #  pragma: no cover
     unittest.main()
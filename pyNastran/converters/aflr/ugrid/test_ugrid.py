@@ -5,10 +5,13 @@ from __future__ import print_function
 import os
 import unittest
 
+import numpy as np
+
 import pyNastran
 from pyNastran.converters.nastran.nastran_to_ugrid import nastran_to_ugrid
 from pyNastran.converters.aflr.ugrid.ugrid3d_to_nastran import ugrid3d_to_nastran
 from pyNastran.converters.aflr.ugrid.ugrid3d_to_tecplot import ugrid_to_tecplot
+from pyNastran.converters.aflr.ugrid.ugrid_reader import read_ugrid
 from pyNastran.utils.log import get_logger
 
 pkg_path = pyNastran.__path__[0]
@@ -47,6 +50,87 @@ class TestUgrid(unittest.TestCase):
                               adjust_nids=True)
         assert os.path.exists(tecplot_filename2), tecplot_filename2
 
+    def test_ugrid_02(self):
+        """tests the memmapped solids"""
+        nastran_filename = os.path.join(nastran_path, 'solid_bending', 'solid_bending.bdf')
+        ugrid_filename = os.path.join(nastran_path, 'solid_bending', 'solid_bending_mmap.b8.ugrid')
+        ugrid_filename2 = os.path.join(nastran_path, 'solid_bending', 'solid_bending_mmap2.b8.ugrid')
+        log = get_logger(level='warning')
+        nastran_to_ugrid(nastran_filename, ugrid_filename_out=ugrid_filename,
+                         properties=None, check_shells=False, check_solids=True, log=log)
+
+        model = read_ugrid(ugrid_filename, log=log)
+        model_mmap = read_ugrid(ugrid_filename, log=log, use_memmap=True)
+        assert isinstance(model_mmap.tets, np.memmap)
+        assert np.array_equal(model.nodes, model_mmap.nodes)
+        assert np.array_equal(model.tets, model_mmap.tets)
+
+        model_mmap.write_ugrid(ugrid_filename2, check_shells=False)
+        with open(ugrid_filename, 'rb') as ugrid_file, open(ugrid_filename2, 'rb') as ugrid_file2:
+            assert ugrid_file.read() == ugrid_file2.read()
+
+        model_surface = read_ugrid(ugrid_filename, log=log, read_solids=False)
+        assert model_surface.tets.shape[0] == 0, model_surface.tets.shape
+        del model_mmap
+        os.remove(ugrid_filename)
+        os.remove(ugrid_filename2)
+
+    def test_ugrid_03(self):
+        """tests the Fortran unformatted (r8/lr8) files"""
+        nastran_filename = os.path.join(nastran_path, 'solid_bending', 'solid_bending.bdf')
+        ugrid_filename = os.path.join(nastran_path, 'solid_bending', 'solid_bending_fortran.b8.ugrid')
+        log = get_logger(level='warning')
+        nastran_to_ugrid(nastran_filename, ugrid_filename_out=ugrid_filename,
+                         properties=None, check_shells=False, check_solids=True, log=log)
+        model = read_ugrid(ugrid_filename, log=log)
+        with open(ugrid_filename, 'rb') as ugrid_file:
+            data = ugrid_file.read()
+        os.remove(ugrid_filename)
+
+        # the number of BL tets and the volume ids are in the same record
+        ntets = model.tets.shape[0]
+        extra = np.hstack([0, np.ones(ntets)]).astype('>i4')
+        for file_format, endian in [('r8', '>'), ('lr8', '<')]:
+            header = np.frombuffer(data[:28], dtype='>i4')
+            body = _swap_ugrid_body(data[28:], model, endian)
+            body += extra.astype(endian + 'i4').tobytes()
+
+            ugrid_filename2 = os.path.join(
+                nastran_path, 'solid_bending', 'solid_bending_fortran.%s.ugrid' % file_format)
+            with open(ugrid_filename2, 'wb') as ugrid_file:
+                _write_fortran_record(ugrid_file, header.astype(endian + 'i4').tobytes(), endian)
+                _write_fortran_record(ugrid_file, body, endian)
+
+            for use_memmap in [False, True]:
+                model2 = read_ugrid(ugrid_filename2, log=log, use_memmap=use_memmap)
+                assert np.array_equal(model2.nodes, model.nodes), file_format
+                assert np.array_equal(model2.tris, model.tris), file_format
+                assert np.array_equal(model2.pids, model.pids), file_format
+                assert np.array_equal(model2.tets, model.tets), file_format
+                del model2
+
+            # a record that's too short
+            with open(ugrid_filename2, 'wb') as ugrid_file:
+                _write_fortran_record(ugrid_file, header.astype(endian + 'i4').tobytes(), endian)
+                _write_fortran_record(ugrid_file, body[:100], endian)
+            with self.assertRaises(RuntimeError):
+                read_ugrid(ugrid_filename2, log=log)
+            os.remove(ugrid_filename2)
+
+
+def _swap_ugrid_body(data, model, endian):
+    """converts the big endian (b8) nodes/elements to the requested endian"""
+    nnodes = model.nodes.shape[0]
+    nodes = np.frombuffer(data[:nnodes * 24], dtype='>f8').astype(endian + 'f8')
+    ints = np.frombuffer(data[nnodes * 24:], dtype='>i4').astype(endian + 'i4')
+    return nodes.tobytes() + ints.tobytes()
+
+
+def _write_fortran_record(ugrid_file, data, endian):
+    """writes a Fortran unformatted record"""
+    marker = np.array([len(data)], dtype=endian + 'i4').tobytes()
+    ugrid_file.write(marker + data + marker)
+
 
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
@@ -4,22 +4,26 @@ Defines the following classes:
 """
 from __future__ import print_function
 import os
-from struct import Struct, unpack
 import sys
 from codecs import open
 
 import numpy as np
 from numpy import zeros, unique, array
-from numpy import arange, hstack, setdiff1d, union1d
+from numpy import arange, hstack, union1d
 
 from pyNastran.bdf.field_writer_double import print_card_double
 from pyNastran.bdf.field_writer_16 import print_card_16
 from pyNastran.bdf.field_writer_8 import print_card_8
 from pyNastran.utils.log import get_logger
 
+#: the number of rows that are read/written at once
+CHUNK_SIZE = 1000000
+
+SOLID_SECTIONS = ['tets', 'penta5s', 'penta6s', 'hexas']
+
 
 def read_ugrid(ugrid_filename=None,
-               encoding=None, log=None, debug=True):
+               encoding=None, log=None, debug=True, read_solids=True, use_memmap=False):
     """
     Creates the UGRID object
 
@@ -37,13 +41,19 @@ def read_ugrid(ugrid_filename=None,
         settings the logging object has
     encoding : str; default=None
         is this used?
+    read_solids : bool; default=True
+        read the volume elements
+    use_memmap : bool; default=False
+        the nodes and volume elements are np.memmap views of the file,
+        which are only loaded when they're used
 
     Returns
     -------
     model : UGRID()
         an UGRID object
     """
-    ugrid_model = UGRID(log=log, debug=debug)
+    ugrid_model = UGRID(log=log, debug=debug, read_solids=read_solids,
+                        use_memmap=use_memmap)
     ugrid_model.read_ugrid(ugrid_filename)
     return ugrid_model
 
@@ -52,7 +62,8 @@ class UGRID(object):
     """
     Interface to the AFLR UGrid format.
     """
-    def __init__(self, log=None, debug=False, read_shells=True, read_solids=True):
+    def __init__(self, log=None, debug=False, read_shells=True, read_solids=True,
+                 use_memmap=False):
         #FortranFormat.__init__(self)
         self.log = get_logger(log, 'debug' if debug else 'info')
         self.debug = debug
@@ -69,11 +80,19 @@ class UGRID(object):
         self.hexas = array([], dtype='int32')
         self.read_shells = read_shells
         self.read_solids = read_solids
+        self.use_memmap = use_memmap
 
         self.isort = None
 
     def read_ugrid(self, ugrid_filename):
         """
+        Reads a UGRID
+
+        The surface (nodes, tris, quads, pids) is loaded into memory.
+        If use_memmap is set, the nodes and the volume elements are
+        np.memmap views of the file, so they're only read when
+        they're used.
+
         $
         $       NASTRAN INPUT DECK GENERATED BY UG_IO
         $
@@ -97,23 +116,27 @@ class UGRID(object):
         $UG_IO_ Data
         $Number_of_Vol_Tets 1036480
         """
-        out = determine_dytpe_nfloat_endian_from_ugrid_filename(ugrid_filename)
-        ndarray_float, float_fmt, nfloat, endian, ugrid_filename = out
+        out = _get_ugrid_format(ugrid_filename)
+        ndarray_float, float_fmt, nfloat, endian, is_fortran, ugrid_filename = out
 
         # more for documentation than anything else
         assert ndarray_float in ['float32', 'float64'], ndarray_float
         assert float_fmt in ['f', 'd'], float_fmt
         assert nfloat in [4, 8], nfloat
         assert endian in ['<', '>'], ndarray_float
-
+        int_dtype = np.dtype(endian + 'i4')
+        float_dtype = np.dtype(endian + float_fmt)
 
         with open(ugrid_filename, 'rb') as ugrid_file:
-            data = ugrid_file.read(7 * 4)
-            self.n += 7 * 4
-
-            nnodes, ntris, nquads, ntets, npenta5s, npenta6s, nhexas = unpack(endian + '7i', data)
+            offset = 0
+            if is_fortran:
+                # the header is a 28 byte record
+                offset = _read_record_marker(ugrid_file, int_dtype, 28)
+            header = np.fromfile(ugrid_file, dtype=int_dtype, count=7)
+            assert len(header) == 7, header
+            offset += 7 * 4
+            nnodes, ntris, nquads, ntets, npenta5s, npenta6s, nhexas = header.tolist()
             npids = nquads + ntris
-            nvol_elements = ntets + npenta5s + npenta6s + nhexas
             self.log.info('nnodes=%.3fm ntris=%s nquads=%s ntets=%.3fm'
                           ' npenta5s=%.3fm npenta6s=%.3fm nhexas=%.3fm' % (
                               nnodes / 1e6, ntris, nquads,
@@ -123,124 +146,37 @@ class UGRID(object):
             self.log.info('nsurface_elements=%s nvolume_elements=%.3f Million' % (
                 npids, nvolume_elements / 1e6))
 
-            # we know the shapes of nodes (e.g. Nx3), but we want to directly
-            # unpack the data into the array, so we shape it as N*3, load the
-            # data and and then do a reshape
-            self.log.debug('ndarray_float=%s' % (ndarray_float))
-            #nodes = zeros(nnodes * 3, dtype=ndarray_float)
-            #tris = zeros(ntris * 3, dtype='int32')
-            #quads = zeros(nquads * 4, dtype='int32')
-            #pids = zeros(npids, dtype='int32')
-
-            if self.read_solids:
-                tets = zeros(ntets * 4, dtype='int32')
-                penta5s = zeros(npenta5s * 5, dtype='int32')
-                penta6s = zeros(npenta6s * 6, dtype='int32')
-                hexas = zeros(nhexas * 8, dtype='int32')
-
-            ## NODES
-            data = ugrid_file.read(nnodes * 3 * nfloat)
-            self.n += nnodes * 3 * nfloat
-            dtype = endian + float_fmt
-            nodes = np.fromstring(data, dtype=dtype).reshape((nnodes, 3))
-            #print('min xyz value = ' , nodes.min())
-            #print('max xyz value = ' , nodes.max())
-
-            ## CTRIA3
-            data = ugrid_file.read(ntris * 3 * 4)
-            self.n += ntris * 3 * 4
-            dtype = endian + 'i'
-            tris = np.fromstring(data, dtype=dtype).reshape((ntris, 3))
-            #print('min tris value = ' , tris.min())
-            #print('max tris value = ' , tris.max())
-
-
-            ## CQUAD4
-            data = ugrid_file.read(nquads * 4 * 4)
-            self.n += nquads * 4 * 4
-            quads = np.fromstring(data, dtype=dtype).reshape((nquads, 4))
-            #print('min quads value = ' , quads.min())
-            #print('max quads value = ' , quads.max())
-
-            if npids:
-                data = ugrid_file.read(npids * 4)
-                assert len(data) == (npids * 4), 'len(data)=%s' % (len(data))
-                self.n += npids * 4
-                pids = np.fromstring(data, dtype=dtype)
-                #print('min pids value = ' , pids.min())
-                #print('max pids value = ' , pids.max())
-                self.pids = pids
-
-            self.nodes = nodes
-            self.tris = tris
-            self.quads = quads
+            sections = _get_sections(header.tolist(), nfloat)
+            if is_fortran:
+                # the rest of the data is a single record
+                nbytes = sum([nbytesi for unused_name, nbytesi, unused_shape in sections])
+                ugrid_file.seek(offset + 4)
+                offset = _read_record_marker(ugrid_file, int_dtype, nbytes)
 
-            #==========================================
-            # solids
-            if not self.read_solids:
-                #nids = np.unique(np.hstack([self.quads.ravel(), self.tris.ravel()]))
-                #inid = np.searchsorted(np.arange(self.nodes.size), nids)
-                #self.nodes = self.nodes[inid]
-                return
-
-            ## CTETRA
-            data = ugrid_file.read(ntets * 4 * 4)
-            self.n += ntets * 4 * 4
-            tets = np.fromstring(data, dtype=dtype).reshape((ntets, 4))
-            #print('min tets value = ' , tets.min())
-            #print('max tets value = ' , tets.max())
-
-            ## CPYRAM
-            data = ugrid_file.read(npenta5s * 5 * 4)
-            self.n += npenta5s * 5 * 4
-            penta5s = np.fromstring(data, dtype=dtype).reshape((npenta5s, 5))
-            #print('min penta5s value = ' , penta5s.min())
-            #print('max penta5s value = ' , penta5s.max())
-
-            ## CPENTA
-            data = ugrid_file.read(npenta6s * 6 * 4)
-            self.n += npenta6s * 6 * 4
-            penta6s = np.fromstring(data, dtype=dtype).reshape((npenta6s, 6))
-            #print('min penta6s value = ' , penta6s.min())
-            #print('max penta6s value = ' , penta6s.max())
-
-            ## CHEXA
-            data = ugrid_file.read(nhexas * 8 * 4)
-            self.n += nhexas * 8 * 4
-            hexas = np.fromstring(data, dtype=dtype).reshape((nhexas, 6))
-            #print('min hexas value = ' , hexas.min())
-            #print('max hexas value = ' , hexas.max())
-
-            self.tets = tets
-            self.penta5s = penta5s
-            self.penta6s = penta6s
-            self.hexas = hexas
-
-            if 0:
-                #self.show(100, types='i', big_endian=True)
-                if nvol_elements == 0:
-                    raise RuntimeError('not a volume grid')
-
-                data = ugrid_file.read(4)
-                nBL_tets = unpack(endian + 'i', data)
-                self.n += 4
-                self.log.debug('nBL_tets=%s' % (nBL_tets)) # trash
-
-
-                data = ugrid_file.read(nvol_elements * 4)
-                self.n += nvol_elements * 4
-                self.log.debug('len(data)=%s len/4=%s nvol_elements=%s' % (
-                    len(data), len(data) / 4., nvol_elements))
-                assert len(data) == (nvol_elements * 4)
-
-                fmt = endian + '%ii' % (nvol_elements * 4)
-                volume_ids = zeros(nvol_elements, dtype='int32')
-                volume_ids[:] = unpack(fmt, data)
-
-                # some more data we're not reading for now...
-
-                #self.show(100, types='i', big_endian=True)
-            assert self.n == ugrid_file.tell()
+            self.log.debug('ndarray_float=%s' % (ndarray_float))
+            for name, nbytes, shape in sections:
+                is_solid = name in SOLID_SECTIONS
+                if is_solid and not self.read_solids:
+                    break
+
+                dtype = float_dtype if name == 'nodes' else int_dtype
+                if self.use_memmap and (is_solid or name == 'nodes') and nbytes:
+                    # the nodes/solids aren't loaded until they're used
+                    values = np.memmap(ugrid_filename, dtype=dtype, mode='r',
+                                       offset=offset, shape=shape)
+                else:
+                    ugrid_file.seek(offset)
+                    nvalues = nbytes // dtype.itemsize
+                    values = np.fromfile(ugrid_file, dtype=dtype, count=nvalues)
+                    if len(values) != nvalues:
+                        raise RuntimeError('expected %i %s values; found %i' % (
+                            nvalues, name, len(values)))
+                    values = values.reshape(shape)
+                setattr(self, name, values)
+                offset += nbytes
+        # some more data (e.g., the number of BL tets, the volume ids) that
+        # we're not reading for now...
+        self.n = offset
         #self.check_hanging_nodes()
 
     def write_bdf(self, bdf_filename, include_shells=True, include_solids=True,
@@ -281,42 +217,34 @@ class UGRID(object):
             self.log.debug('writing GRIDs')
             if not self.read_solids:
                 nids_to_write = np.unique(np.hstack([self.quads.ravel(), self.tris.ravel()]))
-                nnodes = self.nodes.shape[0]
-                all_nids = np.arange(nnodes, dtype='int32')
-                inid = np.searchsorted(all_nids, nids_to_write)
-                nodes = self.nodes[inid, :]
-
-                for i, nid in enumerate(nids_to_write):
-                    node = self.nodes[i, :]
+                nodes = self.nodes[nids_to_write - 1, :]
+                for nid, node in zip(nids_to_write, nodes):
                     card = ['GRID', nid, None] + list(node)
                     bdf_file.write(print_card(card))
             else:
                 self.check_hanging_nodes()
-                for i, node in enumerate(self.nodes):
-                    node = self.nodes[i, :]
-                    card = ['GRID', i + 1, None] + list(node)
-                    bdf_file.write(print_card(card))
+                for i0 in range(0, self.nodes.shape[0], CHUNK_SIZE):
+                    nodes = np.asarray(self.nodes[i0:i0 + CHUNK_SIZE, :])
+                    for i, node in enumerate(nodes):
+                        card = ['GRID', i0 + i + 1, None] + list(node)
+                        bdf_file.write(print_card(card))
             self.log.debug('finished writing GRIDs')
 
             eid = 1
             pids = self.pids
+            ntris = self.tris.shape[0]
             if include_shells:
                 upids = unique(pids)  # auto-sorts
                 for pid in upids:
                     bdf_file.write('PSHELL,%i,%i, 0.1\n' % (pid, mid))
                 self.log.debug('writing CTRIA3')
-                for element in self.tris:
-                    bdf_file.write('CTRIA3  %-8i%-8i%-8i%-8i%-8i\n' % (
-                        eid, pids[eid-1], element[0], element[1], element[2]))
-                    eid += 1
+                eid = _write_elements(bdf_file, 'CTRIA3  %-8i%-8i%-8i%-8i%-8i',
+                                      eid, pids[:ntris], self.tris)
 
                 self.log.debug('writing CQUAD4')
-                for element in self.quads:
-                    bdf_file.write('CQUAD4  %-8i%-8i%-8i%-8i%-8i%-8i\n' % (
-                        eid, pids[eid-1], element[0], element[1], element[2], element[3]))
-                    eid += 1
+                eid = _write_elements(bdf_file, 'CQUAD4  %-8i%-8i%-8i%-8i%-8i%-8i',
+                                      eid, pids[ntris:], self.quads)
             else:
-                ntris = self.tris.shape[0]
                 nquads = self.quads.shape[0]
                 eid += ntris + nquads
 
@@ -333,89 +261,69 @@ class UGRID(object):
             bdf_file.write('ENDDATA\n')
 
     def check_hanging_nodes(self, stop_on_diff=True):
-        """verifies that all nodes are used"""
-        self.log.debug('checking hanging nodes')
-        tris = self.tris
-        quads = self.quads
-        pids = self.pids
-
+        """
+        Verifies that all nodes are used by the solids and that the
+        elements don't have repeated nodes
 
+        The elements are checked in chunks, so memmapped solids aren't
+        loaded all at once.
+        """
+        self.log.debug('checking hanging nodes')
         nnodes = self.nodes.shape[0]
-        # ntris = tris.shape[0]
-        # nquads = quads.shape[0]
 
+        solids = []
         if self.read_solids:
-            tets = self.tets
-            pyrams = self.penta5s
-            pentas = self.penta6s
-            hexas = self.hexas
-
-            ntets = tets.shape[0]
-            npyramids = pyrams.shape[0]
-            npentas = pentas.shape[0]
-            nhexas = hexas.shape[0]
-        else:
-            ntets = 0
-            npyramids = 0
-            npentas = 0
-            nhexas = 0
-
-        nids = []
-        # if ntris:
-            # nids.append(unique(tris.flatten()))
-        # if nquads:
-            # nids.append(unique(quads.flatten()))
-
-        if ntets:
-            nids.append(unique(tets.flatten()))
-        if npyramids:
-            nids.append(unique(pyrams.flatten()))
-        if npentas:
-            nids.append(unique(pentas.flatten()))
-        if nhexas:
-            nids.append(unique(hexas.flatten()))
-        if len(nids) == 0:
-            raise RuntimeError('there are no solid nodes; nids=%s' % nids)
-        elif len(nids) == 1:
-            nids = nids[0]
-        else:
-            nids = unique(hstack(nids))
+            solids = [self.tets, self.penta5s, self.penta6s, self.hexas]
+        solids = [elements for elements in solids if elements.shape[0]]
+        if len(solids) == 0:
+            raise RuntimeError('there are no solid nodes')
+
+        # is_used[0] flags the invalid node ids
+        is_used = zeros(nnodes + 1, dtype='bool')
+        invalid_nids = []
+        for elements in solids:
+            for i0 in range(0, elements.shape[0], CHUNK_SIZE):
+                nids = np.asarray(elements[i0:i0 + CHUNK_SIZE, :]).ravel()
+                is_valid = (nids >= 1) & (nids <= nnodes)
+                is_used[nids[is_valid]] = True
+                if not is_valid.all():
+                    invalid_nids.append(nids[~is_valid])
 
         diff = []
-        if nnodes != len(nids):
-            expected = arange(1, nnodes + 1, dtype='int32')
-            print(expected)
-
-            diff = setdiff1d(expected, nids)
-            diff2 = setdiff1d(nids, expected)
-            diff = union1d(diff, diff2)
-            msg = 'nnodes=%i len(nids)=%s diff=%s diff2=%s' % (nnodes, len(nids), diff, diff2)
-            print(msg)
-            print('nids = %s' % nids)
+        unused_nids = np.where(~is_used[1:])[0] + 1
+        if len(unused_nids) or invalid_nids:
+            diff2 = unique(hstack(invalid_nids)) if invalid_nids else array([], dtype='int32')
+            diff = union1d(unused_nids, diff2)
+            msg = 'nnodes=%i nunused=%s diff=%s diff2=%s' % (
+                nnodes, len(unused_nids), unused_nids, diff2)
+            self.log.error(msg)
             if stop_on_diff:
                 raise RuntimeError(msg)
 
         # check unique node ids
-        for tri in tris:
-            assert len(unique(tri)) == 3, tri
-        for quad in quads:
-            # assert len(unique(quad)) == 4, quad
-            if len(unique(quad)) != 4:
-                print(quad)
-        for tet in tets:
-            assert len(unique(tet)) == 4, tet
-        for pyram in pyrams:
-            assert len(unique(pyram)) == 5, pyram
-        for penta in pentas:
-            assert len(unique(penta)) == 6, penta
-        for hexa in hexas:
-            assert len(unique(hexa)) == 8, hexa
+        for name, elements in [('tris', self.tris), ('quads', self.quads),
+                               ('tets', self.tets), ('penta5s', self.penta5s),
+                               ('penta6s', self.penta6s), ('hexas', self.hexas)]:
+            ibad = _get_collapsed_elements(elements)
+            if len(ibad) == 0:
+                continue
+            msg = 'collapsed %s=%s' % (name, np.asarray(elements[ibad]))
+            if name == 'quads':
+                self.log.warning(msg)
+            else:
+                raise AssertionError(msg)
         return diff
 
     def write_ugrid(self, ugrid_filename_out, check_shells=True, check_solids=True):
-        """writes a UGrid model"""
+        """
+        writes a UGrid model
+
+        The arrays are written in chunks, so memmapped solids may be
+        written without being loaded.
+        """
         outi = determine_dytpe_nfloat_endian_from_ugrid_filename(ugrid_filename_out)
         ndarray_float, float_fmt, nfloat, endian, ugrid_filename = outi
+        int_dtype = endian + 'i4'
 
         nodes = self.nodes
         nnodes = nodes.shape[0]
@@ -446,57 +354,14 @@ class UGRID(object):
 
         self.log.debug('writing ugrid=%r' % ugrid_filename)
         with open(ugrid_filename, 'wb') as f_ugrid:
-            sfmt = Struct(endian + '7i')
-            f_ugrid.write(sfmt.pack(nnodes, ntris, nquads, ntets, npyramids, npentas, nhexas))
-
-            # %3f or %3d
-            fmt = endian + '%i%s' % (nnodes * 3, float_fmt) # len(x,y,z) = 3
-            sfmt = Struct(fmt)
-            f_ugrid.write(sfmt.pack(*nodes.ravel()))
-
-            # TODO: speed up with numpy
-            if ntris:
-                # CTRIA3
-                fmt = endian + '%ii' % (ntris * 3)
-                sfmt = Struct(fmt)
-                f_ugrid.write(sfmt.pack(*tris.ravel()))
-
-            if nquads:
-                # QUAD4
-                fmt = endian + '%ii' % (nquads * 4)
-                sfmt = Struct(fmt)
-                f_ugrid.write(sfmt.pack(*quads.ravel()))
-
-            # PSHELL
+            header = [nnodes, ntris, nquads, ntets, npyramids, npentas, nhexas]
+            array(header, dtype=int_dtype).tofile(f_ugrid)
+
+            _write_array(f_ugrid, nodes, endian + float_fmt)
             if nshells:
                 self.log.info('pids = %s' % pids)
-                fmt = endian + '%ii' % (nshells)
-                sfmt = Struct(fmt)
-                f_ugrid.write(sfmt.pack(*pids.ravel()))
-
-            if ntets:
-                # CTETRA
-                fmt = endian + '%ii' % (ntets * 4)
-                sfmt = Struct(fmt)
-                f_ugrid.write(sfmt.pack(*tets.ravel()))
-
-            if npyramids:
-                # CPYRAM
-                fmt = endian + '%ii' % (npyramids * 5)
-                sfmt = Struct(fmt)
-                f_ugrid.write(sfmt.pack(*pyrams.ravel()))
-
-            if npentas:
-                # CPENTA
-                fmt = endian + '%ii' % (npentas * 6)
-                sfmt = Struct(fmt)
-                f_ugrid.write(sfmt.pack(*pentas.ravel()))
-
-            if nhexas:
-                # CHEXA
-                fmt = endian + '%ii' % (nhexas * 8)
-                sfmt = Struct(fmt)
-                f_ugrid.write(sfmt.pack(*hexas.ravel()))
+            for elements in [tris, quads, pids, tets, pyrams, pentas, hexas]:
+                _write_array(f_ugrid, elements, int_dtype)
         self.check_hanging_nodes()
 
     def _write_bdf_solids(self, bdf_file, eid, pid, convert_pyram_to_penta=True):
@@ -505,48 +370,31 @@ class UGRID(object):
         bdf_file.write('PSOLID,%i,1\n' % pid)
         self.log.debug('writing CTETRA')
         bdf_file.write('$ CTETRA\n')
-        for element in self.tets:
-            #card = ['CTETRA', eid, pid] + list(element)
-            #f.write(print_int_card(card))
-            bdf_file.write('CTETRA  %-8i%-8i%-8i%-8i%-8i%-8i\n' % (
-                eid, pid, element[0], element[1], element[2], element[3]))
-            eid += 1
+        eid = _write_elements(bdf_file, 'CTETRA  %-8i%-8i%-8i%-8i%-8i%-8i',
+                              eid, pid, self.tets)
 
         if convert_pyram_to_penta:
             # skipping the penta5s
             self.log.debug('writing CPYRAM as CPENTA with node6=node5')
             bdf_file.write('$ CPYRAM - CPENTA5\n')
-            for element in self.penta5s:
-                bdf_file.write('CPENTA  %-8i%-8i%-8i%-8i%-8i%-8i%-8i%-8i\n' % (
-                    eid, pid, element[0], element[1], element[2], element[3],
-                    element[4], element[4]))
-                eid += 1
+            eid = _write_elements(bdf_file, 'CPENTA  %-8i%-8i%-8i%-8i%-8i%-8i%-8i%-8i',
+                                  eid, pid, self.penta5s, inodes=[0, 1, 2, 3, 4, 4])
         else:
             self.log.debug('writing CPYRAM')
             bdf_file.write('$ CPYRAM - CPENTA5\n')
-            for element in self.penta5s:
-                bdf_file.write('CPYRAM  %-8i%-8i%-8i%-8i%-8i%-8i%-8i\n' % (
-                    eid, pid, element[0], element[1], element[2], element[3], element[4]))
-                eid += 1
+            eid = _write_elements(bdf_file, 'CPYRAM  %-8i%-8i%-8i%-8i%-8i%-8i%-8i',
+                                  eid, pid, self.penta5s)
 
         self.log.debug('writing CPENTA')
         bdf_file.write('$ CPENTA6\n')
-        for element in self.penta6s:
-            #card = ['CPENTA', eid, pid] + list(element)
-            #f.write(print_int_card(card))
-            bdf_file.write('CPENTA  %-8i%-8i%-8i%-8i%-8i%-8i%-8i%-8i\n' % (
-                eid, pid, element[0], element[1], element[2], element[3], element[4], element[5]))
-            eid += 1
+        eid = _write_elements(bdf_file, 'CPENTA  %-8i%-8i%-8i%-8i%-8i%-8i%-8i%-8i',
+                              eid, pid, self.penta6s)
 
         self.log.debug('writing CHEXA')
         bdf_file.write('$ CHEXA\n')
-        for element in self.hexas:
-            #card = ['CHEXA', eid, pid] + list(element)
-            bdf_file.write('CHEXA   %-8i%-8i%-8i%-8i%-8i%-8i%-8i%-8i\n        %-8i%-8i\n' % (
-                eid, pid, element[0], element[1], element[2], element[3],
-                element[4], element[5], element[6], element[7]))
-            #f.write(print_int_card(card))
-            eid += 1
+        eid = _write_elements(
+            bdf_file, 'CHEXA   %-8i%-8i%-8i%-8i%-8i%-8i%-8i%-8i\n        %-8i%-8i',
+            eid, pid, self.hexas)
         return eid, pid
 
     def skin_solids(self):
@@ -660,8 +508,146 @@ class UGRID(object):
         return tris, quads
 
 
+def _get_sections(header, nfloat):
+    """
+    Gets the sections of the UGRID in the order they're stored
+
+    Parameters
+    ----------
+    header : List[int]
+        nnodes, ntris, nquads, ntets, npenta5s, npenta6s, nhexas
+    nfloat : int
+        the number of bytes in a float
+
+    Returns
+    -------
+    sections : List[(name, nbytes, shape)]
+        name : str
+            the UGRID attribute
+        nbytes : int
+            the size of the section
+        shape : tuple
+            the shape of the array
+    """
+    nnodes, ntris, nquads, ntets, npenta5s, npenta6s, nhexas = header
+    sections = [
+        ('nodes', nnodes * 3 * nfloat, (nnodes, 3)),
+        ('tris', ntris * 3 * 4, (ntris, 3)),
+        ('quads', nquads * 4 * 4, (nquads, 4)),
+        ('pids', (ntris + nquads) * 4, (ntris + nquads, )),
+        ('tets', ntets * 4 * 4, (ntets, 4)),
+        ('penta5s', npenta5s * 5 * 4, (npenta5s, 5)),
+        ('penta6s', npenta6s * 6 * 4, (npenta6s, 6)),
+        ('hexas', nhexas * 8 * 4, (nhexas, 8)),
+    ]
+    return sections
+
+
+def _read_record_marker(ugrid_file, int_dtype, nbytes):
+    """
+    Reads a Fortran record marker and returns the offset of the record data
+
+    The record may be longer than the data we read (e.g., the number of
+    boundary layer tets and the volume ids follow the elements).  Only
+    records that aren't split into subrecords (<2 GB) are supported.
+    """
+    marker, = np.fromfile(ugrid_file, dtype=int_dtype, count=1)
+    if marker < 0:
+        msg = ('expected a Fortran record of at least %i bytes; marker=%i; '
+               'records split into subrecords (>2 GB) are not supported' % (nbytes, marker))
+        raise NotImplementedError(msg)
+    elif marker < nbytes:
+        msg = 'expected a Fortran record of at least %i bytes; marker=%i' % (nbytes, marker)
+        raise RuntimeError(msg)
+    return ugrid_file.tell()
+
+
+def _write_array(ugrid_file, values, dtype):
+    """writes an array in chunks, so memmapped arrays aren't loaded at once"""
+    for i0 in range(0, values.shape[0], CHUNK_SIZE):
+        np.asarray(values[i0:i0 + CHUNK_SIZE], dtype=dtype).tofile(ugrid_file)
+
+
+def _write_elements(bdf_file, fmt, eid, pid, elements, inodes=None):
+    """
+    Writes the elements in chunks
+
+    Parameters
+    ----------
+    bdf_file : file
+        the file object
+    fmt : str
+        the format of a card; filled by (eid, pid, node1, node2, ...)
+    eid : int
+        the first element id
+    pid : int / (nelements, ) int ndarray
+        the property id(s)
+    elements : (nelements, nnodes) int ndarray
+        the node ids
+    inodes : List[int]; default=None -> all
+        the columns of elements to write
+
+    Returns
+    -------
+    eid : int
+        the next element id
+    """
+    nelements = elements.shape[0]
+    for i0 in range(0, nelements, CHUNK_SIZE):
+        elementsi = np.asarray(elements[i0:i0 + CHUNK_SIZE, :])
+        if inodes is not None:
+            elementsi = elementsi[:, inodes]
+        nelementsi = elementsi.shape[0]
+        eids = arange(eid + i0, eid + i0 + nelementsi)
+        if isinstance(pid, np.ndarray):
+            pids = pid[i0:i0 + nelementsi]
+        else:
+            pids = np.full(nelementsi, pid)
+        np.savetxt(bdf_file, np.column_stack([eids, pids, elementsi]), fmt=fmt)
+    return eid + nelements
+
+
+def _get_collapsed_elements(elements):
+    """gets the indices of the elements with repeated node ids"""
+    ibad = []
+    for i0 in range(0, elements.shape[0], CHUNK_SIZE):
+        elementsi = np.sort(elements[i0:i0 + CHUNK_SIZE, :], axis=1)
+        is_repeated = (elementsi[:, 1:] == elementsi[:, :-1]).any(axis=1)
+        ibad.append(i0 + np.where(is_repeated)[0])
+    if len(ibad) == 0:
+        return array([], dtype='int32')
+    return hstack(ibad)
+
+
 def determine_dytpe_nfloat_endian_from_ugrid_filename(ugrid_filename=None):
     """figures out what the format of the binary data is based on the filename"""
+    out = _get_ugrid_format(ugrid_filename)
+    ndarray_float, float_fmt, nfloat, endian, is_fortran, ugrid_filename = out
+    if is_fortran:
+        msg = 'Fortran unformatted files are only supported by read_ugrid; %r' % ugrid_filename
+        raise NotImplementedError(msg)
+    return ndarray_float, float_fmt, nfloat, endian, ugrid_filename
+
+
+def _get_ugrid_format(ugrid_filename=None):
+    """
+    figures out what the format of the binary data is based on the filename
+
+    Returns
+    -------
+    ndarray_float : str
+        float32, float64
+    float_fmt : str
+        f, d
+    nfloat : int
+        the number of bytes in a float
+    endian : str
+        <, >
+    is_fortran : bool
+        is this a Fortran unformatted file (e.g., r8, lr8)
+    ugrid_filename : str
+        the filename
+    """
     if ugrid_filename is None:
         from pyNastran.utils.gui_io import load_file_dialog
         wildcard_wx = "AFLR3 UGRID (*.ugrid)|" \
@@ -692,16 +678,19 @@ def determine_dytpe_nfloat_endian_from_ugrid_filename(ugrid_filename=None):
         msg = 'file_format=%r ugrid_filename=%s' % (file_format, ugrid_filename)
         raise NotImplementedError(msg)
 
+    is_fortran = False
     if 'lb' in file_format:  # C binary, little endian
         endian = '<'
     elif 'b' in file_format: # C binary, big endian
         endian = '>'
-    #elif 'lr' in file_format: # Fortran unformatted binary, little endian
-        #endian = '>'
-    #elif 'r' in file_format:  # Fortran unformatted binary, big endian
-        #endian = '>'
-    else:  # fortran unformatted
+    elif 'lr' in file_format: # Fortran unformatted binary, little endian
+        endian = '<'
+        is_fortran = True
+    elif 'r' in file_format:  # Fortran unformatted binary, big endian
+        endian = '>'
+        is_fortran = True
+    else:
         msg = 'file_format=%r ugrid_filename=%s' % (file_format, ugrid_filename)
         raise NotImplementedError(msg)
-    return ndarray_float, float_fmt, nfloat, endian, ugrid_filename
+    return ndarray_float, float_fmt, nfloat, endian, is_fortran, ugrid_filename
 
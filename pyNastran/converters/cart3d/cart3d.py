@@ -18,7 +18,6 @@ Defines:
 from __future__ import print_function, unicode_literals
 import sys
 from struct import pack, unpack
-from math import ceil
 from collections import defaultdict
 from codecs import open as codec_open
 
@@ -279,18 +278,8 @@ class Cart3dIO(object):
         """
         A point is defined by x,y,z and the ID is the location in points.
         """
-        p = 0
-        data = []
         assert npoints > 0, 'npoints=%s' % npoints
-        points = np.zeros((npoints, 3), dtype='float32')
-        while p < npoints:
-            data += self.infile.readline().strip().split()
-            while len(data) > 2:
-                x = data.pop(0)
-                y = data.pop(0)
-                z = data.pop(0)
-                points[p] = [x, y, z]
-                p += 1
+        points = self._read_block_ascii(npoints * 3, 'float32').reshape(npoints, 3)
 
         #maxX = self.get_max(points, 0)
         #maxY = self.get_max(points, 1)
@@ -310,33 +299,49 @@ class Cart3dIO(object):
         An element is defined by n1,n2,n3 and the ID is the location in elements.
         """
         assert nelements > 0, 'npoints=%s nelements=%s' % (self.npoints, nelements)
-        elements = np.zeros((nelements, 3), dtype='int32')
-
-        ieid = 0
-        data = []
-        while ieid < nelements:
-            data += self.infile.readline().strip().split()
-            while len(data) > 2:
-                n1 = int(data.pop(0))
-                n2 = int(data.pop(0))
-                n3 = int(data.pop(0))
-                elements[ieid] = [n1, n2, n3]
-                ieid += 1
+        elements = self._read_block_ascii(nelements * 3, 'int32').reshape(nelements, 3)
         assert elements.min() == 1, elements.min()
         return elements - 1
 
     def _read_regions_ascii(self, nelements):
         """reads the region section"""
-        regions = np.zeros(nelements, dtype='int32')
-        iregion = 0
-        data = []
-        while iregion < nelements:
-            data = self.infile.readline().strip().split()
-            ndata = len(data)
-            regions[iregion : iregion + ndata] = data
-            iregion += ndata
+        regions = self._read_block_ascii(nelements, 'int32')
         return regions
 
+    def _read_block_ascii(self, nvalues, dtype):
+        """
+        Reads a section with a known number of values
+
+        The lines are collected and converted in a single call, so the
+        values may be split across lines in any way.
+
+        Parameters
+        ----------
+        nvalues : int
+            the number of values in the section
+        dtype : str
+            the numpy type of the values
+
+        Returns
+        -------
+        data : (nvalues, ) ndarray
+            the values
+        """
+        lines = []
+        nread = 0
+        while nread < nvalues:
+            line = self.infile.readline()
+            if not line:
+                raise RuntimeError('end of file; expected %s values; found %s' % (
+                    nvalues, nread))
+            nread += len(line.split())
+            lines.append(line)
+
+        data = np.fromstring(''.join(lines), dtype=dtype, sep=' ')
+        if len(data) != nread:
+            raise SyntaxError('cannot parse %s values; expected %s' % (dtype, nread))
+        return data[:nvalues]
+
     def _read_header_binary(self):
         data = self.infile.read(4)
         size_little, = unpack(b'<i', data)
@@ -373,22 +378,16 @@ class Cart3dIO(object):
 
     def _read_points_binary(self, npoints):
         """reads the xyz points"""
-        size = npoints * 12  # 12=3*4 all the points
-        data = self.infile.read(size)
-
         dtype = np.dtype(self._endian + b('f4'))
-        points = np.fromstring(data, dtype=dtype).reshape((npoints, 3))
+        points = self._read_block_binary(npoints * 3, dtype).reshape((npoints, 3))
 
         self.infile.read(8)  # end of second block, start of third block
         return points
 
     def _read_elements_binary(self, nelements):
         """reads the triangles"""
-        size = nelements * 12  # 12=3*4 all the elements
-        data = self.infile.read(size)
-
         dtype = np.dtype(self._endian + b('i4'))
-        elements = np.fromstring(data, dtype=dtype).reshape((nelements, 3))
+        elements = self._read_block_binary(nelements * 3, dtype).reshape((nelements, 3))
 
         self.infile.read(8)  # end of third (element) block, start of regions (fourth) block
         assert elements.min() == 1, elements.min()
@@ -396,16 +395,34 @@ class Cart3dIO(object):
 
     def _read_regions_binary(self, nelements):
         """reads the regions"""
-        size = nelements * 4  # 12=3*4 all the elements
-        data = self.infile.read(size)
-
-        regions = np.zeros(nelements, dtype='int32')
-        dtype = self._endian + b'i'
-        regions = np.fromstring(data, dtype=dtype)
+        dtype = np.dtype(self._endian + b('i4'))
+        regions = self._read_block_binary(nelements, dtype)
 
         self.infile.read(4)  # end of regions (fourth) block
         return regions
 
+    def _read_block_binary(self, nvalues, dtype):
+        """
+        Reads a record with a known number of values directly into an array
+
+        Parameters
+        ----------
+        nvalues : int
+            the number of values in the record
+        dtype : np.dtype
+            the numpy type of the values (with the endian)
+
+        Returns
+        -------
+        data : (nvalues, ) ndarray
+            the values
+        """
+        data = np.fromfile(self.infile, dtype=dtype, count=nvalues)
+        if len(data) != nvalues:
+            raise RuntimeError('end of file; expected %s values; found %s' % (
+                nvalues, len(data)))
+        return data
+
     def _read_results_binary(self, i, infile, result_names=None):
         """binary results are not supported"""
         pass
@@ -824,42 +841,13 @@ class Cart3D(Cart3dIO):
                             'Mach', 'U', 'V', 'W', 'E', 'a', 'T', 'Pressure', 'q']
         self.log.debug('---starting read_results---')
 
-        results = np.zeros((self.npoints, 6), dtype='float32')
-
-        nresult_lines = int(ceil(nresults / 5.)) - 1
-        for ipoint in range(self.npoints):
-            # rho rhoU,rhoV,rhoW,pressure/rhoE/E
-            sline = infile.readline().strip().split()
-            i += 1
-            for n in range(nresult_lines):
-                sline += infile.readline().strip().split()  # Cp
-                i += 1
-                #gamma = 1.4
-                #else:
-                #    p=0.
-            sline = _get_list(sline)
-
-            # Cp
-            # rho       rhoU      rhoV      rhoW      E
-            # 0.416594
-            # 1.095611  0.435676  0.003920  0.011579  0.856058
-            results[ipoint, :] = sline
-
-            #p=0
-            #cp = sline[0]
-            #rho = float(sline[1])
-            #if(rho > abs(0.000001)):
-                #rhoU = float(sline[2])
-                #rhoV = float(sline[3])
-                #rhoW = float(sline[4])
-                #rhoE = float(sline[5])
-                #mach2 = (rhoU) ** 2 + (rhoV) ** 2 + (rhoW) ** 2 / rho ** 2
-                #mach = sqrt(mach2)
-                #if mach > 10:
-                    #print("nid=%s Cp=%s mach=%s rho=%s rhoU=%s rhoV=%s rhoW=%s" % (
-                        #pointNum, cp, mach, rho, rhoU, rhoV, rhoW))
-            #print("pt=%s i=%s Cp=%s p=%s" %(pointNum,i,sline[0],p))
-        del sline
+        # Cp
+        # rho       rhoU      rhoV      rhoW      E
+        # 0.416594
+        # 1.095611  0.435676  0.003920  0.011579  0.856058
+        npoints = self.npoints
+        results = self._read_block_ascii(npoints * nresults, 'float32').reshape(
+            npoints, nresults)
         self.loads = self._calculate_results(result_names, results)
 
     def _calculate_results(self, result_names, results, loads=None):
@@ -1091,12 +1079,3 @@ def convert_to_float(svalues):
     for value in svalues:
         values.append(float(value))
     return values
-
-def _get_list(sline):
-    """Takes a list of strings and converts them to floats."""
-    try:
-        sline2 = convert_to_float(sline)
-    except ValueError:
-        print("sline = %s" % sline)
-        raise SyntaxError('cannot parse %s' % sline)
-    return sline2
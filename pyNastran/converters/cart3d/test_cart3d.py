@@ -103,6 +103,36 @@ class TestCart3d(unittest.TestCase):
         os.remove(cart3d_filename)
         os.remove(outfile_name)
 
+    def test_cart3d_io_04(self):
+        """geometry + results with the values wrapped across lines"""
+        lines = (
+            "5 3 6\n"
+            "0. 0. 0. 1. 0. 0.\n"
+            "2. 0. 0. 1. 1.\n"
+            "0. 2. 1. 0.\n"
+            "1 4 2 2 4 5\n"
+            "2 5 3\n"
+            "1 2 3\n"
+            "1. 1. 1. 1. 1. 1.\n"
+            "2. 2. 2. 2. 2. 2.\n"
+            "3. 3. 3. 3. 3. 3.\n"
+            "4. 4. 4. 4. 4. 4.\n"
+            "5. 5. 5. 5. 5. 5.\n"
+        )
+        cart3d_filename = os.path.join(TEST_PATH, 'flat_wrapped.tri')
+        with open(cart3d_filename, 'w') as f:
+            f.write(lines)
+
+        log = get_logger(level='warning', encoding='utf-8')
+        cart3d = read_cart3d(cart3d_filename, log=log, debug=False)
+        os.remove(cart3d_filename)
+
+        assert cart3d.points.shape == (5, 3), cart3d.points.shape
+        assert allclose(cart3d.points[4], [2., 1., 0.]), cart3d.points[4]
+        assert array_equal(cart3d.elements, [[0, 3, 1], [1, 3, 4], [1, 4, 2]]), cart3d.elements
+        assert array_equal(cart3d.regions, [1, 2, 3]), cart3d.regions
+        assert allclose(cart3d.loads['Cp'], [1., 2., 3., 4., 5.]), cart3d.loads['Cp']
+
     def test_cart3d_io_03(self):
         """read/write geometry in ascii/binary"""
         log = get_logger(level='warning', encoding='utf-8')
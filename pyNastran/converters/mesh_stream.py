@@ -0,0 +1,549 @@
+"""
+Defines a lightweight mesh interchange for the format_converter
+
+A mesh source is a set of node arrays and typed connectivity arrays
+with a region id for each element.  The nodes/elements are iterated
+over in chunks, so a conversion only needs one chunk of the output in
+memory.  The binary UGRID and Cart3D sources are memmaps of the file,
+so the input isn't loaded either.
+
+Defines:
+  - MeshSource(nodes, elements, index_base=0, log=None)
+     - get_element_counts()
+     - iter_nodes(chunk_size=CHUNK_SIZE)
+     - iter_elements(etypes=None, chunk_size=CHUNK_SIZE)
+     - get_xyz(inodes)
+  - ScaledSource(source, scale)
+  - FilteredSource(source, etypes=None, regions=None)
+  - read_nastran_source(bdf_filename, log=None)
+  - read_cart3d_source(cart3d_filename, log=None)
+  - read_ugrid_source(ugrid_filename, read_solids=True, log=None)
+  - write_mesh_source(source, fmt, filename, is_binary=False)
+  - write_nastran_source(source, bdf_filename)
+  - write_cart3d_source(source, cart3d_filename, is_binary=False)
+  - write_stl_source(source, stl_filename, is_binary=False)
+  - write_ugrid_source(source, ugrid_filename)
+"""
+from __future__ import print_function, division
+from collections import OrderedDict, defaultdict
+from struct import pack, unpack
+from six import iteritems
+
+import numpy as np
+
+from pyNastran.utils import is_binary_file
+from pyNastran.utils.log import get_logger2
+from pyNastran.converters.stl.stl import STL_BINARY_DTYPE
+
+#: the number of nodes/elements that are processed at once
+CHUNK_SIZE = 1000000
+
+#: the element types and their number of nodes
+ELEMENT_TYPES = OrderedDict([
+    ('tri3', 3), ('quad4', 4),
+    ('tet4', 4), ('pyram5', 5), ('penta6', 6), ('hexa8', 8),
+])
+SHELL_TYPES = ['tri3', 'quad4']
+
+#: the Nastran cards that map to an element type; only the corner nodes are used
+NASTRAN_TYPES = {
+    'CTRIA3' : 'tri3', 'CTRIAR' : 'tri3', 'CTRIA6' : 'tri3',
+    'CQUAD4' : 'quad4', 'CQUADR' : 'quad4', 'CQUAD8' : 'quad4',
+    'CTETRA' : 'tet4', 'CPYRAM' : 'pyram5', 'CPENTA' : 'penta6', 'CHEXA' : 'hexa8',
+}
+
+#: large field, so the precision isn't lost; CP is blank
+GRID_FORMAT = 'GRID*   %-16i                %16.8e%16.8e\n*       %16.8e'
+NASTRAN_FORMATS = {
+    'tri3' : 'CTRIA3  ' + '%-8i' * 5,
+    'quad4' : 'CQUAD4  ' + '%-8i' * 6,
+    'tet4' : 'CTETRA  ' + '%-8i' * 6,
+    'pyram5' : 'CPYRAM  ' + '%-8i' * 7,
+    'penta6' : 'CPENTA  ' + '%-8i' * 8,
+    'hexa8' : 'CHEXA   ' + '%-8i' * 8 + '\n        %-8i%-8i',
+}
+
+
+class MeshSource(object):
+    """
+    Stores a mesh as node and element arrays, which may be memmaps
+
+    Attributes
+    ----------
+    nodes : (nnodes, 3) float ndarray
+        the node locations
+    elements : OrderedDict[etype] = (elements, regions)
+        etype : str
+            the element type (e.g., 'tri3', 'hexa8')
+        elements : (nelements, nnodes) int ndarray
+            the node indices
+        regions : (nelements, ) int ndarray / int
+            the region (property) id of the elements
+    index_base : int
+        0/1 for 0/1-based node indices in elements
+    """
+    def __init__(self, nodes, elements, index_base=0, log=None):
+        self.nodes = nodes
+        self.elements = elements
+        self.index_base = index_base
+        self.log = get_logger2(log, debug=False)
+        for etype in elements:
+            assert etype in ELEMENT_TYPES, 'etype=%r; allowed=%s' % (etype, list(ELEMENT_TYPES))
+
+    @property
+    def nnodes(self):
+        """the number of nodes"""
+        return self.nodes.shape[0]
+
+    def get_element_counts(self):
+        """gets the number of elements of each type"""
+        return OrderedDict([
+            (etype, elements.shape[0])
+            for etype, (elements, unused_regions) in iteritems(self.elements)])
+
+    def iter_nodes(self, chunk_size=CHUNK_SIZE):
+        """yields the node locations in chunks as (nchunk, 3) float ndarrays"""
+        for i0 in range(0, self.nnodes, chunk_size):
+            yield np.asarray(self.nodes[i0:i0 + chunk_size, :])
+
+    def iter_elements(self, etypes=None, chunk_size=CHUNK_SIZE):
+        """
+        Yields the elements in chunks
+
+        Parameters
+        ----------
+        etypes : List[str]; default=None -> all
+            the element types to yield
+        chunk_size : int; default=CHUNK_SIZE
+            the max number of elements in a chunk
+
+        Yields
+        ------
+        etype : str
+            the element type
+        elements : (nchunk, nnodes) int ndarray
+            the 0-based node indices
+        regions : (nchunk, ) int ndarray
+            the region id of the elements
+        """
+        for etype, (elements, regions) in iteritems(self.elements):
+            if etypes is not None and etype not in etypes:
+                continue
+            for i0 in range(0, elements.shape[0], chunk_size):
+                elementsi = np.asarray(elements[i0:i0 + chunk_size, :], dtype='int32')
+                if self.index_base:
+                    elementsi = elementsi - self.index_base
+                nelementsi = elementsi.shape[0]
+                if isinstance(regions, np.ndarray):
+                    regionsi = np.asarray(regions[i0:i0 + nelementsi], dtype='int32')
+                else:
+                    regionsi = np.full(nelementsi, regions, dtype='int32')
+                yield etype, elementsi, regionsi
+
+    def get_xyz(self, inodes):
+        """gets the node locations for an (n, ...) int ndarray of 0-based indices"""
+        return np.asarray(self.nodes[inodes.ravel(), :]).reshape(inodes.shape + (3, ))
+
+    def __repr__(self):
+        return '%s(nnodes=%s, nelements=%s)' % (
+            self.__class__.__name__, self.nnodes, dict(self.get_element_counts()))
+
+
+class _SourceStage(MeshSource):
+    """a pipeline stage that passes through another source"""
+    def __init__(self, source):
+        self.source = source
+        self.log = source.log
+
+    @property
+    def nnodes(self):
+        """the number of nodes"""
+        return self.source.nnodes
+
+    def get_element_counts(self):
+        """gets the number of elements of each type"""
+        return self.source.get_element_counts()
+
+    def iter_nodes(self, chunk_size=CHUNK_SIZE):
+        """yields the node locations in chunks as (nchunk, 3) float ndarrays"""
+        return self.source.iter_nodes(chunk_size=chunk_size)
+
+    def iter_elements(self, etypes=None, chunk_size=CHUNK_SIZE):
+        """yields (etype, elements, regions) in chunks"""
+        return self.source.iter_elements(etypes=etypes, chunk_size=chunk_size)
+
+    def get_xyz(self, inodes):
+        """gets the node locations for an (n, ...) int ndarray of 0-based indices"""
+        return self.source.get_xyz(inodes)
+
+
+class ScaledSource(_SourceStage):
+    """scales the node locations of a source"""
+    def __init__(self, source, scale):
+        _SourceStage.__init__(self, source)
+        self.scale = scale
+
+    def iter_nodes(self, chunk_size=CHUNK_SIZE):
+        """yields the scaled node locations in chunks"""
+        for xyz in self.source.iter_nodes(chunk_size=chunk_size):
+            yield xyz * self.scale
+
+    def get_xyz(self, inodes):
+        """gets the scaled node locations"""
+        return self.source.get_xyz(inodes) * self.scale
+
+
+class FilteredSource(_SourceStage):
+    """
+    Only passes through some of the elements of a source
+
+    The nodes aren't renumbered, so unused nodes are kept.
+    """
+    def __init__(self, source, etypes=None, regions=None):
+        """
+        Creates the FilteredSource
+
+        Parameters
+        ----------
+        source : MeshSource
+            the source
+        etypes : List[str]; default=None -> all
+            the element types to keep (e.g., SHELL_TYPES to skin a volume mesh)
+        regions : List[int]; default=None -> all
+            the region ids to keep
+        """
+        _SourceStage.__init__(self, source)
+        self.etypes = etypes
+        self.regions = None if regions is None else np.unique(regions)
+        self._element_counts = None
+
+    def get_element_counts(self):
+        """gets the number of elements of each type; requires a pass over the elements"""
+        if self._element_counts is None:
+            counts = self.source.get_element_counts()
+            if self.regions is None:
+                self._element_counts = OrderedDict([
+                    (etype, nelements) for etype, nelements in iteritems(counts)
+                    if self.etypes is None or etype in self.etypes])
+            else:
+                self._element_counts = OrderedDict([(etype, 0) for etype in counts])
+                for etype, elements, unused_regions in self.iter_elements():
+                    self._element_counts[etype] += elements.shape[0]
+        return self._element_counts
+
+    def iter_elements(self, etypes=None, chunk_size=CHUNK_SIZE):
+        """yields the (etype, elements, regions) chunks that pass the filter"""
+        if self.etypes is not None:
+            etypes = [etype for etype in (self.etypes if etypes is None else etypes)
+                      if etype in self.etypes]
+        for etype, elements, regions in self.source.iter_elements(
+                etypes=etypes, chunk_size=chunk_size):
+            if self.regions is not None:
+                i = np.where(np.in1d(regions, self.regions))[0]
+                if len(i) == 0:
+                    continue
+                elements = elements[i, :]
+                regions = regions[i]
+            yield etype, elements, regions
+
+
+def read_nastran_source(bdf_filename, log=None):
+    """
+    Creates a MeshSource from a Nastran model
+
+    The BDF isn't cross-referenced; the nodes are transformed to the
+    global frame in a vectorized way.  The elements/nodes are
+    renumbered from 1 when they're written.
+    """
+    from pyNastran.bdf.bdf import BDF
+    model = BDF(log=log, debug=False)
+    model.read_bdf(bdf_filename, validate=False, xref=False)
+
+    unused_icd_transform, icp_transform, xyz_cp, nid_cp_cd = (
+        model.get_displacement_index_xyz_cp_cd())
+    nids = nid_cp_cd[:, 0]
+    xyz_cid0 = model.transform_xyzcp_to_xyz_cid(xyz_cp, nids, icp_transform, cid=0)
+
+    node_ids = defaultdict(list)
+    pids = defaultdict(list)
+    for unused_eid, elem in sorted(iteritems(model.elements)):
+        if elem.type not in NASTRAN_TYPES:
+            continue
+        etype = NASTRAN_TYPES[elem.type]
+        node_ids[etype].append(elem.node_ids[:ELEMENT_TYPES[etype]])
+        pids[etype].append(elem.Pid())
+
+    elements = OrderedDict()
+    for etype in ELEMENT_TYPES:
+        if etype not in node_ids:
+            continue
+        nids_elements = np.array(node_ids[etype], dtype='int32')
+        inodes = np.searchsorted(nids, nids_elements)
+        inodes[inodes == len(nids)] = 0
+        if not np.array_equal(nids[inodes], nids_elements):
+            msg = 'missing GRIDs for %s elements; nids=%s' % (
+                etype, np.setdiff1d(nids_elements, nids))
+            raise RuntimeError(msg)
+        elements[etype] = (inodes, np.array(pids[etype], dtype='int32'))
+    del model
+    return MeshSource(xyz_cid0, elements, log=log)
+
+
+def read_cart3d_source(cart3d_filename, log=None):
+    """
+    Creates a MeshSource from a Cart3D file
+
+    Binary files are memmapped; ascii files are read with read_cart3d.
+    """
+    if not is_binary_file(cart3d_filename):
+        from pyNastran.converters.cart3d.cart3d import read_cart3d
+        model = read_cart3d(cart3d_filename, log=log)
+        elements = OrderedDict([('tri3', (model.elements, model.regions))])
+        return MeshSource(model.points, elements, log=log)
+
+    with open(cart3d_filename, 'rb') as cart3d_file:
+        data = cart3d_file.read(16)
+    endian = b'>'
+    size, = unpack(endian + b'i', data[:4])
+    if size not in [8, 12]:
+        endian = b'<'
+        size, = unpack(endian + b'i', data[:4])
+    assert size in [8, 12], 'cannot determine the endian of %r' % cart3d_filename
+    endian = endian.decode('latin1')
+    npoints, nelements = unpack(endian + 'ii', data[4:12])
+
+    # each record has a 4 byte marker on both sides
+    offset = 4 + size + 4 + 4
+    points = np.memmap(cart3d_filename, dtype=endian + 'f4', mode='r',
+                       offset=offset, shape=(npoints, 3))
+    offset += npoints * 12 + 8
+    tris = np.memmap(cart3d_filename, dtype=endian + 'i4', mode='r',
+                     offset=offset, shape=(nelements, 3))
+    offset += nelements * 12 + 8
+    regions = np.memmap(cart3d_filename, dtype=endian + 'i4', mode='r',
+                        offset=offset, shape=(nelements, ))
+    elements = OrderedDict([('tri3', (tris, regions))])
+    return MeshSource(points, elements, index_base=1, log=log)
+
+
+def read_ugrid_source(ugrid_filename, read_solids=True, log=None):
+    """
+    Creates a MeshSource from a UGRID file
+
+    The nodes and volume elements are memmapped.  The surface elements
+    use the surface ids as the region; the volume elements use one
+    region after the max surface id.
+    """
+    from pyNastran.converters.aflr.ugrid.ugrid_reader import read_ugrid
+    model = read_ugrid(ugrid_filename, log=log, debug=False, read_solids=read_solids,
+                       use_memmap=True)
+    ntris = model.tris.shape[0]
+    nquads = model.quads.shape[0]
+    pids = model.pids
+    solid_region = pids.max() + 1 if len(pids) else 1
+
+    elements = OrderedDict()
+    for etype, elementsi, regions in [
+            ('tri3', model.tris, pids[:ntris]),
+            ('quad4', model.quads, pids[ntris:ntris + nquads]),
+            ('tet4', model.tets, solid_region),
+            ('pyram5', model.penta5s, solid_region),
+            ('penta6', model.penta6s, solid_region),
+            ('hexa8', model.hexas, solid_region)]:
+        if elementsi.shape[0]:
+            elements[etype] = (elementsi, regions)
+    return MeshSource(model.nodes, elements, index_base=1, log=log)
+
+
+def write_mesh_source(source, fmt, filename, is_binary=False):
+    """writes a MeshSource to nastran, cart3d, stl, or ugrid"""
+    if fmt == 'nastran':
+        write_nastran_source(source, filename)
+    elif fmt == 'cart3d':
+        write_cart3d_source(source, filename, is_binary=is_binary)
+    elif fmt == 'stl':
+        write_stl_source(source, filename, is_binary=is_binary)
+    elif fmt == 'ugrid':
+        write_ugrid_source(source, filename)
+    else:
+        raise NotImplementedError('fmt=%r' % fmt)
+
+
+def write_nastran_source(source, bdf_filename):
+    """
+    Writes a MeshSource as GRID*, CTRIA3, CQUAD4, CTETRA, CPYRAM, CPENTA,
+    and CHEXA cards
+
+    The nodes/elements are numbered from 1 and the region is the
+    property id.
+    """
+    shell_regions = set([])
+    solid_regions = set([])
+    with open(bdf_filename, 'w') as bdf_file:
+        bdf_file.write('$ pyNastran: punch=True\n')
+        bdf_file.write('MAT1,1,1.0e7,,0.3\n')
+
+        nid = 1
+        for xyz in source.iter_nodes():
+            nnodes = xyz.shape[0]
+            nids = np.arange(nid, nid + nnodes)
+            np.savetxt(bdf_file, np.column_stack([nids, xyz]), fmt=GRID_FORMAT)
+            nid += nnodes
+
+        eid = 1
+        for etype, elements, regions in source.iter_elements():
+            nelements = elements.shape[0]
+            eids = np.arange(eid, eid + nelements)
+            np.savetxt(bdf_file, np.column_stack([eids, regions, elements + 1]),
+                       fmt=NASTRAN_FORMATS[etype])
+            eid += nelements
+            if etype in SHELL_TYPES:
+                shell_regions.update(np.unique(regions).tolist())
+            else:
+                solid_regions.update(np.unique(regions).tolist())
+
+        common_regions = shell_regions & solid_regions
+        if common_regions:
+            msg = 'regions=%s are used by shells and solids' % sorted(common_regions)
+            raise RuntimeError(msg)
+        for pid in sorted(shell_regions):
+            bdf_file.write('PSHELL,%i,1,0.1\n' % pid)
+        for pid in sorted(solid_regions):
+            bdf_file.write('PSOLID,%i,1\n' % pid)
+        bdf_file.write('ENDDATA\n')
+
+
+def _get_ntris(source):
+    """gets the number of triangles; quads are split into 2 triangles"""
+    counts = source.get_element_counts()
+    solid_types = [etype for etype, nelements in iteritems(counts)
+                   if nelements and etype not in SHELL_TYPES]
+    if solid_types:
+        msg = 'only tri3/quad4 elements are supported; filter the solids=%s' % solid_types
+        raise RuntimeError(msg)
+    ntris = counts.get('tri3', 0) + 2 * counts.get('quad4', 0)
+    if ntris == 0:
+        raise RuntimeError('there are no tri3/quad4 elements; counts=%s' % dict(counts))
+    return ntris
+
+
+def _iter_tris(source):
+    """yields the triangles and their regions; quads are split into 2 triangles"""
+    for etype, elements, regions in source.iter_elements(etypes=SHELL_TYPES):
+        if etype == 'quad4':
+            elements = np.vstack([elements[:, [0, 1, 2]], elements[:, [0, 2, 3]]])
+            regions = np.hstack([regions, regions])
+        yield elements, regions
+
+
+def write_cart3d_source(source, cart3d_filename, is_binary=False):
+    """Writes a MeshSource of tri3/quad4 elements as a Cart3D file"""
+    nnodes = source.nnodes
+    ntris = _get_ntris(source)
+    with open(cart3d_filename, 'wb') as cart3d_file:
+        if is_binary:
+            endian = '>'
+            int_dtype = endian + 'i4'
+            _write_record_marker(cart3d_file, 8)
+            np.array([nnodes, ntris], dtype=int_dtype).tofile(cart3d_file)
+            _write_record_marker(cart3d_file, 8)
+
+            _write_record_marker(cart3d_file, nnodes * 12)
+            for xyz in source.iter_nodes():
+                xyz.astype(endian + 'f4').tofile(cart3d_file)
+            _write_record_marker(cart3d_file, nnodes * 12)
+
+            _write_record_marker(cart3d_file, ntris * 12)
+            for tris, unused_regions in _iter_tris(source):
+                (tris + 1).astype(int_dtype).tofile(cart3d_file)
+            _write_record_marker(cart3d_file, ntris * 12)
+
+            _write_record_marker(cart3d_file, ntris * 4)
+            for unused_tris, regions in _iter_tris(source):
+                regions.astype(int_dtype).tofile(cart3d_file)
+            _write_record_marker(cart3d_file, ntris * 4)
+        else:
+            cart3d_file.write(('%i %i\n' % (nnodes, ntris)).encode('ascii'))
+            for xyz in source.iter_nodes():
+                np.savetxt(cart3d_file, xyz, fmt='%6.7f')
+            for tris, unused_regions in _iter_tris(source):
+                np.savetxt(cart3d_file, tris + 1, fmt='%i')
+            for unused_tris, regions in _iter_tris(source):
+                np.savetxt(cart3d_file, regions, fmt='%i')
+
+
+def _write_record_marker(outfile, nbytes):
+    """writes a big endian Fortran record marker"""
+    if nbytes >= 2**31:
+        raise RuntimeError('the record is too big for a Cart3D file; nbytes=%s' % nbytes)
+    outfile.write(pack(b'>i', nbytes))
+
+
+def write_stl_source(source, stl_filename, is_binary=False):
+    """Writes a MeshSource of tri3/quad4 elements as an STL file"""
+    ntris = _get_ntris(source)
+    float_fmt = '%.6e'
+    vertex_fmt = '     vertex %s %s %s\n' % (float_fmt, float_fmt, float_fmt)
+    facet_fmt = (
+        ' facet normal %s %s %s\n' % (float_fmt, float_fmt, float_fmt) +
+        '   outer loop\n' + vertex_fmt * 3 +
+        '   endloop\n'
+        ' endfacet')
+
+    with open(stl_filename, 'wb') as stl_file:
+        if is_binary:
+            stl_file.write(pack(b'80s', ('%-80s' % stl_filename[-80:]).encode('ascii')))
+            stl_file.write(pack(b'<i', ntris))
+        else:
+            stl_file.write(b'solid pyNastran\n')
+
+        for tris, unused_regions in _iter_tris(source):
+            xyz = source.get_xyz(tris)
+            normals = np.cross(xyz[:, 1, :] - xyz[:, 0, :], xyz[:, 2, :] - xyz[:, 0, :])
+            norm = np.linalg.norm(normals, axis=1)
+            inonzero = np.where(norm > 0.)[0]
+            normals[inonzero, :] /= norm[inonzero, np.newaxis]
+
+            if is_binary:
+                facets = np.zeros(tris.shape[0], dtype=STL_BINARY_DTYPE)
+                facets['normal'] = normals
+                facets['vertices'] = xyz
+                facets.tofile(stl_file)
+            else:
+                np.savetxt(stl_file, np.hstack([normals, xyz.reshape(-1, 9)]), fmt=facet_fmt)
+        if not is_binary:
+            stl_file.write(b'endsolid\n')
+
+
+def write_ugrid_source(source, ugrid_filename):
+    """
+    Writes a MeshSource as a C binary UGRID file
+
+    The surface ids are the regions of the tri3/quad4 elements.
+    """
+    from pyNastran.converters.aflr.ugrid.ugrid_reader import (
+        determine_dytpe_nfloat_endian_from_ugrid_filename)
+    out = determine_dytpe_nfloat_endian_from_ugrid_filename(ugrid_filename)
+    unused_ndarray_float, float_fmt, unused_nfloat, endian, ugrid_filename = out
+    float_dtype = endian + float_fmt
+    int_dtype = endian + 'i4'
+
+    counts = source.get_element_counts()
+    header = [source.nnodes] + [counts.get(etype, 0) for etype in ELEMENT_TYPES]
+    with open(ugrid_filename, 'wb') as ugrid_file:
+        np.array(header, dtype=int_dtype).tofile(ugrid_file)
+        for xyz in source.iter_nodes():
+            xyz.astype(float_dtype).tofile(ugrid_file)
+
+        for etype in SHELL_TYPES:
+            for unused_etype, elements, unused_regions in source.iter_elements(etypes=[etype]):
+                (elements + 1).astype(int_dtype).tofile(ugrid_file)
+        for etype in SHELL_TYPES:
+            for unused_etype, unused_elements, regions in source.iter_elements(etypes=[etype]):
+                regions.astype(int_dtype).tofile(ugrid_file)
+
+        for etype in ELEMENT_TYPES:
+            if etype in SHELL_TYPES:
+                continue
+            for unused_etype, elements, unused_regions in source.iter_elements(etypes=[etype]):
+                (elements + 1).astype(int_dtype).tofile(ugrid_file)
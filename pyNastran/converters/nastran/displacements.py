@@ -465,6 +465,47 @@ class DisplacementResults(NastranTable):
         assert len(deflected_xyz.shape) == 2, deflected_xyz.shape
         return self.xyz, deflected_xyz
 
+    def get_vector_results_by_scales_phases(self, i, name, scales, phases):
+        """
+        Gets the real/complex deflection results for many frames at once
+        (e.g., for an animation)
+
+        Parameters
+        ----------
+        i : (nframes, ) int ndarray
+            mode/time/loadstep number of each frame
+        name : str
+            unused; useful for debugging
+        scales : (nframes, ) float ndarray
+            deflection scale factor of each frame; true scale
+        phases : (nframes, ) float ndarray
+            phase angle (degrees) of each frame; unused for real results
+
+        Returns
+        -------
+        xyz : (nnodes, 3) float ndarray
+            the nominal state
+        deflected_xyz : (nframes, nnodes, 3) float ndarray
+            the deflected states
+        """
+        assert len(self.xyz.shape) == 2, self.xyz.shape
+        scales = np.asarray(scales)[:, np.newaxis, np.newaxis]
+        if self.is_real:
+            if self.dim == 2:
+                # single result
+                dxyz = self.dxyz
+            elif self.dim == 3:
+                dxyz = self.dxyz[i, :]
+            else:
+                raise NotImplementedError('dim=%s' % self.dim)
+        else:
+            theta = np.radians(phases)[:, np.newaxis, np.newaxis]
+            dxyz = self.dxyz[i, :]
+            dxyz = dxyz.real * np.cos(theta) + dxyz.imag * np.sin(theta)
+        deflected_xyz = self.xyz + scales * dxyz
+        assert len(deflected_xyz.shape) == 3, deflected_xyz.shape
+        return self.xyz, deflected_xyz
+
     def __repr__(self):
         """defines str(self)"""
         msg = 'DisplacementResults\n'
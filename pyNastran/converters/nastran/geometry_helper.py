@@ -709,3 +709,201 @@ def get_min_max_theta(faces, all_node_ids, nid_map, xyz_cid0):
     min_thetai = thetas.min()
     max_thetai = thetas.max()
     return min_thetai, max_thetai, ideal_thetai, min_edge_length
+
+
+def _dot(a, b):
+    """row-wise dot product of two (n, 3) arrays"""
+    return (a * b).sum(axis=1)
+
+
+def tri_quality_array(p1, p2, p3):
+    """
+    Gets the quality metrics for a series of tris
+
+    Parameters
+    ----------
+    p1, p2, p3 : (ntris, 3) float ndarray
+        the corner points
+
+    Returns
+    -------
+    out : tuple of (ntris, ) float ndarrays
+        the same terms as ``tri_quality``
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        e1 = (p1 + p2) / 2.
+        e2 = (p2 + p3) / 2.
+        e3 = (p3 + p1) / 2.
+        e21 = e2 - e1
+        e31 = e3 - e1
+        e32 = e3 - e2
+
+        e3_p2 = e3 - p2
+        e2_p1 = e2 - p1
+        e1_p3 = e1 - p3
+
+        v21 = p2 - p1
+        v32 = p3 - p2
+        v13 = p1 - p3
+        length21 = norm(v21, axis=1)
+        length32 = norm(v32, axis=1)
+        length13 = norm(v13, axis=1)
+        lengths = np.column_stack([length21, length32, length13])
+        min_edge_length = lengths.min(axis=1)
+        areai = 0.5 * norm(np.cross(v21, v13), axis=1)
+
+        cos_skew1 = _dot(e2_p1, e31) / (norm(e2_p1, axis=1) * norm(e31, axis=1))
+        cos_skew3 = _dot(e3_p2, e21) / (norm(e3_p2, axis=1) * norm(e21, axis=1))
+        cos_skew5 = _dot(e1_p3, e32) / (norm(e1_p3, axis=1) * norm(e32, axis=1))
+        cos_skew = np.column_stack([
+            cos_skew1, -cos_skew1, cos_skew3,
+            -cos_skew3, cos_skew5, -cos_skew5])
+        max_skew = np.pi / 2. - np.abs(np.arccos(np.clip(cos_skew, -1., 1.))).min(axis=1)
+        aspect_ratio = lengths.max(axis=1) / min_edge_length
+
+        cos_theta1 = _dot(v21, -v13) / (length21 * length13)
+        cos_theta2 = _dot(v32, -v21) / (length32 * length21)
+        cos_theta3 = _dot(v13, -v32) / (length13 * length32)
+        thetas = np.arccos(np.clip(
+            np.column_stack([cos_theta1, cos_theta2, cos_theta3]), -1., 1.))
+        min_thetai = thetas.min(axis=1)
+        max_thetai = thetas.max(axis=1)
+        dideal_thetai = np.maximum(max_thetai - piover3, piover3 - min_thetai)
+    return areai, max_skew, aspect_ratio, min_thetai, max_thetai, dideal_thetai, min_edge_length
+
+
+def quad_quality_array(p1, p2, p3, p4):
+    """
+    Gets the quality metrics for a series of quads
+
+    Parameters
+    ----------
+    p1, p2, p3, p4 : (nquads, 3) float ndarray
+        the corner points
+
+    Returns
+    -------
+    out : tuple of (nquads, ) float ndarrays
+        the same terms as ``quad_quality``
+    """
+    with np.errstate(divide='ignore', invalid='ignore'):
+        v21 = p2 - p1
+        v32 = p3 - p2
+        v43 = p4 - p3
+        v14 = p1 - p4
+        length21 = norm(v21, axis=1)
+        length32 = norm(v32, axis=1)
+        length43 = norm(v43, axis=1)
+        length14 = norm(v14, axis=1)
+        lengths = np.column_stack([length21, length32, length43, length14])
+        min_edge_length = lengths.min(axis=1)
+
+        p12 = (p1 + p2) / 2.
+        p23 = (p2 + p3) / 2.
+        p34 = (p3 + p4) / 2.
+        p14 = (p4 + p1) / 2.
+        v31 = p3 - p1
+        v42 = p4 - p2
+        normal = np.cross(v31, v42)
+        areai = 0.5 * norm(normal, axis=1)
+
+        # the ratio of the ideal area to the actual area
+        # this is an hourglass check
+        areas = np.column_stack([
+            norm(np.cross(-v14, v21), axis=1), # v41 x v21
+            norm(np.cross(v32, -v21), axis=1), # v32 x v12
+            norm(np.cross(v43, -v32), axis=1), # v43 x v23
+            norm(np.cross(v14, v43), axis=1),  # v14 x v43
+        ])
+        area_ratioi1 = areai / areas.min(axis=1)
+        area_ratioi2 = areas.max(axis=1) / areai
+        area_ratioi = np.maximum(area_ratioi1, area_ratioi2)
+
+        # the split areas are half of the hourglass areas
+        split_areas = 0.5 * areas
+        aavg = split_areas.mean(axis=1)
+        taper_ratioi = np.abs(split_areas - aavg[:, np.newaxis]).sum(axis=1) / aavg
+
+        e13 = p34 - p12
+        e42 = p23 - p14
+        cos_skew1 = _dot(e13, e42) / (norm(e13, axis=1) * norm(e42, axis=1))
+        cos_skew = np.column_stack([cos_skew1, -cos_skew1])
+        max_skew = np.pi / 2. - np.abs(np.arccos(np.clip(cos_skew, -1., 1.))).min(axis=1)
+        aspect_ratio = lengths.max(axis=1) / min_edge_length
+
+        cos_theta1 = _dot(v21, -v14) / (length21 * length14)
+        cos_theta2 = _dot(v32, -v21) / (length32 * length21)
+        cos_theta3 = _dot(v43, -v32) / (length43 * length32)
+        cos_theta4 = _dot(v14, -v43) / (length14 * length43)
+
+        # sin(theta) < 0. -> normal is flipped
+        n = np.sign(np.column_stack([
+            _dot(np.cross(v14, v21), normal),
+            _dot(np.cross(v21, v32), normal),
+            _dot(np.cross(v32, v43), normal),
+            _dot(np.cross(v43, v14), normal),
+        ]))
+        theta_additional = np.where(n < 0, 2*np.pi, 0.)
+
+        theta = n * np.arccos(np.clip(
+            np.column_stack([cos_theta1, cos_theta2, cos_theta3, cos_theta4]),
+            -1., 1.)) + theta_additional
+        min_thetai = theta.min(axis=1)
+        max_thetai = theta.max(axis=1)
+        dideal_thetai = np.maximum(max_thetai - piover2, piover2 - min_thetai)
+    out = (areai, taper_ratioi, area_ratioi, max_skew, aspect_ratio,
+           min_thetai, max_thetai, dideal_thetai, min_edge_length)
+    return out
+
+
+def get_min_max_theta_array(faces, inids, xyz_cid0):
+    """
+    Gets the min/max thetas for a series of CTETRA, CPENTA, CHEXA,
+    or CPYRAM elements of the same type
+
+    Parameters
+    ----------
+    faces : List[face, ...]
+        face : List[int, ...]
+            the local node indices of the face
+    inids : (nelements, nnodes) int ndarray
+        the node indices into xyz_cid0
+    xyz_cid0 : (nnodes, 3) float ndarray
+        the node locations
+
+    Returns
+    -------
+    out : tuple of (nelements, ) float ndarrays
+        the same terms as ``get_min_max_theta``
+    """
+    cos_thetas = []
+    ideal_theta = []
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for face in faces:
+            nface = len(face)
+            if nface == 3:
+                ideal = piover3
+            elif nface == 4:
+                ideal = piover2
+            else:
+                raise NotImplementedError(face)
+
+            # the edge leaving each node and the edge entering it
+            xyz = xyz_cid0[inids[:, face], :]
+            edges = np.roll(xyz, -1, axis=1) - xyz
+            lengths = norm(edges, axis=2)
+            edges_in = np.roll(edges, 1, axis=1)
+            lengths_in = np.roll(lengths, 1, axis=1)
+            cos_thetas.append((edges * -edges_in).sum(axis=2) / (lengths * lengths_in))
+            ideal_theta.extend([ideal] * nface)
+
+            # like get_min_max_theta, this is from the last face
+            min_edge_length = lengths.min(axis=1)
+
+        thetas = np.arccos(np.hstack(cos_thetas))
+    ideal_theta = np.array(ideal_theta)
+    ideal_thetai = np.maximum((thetas - ideal_theta).max(axis=1),
+                              (ideal_theta - thetas).min(axis=1))
+    min_thetai = thetas.min(axis=1)
+    max_thetai = thetas.max(axis=1)
+    return min_thetai, max_thetai, ideal_thetai, min_edge_length
@@ -67,11 +67,13 @@ from pyNastran.bdf.cards.elements.solid import (
 )
 
 from pyNastran.gui.gui_utils.vtk_utils import (
-    create_vtk_cells_of_constant_element_type, numpy_to_vtk_points)
+    create_vtk_cells_of_constant_element_type, create_vtk_cells_of_constant_element_types,
+    numpy_to_vtk_points)
 from pyNastran.gui.errors import NoGeometry
-from pyNastran.gui.gui_objects.gui_result import GuiResult, NormalResult
+from pyNastran.gui.gui_objects.gui_result import GuiResult, NormalResult, ResultCache
 from pyNastran.converters.nastran.geometry_helper import (
-    NastranGeometryHelper, tri_quality, quad_quality, get_min_max_theta)
+    NastranGeometryHelper, tri_quality, quad_quality, get_min_max_theta,
+    tri_quality_array, quad_quality_array, get_min_max_theta_array)
 from pyNastran.converters.nastran.results_helper import NastranGuiResults
 from pyNastran.converters.nastran.displacements import (
     ForceTableResults)
@@ -98,6 +100,62 @@ NO_THETA = [
 ]
 
 IS_TESTING = 'test' in sys.argv[0]
+
+
+def read_nastran_geometry_model(bdf_filename, log, xref_loads=True):
+    """
+    Reads and cross-references the BDF/OP2 geometry for the GUI
+
+    Parameters
+    ----------
+    bdf_filename : str
+        the BDF/punch/OP2 filename
+    log : logger
+        the logger
+    xref_loads : bool; default=True
+        cross-reference the loads
+
+    Returns
+    -------
+    model : BDF/OP2Geom
+        the cross-referenced model
+    """
+    ext = os.path.splitext(bdf_filename)[1].lower()
+    punch = False
+    if ext == '.pch':
+        punch = True
+
+    if ext == '.op2':
+        model = OP2Geom(make_geom=True, debug=False, log=log,
+                        debug_file=None)
+        model.clear_results()
+        model.read_op2(op2_filename=bdf_filename)
+    else:  # read the bdf/punch
+        model = BDF(log=log, debug=True)
+        model.read_bdf(bdf_filename,
+                       punch=punch, xref=False,
+                       validate=True)
+        #print('done with read_bdf')
+        #xref_loads = False
+
+    #model.cross_reference()
+    model.safe_cross_reference(
+        xref=True,
+        xref_nodes=True,
+        xref_elements=True,
+        xref_nodes_with_elements=False,
+        xref_properties=True,
+        xref_masses=True,
+        xref_materials=False,
+        xref_loads=xref_loads,
+        xref_constraints=False,
+        xref_optimization=False,
+        xref_aero=True,
+        xref_sets=False,
+    )
+    return model
+
+
 class NastranIO(NastranGuiResults, NastranGeometryHelper):
     """
     Defines the GUI class for Nastran.
@@ -415,46 +473,52 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         #print('dt_nastran_xyz =', time.time() - time0)
         return xyz_cid0, nid_cp_cd
 
-    def _get_model_nonvectorized(self, bdf_filename, xref_loads=True):
-        """Loads the BDF/OP2 geometry"""
-        ext = os.path.splitext(bdf_filename)[1].lower()
-        punch = False
-        if ext == '.pch':
-            punch = True
+    def _get_model_nonvectorized(self, bdf_filename, xref_loads=True, model=None):
+        """
+        Loads the BDF/OP2 geometry
 
+        Parameters
+        ----------
+        bdf_filename : str
+            the Nastran filename to load
+        xref_loads : bool; default=True
+            cross-reference the loads
+        model : BDF/OP2Geom; default=None
+            a model that was already read by ``read_nastran_geometry``
+            (e.g., on a background thread)
+        """
         self.model_type = 'nastran'
-        if ext == '.op2':
-            model = OP2Geom(make_geom=True, debug=False, log=self.log,
-                            debug_file=None)
-            model.clear_results()
-            model.read_op2(op2_filename=bdf_filename)
-        else:  # read the bdf/punch
-            model = BDF(log=self.log, debug=True)
-            model.read_bdf(bdf_filename,
-                           punch=punch, xref=False,
-                           validate=True)
-            #print('done with read_bdf')
-            #xref_loads = False
-        xref_aero = len(model.caeros) > 0
-
         xref_nodes = True
-        #model.cross_reference()
-        model.safe_cross_reference(
-            xref=True,
-            xref_nodes=xref_nodes,
-            xref_elements=True,
-            xref_nodes_with_elements=False,
-            xref_properties=True,
-            xref_masses=True,
-            xref_materials=False,
-            xref_loads=xref_loads,
-            xref_constraints=False,
-            xref_optimization=False,
-            xref_aero=True,
-            xref_sets=False,
-        )
+        if model is None:
+            model = read_nastran_geometry_model(bdf_filename, self.log, xref_loads=xref_loads)
+        else:
+            model.log = self.log
         return model, xref_nodes
 
+    def read_nastran_geometry(self, bdf_filename, log):
+        """
+        Reads and cross-references the BDF/OP2 geometry without
+        touching the GUI, so it may be called from a background thread.
+        The model is passed to ``load_nastran_geometry``.
+        """
+        return read_nastran_geometry_model(bdf_filename, log, xref_loads=True)
+
+    def read_nastran_results(self, op2_filename, log):
+        """
+        Reads the OP2 results without touching the GUI, so it may be
+        called from a background thread.  The model (or the filename
+        for formats that are cheap to read) is passed to
+        ``load_nastran_results``.
+        """
+        ext = os.path.splitext(op2_filename)[1].lower()
+        if ext != '.op2':
+            return op2_filename
+        model = OP2(log=log, debug=True)
+        model.read_op2(op2_filename, combine=False)
+        if not IS_TESTING or self.is_testing_flag:
+            log.info(model.get_op2_stats())
+        return model
+
     def load_nastran_geometry(self, bdf_filename, name='main', plot=True, **kwargs):
         """
         The entry point for Nastran geometry loading.
@@ -474,6 +538,9 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         is_geometry_results : bool; default=True
             code is being called from load_nastran_geometry_and_results
             not used...
+        model : BDF/OP2Geom; default=None
+            the model from ``read_nastran_geometry``; skips reading
+            bdf_filename
         """
         self.eid_maps[name] = {}
         self.nid_maps[name] = {}
@@ -496,7 +563,10 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
             return
 
         load_geom = True
-        if bdf_filename.lower().endswith(('.bdf', '.dat', '.pch',)): # '.op2'
+        model = kwargs.get('model', None)
+        if model is not None:
+            self.load_nastran_geometry_nonvectorized(bdf_filename, plot=plot, model=model)
+        elif bdf_filename.lower().endswith(('.bdf', '.dat', '.pch',)): # '.op2'
             if IS_TESTING or self.is_testing_flag:
                 self.load_nastran_geometry_vectorized(bdf_filename, plot=plot)
                 self.load_nastran_geometry_nonvectorized(bdf_filename, plot=plot)
@@ -1517,7 +1587,7 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         #)
         return model
 
-    def load_nastran_geometry_nonvectorized(self, bdf_filename, plot=True):
+    def load_nastran_geometry_nonvectorized(self, bdf_filename, plot=True, model=None):
         """
         The entry point for Nastran geometry loading.
 
@@ -1528,6 +1598,9 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         plot : bool; default=True
             should the model be generated or should we wait until
             after the results are loaded
+        model : BDF/OP2Geom; default=None
+            the model from ``read_nastran_geometry``; skips reading
+            bdf_filename
         """
         reset_labels = True
         if plot:
@@ -1535,7 +1608,8 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
             self.scalarBar.Modified()
 
         xref_loads = True # should be True
-        model, xref_nodes = self._get_model_nonvectorized(bdf_filename, xref_loads=xref_loads)
+        model, xref_nodes = self._get_model_nonvectorized(
+            bdf_filename, xref_loads=xref_loads, model=model)
 
         nnodes = len(model.nodes)
         nspoints = len(model.spoints)
@@ -3647,7 +3721,7 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         (nid_to_pid_map, xyz_cid0, pids, nelements, material_coord,
          area, min_interior_angle, max_interior_angle, max_aspect_ratio,
          max_skew_angle, taper_ratio, dideal_theta,
-         area_ratio, min_edge_length, max_warp_angle) = out
+         area_ratio, min_edge_length, max_warp_angle, normals) = out
 
         #self.grid_mapper.SetResolveCoincidentTopologyToPolygonOffset()
         grid.Modified()
@@ -3727,7 +3801,7 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         if self.make_offset_normals_dim and nelements:
             icase, normals = self._build_normals_quality(
                 model, nelements, cases, form0, icase,
-                xyz_cid0, material_coord,
+                xyz_cid0, material_coord, normals,
                 min_interior_angle, max_interior_angle, dideal_theta,
                 area, max_skew_angle, taper_ratio,
                 max_warp_angle, area_ratio, min_edge_length, max_aspect_ratio)
@@ -3851,7 +3925,6 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
           split in the other direction.
         """
         xyz_cid0 = self.xyz_cid0
-        nids = nid_cp_cd[:, 0]
         #sphere_size = self._get_sphere_size(dim_max)
 
         # :param i: the element id in grid
@@ -3869,16 +3942,16 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         nelements = len(model.elements)
         pids = np.zeros(nelements, 'int32')
         material_coord = np.zeros(nelements, 'int32')
-        min_interior_angle = np.zeros(nelements, 'float32')
-        max_interior_angle = np.zeros(nelements, 'float32')
-        dideal_theta = np.zeros(nelements, 'float32')
-        max_skew_angle = np.zeros(nelements, 'float32')
-        max_warp_angle = np.zeros(nelements, 'float32')
-        max_aspect_ratio = np.zeros(nelements, 'float32')
-        area = np.zeros(nelements, 'float32')
-        area_ratio = np.zeros(nelements, 'float32')
-        taper_ratio = np.zeros(nelements, 'float32')
-        min_edge_length = np.zeros(nelements, 'float32')
+        min_interior_angle = np.full(nelements, np.nan, 'float32')
+        max_interior_angle = np.full(nelements, np.nan, 'float32')
+        dideal_theta = np.full(nelements, np.nan, 'float32')
+        max_skew_angle = np.full(nelements, np.nan, 'float32')
+        max_warp_angle = np.full(nelements, np.nan, 'float32')
+        max_aspect_ratio = np.full(nelements, np.nan, 'float32')
+        area = np.full(nelements, np.nan, 'float32')
+        area_ratio = np.full(nelements, np.nan, 'float32')
+        taper_ratio = np.full(nelements, np.nan, 'float32')
+        min_edge_length = np.full(nelements, np.nan, 'float32')
 
         # pids_good = []
         # pids_to_keep = []
@@ -3966,7 +4039,40 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         nid_to_pid_map = defaultdict(list)
         pid = 0
 
-        grid = self.grid
+        cell_type_point = vtk.vtkVertex().GetCellType()
+        cell_type_line = vtk.vtkLine().GetCellType()
+        cell_type_line3 = vtk.vtkQuadraticEdge().GetCellType()
+        cell_type_tri3 = vtkTriangle().GetCellType()
+        cell_type_tri6 = vtkQuadraticTriangle().GetCellType()
+        cell_type_quad4 = vtkQuad().GetCellType()
+        cell_type_quad8 = vtkQuadraticQuad().GetCellType()
+        cell_type_quad9 = vtk.vtkBiQuadraticQuad().GetCellType()
+        cell_type_tetra4 = vtkTetra().GetCellType()
+        cell_type_tetra10 = vtkQuadraticTetra().GetCellType()
+        cell_type_pyram5 = vtkPyramid().GetCellType()
+        cell_type_penta6 = vtkWedge().GetCellType()
+        cell_type_penta15 = vtkQuadraticWedge().GetCellType()
+        cell_type_hexa8 = vtkHexahedron().GetCellType()
+        cell_type_hexa20 = vtkQuadraticHexahedron().GetCellType()
+
+        # the cells and quality checks are built for all the elements
+        # of a given type at once, so we just store the node indices
+        #    cell_type -> ielements, node indices
+        icells = defaultdict(list)
+        cells = defaultdict(list)
+        #    faces -> ielements, node indices
+        isolids = defaultdict(list)
+        solids = defaultdict(list)
+        itris = []
+        tris = []
+        iquads = []
+        quads = []
+        ilines = []
+        lines = []
+        eids = np.zeros(nelements, 'int32')
+        is_shell = np.zeros(nelements, 'bool')
+        is_theta = np.zeros(nelements, 'bool')
+
         self._build_plotels(model)
 
         #print("map_elements...")
@@ -3975,33 +4081,11 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
             if i % 5000 == 0 and i > 0:
                 print('  map_elements = %i' % i)
             etype = element.type
-            # if element.Pid() >= 82:
-                # continue
-            # if element.Pid() in pids_to_drop:
-                # continue
-            # if element.Pid() not in pids_to_keep:
-                # continue
-            # if element.pid.type == 'PSOLID':
-                # continue
-
             pid = np.nan
-            dideal_thetai = np.nan
-            min_thetai = np.nan
-            max_thetai = np.nan
-            #max_thetai = np.nan
-            max_skew = np.nan
-            #max_warp = np.nan
-            max_warp = np.nan
-            aspect_ratio = np.nan
-            areai = np.nan
-            area_ratioi = np.nan
-            taper_ratioi = np.nan
-            min_edge_lengthi = np.nan
 
             if isinstance(element, (CTRIA3, CTRIAR, CTRAX3, CPLSTN3)):
                 if isinstance(element, (CTRIA3, CTRIAR)):
                     material_coord[i] = 0 if isinstance(element.theta_mcid, float) else element.theta_mcid
-                elem = vtkTriangle()
                 node_ids = element.node_ids
                 pid = element.Pid()
                 self.eid_to_nid_map[eid] = node_ids
@@ -4009,18 +4093,10 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                     if nid is not None:
                         nid_to_pid_map[nid].append(pid)
 
-                n1, n2, n3 = [nid_map[nid] for nid in node_ids]
-                p1 = xyz_cid0[n1, :]
-                p2 = xyz_cid0[n2, :]
-                p3 = xyz_cid0[n3, :]
-                out = tri_quality(p1, p2, p3)
-                (areai, max_skew, aspect_ratio,
-                 min_thetai, max_thetai, dideal_thetai, min_edge_lengthi) = out
-
-                elem.GetPointIds().SetId(0, n1)
-                elem.GetPointIds().SetId(1, n2)
-                elem.GetPointIds().SetId(2, n3)
-                grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                inids = [nid_map[nid] for nid in node_ids]
+                cell_type = cell_type_tri3
+                itris.append(i)
+                tris.append(inids)
             elif isinstance(element, (CTRIA6, CPLSTN6, CTRIAX)):
                 # the CTRIAX is a standard 6-noded element
                 if isinstance(element, CTRIA6):
@@ -4032,24 +4108,13 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                     if nid is not None:
                         nid_to_pid_map[nid].append(pid)
                 if None not in node_ids:
-                    elem = vtkQuadraticTriangle()
-                    elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                    elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                    elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
+                    inids = [nid_map[nid] for nid in node_ids]
+                    cell_type = cell_type_tri6
                 else:
-                    elem = vtkTriangle()
-
-                n1, n2, n3 = [nid_map[nid] for nid in node_ids[:3]]
-                p1 = xyz_cid0[n1, :]
-                p2 = xyz_cid0[n2, :]
-                p3 = xyz_cid0[n3, :]
-                out = tri_quality(p1, p2, p3)
-                (areai, max_skew, aspect_ratio,
-                 min_thetai, max_thetai, dideal_thetai, min_edge_lengthi) = out
-                elem.GetPointIds().SetId(0, n1)
-                elem.GetPointIds().SetId(1, n2)
-                elem.GetPointIds().SetId(2, n3)
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                    inids = [nid_map[nid] for nid in node_ids[:3]]
+                    cell_type = cell_type_tri3
+                itris.append(i)
+                tris.append(inids[:3])
             elif isinstance(element, CTRIAX6):
                 # the CTRIAX6 is not a standard second-order triangle
                 #
@@ -4070,27 +4135,14 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                         nid_to_pid_map[nid].append(pid)
 
                 if None not in node_ids:
-                    elem = vtkQuadraticTriangle()
-                    elem.GetPointIds().SetId(3, nid_map[node_ids[1]])
-                    elem.GetPointIds().SetId(4, nid_map[node_ids[3]])
-                    elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
+                    inids = [nid_map[node_ids[inid]] for inid in (0, 2, 4, 1, 3, 5)]
+                    cell_type = cell_type_tri6
                 else:
-                    elem = vtkTriangle()
-
-                n1 = nid_map[node_ids[0]]
-                n2 = nid_map[node_ids[2]]
-                n3 = nid_map[node_ids[4]]
-                p1 = xyz_cid0[n1, :]
-                p2 = xyz_cid0[n2, :]
-                p3 = xyz_cid0[n3, :]
-                out = tri_quality(p1, p2, p3)
-                (areai, max_skew, aspect_ratio,
-                 min_thetai, max_thetai, dideal_thetai, min_edge_lengthi) = out
-                elem.GetPointIds().SetId(0, n1)
-                elem.GetPointIds().SetId(1, n2)
-                elem.GetPointIds().SetId(2, n3)
+                    inids = [nid_map[node_ids[inid]] for inid in (0, 2, 4)]
+                    cell_type = cell_type_tri3
                 self.eid_to_nid_map[eid] = [node_ids[0], node_ids[2], node_ids[4]]
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                itris.append(i)
+                tris.append(inids[:3])
 
             elif isinstance(element, (CQUAD4, CSHEAR, CQUADR, CPLSTN4, CQUADX4)):
                 if isinstance(element, (CQUAD4, CQUADR)):
@@ -4103,22 +4155,10 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                         nid_to_pid_map[nid].append(pid)
 
                 self.eid_to_nid_map[eid] = node_ids
-
-                n1, n2, n3, n4 = [nid_map[nid] for nid in node_ids]
-                p1 = xyz_cid0[n1, :]
-                p2 = xyz_cid0[n2, :]
-                p3 = xyz_cid0[n3, :]
-                p4 = xyz_cid0[n4, :]
-                out = quad_quality(p1, p2, p3, p4)
-                (areai, taper_ratioi, area_ratioi, max_skew, aspect_ratio,
-                 min_thetai, max_thetai, dideal_thetai, min_edge_lengthi) = out
-
-                elem = vtkQuad()
-                elem.GetPointIds().SetId(0, n1)
-                elem.GetPointIds().SetId(1, n2)
-                elem.GetPointIds().SetId(2, n3)
-                elem.GetPointIds().SetId(3, n4)
-                self.grid.InsertNextCell(9, elem.GetPointIds())
+                inids = [nid_map[nid] for nid in node_ids]
+                cell_type = cell_type_quad4
+                iquads.append(i)
+                quads.append(inids)
 
             elif isinstance(element, (CQUAD8, CPLSTN8, CQUADX8)):
                 if isinstance(element, CQUAD8):
@@ -4129,28 +4169,14 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                     if nid is not None:
                         nid_to_pid_map[nid].append(pid)
                 self.eid_to_nid_map[eid] = node_ids[:4]
-
-                n1, n2, n3, n4 = [nid_map[nid] for nid in node_ids[:4]]
-                p1 = xyz_cid0[n1, :]
-                p2 = xyz_cid0[n2, :]
-                p3 = xyz_cid0[n3, :]
-                p4 = xyz_cid0[n4, :]
-                out = quad_quality(p1, p2, p3, p4)
-                (areai, taper_ratioi, area_ratioi, max_skew, aspect_ratio,
-                 min_thetai, max_thetai, dideal_thetai, min_edge_lengthi) = out
                 if None not in node_ids:
-                    elem = vtkQuadraticQuad()
-                    elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                    elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                    elem.GetPointIds().SetId(6, nid_map[node_ids[6]])
-                    elem.GetPointIds().SetId(7, nid_map[node_ids[7]])
+                    inids = [nid_map[nid] for nid in node_ids]
+                    cell_type = cell_type_quad8
                 else:
-                    elem = vtkQuad()
-                    elem.GetPointIds().SetId(0, n1)
-                    elem.GetPointIds().SetId(1, n2)
-                    elem.GetPointIds().SetId(2, n3)
-                    elem.GetPointIds().SetId(3, n4)
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                    inids = [nid_map[nid] for nid in node_ids[:4]]
+                    cell_type = cell_type_quad4
+                iquads.append(i)
+                quads.append(inids[:4])
             elif isinstance(element, (CQUAD, CQUADX)):
                 # CQUAD, CQUADX are 9 noded quads
                 material_coord[i] = 0 if isinstance(element.theta_mcid, float) else element.theta_mcid
@@ -4161,44 +4187,24 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                     if nid is not None:
                         nid_to_pid_map[nid].append(pid)
                 self.eid_to_nid_map[eid] = node_ids[:4]
-
-                n1, n2, n3, n4 = [nid_map[nid] for nid in node_ids[:4]]
-                p1 = xyz_cid0[n1, :]
-                p2 = xyz_cid0[n2, :]
-                p3 = xyz_cid0[n3, :]
-                p4 = xyz_cid0[n4, :]
-                out = quad_quality(p1, p2, p3, p4)
-                (areai, taper_ratioi, area_ratioi, max_skew, aspect_ratio,
-                 min_thetai, max_thetai, dideal_thetai, min_edge_lengthi) = out
                 if None in node_ids:
-                    elem = vtkQuad()
-                    elem.GetPointIds().SetId(0, n1)
-                    elem.GetPointIds().SetId(1, n2)
-                    elem.GetPointIds().SetId(2, n3)
-                    elem.GetPointIds().SetId(3, n4)
+                    inids = [nid_map[nid] for nid in node_ids[:4]]
+                    cell_type = cell_type_quad4
                 else:
-                    elem = vtk.vtkBiQuadraticQuad()
-                    elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                    elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                    elem.GetPointIds().SetId(6, nid_map[node_ids[6]])
-                    elem.GetPointIds().SetId(7, nid_map[node_ids[7]])
-                    elem.GetPointIds().SetId(8, nid_map[node_ids[8]])
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                    inids = [nid_map[nid] for nid in node_ids]
+                    cell_type = cell_type_quad9
+                iquads.append(i)
+                quads.append(inids[:4])
             elif isinstance(element, CTETRA4):
-                elem = vtkTetra()
                 node_ids = element.node_ids
                 pid = element.Pid()
                 for nid in node_ids:
                     nid_to_pid_map[nid].append(pid)
                 self.eid_to_nid_map[eid] = node_ids[:4]
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[node_ids[2]])
-                elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                self.grid.InsertNextCell(10, elem.GetPointIds())
-                #elem_nid_map = {nid:nid_map[nid] for nid in node_ids[:4]}
-                min_thetai, max_thetai, dideal_thetai, min_edge_lengthi = get_min_max_theta(
-                    _ctetra_faces, node_ids[:4], nid_map, xyz_cid0)
+                inids = [nid_map[nid] for nid in node_ids[:4]]
+                cell_type = cell_type_tetra4
+                isolids[_ctetra_faces].append(i)
+                solids[_ctetra_faces].append(inids)
             elif isinstance(element, CTETRA10):
                 node_ids = element.node_ids
                 pid = element.Pid()
@@ -4207,38 +4213,23 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                         nid_to_pid_map[nid].append(pid)
                 self.eid_to_nid_map[eid] = node_ids[:4]
                 if None not in node_ids:
-                    elem = vtkQuadraticTetra()
-                    elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                    elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                    elem.GetPointIds().SetId(6, nid_map[node_ids[6]])
-                    elem.GetPointIds().SetId(7, nid_map[node_ids[7]])
-                    elem.GetPointIds().SetId(8, nid_map[node_ids[8]])
-                    elem.GetPointIds().SetId(9, nid_map[node_ids[9]])
+                    inids = [nid_map[nid] for nid in node_ids]
+                    cell_type = cell_type_tetra10
                 else:
-                    elem = vtkTetra()
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[node_ids[2]])
-                elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
-                min_thetai, max_thetai, dideal_thetai, min_edge_lengthi = get_min_max_theta(
-                    _ctetra_faces, node_ids[:4], nid_map, xyz_cid0)
+                    inids = [nid_map[nid] for nid in node_ids[:4]]
+                    cell_type = cell_type_tetra4
+                isolids[_ctetra_faces].append(i)
+                solids[_ctetra_faces].append(inids[:4])
             elif isinstance(element, CPENTA6):
-                elem = vtkWedge()
                 node_ids = element.node_ids
                 pid = element.Pid()
                 for nid in node_ids:
                     nid_to_pid_map[nid].append(pid)
                 self.eid_to_nid_map[eid] = node_ids[:6]
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[node_ids[2]])
-                elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                self.grid.InsertNextCell(13, elem.GetPointIds())
-                min_thetai, max_thetai, dideal_thetai, min_edge_lengthi = get_min_max_theta(
-                    _cpenta_faces, node_ids[:6], nid_map, xyz_cid0)
+                inids = [nid_map[nid] for nid in node_ids[:6]]
+                cell_type = cell_type_penta6
+                isolids[_cpenta_faces].append(i)
+                solids[_cpenta_faces].append(inids)
 
             elif isinstance(element, CPENTA15):
                 node_ids = element.node_ids
@@ -4248,45 +4239,23 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                         nid_to_pid_map[nid].append(pid)
                 self.eid_to_nid_map[eid] = node_ids[:6]
                 if None not in node_ids:
-                    elem = vtkQuadraticWedge()
-                    elem.GetPointIds().SetId(6, nid_map[node_ids[6]])
-                    elem.GetPointIds().SetId(7, nid_map[node_ids[7]])
-                    elem.GetPointIds().SetId(8, nid_map[node_ids[8]])
-                    elem.GetPointIds().SetId(9, nid_map[node_ids[9]])
-                    elem.GetPointIds().SetId(10, nid_map[node_ids[10]])
-                    elem.GetPointIds().SetId(11, nid_map[node_ids[11]])
-                    elem.GetPointIds().SetId(12, nid_map[node_ids[12]])
-                    elem.GetPointIds().SetId(13, nid_map[node_ids[13]])
-                    elem.GetPointIds().SetId(14, nid_map[node_ids[14]])
+                    inids = [nid_map[nid] for nid in node_ids]
+                    cell_type = cell_type_penta15
                 else:
-                    elem = vtkWedge()
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[node_ids[2]])
-                elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
-                min_thetai, max_thetai, dideal_thetai, min_edge_lengthi = get_min_max_theta(
-                    _cpenta_faces, node_ids[:6], nid_map, xyz_cid0)
+                    inids = [nid_map[nid] for nid in node_ids[:6]]
+                    cell_type = cell_type_penta6
+                isolids[_cpenta_faces].append(i)
+                solids[_cpenta_faces].append(inids[:6])
             elif isinstance(element, (CHEXA8, CIHEX1)):
                 node_ids = element.node_ids
                 pid = element.Pid()
                 for nid in node_ids:
                     nid_to_pid_map[nid].append(pid)
                 self.eid_to_nid_map[eid] = node_ids[:8]
-                elem = vtkHexahedron()
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[node_ids[2]])
-                elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                elem.GetPointIds().SetId(6, nid_map[node_ids[6]])
-                elem.GetPointIds().SetId(7, nid_map[node_ids[7]])
-                self.grid.InsertNextCell(12, elem.GetPointIds())
-                min_thetai, max_thetai, dideal_thetai, min_edge_lengthi = get_min_max_theta(
-                    _chexa_faces, node_ids[:8], nid_map, xyz_cid0)
+                inids = [nid_map[nid] for nid in node_ids[:8]]
+                cell_type = cell_type_hexa8
+                isolids[_chexa_faces].append(i)
+                solids[_chexa_faces].append(inids)
             elif isinstance(element, (CHEXA20, CIHEX2)):
                 node_ids = element.node_ids
                 pid = element.Pid()
@@ -4294,83 +4263,30 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                     if nid is not None:
                         nid_to_pid_map[nid].append(pid)
                 if None not in node_ids:
-                    elem = vtkQuadraticHexahedron()
-                    elem.GetPointIds().SetId(8, nid_map[node_ids[8]])
-                    elem.GetPointIds().SetId(9, nid_map[node_ids[9]])
-                    elem.GetPointIds().SetId(10, nid_map[node_ids[10]])
-                    elem.GetPointIds().SetId(11, nid_map[node_ids[11]])
-
-                    # these two blocks are flipped
-                    elem.GetPointIds().SetId(12, nid_map[node_ids[16]])
-                    elem.GetPointIds().SetId(13, nid_map[node_ids[17]])
-                    elem.GetPointIds().SetId(14, nid_map[node_ids[18]])
-                    elem.GetPointIds().SetId(15, nid_map[node_ids[19]])
-
-                    elem.GetPointIds().SetId(16, nid_map[node_ids[12]])
-                    elem.GetPointIds().SetId(17, nid_map[node_ids[13]])
-                    elem.GetPointIds().SetId(18, nid_map[node_ids[14]])
-                    elem.GetPointIds().SetId(19, nid_map[node_ids[15]])
+                    # the 12-15 and 16-19 blocks are flipped
+                    inids = [nid_map[nid] for nid in
+                             node_ids[:12] + node_ids[16:20] + node_ids[12:16]]
+                    cell_type = cell_type_hexa20
                 else:
-                    elem = vtkHexahedron()
+                    inids = [nid_map[nid] for nid in node_ids[:8]]
+                    cell_type = cell_type_hexa8
 
                 self.eid_to_nid_map[eid] = node_ids[:8]
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[node_ids[2]])
-                elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                elem.GetPointIds().SetId(6, nid_map[node_ids[6]])
-                elem.GetPointIds().SetId(7, nid_map[node_ids[7]])
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
-                min_thetai, max_thetai, dideal_thetai, min_edge_lengthi = get_min_max_theta(
-                    _chexa_faces, node_ids[:8], nid_map, xyz_cid0)
+                isolids[_chexa_faces].append(i)
+                solids[_chexa_faces].append(inids[:8])
 
-            elif isinstance(element, CPYRAM5):
+            elif isinstance(element, (CPYRAM5, CPYRAM13)):
+                # the CPYRAM13 is shown as a linear pyramid
                 node_ids = element.node_ids
                 pid = element.Pid()
                 for nid in node_ids:
-                    nid_to_pid_map[nid].append(pid)
-                self.eid_to_nid_map[eid] = node_ids[:5]
-                elem = vtkPyramid()
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[node_ids[2]])
-                elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                # etype = 14
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
-                min_thetai, max_thetai, dideal_thetai, min_edge_lengthi = get_min_max_theta(
-                    _cpyram_faces, node_ids[:5], nid_map, xyz_cid0)
-            elif isinstance(element, CPYRAM13):
-                node_ids = element.node_ids
-                pid = element.Pid()
-                #if None not in node_ids:
-                    #print(' node_ids =', node_ids)
-                    #elem = vtkQuadraticPyramid()
-                    # etype = 27
-                    #elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                    #elem.GetPointIds().SetId(6, nid_map[node_ids[6]])
-                    #elem.GetPointIds().SetId(7, nid_map[node_ids[7]])
-                    #elem.GetPointIds().SetId(8, nid_map[node_ids[8]])
-                    #elem.GetPointIds().SetId(9, nid_map[node_ids[9]])
-                    #elem.GetPointIds().SetId(10, nid_map[node_ids[10]])
-                    #elem.GetPointIds().SetId(11, nid_map[node_ids[11]])
-                    #elem.GetPointIds().SetId(12, nid_map[node_ids[12]])
-                #else:
-                elem = vtkPyramid()
-                #print('*node_ids =', node_ids[:5])
-
+                    if nid is not None:
+                        nid_to_pid_map[nid].append(pid)
                 self.eid_to_nid_map[eid] = node_ids[:5]
-
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[node_ids[2]])
-                elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
-                min_thetai, max_thetai, dideal_thetai, min_edge_lengthi = get_min_max_theta(
-                    _cpyram_faces, node_ids[:5], nid_map, xyz_cid0)
+                inids = [nid_map[nid] for nid in node_ids[:5]]
+                cell_type = cell_type_pyram5
+                isolids[_cpyram_faces].append(i)
+                solids[_cpyram_faces].append(inids)
 
             elif etype in ['CBUSH', 'CBUSH1D', 'CFAST',
                            'CELAS1', 'CELAS2', 'CELAS3', 'CELAS4',
@@ -4407,32 +4323,18 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                         # SPOINT
                         print('removing CELASx eid=%i -> SPOINT %i' % (eid, nid))
                         continue
-
-                    #c = nid_map[nid]
-
-                    #if 1:
-                    elem = vtk.vtkVertex()
-                    elem.GetPointIds().SetId(0, j)
-                    #else:
-                        #elem = vtk.vtkSphere()
-                        #elem = vtk.vtkSphereSource()
-                        #if d == 0.:
-                        #d = sphere_size
-                        #elem.SetRadius(sphere_size)
+                    inids = [nid_map[nid]]
+                    cell_type = cell_type_point
                 else:
                     # 2 points
-                    #d = norm(element.nodes[0].get_position() - element.nodes[1].get_position())
                     self.eid_to_nid_map[eid] = node_ids
-                    elem = vtk.vtkLine()
                     try:
-                        elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                        elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
+                        inids = [nid_map[node_ids[0]], nid_map[node_ids[1]]]
                     except KeyError:
                         print("node_ids =", node_ids)
                         print(str(element))
                         continue
-
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                    cell_type = cell_type_line
 
             elif etype in ('CBAR', 'CBEAM', 'CROD', 'CONROD', 'CTUBE'):
                 if etype == 'CONROD':
@@ -4451,22 +4353,17 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                     nid_to_pid_map[nid].append(pid)
 
                 # 2 points
-                #min_edge_lengthi = norm(element.nodes_ref[0].get_position() -
-                                        #element.nodes_ref[1].get_position())
-                n1, n2 = np.searchsorted(nids, element.nodes)
-                xyz1 = xyz_cid0[n1, :]
-                xyz2 = xyz_cid0[n2, :]
-                min_edge_lengthi = norm(xyz2 - xyz1)
                 self.eid_to_nid_map[eid] = node_ids
-                elem = vtk.vtkLine()
                 try:
-                    elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                    elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
+                    inids = [nid_map[node_ids[0]], nid_map[node_ids[1]]]
                 except KeyError:
                     print("node_ids =", node_ids)
                     print(str(element))
                     continue
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                cell_type = cell_type_line
+                area[i] = areai
+                ilines.append(i)
+                lines.append(inids)
 
             elif etype == 'CBEND':
                 pid = element.Pid()
@@ -4475,11 +4372,6 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                     nid_to_pid_map[nid].append(pid)
 
                 # 2 points
-                n1, n2 = np.searchsorted(nids, element.nodes)
-                xyz1 = xyz_cid0[n1, :]
-                xyz2 = xyz_cid0[n2, :]
-                #min_edge_lengthi = norm(element.nodes_ref[0].get_position() -
-                                        #element.nodes_ref[1].get_position())
                 self.eid_to_nid_map[eid] = node_ids
 
                 g0 = element.g0 #_vector
@@ -4488,11 +4380,8 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                         g0, element.x, element)
                     raise NotImplementedError(msg)
                 # only supports g0 as an integer
-                elem = vtk.vtkQuadraticEdge()
-                elem.GetPointIds().SetId(0, nid_map[node_ids[0]])
-                elem.GetPointIds().SetId(1, nid_map[node_ids[1]])
-                elem.GetPointIds().SetId(2, nid_map[g0])
-                self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                inids = [nid_map[node_ids[0]], nid_map[node_ids[1]], nid_map[g0]]
+                cell_type = cell_type_line3
 
             elif etype == 'CHBDYG':
                 node_ids = element.node_ids
@@ -4504,50 +4393,24 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
 
                 if element.Type in ['AREA4', 'AREA8']:
                     self.eid_to_nid_map[eid] = node_ids[:4]
-
-                    n1, n2, n3, n4 = [nid_map[nid] for nid in node_ids[:4]]
-                    p1 = xyz_cid0[n1, :]
-                    p2 = xyz_cid0[n2, :]
-                    p3 = xyz_cid0[n3, :]
-                    p4 = xyz_cid0[n4, :]
-                    out = quad_quality(p1, p2, p3, p4)
-                    (areai, taper_ratioi, area_ratioi, max_skew, aspect_ratio,
-                     min_thetai, max_thetai, dideal_thetai, min_edge_lengthi) = out
                     if element.Type == 'AREA4' or None in node_ids:
-                        elem = vtkQuad()
+                        inids = [nid_map[nid] for nid in node_ids[:4]]
+                        cell_type = cell_type_quad4
                     else:
-                        elem = vtkQuadraticQuad()
-                        elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                        elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-                        elem.GetPointIds().SetId(6, nid_map[node_ids[6]])
-                        elem.GetPointIds().SetId(7, nid_map[node_ids[7]])
-
-                    elem.GetPointIds().SetId(0, n1)
-                    elem.GetPointIds().SetId(1, n2)
-                    elem.GetPointIds().SetId(2, n3)
-                    elem.GetPointIds().SetId(3, n4)
-                    self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                        inids = [nid_map[nid] for nid in node_ids[:8]]
+                        cell_type = cell_type_quad8
+                    iquads.append(i)
+                    quads.append(inids[:4])
                 elif element.Type in ['AREA3', 'AREA6']:
                     self.eid_to_nid_map[eid] = node_ids[:3]
                     if element.Type == 'AREA3' or None in node_ids:
-                        elem = vtkTriangle()
+                        inids = [nid_map[nid] for nid in node_ids[:3]]
+                        cell_type = cell_type_tri3
                     else:
-                        elem = vtkQuadraticTriangle()
-                        elem.GetPointIds().SetId(3, nid_map[node_ids[3]])
-                        elem.GetPointIds().SetId(4, nid_map[node_ids[4]])
-                        elem.GetPointIds().SetId(5, nid_map[node_ids[5]])
-
-                    n1, n2, n3 = [nid_map[nid] for nid in node_ids[:3]]
-                    p1 = xyz_cid0[n1, :]
-                    p2 = xyz_cid0[n2, :]
-                    p3 = xyz_cid0[n3, :]
-                    out = tri_quality(p1, p2, p3)
-                    (areai, max_skew, aspect_ratio,
-                     min_thetai, max_thetai, dideal_thetai, min_edge_lengthi) = out
-                    elem.GetPointIds().SetId(0, n1)
-                    elem.GetPointIds().SetId(1, n2)
-                    elem.GetPointIds().SetId(2, n3)
-                    self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                        inids = [nid_map[nid] for nid in node_ids[:6]]
+                        cell_type = cell_type_tri6
+                    itris.append(i)
+                    tris.append(inids[:3])
                 else:
                     #print('removing\n%s' % (element))
                     print('removing eid=%s; %s' % (eid, element.type))
@@ -4575,27 +4438,11 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                 pids[i] = pid
                 pids_dict[eid] = pid
 
-            if np.isnan(max_thetai) and etype not in NO_THETA:
-                print('eid=%s theta=%s...setting to 360. deg' % (eid, max_thetai))
-                print(str(element).rstrip())
-                if isinstance(element.nodes[0], integer_types):
-                    print('  nodes = %s' % element.nodes)
-                else:
-                    for node in element.nodes:
-                        print(str(node).rstrip())
-                max_thetai = 2 * np.pi
-            #print(eid, min_thetai, max_thetai, '\n', element)
-
-            min_interior_angle[i] = min_thetai
-            max_interior_angle[i] = max_thetai
-            dideal_theta[i] = dideal_thetai
-            max_skew_angle[i] = max_skew
-            max_warp_angle[i] = max_warp
-            max_aspect_ratio[i] = aspect_ratio
-            area[i] = areai
-            area_ratio[i] = area_ratioi
-            taper_ratio[i] = taper_ratioi
-            min_edge_length[i] = min_edge_lengthi
+            icells[cell_type].append(i)
+            cells[cell_type].append(inids)
+            eids[i] = eid
+            is_shell[i] = isinstance(element, ShellElement)
+            is_theta[i] = etype not in NO_THETA
             i += 1
         #assert len(self.eid_map) > 0, self.eid_map
         #print('mapped elements')
@@ -4604,17 +4451,105 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         self.nelements = nelements
         #print('nelements=%s pids=%s' % (nelements, list(pids)))
         pids = pids[:nelements]
+        eids = eids[:nelements]
+        is_shell = is_shell[:nelements]
+        is_theta = is_theta[:nelements]
+        material_coord = material_coord[:nelements]
+        (area, min_interior_angle, max_interior_angle, max_aspect_ratio,
+         max_skew_angle, taper_ratio, dideal_theta,
+         area_ratio, min_edge_length, max_warp_angle) = [
+             array[:nelements] for array in (
+                 area, min_interior_angle, max_interior_angle, max_aspect_ratio,
+                 max_skew_angle, taper_ratio, dideal_theta,
+                 area_ratio, min_edge_length, max_warp_angle)]
+
+        #-----------------------------------------------------------------------
+        # build the grid
+        cell_types = sorted(cells)
+        create_vtk_cells_of_constant_element_types(
+            self.grid,
+            [np.array(cells[cell_type], dtype='int32') for cell_type in cell_types],
+            cell_types,
+            [np.array(icells[cell_type], dtype='int32') for cell_type in cell_types])
+
+        #-----------------------------------------------------------------------
+        # quality
+        normals = np.zeros((nelements, 3), dtype='float32')
+        if itris:
+            itris = np.array(itris, dtype='int32')
+            tris = np.array(tris, dtype='int32')
+            p1 = xyz_cid0[tris[:, 0], :]
+            p2 = xyz_cid0[tris[:, 1], :]
+            p3 = xyz_cid0[tris[:, 2], :]
+            (area[itris], max_skew_angle[itris], max_aspect_ratio[itris],
+             min_interior_angle[itris], max_interior_angle[itris],
+             dideal_theta[itris], min_edge_length[itris]) = tri_quality_array(p1, p2, p3)
+            normals[itris, :] = np.cross(p1 - p2, p1 - p3)
+
+        if iquads:
+            iquads = np.array(iquads, dtype='int32')
+            quads = np.array(quads, dtype='int32')
+            p1 = xyz_cid0[quads[:, 0], :]
+            p2 = xyz_cid0[quads[:, 1], :]
+            p3 = xyz_cid0[quads[:, 2], :]
+            p4 = xyz_cid0[quads[:, 3], :]
+            (area[iquads], taper_ratio[iquads], area_ratio[iquads],
+             max_skew_angle[iquads], max_aspect_ratio[iquads],
+             min_interior_angle[iquads], max_interior_angle[iquads],
+             dideal_theta[iquads], min_edge_length[iquads]) = quad_quality_array(p1, p2, p3, p4)
+            normals[iquads, :] = np.cross(p1 - p3, p2 - p4)
+
+        for faces, isolid in iteritems(isolids):
+            isolid = np.array(isolid, dtype='int32')
+            inids = np.array(solids[faces], dtype='int32')
+            (min_interior_angle[isolid], max_interior_angle[isolid],
+             dideal_theta[isolid], min_edge_length[isolid]) = get_min_max_theta_array(
+                 faces, inids, xyz_cid0)
+
+        if ilines:
+            ilines = np.array(ilines, dtype='int32')
+            lines = np.array(lines, dtype='int32')
+            min_edge_length[ilines] = norm(
+                xyz_cid0[lines[:, 1], :] - xyz_cid0[lines[:, 0], :], axis=1)
+
+        inan = np.where(is_theta & np.isnan(max_interior_angle))[0]
+        for ieid in inan:
+            eid = eids[ieid]
+            element = model.elements[eid]
+            print('eid=%s theta=%s...setting to 360. deg' % (eid, max_interior_angle[ieid]))
+            print(str(element).rstrip())
+            if isinstance(element.nodes[0], integer_types):
+                print('  nodes = %s' % element.nodes)
+            else:
+                for node in element.nodes:
+                    print(str(node).rstrip())
+        max_interior_angle[inan] = 2 * np.pi
+
+        # only ShellElements have normals
+        normals[~is_shell, :] = 0.
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normals /= norm(normals, axis=1)[:, np.newaxis]
+        ibad = np.where(is_shell & ~np.isfinite(normals).all(axis=1))[0]
+        for ieid in ibad:
+            # this happens when you have a degenerate tri
+            element = model.elements[eids[ieid]]
+            msg = 'eid=%i normal=nan...setting to [2, 2, 2]\n' % eids[ieid]
+            msg += '%s' % (element)
+            msg += 'nodes = %s' % str(element.nodes)
+            self.log.error(msg)
+        normals[ibad, :] = 2.
+        normals[~is_shell, :] = 0.
 
         out = (
             nid_to_pid_map, xyz_cid0, pids, nelements, material_coord,
             area, min_interior_angle, max_interior_angle, max_aspect_ratio,
             max_skew_angle, taper_ratio, dideal_theta,
-            area_ratio, min_edge_length, max_warp_angle,
+            area_ratio, min_edge_length, max_warp_angle, normals,
         )
         return out
 
     def _build_normals_quality(self, model, nelements, cases, form0, icase,
-                               xyz_cid0, material_coord,
+                               xyz_cid0, material_coord, normals,
                                min_interior_angle, max_interior_angle, dideal_theta,
                                area, max_skew_angle, taper_ratio,
                                max_warp_angle, area_ratio, min_edge_length, max_aspect_ratio):
@@ -4631,14 +4566,13 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
          - Taper Ratio
          - Area Ratio
          - MaterialCoord
+
+        The normals and quality metrics are calculated for all the
+        elements at once in ``_map_elements1``.
         """
         #ielement = 0
         nelements = self.element_ids.shape[0]
-        normals = np.zeros((nelements, 3), dtype='float32')
         offset = np.full(nelements, np.nan, dtype='float32')
-        xoffset = np.full(nelements, np.nan, dtype='float32')
-        yoffset = np.full(nelements, np.nan, dtype='float32')
-        zoffset = np.full(nelements, np.nan, dtype='float32')
         element_dim = np.full(nelements, -1, dtype='int32')
         nnodes_array = np.full(nelements, np.nan, dtype='int32')
 
@@ -4647,23 +4581,6 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
             if isinstance(element, ShellElement):
                 ieid = None
                 element_dimi = 2
-                #assert element.nodes_ref is not None, element.nodes_ref
-                try:
-                    normali = element.Normal()
-                except AttributeError:
-                    msg = str(element)
-                    msg += 'nodes_ref = %s\n' % element
-                    msg += 'nodes = %s' % element.node_ids
-                    raise AttributeError(msg)
-                except RuntimeError:
-                    # this happens when you have a degenerate tri
-                    msg = 'eid=%i normal=nan...setting to [2, 2, 2]\n'
-                    msg += '%s' % (element)
-                    msg += 'nodes = %s' % str(element.nodes)
-                    self.log.error(msg)
-                    normali = np.ones(3) * 2.
-                    #raise
-
                 prop = element.pid_ref
                 if prop is None:
                     # F:\work\pyNastran\examples\Dropbox\move_tpl\ehbus69.op2
@@ -4751,17 +4668,12 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                         raise NotImplementedError(element)
 
                 ieid = self.eid_map[eid]
-                normals[ieid, :] = normali
                 if element.type in ['CPLSTN3', 'CPLSTN4', 'CPLSTN6', 'CPLSTN8']:
                     element_dim[ieid] = element_dimi
                     nnodes_array[ieid] = nnodesi
                     self.log.debug('continue...element.type=%r' % element.type)
                     continue
-
                 offset[ieid] = z0
-                xoffset[ieid] = z0 * normali[0]
-                yoffset[ieid] = z0 * normali[1]
-                zoffset[ieid] = z0 * normali[2]
 
             elif etype == 'CTETRA':
                 ieid = self.eid_map[eid]
@@ -4829,6 +4741,10 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
             nnodes_array[ieid] = nnodesi
             #ielement += 1
 
+        xoffset = offset * normals[:, 0]
+        yoffset = offset * normals[:, 1]
+        zoffset = offset * normals[:, 2]
+
         # if not a flat plate
         #if min(nxs) == max(nxs) and min(nxs) != 0.0:
         is_element_dim = np.max(element_dim) != np.min(element_dim)
@@ -5558,7 +5474,8 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
                 raise NotImplementedError(msg)
         else:
             model = op2_filename
-            op2_filename = op2_filename.filename
+            op2_filename = op2_filename.op2_filename
+            model.log = self.log
 
         if self.save_data:
             self.model_results = model
@@ -5668,6 +5585,10 @@ class NastranIO(NastranGuiResults, NastranGeometryHelper):
         assert keys is not None, keys
         #print('keys_order =', keys)
 
+        # the lazy results from a previous OP2 keep their own cache
+        self._result_cache = ResultCache()
+        self._lazy_results_info = {}
+
         disp_dict = defaultdict(list)
         stress_dict = defaultdict(list)
         strain_dict = defaultdict(list)
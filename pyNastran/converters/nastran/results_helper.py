@@ -1,13 +1,14 @@
 from __future__ import print_function
 from copy import deepcopy
 from collections import defaultdict
+from functools import partial
 import traceback
 
 from six import iteritems
 import numpy as np
 from numpy.linalg import norm  # type: ignore
 
-from pyNastran.gui.gui_objects.gui_result import GuiResult
+from pyNastran.gui.gui_objects.gui_result import GuiResult, LazyGuiResult, ResultCache
 from pyNastran.converters.nastran.geometry_helper import NastranGuiAttributes
 from pyNastran.converters.nastran.displacements import (
     DisplacementResults, ForceTableResults) #, TransientElementResults
@@ -18,6 +19,8 @@ class NastranGuiResults(NastranGuiAttributes):
     """
     def __init__(self):
         super(NastranGuiResults, self).__init__()
+        self._result_cache = ResultCache()
+        self._lazy_results_info = {}
 
     def _fill_gpforces(self, model):
         pass
@@ -585,14 +588,12 @@ class NastranGuiResults(NastranGuiAttributes):
 
         return header.strip('; ')
 
-    def _fill_op2_time_centroidal_strain_energy(self, cases, model,
-                                                key, icase, itime,
-                                                form_dict, header_dict, keys_map, is_static):
+    def _create_op2_time_centroidal_strain_energy_arrays(self, model, key, itime, keys_map):
         """
-        Creates the time accurate strain energy objects for the pyNastranGUI
+        creates the following strain energy outputs:
+         - ese, percent, strain_energy_density
         """
         case = None
-        subcase_id = key[2]
         strain_energies = [
             (model.cquad4_strain_energy, 'CQUAD4', True),
             (model.cquad8_strain_energy, 'CQUAD8', True),
@@ -632,7 +633,7 @@ class NastranGuiResults(NastranGuiAttributes):
         ]
         has_strain_energy = [key in res[0] for res in strain_energies]
         if not any(has_strain_energy):
-            return icase
+            return case, None, None, None
         itrue = has_strain_energy.index(True)
         ese0 = strain_energies[itrue][0]
         #times = ese0._times
@@ -676,7 +677,35 @@ class NastranGuiResults(NastranGuiAttributes):
             ese[i] = case.data[itime, :itotal, 0]
             percent[i] = case.data[itime, :itotal, 1]
             strain_energy_density[i] = case.data[itime, :itotal, 2]
+        return case, ese, percent, strain_energy_density
 
+    def _fill_op2_time_centroidal_strain_energy(self, cases, model,
+                                                key, icase, itime,
+                                                form_dict, header_dict, keys_map, is_static):
+        """
+        Creates the time accurate strain energy objects for the pyNastranGUI
+        """
+        if not is_static and itime > 0:
+            return self._fill_op2_lazy_strain_energy(cases, model, key, icase, itime,
+                                                     form_dict)
+
+        subcase_id = key[2]
+        case, ese, percent, strain_energy_density = (
+            self._create_op2_time_centroidal_strain_energy_arrays(model, key, itime, keys_map))
+        if case is None:
+            return icase
+
+        if not is_static:
+            # the first time step seeds the cache for the lazy results
+            self._lazy_results_info[('Strain Energy', key)] = case
+            results = {
+                'Strain Energy' : ese,
+                'Percent of Total' : percent,
+                'Strain Energy Density' : strain_energy_density,
+            }
+            self._result_cache.set(('Strain Energy', key, itime), results)
+            return self._fill_op2_lazy_strain_energy(cases, model, key, icase, itime,
+                                                     form_dict)
 
         #ese
 
@@ -709,11 +738,41 @@ class NastranGuiResults(NastranGuiAttributes):
 
         form_dict[(key, itime)].append(('Strain Energy', icase, []))
         form_dict[(key, itime)].append(('Percent', icase + 1, []))
-        form_dict[(key, itime)].append(('Strain Energy Density', icase + 1, []))
+        form_dict[(key, itime)].append(('Strain Energy Density', icase + 2, []))
         icase += 3
 
         return icase
 
+    def _fill_op2_lazy_strain_energy(self, cases, model, key, icase, itime, form_dict):
+        """creates the strain energy LazyGuiResults for a time step"""
+        try:
+            case = self._lazy_results_info[('Strain Energy', key)]
+        except KeyError:
+            # there is no strain energy for this key
+            return icase
+        if itime >= case.data.shape[0]:
+            # the output is requested at fewer time steps
+            return icase
+        names = [
+            ('Strain Energy', 'Strain Energy', '%.3e'),
+            ('Percent of Total', 'Percent', '%.3f'),
+            ('Strain Energy Density', 'Strain Energy Density', '%.3e'),
+        ]
+        get_results = partial(self._get_lazy_strain_energy_results, model)
+        return self._add_lazy_results(cases, form_dict, key, itime, icase,
+                                      'Strain Energy', names, get_results)
+
+    def _get_lazy_strain_energy_results(self, model, key, itime):
+        """the LazyGuiResult callback for the strain energy"""
+        ese, percent, strain_energy_density = (
+            self._create_op2_time_centroidal_strain_energy_arrays(model, key, itime, {})[1:])
+        results = {
+            'Strain Energy' : ese,
+            'Percent of Total' : percent,
+            'Strain Energy Density' : strain_energy_density,
+        }
+        return results
+
     #icase = self._fill_op2_time_centroidal_force(
         #cases, model, subcase_id, icase, itime, form_dict,
         #is_static)
@@ -878,7 +937,7 @@ class NastranGuiResults(NastranGuiAttributes):
                 rz[i] = np.array(
                     [case.data[itime, ::-1, 2],
                      case.data[itime, 1::-1, 2]]).max(axis=0)
-        return found_force, fx, fy, fz, rx, ry, rz, is_element_on
+        return found_force, fx, fy, fz, rx, ry, rz, is_element_on, case
 
     def _fill_op2_time_centroidal_force(self, cases, model,
                                         key, icase, itime,
@@ -886,10 +945,14 @@ class NastranGuiResults(NastranGuiAttributes):
         """
         Creates the time accurate strain energy objects for the pyNastranGUI
         """
+        if not is_static and itime > 0:
+            return self._fill_op2_lazy_force(cases, model, key, icase, itime,
+                                             form_dict, header_dict)
+
         nelements = self.nelements
         out = self._create_op2_time_centroidal_force_arrays(
             model, nelements, key, itime, header_dict, keys_map)
-        found_force, fx, fy, fz, rx, ry, rz, is_element_on = out
+        found_force, fx, fy, fz, rx, ry, rz, is_element_on, case = out
 
         #new_cases = True
         subcase_id = key[2]
@@ -912,6 +975,14 @@ class NastranGuiResults(NastranGuiAttributes):
                 #num_on -= num_off
                 icase += 1
 
+            if not is_static:
+                # the first time step seeds the cache for the lazy results
+                self._lazy_results_info[('Force', key)] = case
+                self._result_cache.set(('Force', key, itime),
+                                       _get_force_results(fx, fy, fz, rx, ry, rz))
+                return self._fill_op2_lazy_force(cases, model, key, icase, itime,
+                                                 form_dict, header_dict)
+
             if fx.min() != fx.max() or rx.min() != rx.max() and not num_off == nelements:
                 fx_res = GuiResult(subcase_id, header='Axial', title='Axial',
                                    location='centroid', scalar=fx)
@@ -983,17 +1054,15 @@ class NastranGuiResults(NastranGuiAttributes):
                 icase += 6
         return icase
 
-    def _fill_op2_time_centroidal_stress(self, cases, model, key, icase, itime,
-                                         form_dict, header_dict, keys_map,
-                                         is_static, is_stress=True):
+    def _create_op2_time_centroidal_stress_arrays(self, model, key, itime,
+                                                  header_dict, keys_map, is_stress=True):
         """
-        Creates the time accurate stress objects for the pyNastranGUI
+        creates the following stress/strain outputs:
+         - oxx, oyy, ozz, txy, tyz, txz
+         - max_principal, mid_principal, min_principal, ovm
+         - is_element_on
         """
-        #new_cases = True
         case = None
-        #assert isinstance(subcase_id, int), type(subcase_id)
-        assert isinstance(icase, int), icase
-        #assert isinstance(itime, int), type(itime)
         assert is_stress in [True, False], is_stress
         eids = self.element_ids
         assert len(eids) > 0, eids
@@ -1475,8 +1544,61 @@ class NastranGuiResults(NastranGuiAttributes):
             min_principal[i] = o3i
             ovm[i] = ovmi
         del solids
+        return (case, dt, vm_word, is_element_on, oxx, oyy, ozz, txy, tyz, txz,
+                max_principal, mid_principal, min_principal, ovm)
+
+    def _fill_op2_lazy_force(self, cases, model, key, icase, itime,
+                             form_dict, header_dict):
+        """creates the force LazyGuiResults for a time step"""
+        try:
+            case = self._lazy_results_info[('Force', key)]
+        except KeyError:
+            # there are no forces for this key
+            return icase
+        if itime >= len(case._times):
+            # the output is requested at fewer time steps
+            return icase
+
+        dt = case._times[itime]
+        header_dict[(key, itime)] = self._get_nastran_header(case, dt, itime)
+        fmt = '%.4f'
+        names = [
+            ('Axial', 'Axial', None),
+            ('ShearY', 'ShearY', None),
+            ('ShearZ', 'ShearZ', None),
+            ('Torsion', 'Torque', None),
+            ('BendingY', 'BendingY', None),
+            ('BendingZ', 'BendingZ', None),
+            ('IsAxial', 'IsAxial', fmt),
+            ('IsShearY', 'IsShearY', fmt),
+            ('IsShearZ', 'IsShearZ', fmt),
+            ('IsTorsion', 'IsTorsion', fmt),
+            ('IsBendingY', 'IsBendingY', fmt),
+            ('IsBendingZ', 'IsBendingZ', fmt),
+        ]
+        get_results = partial(self._get_lazy_force_results, model)
+        return self._add_lazy_results(cases, form_dict, key, itime, icase,
+                                      'Force', names, get_results)
+
+    def _get_lazy_force_results(self, model, key, itime):
+        """the LazyGuiResult callback for the forces"""
+        out = self._create_op2_time_centroidal_force_arrays(
+            model, self.nelements, key, itime, {}, {})
+        return _get_force_results(*out[1:7])
 
+    def _fill_op2_time_centroidal_stress(self, cases, model, key, icase, itime,
+                                         form_dict, header_dict, keys_map,
+                                         is_static, is_stress=True):
+        """
+        Creates the time accurate stress objects for the pyNastranGUI
 
+        For a transient/modal/frequency subcase, the first time step is
+        computed and the cases are LazyGuiResults, so only the time
+        steps that are displayed are computed.
+        """
+        #assert isinstance(subcase_id, int), type(subcase_id)
+        assert isinstance(icase, int), icase
+        #assert isinstance(itime, int), type(itime)
         if is_stress:
             word = 'Stress'
             fmt = '%.3f'
@@ -1484,6 +1606,15 @@ class NastranGuiResults(NastranGuiAttributes):
             word = 'Strain'
             fmt = '%.4e'
 
+        if not is_static and itime > 0:
+            return self._fill_op2_lazy_stress(cases, model, key, icase, itime,
+                                              form_dict, header_dict, word, fmt, is_stress)
+
+        out = self._create_op2_time_centroidal_stress_arrays(
+            model, key, itime, header_dict, keys_map, is_stress=is_stress)
+        (case, dt, vm_word, is_element_on, oxx, oyy, ozz, txy, tyz, txz,
+         max_principal, mid_principal, min_principal, ovm) = out
+
         # a form is the table of output...
         # Subcase 1         <--- formi  - form_isubcase
         #    Time 1
@@ -1495,17 +1626,9 @@ class NastranGuiResults(NastranGuiAttributes):
         if dt is None:
             return icase
 
-        header = ''
-        if not is_static:
-            #print('is_static = %s' % is_static)
-            if case is None:
-                formis = None
-                return icase
-            header = self._get_nastran_header(case, dt, itime)
-            #form_time[0] = header
+        if not is_static and case is None:
+            return icase
 
-        form0 = (word, None, [])
-        formis = form0[2]
         # subcase_id, icase, resultType, vector_size, location, dataFormat
         subcase_id = key[2]
         if is_stress and itime == 0:
@@ -1520,6 +1643,16 @@ class NastranGuiResults(NastranGuiAttributes):
                 form_dict[(key, itime)].append(('Stress - IsElementOn', icase, []))
                 icase += 1
 
+        if not is_static:
+            # the first time step seeds the cache for the lazy results
+            self._lazy_results_info[(word, key)] = (case, vm_word)
+            results = _get_stress_results(
+                word, vm_word, oxx, oyy, ozz, txy, tyz, txz,
+                max_principal, mid_principal, min_principal, ovm)
+            self._result_cache.set((word, key, itime), results)
+            return self._fill_op2_lazy_stress(cases, model, key, icase, itime,
+                                              form_dict, header_dict, word, fmt, is_stress)
+
         if oxx.min() != oxx.max():
             oxx_res = GuiResult(subcase_id, header=word + 'XX', title=word + 'XX',
                                 location='centroid', scalar=oxx, data_format=fmt)
@@ -1585,6 +1718,69 @@ class NastranGuiResults(NastranGuiAttributes):
         #, case, header, form0
         return icase
 
+    def _fill_op2_lazy_stress(self, cases, model, key, icase, itime,
+                              form_dict, header_dict, word, fmt, is_stress):
+        """creates the stress/strain LazyGuiResults for a time step"""
+        try:
+            case, vm_word = self._lazy_results_info[(word, key)]
+        except KeyError:
+            # there are no real stresses/strains for this key
+            return icase
+        if itime >= len(case._times):
+            # the output is requested at fewer time steps
+            return icase
+
+        dt = case._times[itime]
+        header_dict[(key, itime)] = self._get_nastran_header(case, dt, itime)
+        names = [
+            (word + 'XX', word + 'XX', fmt),
+            (word + 'YY', word + 'YY', fmt),
+            (word + 'ZZ', word + 'ZZ', fmt),
+            (word + 'XY', word + 'XY', fmt),
+            (word + 'YZ', word + 'YZ', fmt),
+            (word + 'XZ', word + 'XZ', fmt),
+            ('MaxPrincipal', 'Max Principal', fmt),
+            ('MidPrincipal', 'Mid Principal', fmt),
+            ('MinPrincipal', 'Min Principal', fmt),
+        ]
+        if vm_word is not None:
+            names.append((vm_word, vm_word, fmt))
+        get_results = partial(self._get_lazy_stress_results, model, word, is_stress)
+        return self._add_lazy_results(cases, form_dict, key, itime, icase,
+                                      word, names, get_results)
+
+    def _get_lazy_stress_results(self, model, word, is_stress, key, itime):
+        """the LazyGuiResult callback for the stress/strain"""
+        out = self._create_op2_time_centroidal_stress_arrays(
+            model, key, itime, {}, {}, is_stress=is_stress)
+        vm_word = out[2]
+        return _get_stress_results(word, vm_word, *out[4:])
+
+    def _add_lazy_results(self, cases, form_dict, key, itime, icase,
+                          group, names, get_results):
+        """
+        Adds the LazyGuiResults for a (key, itime)
+
+        Parameters
+        ----------
+        group : str
+            the type of result (e.g., 'Stress')
+        names : List[(header, form_name, data_format)]
+            the header is the title and the key in the results dictionary
+        get_results : function
+            get_results(key, itime) returns the results dictionary
+        """
+        subcase_id = key[2]
+        for header, form_name, data_format in names:
+            res = LazyGuiResult(subcase_id, header=header, title=header,
+                                location='centroid', get_results=get_results,
+                                group=group, key=key, itime=itime, name=header,
+                                cache=self._result_cache, data_format=data_format)
+            cases[icase] = (res, (subcase_id, header))
+            form_dict[(key, itime)].append((form_name, icase, []))
+            icase += 1
+        return icase
+
 
     def _get_nastran_key_order(self, model):
         displacement_like = [
@@ -1705,3 +1901,37 @@ class NastranGuiResults(NastranGuiAttributes):
                         keys2.remove(keyi)
                 #keys_order += keys
         return keys_order
+
+
+def _get_stress_results(word, vm_word, oxx, oyy, ozz, txy, tyz, txz,
+                        max_principal, mid_principal, min_principal, ovm):
+    """makes the results dictionary for the stress/strain LazyGuiResults"""
+    results = {
+        word + 'XX' : oxx,
+        word + 'YY' : oyy,
+        word + 'ZZ' : ozz,
+        word + 'XY' : txy,
+        word + 'YZ' : tyz,
+        word + 'XZ' : txz,
+        'MaxPrincipal' : max_principal,
+        'MidPrincipal' : mid_principal,
+        'MinPrincipal' : min_principal,
+    }
+    if vm_word is not None:
+        results[vm_word] = ovm
+    return results
+
+def _get_force_results(fx, fy, fz, rx, ry, rz):
+    """makes the results dictionary for the force LazyGuiResults"""
+    results = {
+        'Axial' : fx,
+        'ShearY' : fy,
+        'ShearZ' : fz,
+        'Torsion' : rx,
+        'BendingY' : ry,
+        'BendingZ' : rz,
+    }
+    is_names = ['IsAxial', 'IsShearY', 'IsShearZ', 'IsTorsion', 'IsBendingY', 'IsBendingZ']
+    for name, force in zip(is_names, [fx, fy, fz, rx, ry, rz]):
+        results[name] = (np.abs(force) > 0.0).astype('int8')
+    return results
@@ -2,6 +2,7 @@ import os
 import unittest
 from six.moves import range
 from numpy import allclose
+import numpy as np
 
 import pyNastran
 from pyNastran.bdf.bdf import read_bdf
@@ -11,6 +12,9 @@ from pyNastran.converters.nastran.nastran_to_cart3d import nastran_to_cart3d
 from pyNastran.converters.nastran.nastran_to_stl import nastran_to_stl
 from pyNastran.converters.nastran.nastran_to_ugrid import nastran_to_ugrid
 from pyNastran.converters.aflr.ugrid.ugrid_reader import read_ugrid
+from pyNastran.converters.nastran.geometry_helper import (
+    tri_quality, quad_quality, get_min_max_theta,
+    tri_quality_array, quad_quality_array, get_min_max_theta_array)
 from pyNastran.utils.log import get_logger
 
 PKG_PATH = pyNastran.__path__[0]
@@ -56,6 +60,50 @@ class TestNastran(unittest.TestCase):
         log = get_logger(log=None, level='warning', encoding='utf-8')
         nastran_to_stl(bdf_filename, stl_filename, is_binary=False, log=log)
 
+    def test_quality_array(self):
+        """tests the vectorized quality checks match the element-based ones"""
+        xyz_cid0 = np.array([
+            [0., 0., 0.],
+            [1., 0., 0.],
+            [1., 1., 0.],
+            [0., 1., 0.],
+            [0., 0., 1.],
+            [1.5, 0., 1.],
+            [1., 1., 1.2],
+            [0., 1., 1.],
+            [0.5, 0., 0.],  # collinear with nodes 0 and 1
+        ])
+        nid_map = {nid: nid for nid in range(len(xyz_cid0))}
+        tris = np.array([[0, 1, 2], [4, 5, 6], [0, 8, 1]])
+        quads = np.array([[0, 1, 2, 3], [4, 5, 6, 7], [0, 1, 6, 7]])
+        hexas = np.array([[0, 1, 2, 3, 4, 5, 6, 7]])
+        chexa_faces = (
+            (4, 5, 6, 7),
+            (0, 3, 2, 1),
+            (1, 2, 6, 5),
+            (2, 3, 7, 6),
+            (0, 4, 7, 3),
+            (0, 6, 5, 4),
+        )
+
+        # the element-based checks divide by zero on the degenerate tri,
+        # which raises if another test module called np.seterr(all='raise')
+        with np.errstate(all='ignore'):
+            expected_tris = [tri_quality(*xyz_cid0[tri, :]) for tri in tris]
+            expected_quads = [quad_quality(*xyz_cid0[quad, :]) for quad in quads]
+            expected_hexas = [get_min_max_theta(chexa_faces, hexa, nid_map, xyz_cid0)
+                              for hexa in hexas]
+
+        out = tri_quality_array(*[xyz_cid0[tris[:, i], :] for i in range(3)])
+        assert allclose(np.column_stack(out), expected_tris, equal_nan=True)
+
+        out = quad_quality_array(*[xyz_cid0[quads[:, i], :] for i in range(4)])
+        assert allclose(np.column_stack(out), expected_quads, equal_nan=True)
+
+        out = get_min_max_theta_array(chexa_faces, hexas, xyz_cid0)
+        assert allclose(np.column_stack(out), expected_hexas, equal_nan=True)
+
+
 if __name__ == '__main__':  # pragma: no cover
     import time
     time0 = time.time()
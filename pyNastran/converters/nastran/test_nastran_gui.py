@@ -1,6 +1,13 @@
 import os
+import shutil
+import tempfile
 import unittest
+
+import numpy as np
 from pyNastran.gui.testing_methods import FakeGUIMethods
+from pyNastran.gui.qt_files.load_worker import LoadWorker
+from pyNastran.gui.gui_objects.animation_cache import AnimationCache
+from pyNastran.converters.nastran.displacements import DisplacementResults
 from pyNastran.converters.nastran.nastranIOv import NastranIO
 import pyNastran
 #from pyNastran.utils.log import get_logger2
@@ -24,6 +31,64 @@ class TestNastranGUI(unittest.TestCase):
         test.load_nastran_geometry(bdf_filename)
         test.load_nastran_results(op2_filename)
 
+    def test_solid_shell_bar_01_worker(self):
+        """the model is read by the LoadWorker and built on the main thread"""
+        bdf_filename = os.path.join(MODEL_PATH, 'sol_101_elements', 'static_solid_shell_bar.bdf')
+        op2_filename = os.path.join(MODEL_PATH, 'sol_101_elements', 'static_solid_shell_bar.op2')
+
+        test = NastranGUI()
+        models = []
+        worker = LoadWorker(test.read_nastran_geometry, [bdf_filename])
+        worker.load_finished.connect(models.extend)
+        worker.run()
+        test.load_nastran_geometry(bdf_filename, model=models[0])
+
+        models = []
+        worker = LoadWorker(test.read_nastran_results, [op2_filename])
+        worker.load_finished.connect(models.extend)
+        worker.run()
+        test.load_nastran_results(models[0])
+
+        cancelled = []
+        worker = LoadWorker(test.read_nastran_geometry, [bdf_filename])
+        worker.load_cancelled.connect(lambda: cancelled.append(True))
+        worker.cancel()
+        worker.run()
+        assert cancelled == [True], cancelled
+
+    def test_animation_cache(self):
+        """the cached frames match the frames computed one at a time"""
+        xyz = np.random.random((5, 3))
+        dxyz = np.random.random((2, 5, 3)) + 1j * np.random.random((2, 5, 3))
+        obj = DisplacementResults(1, ['T1', 'T2'], ['T1', 'T2'], xyz, dxyz.astype('complex64'),
+                                  None, [1., 1.])
+        result_cases = {0 : (obj, (0, 'T1')), 1 : (obj, (1, 'T2'))}
+        icases = [0, 0, 0, 1, 1]
+        scales = [1., 2., 3., 2., 2.]
+        phases = [0., 45., 90., 0., 180.]
+
+        cache = AnimationCache()
+        cache2 = AnimationCache(max_memory=2 * 5 * 3 * 4 / 1e6)  # 2 frames
+        memmap_dirname = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, memmap_dirname)
+        cache3 = AnimationCache(memmap_dirname=memmap_dirname)
+        for cachei in [cache, cache2, cache3]:
+            cachei.build(result_cases, icases, scales, phases)
+            assert cachei.is_valid(result_cases, icases, scales, phases)
+            assert not cachei.is_valid(result_cases, icases, scales[::-1], phases)
+            for iframe in [0, 1, 2, 3, 4, 0, 3]:
+                icase = icases[iframe]
+                unused_obj, (i, name) = result_cases[icase]
+                xyz0, deflected_xyz = obj.get_vector_result_by_scale_phase(
+                    i, name, scales[iframe], phases[iframe])
+                assert np.allclose(cachei.get_frame(iframe), deflected_xyz, atol=1e-5)
+        assert cache.nslots == 5, cache
+        assert cache2.nslots == 2, cache2
+        memmap_filename = cache3.memmap_filename
+        assert os.path.exists(memmap_filename)
+        cache3.clear()
+        assert not os.path.exists(memmap_filename)
+
     def test_solid_shell_bar_02(self):
         bdf_filename = os.path.join(MODEL_PATH, 'sol_101_elements', 'mode_solid_shell_bar.bdf')
         op2_filename = os.path.join(MODEL_PATH, 'sol_101_elements', 'mode_solid_shell_bar.op2')
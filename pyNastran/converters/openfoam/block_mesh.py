@@ -1,17 +1,19 @@
 from __future__ import print_function
 import os
-from copy import deepcopy
 from codecs import open
-from collections import defaultdict, OrderedDict
+from collections import defaultdict
 from itertools import count
 from six import iteritems
 from six.moves import range, zip
 
 import numpy as np
-from numpy import array, cross, unique, allclose, zeros, arange, ravel, ones, argsort
+from numpy import array, cross, unique, allclose, arange, ones
 from numpy.linalg import norm  # type: ignore
+from scipy.spatial import cKDTree
 
 from pyNastran.converters.openfoam.openfoam_parser import FoamFile, convert_to_dict #, write_dict
+from pyNastran.converters.openfoam.poly_mesh import (
+    read_points, read_faces, read_boundary, get_padded_faces)
 from pyNastran.bdf.field_writer_8 import print_card_8
 from pyNastran.utils.log import get_logger2
 from pyNastran.utils import print_bad_path
@@ -43,95 +45,34 @@ class FaceFile(object):
         self.log = get_logger2(log, debug=debug)
 
     def read_face_file(self, face_filename, ifaces_to_read=None):
-        #p = FoamFile(face_filename)
-        #lines = p.read_foam_file()
-        #print('converting')
-        f = open(face_filename, 'r')
-
-        i = 0
-        nfaces = 0
-        while nfaces == 0:
-            line = f.readline()
-            i += 1
-            try:
-                nfaces = int(line)
-            except:
-                pass
-        line = f.readline()
-        i += 1
-
-        #print('nfaces = %s' % nfaces)
-        #print('lineA = %r' % line)
-
-        #print('building faces')
-        assert nfaces > 0, nfaces
-
-        if ifaces_to_read is None:
-            faces = ones((nfaces, 4), dtype='int32') * -1
-
-            for j in range(nfaces):
-                # 3(a b c) to [a, b, c]
-                # 4(a b c d) to [a, b, c, d]
-                face_line = f.readline()
-                i += 1
-                sline = face_line[1:].strip('( )\n\r').split()
-                try:
-                    if len(sline) == 3:
-                        faces[j, :3] = sline[:3]
-                    elif len(sline) == 4:
-                        faces[j, :] = sline[:4]  # TODO: quads only
-                    else:
-                        msg = 'The sline is the wrong length (3/4 required)\n'
-                        msg += 'sline = %s\n' % str(sline)
-                        msg += 'line = %r\n' % face_line.rstrip()
-                        raise RuntimeError(msg)
-                except:
-                    print('face = %r' % face_line)
-                    print(sline, i, len(sline))
-                    raise
-        else:
-            # we need to sort our faces as we read the faces sequentially
-            # however the output needs to be in unsorted order so we save the sorting
-            # order and back apply it at the end
-            isort = argsort(ifaces_to_read)
-            ifaces_to_read_sorted = ifaces_to_read[isort]
-
-            nfaces2 = len(ifaces_to_read)  # must be sorted
-            assert len(isort) == nfaces2
-            faces = ones((nfaces2, 4), dtype='int32') * -1
-            ni = 0
-            for j in range(nfaces):
-                face_line = f.readline()
-                i += 1
-                try:
-                    ni_face = ifaces_to_read_sorted[ni]
-                except:
-                    raise
-                #if j % 5000 == 0 or j == ni_face:
-                    #print('j=%s ni=%s' % (j, ni))
-                if j == ni_face:
-                    # 3(a b c) to [a, b, c]
-                    # 4(a b c d) to [a, b, c, d]
-                    sline = face_line[1:].strip('( )\n\r').split()
-                    try:
-                        if len(sline) == 3:
-                            faces[ni, :3] = sline[:3]
-                        elif len(sline) == 4:
-                            faces[ni, :] = sline[:4]
-                        else:
-                            msg = 'The sline is the wrong length (3/4 required)\n'
-                            msg += 'sline = %s\n' % str(sline)
-                            msg += 'line = %r\n' % face_line
-                            raise RuntimeError(msg)
-                    except:
-                        print('face = %r' % face_line.rstrip())
-                        print(sline, i, j, ni)
-                        raise
-                    ni += 1
-            #assert faces[:, 0].min() > 0, 'where-1 = %s' % where(faces[:, 0] == -1)[0]
-            print(faces)
-            faces[isort, :] = deepcopy(faces[:, :])
-        print('faces.shape = %s' % str(faces.shape))
+        """
+        Reads a faces file
+
+        Parameters
+        ----------
+        face_filename : str
+            the faces file
+        ifaces_to_read : (n, ) int ndarray; default=None -> all
+            the faces to read
+
+        Returns
+        -------
+        faces : (nfaces, nnodes_max) int ndarray
+            the faces; unused nodes are -1 (at least 4 columns)
+        """
+        iface0 = 0
+        iface1 = None
+        if ifaces_to_read is not None:
+            ifaces_to_read = np.asarray(ifaces_to_read)
+            iface0 = ifaces_to_read.min()
+            iface1 = ifaces_to_read.max() + 1
+        face_offsets, face_nodes = read_faces(face_filename, iface0=iface0, iface1=iface1)
+        faces = get_padded_faces(face_offsets, face_nodes.astype('int32'))
+        if faces.shape[1] < 4:
+            faces = np.hstack([faces, -ones((faces.shape[0], 4 - faces.shape[1]), dtype='int32')])
+        if ifaces_to_read is not None:
+            faces = faces[ifaces_to_read - iface0, :]
+        self.log.debug('faces.shape = %s' % str(faces.shape))
         return faces
 
 
@@ -140,65 +81,26 @@ class PointFile(object):
         self.log = get_logger2(log, debug=debug)
 
     def read_point_file(self, point_filename, ipoints_to_read=None):
-        #p = FoamFile(face_filename)
-        #lines = p.read_foam_file()
-        #print('converting')
-        f = open(point_filename, 'r')
-
-        i = 0
-        npoints = 0
-        while npoints == 0:
-            line = f.readline()
-            i += 1
-            try:
-                npoints = int(line)
-            except:
-                pass
-        line = f.readline()
-        i += 1
-
-        print('npoints = %s' % npoints)
-        #print('lineA = %r' % line)
-
-        print('building points')
-        assert npoints > 0, npoints
+        """
+        Reads a points file
+
+        Parameters
+        ----------
+        point_filename : str
+            the points file
+        ipoints_to_read : (n, ) int ndarray; default=None -> all
+            the points to read
+
+        Returns
+        -------
+        points : (npoints, 3) float32 ndarray
+            the points
+        """
+        points = read_points(point_filename).astype('float32')
         if ipoints_to_read is not None:
             ipoints_to_read.sort()
-            npoints2 = len(ipoints_to_read)
-            points = zeros((npoints2, 3), dtype='float32')
-
-            print('npoints2 = %s' % npoints2)
-            ni = 0
-            for j in range(npoints):
-                try:
-                    ni_point = ipoints_to_read[ni]
-                except:
-                    print('j=%s ni=%s' % (j, ni))
-                    raise
-                if j == ni_point:
-                    point = f.readline()
-                    i += 1
-                    sline = point.strip('( )\n\r').split()
-                    try:
-                        points[ni, :] = sline
-                    except:
-                        print('point = %r' % point)
-                        print(sline, i, j, ni)
-                        raise
-                    ni += 1
-        else:
-            points = zeros((npoints, 3), dtype='float32')
-            for j in range(npoints):
-                point = f.readline()
-                i += 1
-                sline = point.strip('( )\n\r').split()
-                try:
-                    points[j, :] = sline
-                except:
-                    print('point = %r' % point)
-                    print(sline, i)
-                    raise
-        print('points.shape = %s' % str(points.shape))
+            points = points[ipoints_to_read, :]
+        self.log.debug('points.shape = %s' % str(points.shape))
         return points
 
 
@@ -207,112 +109,17 @@ class BoundaryFile(object):
         self.log = get_logger2(log, debug=debug)
 
     def read_boundary_file(self, boundary_filename):
-        #p = FoamFile(face_filename)
-        #lines = p.read_foam_file()
-        #print('converting')
-        f = open(boundary_filename, 'r')
-
-        i = 0
-        nboundaries = 0
-        while nboundaries == 0:
-            line = f.readline()
-            i += 1
-            try:
-                nboundaries = int(line)
-            except:
-                pass
-        line = f.readline()
-        i += 1
-
-        print('nboundaries = %s' % nboundaries)
-        #print('lineA = %r' % line)
-
-        print('building boundaries')
-        boundaries = OrderedDict()
-        boundaries = self._read_boundaries(f, i, nboundaries, boundaries)
-        return boundaries
-
-    def _read_boundaries(self, f, i, nboundaries, boundaries, basename=''):
-        assert nboundaries > 0, nboundaries
-        read_next = 0
-        for j in range(nboundaries):
-            # 3(a b c) to [a, b, c]
-            # 4(a b c d) to [a, b, c, d]
-            nameline = f.readline()
-            i += 1
-            name = nameline.strip()
-            print('name = %r' % (basename + name))
-
-            openline = f.readline()
-            i += 1
-            typeline = f.readline()
-            i += 1
-            word, Type = typeline.strip('\n\r\t ;').split()
-
-            nfacesline = f.readline()
-            i += 1
-            sline = nfacesline.strip('\n\r\t ;').split()
-            word = sline[0]
-            if word == 'inGroups' and len(sline) == 1:
-                #nboundary_line = f.readline(); i+=1
-                #nboundaries2 = int(nboundary_line)
-                #openline = f.readline(); i+=1
-                for ii in range(7):
-                    groupline = f.readline()
-                    i += 1
-                    #print(ii, groupline)
-                sline = groupline.strip('\n\r\t ;').split()
-
-                word, nfaces = sline
-                nfaces = int(nfaces)
-                print('nfaces = %r' % nfaces)
-
-                startfacesline = f.readline()
-                i += 1
-                print('startfacesline = %r' % startfacesline)
-                word, startfaces = startfacesline.strip('\n\r\t ;').split()
-                startfaces = int(startfaces)
-                closeline = f.readline()
-                i += 1
-
-                boundary_name = basename + name
-                if boundary_name in boundaries:
-                    msg = ('boundary_name=%r is already defined...'
-                           'boundaries must have unique names' % boundary_name)
-                    raise KeyError(msg)
-                boundaries[boundary_name] = [Type, nfaces, startfaces]
-
-                #self._read_boundaries(f, i, nboundaries2, boundaries, basename + name)
-            else:
-                if word == 'inGroups' and len(sline) == 2:
-                    ingroups = nfaces
-                    nfacesline = f.readline()
-                    i += 1
-                    word, nfaces = nfacesline.strip('\n\r\t ;').split()
-                else:
-                    word, nfaces = sline
-
-                nfaces = int(nfaces)
-                print('nfaces = %r' % (nfaces))
-
-                startfacesline = f.readline()
-                i += 1
-                print('startfacesline = %r' % startfacesline)
-                word, startfaces = startfacesline.strip('\n\r\t ;').split()
-                startfaces = int(startfaces)
-
-                closeline = f.readline()
-                i += 1
-
-                boundary_name = basename + name
-                if boundary_name in boundaries:
-                    raise KeyError('boundary_name=%r is already defined...'
-                                   'boundaries must have unique names' % boundary_name)
-                boundaries[boundary_name] = [Type, nfaces, startfaces]
-        f.close()
+        """
+        Reads a boundary file
 
+        Returns
+        -------
+        boundaries : OrderedDict[name] = [type, nfaces, startFace]
+            the boundary patches
+        """
+        boundaries = read_boundary(boundary_filename)
         for name, boundary in iteritems(boundaries):
-            print('name=%s boundary=%s' % (name, boundary))
+            self.log.debug('name=%s boundary=%s' % (name, boundary))
         return boundaries
 
 
@@ -323,166 +130,51 @@ class Boundary(object):
         self.log = get_logger2(log, debug=debug)
 
     def read_openfoam(self, point_filename, face_filename, boundary_filename):
+        """
+        Reads the boundary faces of a polyMesh
+
+        Returns
+        -------
+        nodes : (nnodes, 3) float32 ndarray
+            the points
+        quads : (nfaces, nnodes_max) int ndarray
+            the boundary faces; unused nodes are -1
+        names : (nfaces, ) int ndarray
+            the 1-based boundary index of each face
+        """
         assert os.path.exists(face_filename), print_bad_path(face_filename)
         assert os.path.exists(point_filename), print_bad_path(point_filename)
         assert os.path.exists(boundary_filename), print_bad_path(boundary_filename)
 
-        print('face_filename = %r' % face_filename)
-        print('point_filename = %r' % point_filename)
-        print('boundary_filename = %r' % boundary_filename)
-
         assert 'faces' in face_filename, face_filename
         assert 'points' in point_filename, point_filename
         assert 'boundary' in boundary_filename, boundary_filename
 
-        print('starting Boundary')
-        p = PointFile(log=None, debug=True)
-        #from PyFoam.RunDictionary.ParsedBlockMeshDict import ParsedBlockMeshDict
-        #print(dir(f))
-
-        f = FaceFile(log=None, debug=True)
-
-        b = BoundaryFile(log=None, debug=False)
+        b = BoundaryFile(log=self.log)
         boundaries = b.read_boundary_file(boundary_filename)
 
-        #if 0:
-            #foam = FoamFile(boundary_filename, log=p.log)
-
-            #print('getting lines')
-            #blines = foam.read_foam_file()
-            #print('converting')
-            #bd = convert_to_dict(foam, blines, debug=True)
-            #del blines
-
-
-        print('getting npoints')
-        #print write_dict(d)
-
         #-------------------------------------------
-        # count number of faces by looking at the boundary info
-        # so we can allocate faces2
-        nfaces2 = 0
+        # the faces are read in the order of the boundaries
         ifaces_to_read = []
-        #f_boundary_faces = open('boundary_faces.py', 'wb')
-        for name, boundary in iteritems(boundaries):
+        names = []
+        for iname, (name, boundary) in enumerate(iteritems(boundaries)):
             # type            patch;  # 0
             # nFaces          nFaces; # 1
             # startFace       777700; # 2
-            print('boundary[%s] = %s' % (name, boundary))
-            nfacesi = boundary[1]
-            startface = int(boundary[2])
-            nfaces2 += nfacesi
-            new_faces = list(arange(nfacesi, dtype='int32') + startface)
-            #f_boundary_faces.write('boundary_faces[%s, %s] = %s\n' % (
-                #name, len(new_faces), new_faces))
-            ifaces_to_read += new_faces
-
-        print('nfaces2 = %s' % nfaces2)
-        ifaces_to_read = ravel(ifaces_to_read)
-        if len(ifaces_to_read) != nfaces2:
-            raise RuntimeError('len(ifaces_to_read)=%s nfaces2=%s' % (
-                ifaces_to_read.shape, nfaces2))
-        print(ifaces_to_read)
-
-        faces = f.read_face_file(face_filename, ifaces_to_read=ifaces_to_read)
-        #faces = f.read_face_file(face_filename, ifaces_to_read=None)
-        del ifaces_to_read
-
-        if 0:
-            # doesn't work for some reason...
-            # we want to only plot a subset of faces to reduce the data set
-            # that works, but we also need to decrease the number of nodes
-            # (they take wayyy too long)
-
-            # so we take our faces, get the unique nodes
-            # sort them so they're consistent with the order in the file
-            # using the same block of codethat works in the face reader,
-            #but it still fails for some reason...
-
-            # after this step, we renumber the faces with the adjusted node ids
-            ipoints_to_read = unique(faces.ravel())
-            print('nnodes = %s' % len(ipoints_to_read))
-            ipoints_to_read.sort()
-            print('ipoints_to_read = %s' % ipoints_to_read)
-        else:
-            ipoints_to_read = None
-        nodes = p.read_point_file(point_filename, ipoints_to_read=ipoints_to_read)
+            self.log.info('iname=%s name=%s boundary=%s' % (iname + 1, name, boundary))
+            unused_type, nfacesi, startface = boundary
+            ifaces_to_read.append(arange(startface, startface + nfacesi, dtype='int32'))
+            names.append(ones(nfacesi, dtype='int32') * (iname + 1))
+        ifaces_to_read = np.hstack(ifaces_to_read)
+        names = np.hstack(names)
 
-        if ipoints_to_read is not None:
-            nid_to_ipoint = {}
-            for i, nid in enumerate(ipoints_to_read):
-                nid_to_ipoint[nid] = i
-
-            print(faces, faces.max())
-            for i, face in enumerate(faces):
-                #print('face      = %s' % face)
-                faces[i, 0] = nid_to_ipoint[faces[i, 0]]
-                faces[i, 1] = nid_to_ipoint[faces[i, 1]]
-                faces[i, 2] = nid_to_ipoint[faces[i, 2]]
-                #print('faces[%i] = %s' % (i, faces[i, :]))
-            print(faces, faces.max())
-            print('done...')
-            del ipoints_to_read
-            del nid_to_ipoint
-        #-------------------------------------------
-        # keep only the required faces
-        iface = 0
-        #faces2 = zeros((nfaces2, 4), dtype='int32')
-        names = zeros(nfaces2, dtype='int32')
-        iname = 1
-        snames = [None] * (len(boundaries) + 1)
-        self.log.info('')
-        for name, boundary in iteritems(boundaries):
-            self.log.info('iname=%s name=%s boundary=%s' % (iname, name, boundary))
-            # type            patch;
-            # nFaces          nFaces;
-            # startFace       777700;
-            try:
-                Type = boundary[0]
-                nfacesi = int(boundary[1])
-                startface = int(boundary[2])
-            except:
-                print(boundary.keys())
-                raise
-            #faces2[iface:iface+nfacesi] = faces[startface:startface + nfacesi]
-            names[iface:iface+nfacesi] = iname
-            snames[iname] = name
-            iface += nfacesi
-            iname += 1
-        #del faces
-        quads = faces
+        f = FaceFile(log=self.log)
+        quads = f.read_face_file(face_filename, ifaces_to_read=ifaces_to_read)
 
+        p = PointFile(log=self.log)
+        nodes = p.read_point_file(point_filename)
 
-        #if 0:
-            #f_boundary_faces.write('\n\n---Faces----\n')
-            #for iface, face in enumerate(faces):
-                #pid = names[iface]
-                #name = snames[pid]
-                #f_boundary_faces.write('%i (%i %i %i %i) pid=%s name=%s\n' % (
-                    #iface, face[0], face[1], face[2], face[3], pid, name))
-
-            #f_boundary_faces.write('\n\n---First Faces----\n')
-            #pid_save = set([])
-            #for iface, face in enumerate(faces):
-                #pid = names[iface]
-                #if pid not in pid_save:
-                    #name = snames[pid]
-                    #f_boundary_faces.write('%i (%i %i %i %i) pid=%s name=%s\n' % (
-                        #iface, face[0], face[1], face[2], face[3], pid, name))
-                    #pid_save.add(pid)
-
-        # only save the unique nodes
-        # ...
-        #unodes = unique(quads.ravel())
-        #unodes.sort()
-        #nodes = nodes[unodes, :]
-
-        # renumber the nodes on the faces
-        # ...
         self.log.debug('names=%s; max=%s min=%s' % (names, names.max(), names.min()))
-
-        print('done with Boundary')
-        #self.nodes = nodes
         return nodes, quads, names
 
 
@@ -716,15 +408,15 @@ class BlockMesh(object):
         nodes = self.nodes
         nnodes, three = self.nodes.shape
         print('nnodes = %s' % nnodes)
-        for inode, nodei in enumerate(self.nodes):
-            for jnode, nodej in enumerate(self.nodes):
-                if inode < jnode:
-                    delta = norm(nodei-nodej)
-                    if delta < Rtol:
-                        #print('delta=%6g %2s %2s' % (delta, inode, jnode))
-                        #same_location.append([inode, jnode])
-                        inode_map[jnode] = inode
-                        neq += 1
+
+        # find the pairs of nodes within Rtol of each other (i < j)
+        # in the same order as the previous double loop
+        tree = cKDTree(nodes)
+        pairs = tree.query_pairs(Rtol)
+        for inode, jnode in sorted(pairs):
+            #same_location.append([inode, jnode])
+            inode_map[jnode] = inode
+            neq += 1
         #same_location = array(same_location, dtype='int32')
         #print('same_location = \n%s' % same_location)
         #nleft = nnodes - neq
@@ -5,12 +5,12 @@ defines:
 from __future__ import print_function
 import os
 import numpy as np
-from numpy import zeros, arange, where, unique, cross
+from numpy import zeros, arange, unique, cross
 from numpy.linalg import norm  # type: ignore
 
 import vtk
 #VTK_TRIANGLE = 5
-from vtk import vtkTriangle, vtkQuad, vtkHexahedron
+from vtk import vtkTriangle, vtkQuad, vtkPolygon, vtkHexahedron
 
 from pyNastran.converters.openfoam.block_mesh import BlockMesh, Boundary
 from pyNastran.gui.gui_objects.gui_result import GuiResult
@@ -219,11 +219,8 @@ class OpenFoamIO(object):
                         nnames, nelements, names.max(), names.min())
                     raise RuntimeError(msg)
                 for eid, element in enumerate(elems):
-                    ineg = where(element == -1)[0]
-
-                    nnodes = 4
-                    if ineg:
-                        nnodes = ineg.max()
+                    # the faces are padded with -1
+                    nnodes = (element >= 0).sum()
 
                     #pid = 1
                     pid = names[eid]
@@ -254,6 +251,20 @@ class OpenFoamIO(object):
                         elem.GetPointIds().SetId(2, element[2])
                         elem.GetPointIds().SetId(3, element[3])
                         self.grid.InsertNextCell(elem.GetCellType(), elem.GetPointIds())
+                    elif nnodes > 4:
+                        # polyMesh faces may be arbitrary polygons; there's no
+                        # Nastran equivalent, so they're only in the GUI
+                        element = element[:nnodes]
+                        xyz = nodes[element, :]
+                        n = cross(xyz, np.roll(xyz, -1, axis=0)).sum(axis=0)
+                        normals[eid, :] = n / norm(n)
+
+                        elem = vtkPolygon()
+                        point_ids = elem.GetPointIds()
+                        point_ids.SetNumberOfIds(nnodes)
+                        for i, nid in enumerate(element):
+                            point_ids.SetId(i, nid)
+                        self.grid.InsertNextCell(elem.GetCellType(), point_ids)
                     else:
                         raise RuntimeError('nnodes=%s' % nnodes)
             else:
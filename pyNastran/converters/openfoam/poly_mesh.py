@@ -0,0 +1,442 @@
+"""
+Defines:
+  - PolyMesh(log=None, debug=False)
+     - read_poly_mesh(poly_mesh_dirname, boundary_only=False)
+     - get_faces()
+  - read_poly_mesh(poly_mesh_dirname, boundary_only=False, log=None, debug=False)
+  - read_points(points_filename)
+  - read_faces(faces_filename, iface0=0, iface1=None)
+  - read_labels(labels_filename)
+  - read_boundary(boundary_filename)
+
+The polyMesh files (points, faces, owner, neighbour) are parsed in bulk
+with numpy for the ascii and binary formats.  The faces are stored as
+compressed lists (offsets + indices), so arbitrary polygons are
+supported.
+"""
+from __future__ import print_function
+import os
+import re
+import mmap
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+from pyNastran.utils.log import get_logger2
+
+
+#: the FoamFile {...} header dictionary
+FOAM_HEADER = re.compile(br'FoamFile\s*\{(.*?)\}', re.S)
+
+#: key value; lines in a dictionary
+FOAM_ENTRY = re.compile(br'(\w+)\s+([^;]*);')
+
+#: the start of a list (e.g., 42\n(), skipping any comments
+FOAM_LIST_START = re.compile(br'(?:\s+|//[^\n]*|/\*.*?\*/)*(\d+)\s*\(', re.S)
+
+#: name { ... } in a boundary file
+FOAM_PATCH = re.compile(br'([^\s{}();]+)\s*\{([^{}]*)\}')
+
+
+def read_poly_mesh(poly_mesh_dirname, boundary_only=False, log=None, debug=False):
+    """
+    Creates the PolyMesh object
+
+    Parameters
+    ----------
+    poly_mesh_dirname : str
+        the constant/polyMesh directory
+    boundary_only : bool; default=False
+        only read the boundary faces and the nodes they use
+    log : logger; default=None
+        a logger
+    debug : bool; default=False
+        used to set the logger if no logger is passed in
+
+    Returns
+    -------
+    model : PolyMesh()
+        the PolyMesh object
+    """
+    model = PolyMesh(log=log, debug=debug)
+    model.read_poly_mesh(poly_mesh_dirname, boundary_only=boundary_only)
+    return model
+
+
+class PolyMesh(object):
+    """
+    Interface to the OpenFOAM polyMesh format
+
+    Attributes
+    ----------
+    nodes : (nnodes, 3) float ndarray
+        the points
+    face_offsets : (nfaces + 1, ) int ndarray
+        face i uses face_nodes[face_offsets[i]:face_offsets[i+1]]
+    face_nodes : (nindices, ) int ndarray
+        the 0-based node indices of the faces
+    owner : (nfaces, ) int ndarray
+        the 0-based cell that owns each face
+    neighbour : (ninternal_faces, ) int ndarray
+        the 0-based neighbor cell of each internal face;
+        None for boundary_only
+    boundaries : OrderedDict[name] = [type, nfaces, startFace]
+        the boundary patches
+    patch_ids : (nfaces, ) int ndarray
+        the 1-based patch index of each face (0 for internal faces)
+    node_ids : (nnodes, ) int ndarray
+        the 0-based index of each node in the points file
+    """
+    def __init__(self, log=None, debug=False):
+        self.log = get_logger2(log, debug=debug)
+        self.nodes = None
+        self.face_offsets = None
+        self.face_nodes = None
+        self.owner = None
+        self.neighbour = None
+        self.boundaries = None
+        self.patch_ids = None
+        self.node_ids = None
+
+    @property
+    def nfaces(self):
+        """the number of faces"""
+        return len(self.face_offsets) - 1
+
+    def read_poly_mesh(self, poly_mesh_dirname, boundary_only=False):
+        """
+        Reads the polyMesh directory
+
+        Parameters
+        ----------
+        poly_mesh_dirname : str
+            the constant/polyMesh directory
+        boundary_only : bool; default=False
+            only read the boundary faces and the nodes they use
+        """
+        self.boundaries = read_boundary(os.path.join(poly_mesh_dirname, 'boundary'))
+        nfaces_boundary = sum(nfaces for unused_type, nfaces, unused_start
+                              in self.boundaries.values())
+        iface0 = 0
+        iface1 = None
+        if boundary_only and nfaces_boundary:
+            iface0 = min(start for unused_type, nfaces, start
+                         in self.boundaries.values() if nfaces)
+            iface1 = max(start + nfaces for unused_type, nfaces, start
+                         in self.boundaries.values())
+
+        self.face_offsets, self.face_nodes = read_faces(
+            os.path.join(poly_mesh_dirname, 'faces'), iface0=iface0, iface1=iface1)
+        nfaces = self.nfaces
+        self.log.info('nfaces=%s nboundary_faces=%s' % (nfaces, nfaces_boundary))
+
+        owner = read_labels(os.path.join(poly_mesh_dirname, 'owner'))
+        self.owner = owner[iface0:iface0 + nfaces]
+        if not boundary_only:
+            self.neighbour = read_labels(os.path.join(poly_mesh_dirname, 'neighbour'))
+
+        self.patch_ids = np.zeros(nfaces, dtype='int32')
+        for ipatch, (unused_type, nfacesi, startface) in enumerate(self.boundaries.values()):
+            i0 = startface - iface0
+            self.patch_ids[i0:i0 + nfacesi] = ipatch + 1
+
+        nodes = read_points(os.path.join(poly_mesh_dirname, 'points'))
+        if boundary_only:
+            # only keep the nodes used by the boundary faces and renumber the faces
+            self.node_ids, self.face_nodes = np.unique(self.face_nodes, return_inverse=True)
+            nodes = nodes[self.node_ids, :]
+        else:
+            self.node_ids = np.arange(nodes.shape[0])
+        self.nodes = nodes
+        self.log.info('nnodes=%s' % nodes.shape[0])
+
+    def get_faces(self):
+        """
+        Gets the faces as a padded array
+
+        Returns
+        -------
+        faces : (nfaces, nnodes_max) int ndarray
+            the node indices; the unused nodes are -1
+        """
+        return get_padded_faces(self.face_offsets, self.face_nodes)
+
+    def __repr__(self):
+        return 'PolyMesh(nnodes=%s, nfaces=%s, npatches=%s)' % (
+            0 if self.nodes is None else self.nodes.shape[0],
+            0 if self.face_offsets is None else self.nfaces,
+            0 if self.boundaries is None else len(self.boundaries))
+
+
+def get_padded_faces(face_offsets, face_nodes):
+    """
+    Converts compressed faces to a padded array
+
+    Parameters
+    ----------
+    face_offsets : (nfaces + 1, ) int ndarray
+        face i uses face_nodes[face_offsets[i]:face_offsets[i+1]]
+    face_nodes : (nindices, ) int ndarray
+        the node indices of the faces
+
+    Returns
+    -------
+    faces : (nfaces, nnodes_max) int ndarray
+        the node indices; the unused nodes are -1
+    """
+    nnodes = np.diff(face_offsets)
+    nfaces = len(nnodes)
+    nnodes_max = nnodes.max() if nfaces else 0
+    faces = np.full((nfaces, nnodes_max), -1, dtype=face_nodes.dtype)
+    iface = np.repeat(np.arange(nfaces), nnodes)
+    inode = np.arange(len(face_nodes)) - np.repeat(face_offsets[:-1] - face_offsets[0], nnodes)
+    faces[iface, inode] = face_nodes
+    return faces
+
+
+def read_points(points_filename):
+    """
+    Reads a points file
+
+    Returns
+    -------
+    points : (npoints, 3) float ndarray
+        the points
+    """
+    with _open_foam_file(points_filename) as data:
+        header, pos = _read_header(data)
+        if header['is_binary']:
+            values, pos = _read_binary_list(data, pos, header['scalar'], ncomponents=3)
+        else:
+            match = _match_list_start(data, pos, points_filename)
+            npoints = int(match.group(1))
+            body = _remove_parentheses(data[match.end():data.rfind(b')')])
+            values = _fromstring(body, 'float64', npoints * 3, points_filename)
+    return values.reshape(-1, 3)
+
+
+def read_labels(labels_filename):
+    """
+    Reads a labelList (e.g., owner, neighbour)
+
+    Returns
+    -------
+    labels : (nlabels, ) int ndarray
+        the labels
+    """
+    with _open_foam_file(labels_filename) as data:
+        header, pos = _read_header(data)
+        if header['is_binary']:
+            labels, pos = _read_binary_list(data, pos, header['label'])
+        else:
+            labels, pos = _read_ascii_list(data, pos, labels_filename)
+    return labels
+
+
+def read_faces(faces_filename, iface0=0, iface1=None):
+    """
+    Reads a faceList (ascii) or faceCompactList (binary/ascii)
+
+    Parameters
+    ----------
+    faces_filename : str
+        the faces file
+    iface0 : int; default=0
+        the first face to keep
+    iface1 : int; default=None -> all
+        the last face to keep (exclusive)
+
+    Returns
+    -------
+    face_offsets : (nfaces + 1, ) int ndarray
+        face i uses face_nodes[face_offsets[i]:face_offsets[i+1]]
+    face_nodes : (nindices, ) int ndarray
+        the node indices of the faces
+    """
+    with _open_foam_file(faces_filename) as data:
+        header, pos = _read_header(data)
+        is_compact = header['class'] == 'faceCompactList'
+        if header['is_binary']:
+            assert is_compact, 'class=%r; expected faceCompactList' % header['class']
+            offsets, pos = _read_binary_list(data, pos, header['label'])
+            offsets = offsets[iface0:None if iface1 is None else iface1 + 1]
+
+            # only read the indices of the faces we need
+            match = _match_list_start(data, pos, faces_filename)
+            nindices = int(match.group(1))
+            dtype = header['label']
+            start = match.end()
+            assert offsets[-1] <= nindices, 'offsets[-1]=%s nindices=%s' % (offsets[-1], nindices)
+            face_nodes = np.frombuffer(
+                data, dtype=dtype, count=offsets[-1] - offsets[0],
+                offset=start + offsets[0] * dtype.itemsize).astype(dtype.newbyteorder('='))
+        elif is_compact:
+            offsets, pos = _read_ascii_list(data, pos, faces_filename)
+            face_nodes, pos = _read_ascii_list(data, pos, faces_filename)
+            offsets = offsets[iface0:None if iface1 is None else iface1 + 1]
+            face_nodes = face_nodes[offsets[0]:offsets[-1]]
+        else:
+            offsets, face_nodes = _read_ascii_face_list(data, pos, faces_filename)
+            if iface0 != 0 or iface1 is not None:
+                offsets = offsets[iface0:None if iface1 is None else iface1 + 1]
+                face_nodes = face_nodes[offsets[0]:offsets[-1]]
+    return offsets - offsets[0], face_nodes
+
+
+def read_boundary(boundary_filename):
+    """
+    Reads a boundary file
+
+    Returns
+    -------
+    boundaries : OrderedDict[name] = [type, nfaces, startFace]
+        the boundary patches in the order they're defined
+    """
+    with open(boundary_filename, 'rb') as boundary_file:
+        data = boundary_file.read()
+    header, pos = _read_header(data)
+    match = _match_list_start(data, pos, boundary_filename)
+    npatches = int(match.group(1))
+
+    boundaries = OrderedDict()
+    for name, entries in FOAM_PATCH.findall(data, match.end()):
+        name = name.decode('latin1')
+        entries = dict((key.decode('latin1'), value.strip().decode('latin1'))
+                       for key, value in FOAM_ENTRY.findall(entries))
+        if name in boundaries:
+            raise KeyError('boundary_name=%r is already defined...'
+                           'boundaries must have unique names' % name)
+        boundaries[name] = [entries['type'], int(entries['nFaces']),
+                            int(entries['startFace'])]
+    if len(boundaries) != npatches:
+        raise RuntimeError('expected %s patches; found %s in %r' % (
+            npatches, len(boundaries), boundary_filename))
+    return boundaries
+
+
+@contextmanager
+def _open_foam_file(foam_filename):
+    """memory maps a file, so binary files are only read where they're used"""
+    with open(foam_filename, 'rb') as foam_file:
+        data = mmap.mmap(foam_file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield data
+        finally:
+            data.close()
+
+
+def _read_header(data):
+    """
+    Reads the FoamFile header
+
+    Returns
+    -------
+    header : dict
+        class : str
+            the class (e.g., faceList)
+        is_binary : bool
+            is the data binary
+        label : np.dtype
+            the dtype of a binary int
+        scalar : np.dtype
+            the dtype of a binary float
+    pos : int
+        the end of the header
+    """
+    match = FOAM_HEADER.search(data)
+    if match is None:
+        raise SyntaxError('FoamFile header was not found')
+    entries = dict((key.decode('latin1'), value.strip().strip(b'"').decode('latin1'))
+                   for key, value in FOAM_ENTRY.findall(match.group(1)))
+
+    # arch "LSB;label=32;scalar=64";
+    arch = entries.get('arch', 'LSB;label=32;scalar=64')
+    endian = '>' if 'MSB' in arch else '<'
+    label = re.search(r'label=(\d+)', arch)
+    scalar = re.search(r'scalar=(\d+)', arch)
+    label_size = int(label.group(1)) // 8 if label else 4
+    scalar_size = int(scalar.group(1)) // 8 if scalar else 8
+
+    header = {
+        'class' : entries.get('class', ''),
+        'is_binary' : entries.get('format', 'ascii') == 'binary',
+        'label' : np.dtype('%si%i' % (endian, label_size)),
+        'scalar' : np.dtype('%sf%i' % (endian, scalar_size)),
+    }
+    return header, match.end()
+
+
+def _match_list_start(data, pos, foam_filename):
+    """finds the 'n (' that starts a list"""
+    match = FOAM_LIST_START.match(data, pos)
+    if match is None:
+        raise SyntaxError('cannot find the start of the list in %r' % foam_filename)
+    return match
+
+
+def _read_binary_list(data, pos, dtype, ncomponents=1):
+    """reads 'n (binary data)' and returns the values in native byte order"""
+    match = _match_list_start(data, pos, '')
+    nvalues = int(match.group(1)) * ncomponents
+    start = match.end()
+    end = start + nvalues * dtype.itemsize
+    if data[end:end + 1] != b')':
+        raise SyntaxError('expected the list to end at byte %i' % end)
+    values = np.frombuffer(data, dtype=dtype, count=nvalues, offset=start)
+    return values.astype(dtype.newbyteorder('=')), end + 1
+
+
+def _read_ascii_list(data, pos, foam_filename):
+    """reads 'n (a b c ...)' (not nested)"""
+    match = _match_list_start(data, pos, foam_filename)
+    nvalues = int(match.group(1))
+    start = match.end()
+    end = data.find(b')', start)
+    values = _fromstring(data[start:end], 'int64', nvalues, foam_filename)
+    return values, end + 1
+
+
+def _read_ascii_face_list(data, pos, faces_filename):
+    """
+    Reads an ascii faceList in bulk
+
+    The closing parenthesis of each face is replaced by a -1, so the
+    sizes of the faces (e.g., the 4 in 4(a b c d)) may be found with
+    vectorized operations.
+    """
+    match = _match_list_start(data, pos, faces_filename)
+    nfaces = int(match.group(1))
+    body = data[match.end():data.rfind(b')')]
+    values = np.fromstring(body.replace(b')', b' -1 ').replace(b'(', b' '),
+                           dtype='int64', sep=' ')
+
+    iend = np.flatnonzero(values == -1)
+    if len(iend) != nfaces:
+        raise SyntaxError('expected %i faces; found %i in %r' % (
+            nfaces, len(iend), faces_filename))
+    isize = np.hstack([0, iend[:-1] + 1])
+    nnodes = values[isize]
+    if not np.array_equal(iend - isize - 1, nnodes):
+        raise SyntaxError('the face sizes are inconsistent in %r' % faces_filename)
+
+    is_node = np.ones(len(values), dtype='bool')
+    is_node[isize] = False
+    is_node[iend] = False
+    face_nodes = values[is_node]
+    face_offsets = np.hstack([0, np.cumsum(nnodes)])
+    return face_offsets, face_nodes
+
+
+def _remove_parentheses(body):
+    """(x y z) -> x y z"""
+    return body.replace(b'(', b' ').replace(b')', b' ')
+
+
+def _fromstring(body, dtype, nvalues, foam_filename):
+    """parses whitespace separated values and checks the count"""
+    values = np.fromstring(body, dtype=dtype, sep=' ')
+    if len(values) != nvalues:
+        raise SyntaxError('expected %i values; found %i in %r' % (
+            nvalues, len(values), foam_filename))
+    return values
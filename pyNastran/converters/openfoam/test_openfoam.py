@@ -0,0 +1,163 @@
+"""
+tests non-gui related OpenFOAM polyMesh reading
+"""
+import os
+import shutil
+import unittest
+
+import numpy as np
+
+import pyNastran
+from pyNastran.converters.openfoam.poly_mesh import read_poly_mesh
+from pyNastran.converters.openfoam.block_mesh import Boundary
+from pyNastran.utils.log import get_logger
+
+PKG_PATH = pyNastran.__path__[0]
+MODEL_PATH = os.path.join(PKG_PATH, 'converters', 'openfoam', 'models')
+
+HEADER = (
+    'FoamFile\n'
+    '{\n'
+    '    version     2.0;\n'
+    '    format      %s;\n'
+    '    arch        "LSB;label=32;scalar=64";\n'
+    '    class       %s;\n'
+    '    location    "constant/polyMesh";\n'
+    '    object      %s;\n'
+    '}\n'
+    '// * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * * //\n\n'
+)
+FOOTER = b'\n\n// ************************************************************************* //\n'
+
+BOUNDARY = (
+    b'2\n'
+    b'(\n'
+    b'    wall\n'
+    b'    {\n'
+    b'        type            wall;\n'
+    b'        inGroups        List<word> 1(wall);\n'
+    b'        nFaces          4;\n'
+    b'        startFace       1;\n'
+    b'    }\n'
+    b'    sides\n'
+    b'    {\n'
+    b'        type            patch;\n'
+    b'        nFaces          2;\n'
+    b'        startFace       5;\n'
+    b'    }\n'
+    b')\n'
+)
+
+# two hexas; node i = ix + 3*iy + 6*iz
+POINTS = np.array([[x, y, z]
+                   for z in [0., 1.]
+                   for y in [0., 1.]
+                   for x in [0., 1., 2.]])
+FACES = [
+    [1, 4, 10, 7],  # internal
+    [0, 3, 4, 1],  # wall
+    [1, 4, 5, 2],
+    [6, 7, 10, 9],
+    [7, 8, 11, 10],
+    [0, 1, 2, 8, 6],  # sides (a pentagon and a triangle)
+    [3, 9, 11],
+]
+OWNER = [0, 0, 1, 0, 1, 0, 1]
+NEIGHBOUR = [1]
+
+
+class TestOpenFoam(unittest.TestCase):
+
+    def test_poly_mesh_ascii(self):
+        """tests an ascii polyMesh with a faceList"""
+        self._test_poly_mesh('poly_mesh_ascii', is_binary=False)
+
+    def test_poly_mesh_binary(self):
+        """tests a binary polyMesh with a faceCompactList"""
+        self._test_poly_mesh('poly_mesh_binary', is_binary=True)
+
+    def _test_poly_mesh(self, dirname, is_binary):
+        log = get_logger(level='warning', encoding='utf-8')
+        poly_mesh_dirname = os.path.join(MODEL_PATH, dirname)
+        _write_poly_mesh(poly_mesh_dirname, is_binary)
+
+        try:
+            model = read_poly_mesh(poly_mesh_dirname, log=log)
+            assert np.allclose(model.nodes, POINTS), model.nodes
+            assert np.array_equal(model.owner, OWNER), model.owner
+            assert np.array_equal(model.neighbour, NEIGHBOUR), model.neighbour
+            assert np.array_equal(model.patch_ids, [0, 1, 1, 1, 1, 2, 2]), model.patch_ids
+            assert list(model.boundaries) == ['wall', 'sides'], list(model.boundaries)
+            assert model.boundaries['sides'] == ['patch', 2, 5], model.boundaries['sides']
+
+            faces = model.get_faces()
+            assert faces.shape == (7, 5), faces.shape
+            for face, expected_face in zip(faces, FACES):
+                nnodes = len(expected_face)
+                assert np.array_equal(face[:nnodes], expected_face), face
+                assert (face[nnodes:] == -1).all(), face
+
+            # only the nodes used by the boundary faces are kept
+            model2 = read_poly_mesh(poly_mesh_dirname, boundary_only=True, log=log)
+            assert model2.neighbour is None
+            assert model2.nfaces == 6, model2.nfaces
+            assert np.array_equal(model2.owner, OWNER[1:]), model2.owner
+            assert np.array_equal(model2.patch_ids, [1, 1, 1, 1, 2, 2]), model2.patch_ids
+            faces2 = model2.get_faces()
+            nids = np.where(faces2 >= 0, model2.node_ids[faces2], -1)
+            assert np.array_equal(nids, faces[1:, :]), nids
+
+            # the legacy interface
+            nodes, quads, names = Boundary(log=log).read_openfoam(
+                os.path.join(poly_mesh_dirname, 'points'),
+                os.path.join(poly_mesh_dirname, 'faces'),
+                os.path.join(poly_mesh_dirname, 'boundary'))
+            assert nodes.shape == (12, 3), nodes.shape
+            assert np.array_equal(quads, faces[1:, :]), quads
+            assert np.array_equal(names, [1, 1, 1, 1, 2, 2]), names
+        finally:
+            shutil.rmtree(poly_mesh_dirname)
+
+
+def _write_poly_mesh(poly_mesh_dirname, is_binary):
+    """writes the test polyMesh"""
+    if not os.path.exists(poly_mesh_dirname):
+        os.makedirs(poly_mesh_dirname)
+    fmt = 'binary' if is_binary else 'ascii'
+
+    def write(name, foam_class, body, fmt=fmt):
+        with open(os.path.join(poly_mesh_dirname, name), 'wb') as foam_file:
+            foam_file.write((HEADER % (fmt, foam_class, name)).encode('ascii'))
+            foam_file.write(body)
+            foam_file.write(FOOTER)
+
+    if is_binary:
+        offsets = np.cumsum([0] + [len(face) for face in FACES])
+        write('points', 'vectorField', _binary_list(POINTS, '<f8'))
+        write('faces', 'faceCompactList',
+              _binary_list(offsets, '<i4') + _binary_list(np.hstack(FACES), '<i4'))
+        write('owner', 'labelList', _binary_list(OWNER, '<i4'))
+        write('neighbour', 'labelList', _binary_list(NEIGHBOUR, '<i4'))
+    else:
+        points = ''.join('(%s %s %s)\n' % tuple(point) for point in POINTS)
+        faces = ''.join('%i(%s)\n' % (len(face), ' '.join(str(nid) for nid in face))
+                        for face in FACES)
+        write('points', 'vectorField', _ascii_list(len(POINTS), points))
+        write('faces', 'faceList', _ascii_list(len(FACES), faces))
+        write('owner', 'labelList', _ascii_list(len(OWNER), '\n'.join(str(i) for i in OWNER)))
+        write('neighbour', 'labelList',
+              _ascii_list(len(NEIGHBOUR), '\n'.join(str(i) for i in NEIGHBOUR)))
+    write('boundary', 'polyBoundaryMesh', BOUNDARY, fmt='ascii')
+
+
+def _ascii_list(nvalues, body):
+    return ('\n%i\n(\n%s\n)\n' % (nvalues, body)).encode('ascii')
+
+
+def _binary_list(values, dtype):
+    values = np.asarray(values, dtype=dtype)
+    return ('\n%i\n(' % values.shape[0]).encode('ascii') + values.tobytes() + b')\n'
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
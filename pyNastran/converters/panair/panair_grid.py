@@ -1,7 +1,6 @@
 from __future__ import print_function
 import os
-from itertools import count
-from math import ceil, sin, cos, radians
+from math import ceil
 
 from six import iteritems
 from six import PY2
@@ -11,7 +10,7 @@ import numpy as np
 
 
 from pyNastran.converters.panair.panair_grid_patch import (
-    PanairPatch, PanairWakePatch, print_float)
+    PanairPatch, PanairWakePatch, print_float, get_area_normal_centroid)
 from pyNastran.converters.panair.assign_type import (
     integer, double, integer_or_blank, double_or_blank, fortran_value)
 from pyNastran.utils.log import get_logger2
@@ -92,31 +91,32 @@ class PanairGrid(object):
         self.log = get_logger2(log, debug=debug)
 
     def write_plot3d(self, p3dname, is_binary=False, is_iblank=False):
+        """
+        Writes the networks as a multi-block ASCII Plot3D grid
+
+        Parameters
+        ----------
+        p3dname : str
+            the Plot3D filename
+        is_binary : bool; default=False
+            not supported
+        is_iblank : bool; default=False
+            not supported
+        """
         assert not is_binary, is_binary
         assert not is_iblank, is_iblank
 
+        patches = [patch for patch_id, patch in sorted(iteritems(self.patches))]
         with open(p3dname, 'w') as p3d_file:
-            npatches = len(self.patches)
-            npatches = 1
-            msg = '%i\n' % npatches
-            for patch_id, patch in sorted(iteritems(self.patches)):
-                #if patchID == 1:
-                print("patch_id = %s" % patch_id)
-                ni, nj = patch.xyz.shape[:2]
-                #nr = patch.nrows
-                #nc = patch.ncols
-                #msg += '%i %i 1\n' % (nc, nr)
-                msg += '%i %i 1\n' % (ni, nj-1)
-                break
-
+            msg = '%i\n' % len(patches)
+            for patch in patches:
+                msg += '%i %i 1\n' % (patch.nrows, patch.ncols)
             p3d_file.write(msg)
-            for patch_id, patch in sorted(iteritems(self.patches)):
-                #if patch_id == 1:
+
+            for patch in patches:
                 patch.write_plot3d(p3d_file, 1) # x
                 patch.write_plot3d(p3d_file, 2) # y
                 patch.write_plot3d(p3d_file, 3) # z
-                p3d_file.write('\n')
-                break
 
     def print_file(self):
         msg = ''
@@ -149,13 +149,9 @@ class PanairGrid(object):
 
     @property
     def npanels(self):
-        total_npanels = 0
-        for patch_id in range(self.npatches):
-            patch = self.get_patch(patch_id)
-            if patch.kt == 1:
-                total_npanels += patch.npanels
-                #self.log.debug("nPanels = %s" % (total_npanels))
-        return total_npanels
+        """the number of kt=1 panels"""
+        return sum(patch.npanels for patch in self.patches.values()
+                   if patch.kt == 1)
 
     @property
     def npatches(self):
@@ -247,33 +243,11 @@ class PanairGrid(object):
         """
         reads the points
         """
-        ipoint = 0
-        nrows = 2 * nactual + nremainder
-        points = np.zeros((nrows, 3), dtype='float32')
-
-        for n in range(nactual):
-            line = lines[n]
-            x1 = double(line[0:10], 'x%i' % (ipoint + 1))
-            y1 = double(line[10:20], 'y%i' % (ipoint + 1))
-            z1 = double(line[20:30], 'z%i' % (ipoint + 1))
-            points[ipoint, :] = [x1, y1, z1]
-            ipoint += 1
-
-            x2 = double(line[30:40], 'x%i' % (ipoint + 2))
-            y2 = double(line[40:50], 'y%i' % (ipoint + 2))
-            z2 = double(line[50:60], 'z%i' % (ipoint + 2))
-            points[ipoint, :] = [x2, y2, z2]
-            ipoint += 1
-
-        if nremainder:
-            n += 1
-            line = lines[n]
-            x1 = double(line[0:10], 'x%i' % (ipoint + 1))
-            y1 = double(line[10:20], 'y%i' % (ipoint + 1))
-            z1 = double(line[20:30], 'z%i' % (ipoint + 1))
-            points[ipoint, :] = [x1, y1, z1]
-
-        return points
+        npoints = 2 * nactual + nremainder
+        values = _read_fixed_width_fields(lines[:nactual + nremainder], 6, 'points')
+        points = values.reshape(-1, 3)[:npoints, :]
+        _assert_not_blank(points, 'points', lines)
+        return points.astype('float32')
 
     def add_wake_patch(self, network_name, options, xyz):
         patch = PanairWakePatch(self.nnetworks, network_name, options, xyz, self.log)
@@ -334,22 +308,20 @@ class PanairGrid(object):
             #self.log.debug("kt=%s nm=%s nn=%s netname=%s" % (
                 #kt, nm, nn, network_name))
 
-            xyz = np.zeros([nm, nn, 3], dtype='float32')
-            #y = zeros([nm, nn])
-            #z = zeros([nm, nn])
             nfull_lines = nm // 2
             npartial_lines = nm % 2
             nlines = nfull_lines + npartial_lines
             #print "nfull_lines=%s npartial_lines=%s nlines=%s" % (
                 #nfull_lines, npartial_lines, nlines)
-            for j in range(nn):
-                lines = section[n:n + nlines]
-                n += nlines
-                #print '\n'.join(lines)
-                points = self.split_points(lines, nfull_lines, npartial_lines)
 
-                for i, point in enumerate(points):
-                    xyz[i, j, :] = [point[0], point[1], point[2]]
+            # each column (j) starts on a new line, so the whole
+            # network is read at once and the padding is dropped
+            lines = section[n:n + nn * nlines]
+            n += nn * nlines
+            values = _read_fixed_width_fields(lines, 6, network_name)
+            xyz = values.reshape(nn, 2 * nlines, 3)[:, :nm, :]
+            _assert_not_blank(xyz, network_name, lines)
+            xyz = xyz.transpose(1, 0, 2).astype('float32')
 
             self.add_patch(network_name, kt, cp_norm, xyz)
             n += 1
@@ -415,38 +387,10 @@ class PanairGrid(object):
                 #nfull_lines, npartial_lines, nx_nr_lines))
             n += 1
 
-            Xin = []
-            R = []
             lines_full = section[n:n + nx_nr_lines]
             n += nx_nr_lines
-
-            assert len(lines_full) == 7, len(lines_full)
-
-            ipoint = 1
-            for line in lines_full:
-                if len(line[0:60].strip()) > 0:
-                    x1 = double(line[0:10], 'x%i' % ipoint)
-                    r1 = double(line[10:20], 'r%i' % ipoint)
-                    Xin.append(x1)
-                    R.append(r1)
-                    ipoint += 1
-                else:  # pragma: no cover
-                    raise RuntimeError(line.rstrip())
-
-                if len(line[20:60].strip()) > 0:
-                    x2 = double(line[20:30], 'x%i' % ipoint)
-                    r2 = double(line[30:40], 'r%i' % ipoint)
-                    Xin.append(x2)
-                    R.append(r2)
-                    ipoint += 1
-
-                if len(line[40:60].strip()) > 0:
-                    x3 = double(line[40:50], 'x%i' % ipoint)
-                    r3 = double(line[50:60], 'r%i' % ipoint)
-                    Xin.append(x3)
-                    R.append(r3)
-                    ipoint += 1
-            assert nx_nr == len(Xin), 'nx,nr=%s Xin=%s len(Xin)=%s' % (nx_nr, Xin, len(Xin))
+            x_r = _read_fixed_width_fields(lines_full, 6, network_name).reshape(-1, 2)[:nx_nr, :]
+            _assert_not_blank(x_r, network_name, lines_full)
 
             #----------------------------------------------------
             #print("section[n] = ", section[n].strip())
@@ -461,58 +405,19 @@ class PanairGrid(object):
             n += 1
 
             lines = section[n:n + ntheta_lines]
-            theta = []
-
-            ipoint = 1
-            for line in lines:
-                #print(line)
-                if len(line[0:60].rstrip()) > 0:
-                    (theta1) = double(line[0:10], 'theta%i' % ipoint)
-                    theta.append(theta1)
-                    ipoint += 1
-                else:  # pragma: no cover
-                    raise RuntimeError(line.rstrip())
-
-                if len(line[0:60].rstrip()) > 0:
-                    (theta2) = double(line[10:20], 'theta%i' % ipoint)
-                    theta.append(theta2)
-                    ipoint += 1
-
-                if len(line[20:60].rstrip()) > 0:
-                    (theta3) = double(line[20:30], 'theta%i' % ipoint)
-                    theta.append(theta3)
-                    ipoint += 1
-
-                if len(line[30:60].rstrip()) > 0:
-                    (theta4) = double(line[30:40], 'theta%i' % ipoint)
-                    theta.append(theta4)
-                    ipoint += 1
-
-                if len(line[40:60].rstrip()) > 0:
-                    (theta5) = double(line[40:50], 'theta%i' % ipoint)
-                    theta.append(theta5)
-                    ipoint += 1
-
-                if len(line[50:60].rstrip()) > 0:
-                    (theta6) = double(line[50:60], 'theta%i' % ipoint)
-                    theta.append(theta6)
-                    ipoint += 1
+            theta = _read_fixed_width_fields(lines, 6, network_name).ravel()[:ntheta]
+            _assert_not_blank(theta, network_name, lines)
             n += ntheta_lines
 
-            assert ntheta == len(theta)
-            sin_theta_r = [sin(radians(thetai)) for thetai in theta]
-            cos_theta_r = [cos(radians(thetai)) for thetai in theta]
-
+            # sweep the (x, r) profile through theta
             zi = 0.
-            # TODO: can't we use numpy meshgrid?
+            x = x_r[:, 0]
+            r = x_r[:, 1][:, np.newaxis]
+            theta_r = np.radians(theta)
             XYZ = np.zeros([nx_nr, ntheta, 3], dtype='float32')
-            #print("Xin=%s \nR=%s" % (Xin, R))
-            for (i, x, r) in zip(count(), Xin, R):
-                for (j, sin_theta, cos_theta) in zip(count(), sin_theta_r, cos_theta_r):
-                    y = r * sin_theta
-                    z = r * cos_theta + zi
-                    #print("x=%s y=%s z=%s" % (x, y, z))
-                    XYZ[i, j, :] = [x, y, z]
+            XYZ[:, :, 0] = x[:, np.newaxis]
+            XYZ[:, :, 1] = r * np.sin(theta_r)
+            XYZ[:, :, 2] = r * np.cos(theta_r) + zi
 
             #print("--XYZ--")
             #print(xyz)
@@ -826,48 +731,67 @@ class PanairGrid(object):
         #print "self.msg = ",self.msg
 
     def get_points_elements_regions(self, get_wakes=False):
-        points = []
-        elements = []
-        regions = []
-        kt = []
-        cp_norm = []
-        npoints = 0
-        for name, panel in sorted(iteritems(self.patches)):
-            if not get_wakes:
-                if panel.is_wake():
-                    continue
-
-            #self.log.debug("size(xyz) = %s" % ( str(panel.xyz.shape) ))
-            patch_points, npointsi = panel.get_points()
-            patch_elements = panel.get_elements(npoints) + npoints
-            npatch_elements = patch_elements.shape[0]
-            regions.append(np.ones(npatch_elements, dtype='int32') * (panel.inetwork + 1))
-            kt.append(np.ones(npatch_elements, dtype='int32') * panel.kt)
-            #print('panel.cp_norm = %r' % panel.cp_norm)
-            cp_norm.append(np.ones(npatch_elements, dtype='int32') * panel.cp_norm)
-
-            points += patch_points
-            elements.append(patch_elements)
-            npoints += npointsi
-            #print "name=%r npointsi=%s len(elements)=%s len(points)=%s" %(
-                #name, npointsi, len(elements), len(points))
-
-            #if npoints != 0 and False:
-                #if panel.network_name in ['bodylwk', 'awbw']:
-                    #for point in patch_points:
-                        #print(point)
-                    #for element in patch_elements:
-                        #(n1, n2, n3, n4) = element
-                        #print(element)
-                        #print(points[n1], points[n2], points[n3], points[n4])
-                        #print("")
-        points = np.array(points, dtype='float32')
-        elements = np.vstack(elements)
-        regions = np.hstack(regions)
-        kt = np.hstack(kt)
-        cp_norm = np.hstack(cp_norm)
+        """
+        Stacks the networks into a single set of arrays
+
+        Parameters
+        ----------
+        get_wakes : bool; default=False
+            include the wake networks
+
+        Returns
+        -------
+        points : (npoints, 3) float ndarray
+            the points
+        elements : (npanels, 4) int ndarray
+            the 0-based panel connectivity
+        regions : (npanels, ) int ndarray
+            the 1-based network id
+        kt : (npanels, ) int ndarray
+            the network's boundary condition type
+        cp_norm : (npanels, ) int ndarray
+            the network's cp_norm flag
+        """
+        patches = [patch for name, patch in sorted(iteritems(self.patches))
+                   if get_wakes or not patch.is_wake()]
+
+        npoints = np.array([patch.npoints for patch in patches], dtype='int32')
+        npanels = np.array([patch.npanels for patch in patches], dtype='int32')
+        ipoints = np.hstack([0, np.cumsum(npoints)[:-1]])
+
+        points = np.vstack([patch.get_points()[0] for patch in patches])
+        elements = np.vstack([patch.get_elements(ipoint) + ipoint
+                              for ipoint, patch in zip(ipoints, patches)]).astype('int32')
+
+        regions = np.repeat(
+            np.array([patch.inetwork + 1 for patch in patches], dtype='int32'), npanels)
+        kt = np.repeat(
+            np.array([patch.kt for patch in patches], dtype='int32'), npanels)
+        cp_norm = np.repeat(
+            np.array([patch.cp_norm for patch in patches], dtype='int32'), npanels)
         return points, elements, regions, kt, cp_norm
 
+    def get_panel_geometry(self, get_wakes=False):
+        """
+        Gets the panel properties for all the networks at once
+
+        Parameters
+        ----------
+        get_wakes : bool; default=False
+            include the wake networks
+
+        Returns
+        -------
+        area : (npanels, ) float ndarray
+            the panel areas
+        normal : (npanels, 3) float ndarray
+            the unit normals
+        centroid : (npanels, 3) float ndarray
+            the panel centroids
+        """
+        points, elements = self.get_points_elements_regions(get_wakes=get_wakes)[:2]
+        return get_area_normal_centroid(points, elements)
+
     def _read_cases(self, section):
         """
         $cases - no. of solutions
@@ -1225,3 +1149,43 @@ def remove_comments(lines, log):
         else:
             lines2.append(line)
     return lines2
+
+
+def _read_fixed_width_fields(lines, nfields, name):
+    """
+    Reads a block of 10 character wide fields in one pass
+
+    Parameters
+    ----------
+    lines : List[str]
+        the lines to parse
+    nfields : int
+        the number of fields on a full line
+    name : str
+        the network name (for error messages)
+
+    Returns
+    -------
+    values : (nlines, nfields) float ndarray
+        the values; blank fields are nan
+    """
+    width = 10 * nfields
+    block = ''.join(line[:width].ljust(width) for line in lines)
+    fields = np.char.strip(np.frombuffer(block.encode('ascii'), dtype='|S10'))
+    fields[fields == b''] = b'nan'
+    try:
+        values = fields.astype('float64')
+    except ValueError:
+        for line in lines:
+            for ifield in range(0, width, 10):
+                double_or_blank(line[ifield:ifield + 10], name)
+        raise
+    return values.reshape(len(lines), nfields)
+
+
+def _assert_not_blank(values, name, lines):
+    """a blank field was found where a value is required"""
+    if np.isnan(values).any():
+        msg = 'network=%r has a blank field where a value is required\n%s' % (
+            name.strip(), '\n'.join(lines))
+        raise RuntimeError(msg)
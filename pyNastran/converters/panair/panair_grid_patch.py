@@ -38,6 +38,16 @@ class PanairPatch(object):
 
     def write_plot3d(self, f, dim):
         """
+        Writes one coordinate of the network as a Plot3D block,
+        where i (the row) varies fastest
+
+        Parameters
+        ----------
+        f : file
+            the open Plot3D file
+        dim : int
+            1 -> x; 2 -> y; 3 -> z
+
         ..todo: is the normal defined correctly?
         ..todo: will this load into tecplot
         """
@@ -46,14 +56,7 @@ class PanairPatch(object):
             data = self.xyz[:, :, dim - 1]
         except IndexError:
             raise RuntimeError('dim=1 -> x; dim=2 -> y; dim=3 -> z')
-        ni, nj = data.shape
-        for j in range(nj):
-            msg = ''
-            for i in range(ni):
-                msg += '%s ' % data[i, j]
-            f.write(msg)
-        msg += '\n'
-        f.write(msg)
+        np.savetxt(f, data.ravel(order='F')[np.newaxis, :], fmt='%s')
 
     def process(self):
         msg = '     network # being processed %3i\n\n' % (self.inetwork + 1)
@@ -273,14 +276,20 @@ class PanairPatch(object):
         return panels
 
     def get_points(self):
-        points = []
+        """
+        Gets the points in column-major order (point_id = col * nrows + row)
+
+        Returns
+        -------
+        points : (npoints, 3) float ndarray
+            the points
+        npoints : int
+            the number of points
+        """
         #self.log.debug("size(xyz) = %s" %( str( self.xyz.shape ) ))
         self.log.debug('self.inetwork=%s self.network_name=%r' % (self.inetwork, self.network_name))
-        for j in range(self.ncols):
-            for i in range(self.nrows):
-                point = self.xyz[i, j, :]
-                points.append(point)
-        return points, len(points)
+        points = self.xyz.transpose(1, 0, 2).reshape(self.npoints, 3)
+        return points, self.npoints
 
     def write_as_plot3d(self):
         out = ''
@@ -433,3 +442,36 @@ def elements_from_quad(nx, ny):
     elements[:, 2] = ipoints[1:, 1:].ravel()    # (i+1,j+1)
     elements[:, 3] = ipoints[:-1, 1:].ravel()   # (i,j+1  )
     return elements
+
+
+def get_area_normal_centroid(points, elements):
+    """
+    Gets the panel properties for all the panels at once
+
+    Parameters
+    ----------
+    points : (npoints, 3) float ndarray
+        the points
+    elements : (npanels, 4) int ndarray
+        the 0-based panel connectivity
+
+    Returns
+    -------
+    area : (npanels, ) float ndarray
+        the panel areas
+    normal : (npanels, 3) float ndarray
+        the unit normals
+    centroid : (npanels, 3) float ndarray
+        the panel centroids
+    """
+    p1 = points[elements[:, 0], :]
+    p2 = points[elements[:, 1], :]
+    p3 = points[elements[:, 2], :]
+    p4 = points[elements[:, 3], :]
+    centroid = (p1 + p2 + p3 + p4) / 4.
+
+    n = np.cross(p3 - p1, p4 - p2)
+    n_norm = np.linalg.norm(n, axis=1)
+    area = n_norm / 2.
+    normal = n / n_norm[:, np.newaxis]
+    return area, normal, centroid
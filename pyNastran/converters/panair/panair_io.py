@@ -8,12 +8,14 @@ from six import iteritems
 import numpy as np
 from numpy import zeros, ravel, amax, amin, arange
 
-import vtk
 from vtk import vtkQuad
 
 from pyNastran.converters.panair.panair_grid import PanairGrid
+from pyNastran.converters.panair.panair_grid_patch import get_area_normal_centroid
 from pyNastran.converters.panair.agps import AGPS
 from pyNastran.gui.gui_objects.gui_result import GuiResult
+from pyNastran.gui.gui_utils.vtk_utils import (
+    create_vtk_cells_of_constant_element_type, numpy_to_vtk_points)
 
 
 class PanairIO(object):
@@ -54,31 +56,16 @@ class PanairIO(object):
         self.grid.Allocate(self.nelements, 1000)
         #self.gridResult.SetNumberOfComponents(self.nelements)
 
-        points = vtk.vtkPoints()
-        points.SetNumberOfPoints(self.nnodes)
-        #self.gridResult.Allocate(self.nnodes, 1000)
-        #vectorReselt.SetNumberOfComponents(3)
-        #elem.SetNumberOfPoints(nnodes)
-
         assert len(nodes) > 0
+        points = numpy_to_vtk_points(nodes)
         mmax = amax(nodes, axis=0)
         mmin = amin(nodes, axis=0)
         dim_max = (mmax - mmin).max()
         self.create_global_axes(dim_max)
-        for nid, node in enumerate(nodes):
-            points.InsertPoint(nid, *node)
 
         assert len(elements) > 0
-        elem = vtkQuad()
-        quad_type = elem.GetCellType()
-        for eid, element in enumerate(elements):
-            (p1, p2, p3, p4) = element
-            elem = vtkQuad()
-            elem.GetPointIds().SetId(0, p1)
-            elem.GetPointIds().SetId(1, p2)
-            elem.GetPointIds().SetId(2, p3)
-            elem.GetPointIds().SetId(3, p4)
-            self.grid.InsertNextCell(quad_type, elem.GetPointIds())
+        quad_type = vtkQuad().GetCellType()
+        create_vtk_cells_of_constant_element_type(self.grid, elements, quad_type)
 
         self.grid.SetPoints(points)
         #self.grid.GetPointData().SetScalars(self.gridResult)
@@ -151,16 +138,7 @@ class PanairIO(object):
         #print('nelements = ', nelements)
         #print('nnodes = ', nodes.shape)
 
-        p1 = nodes[elements[:, 0]]
-        p2 = nodes[elements[:, 1]]
-        p3 = nodes[elements[:, 2]]
-        p4 = nodes[elements[:, 3]]
-        xyz_centroid = (p1 + p2 + p3 + p4) / 4.
-
-        n = np.cross(p3 - p1, p4 - p2)
-        n_norm = np.linalg.norm(n, axis=1)
-        area = n_norm / 2.
-        normal = n / n_norm[:, np.newaxis]
+        area, normal, xyz_centroid = get_area_normal_centroid(nodes, elements)
 
         itime = 0
         # ID, header, title, location, values, format, uname
@@ -228,23 +206,15 @@ class PanairIO(object):
             raise RuntimeError('only files named "agps" files are supported')
 
         # get the Cp on the nodes
+        #
+        # agps stores implicit and explicit wakes, so we keep the
+        # networks that fit on the (wakeless) geometry
+        Cps = [ravel(Cp) for ipatch, Cp in sorted(iteritems(model.pressures))]
+        iends = np.cumsum([len(Cpv) for Cpv in Cps])
+        nCp = iends[iends <= self.nnodes].max() if iends[0] <= self.nnodes else 0
         Cp_array = zeros(self.nnodes, dtype='float32')
-        imin = 0
-        for ipatch, Cp in sorted(iteritems(model.pressures)):
-            Cpv = ravel(Cp)
-            nCp = len(Cpv)
-            try:
-                Cp_array[imin:imin + nCp] = Cpv
-            except ValueError:
-                # agps stores implicit and explicit wakes
-                # we're skipping all wakes
-                pass
-            imin += nCp
-
-        Cp_array2 = (Cp_array[self.elements[:, 0]] +
-                     Cp_array[self.elements[:, 1]] +
-                     Cp_array[self.elements[:, 2]] +
-                     Cp_array[self.elements[:, 3]]) / 4.
+        Cp_array[:nCp] = np.hstack(Cps)[:nCp]
+        Cp_array2 = Cp_array[self.elements].mean(axis=1)
 
         icase = len(self.result_cases)
 
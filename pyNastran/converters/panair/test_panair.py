@@ -2,6 +2,7 @@ from __future__ import print_function
 import os
 import unittest
 from six.moves import range
+import numpy as np
 from numpy import array_equal, allclose
 
 import pyNastran
@@ -65,6 +66,14 @@ class TestPanair(unittest.TestCase):
         model.write_panair('junk_circ.inp')
         os.remove('junk_circ.inp')
 
+        xyz = model.patches[0].xyz
+        assert xyz.shape == (20, 5, 3), xyz.shape
+        assert allclose(xyz[0, :, 0], 2.0), xyz[0, :, 0]
+        assert allclose(xyz[19, :, 0], 6.4687), xyz[19, :, 0]
+        assert allclose(xyz[:, 0, 1], -xyz[:, 4, 1]), xyz[:, :, 1]
+        assert allclose(xyz[:, 2, :], np.column_stack([xyz[:, 2, 0], np.zeros(20), xyz[:, 0, 1] * -1]),
+                        atol=1e-5), xyz[:, 2, :]
+
     def test_panair_io_03(self):
         """tests the SWB model"""
         log = get_logger(level='warning')
@@ -77,6 +86,51 @@ class TestPanair(unittest.TestCase):
         model.write_panair('junk_swb.inp')
         os.remove('junk_swb.inp')
 
+    def test_panair_geometry_04(self):
+        """tests the stacked networks and panel properties of the M100 model"""
+        log = get_logger(level='warning')
+        in_filename = os.path.join(TEST_PATH, 'M100', 'M100.inp')
+        p3d_filename = os.path.join(TEST_PATH, 'M100', 'M100.p3d')
+
+        model = PanairGrid(log=log, debug=False)
+        model.read_panair(in_filename)
+        (points, elements, regions, kt, cp_norm) = model.get_points_elements_regions()
+        area, normal, centroid = model.get_panel_geometry()
+
+        nelements = elements.shape[0]
+        assert area.shape == (nelements, ), area.shape
+        assert allclose(np.linalg.norm(normal, axis=1), 1.)
+        assert model.npanels == (kt == 1).sum(), model.npanels
+
+        ipanel0 = 0
+        for patch_id, patch in sorted(model.patches.items()):
+            if patch.is_wake():
+                continue
+            assert (regions[ipanel0:ipanel0 + patch.npanels] == patch.inetwork + 1).all()
+            for ipanel in range(patch.npanels):
+                areai, normali = patch.get_panel_area_normal(ipanel)
+                assert allclose(area[ipanel0 + ipanel], areai)
+                assert allclose(normal[ipanel0 + ipanel], normali, atol=1e-5)
+            ipanel0 += patch.npanels
+        assert ipanel0 == nelements, ipanel0
+
+        # the first network is defined on 2 points per line
+        patch = model.patches[0]
+        assert allclose(patch.xyz[0, 0, :], [768.348, 60.014, -48.743]), patch.xyz[0, 0, :]
+        assert allclose(patch.xyz[1, 0, :], [762.518, 61.094, -47.368]), patch.xyz[1, 0, :]
+
+        model.write_plot3d(p3d_filename)
+        with open(p3d_filename, 'r') as p3d_file:
+            npatches = int(p3d_file.readline())
+            dims = [[int(value) for value in p3d_file.readline().split()]
+                    for ipatch in range(npatches)]
+            xyz = np.array(p3d_file.read().split(), dtype='float32')
+        os.remove(p3d_filename)
+        assert npatches == len(model.patches), npatches
+        npoints = sum(ni * nj for ni, nj, nk in dims)
+        assert xyz.shape == (3 * npoints, ), xyz.shape
+        assert allclose(xyz[:dims[0][0]], patch.xyz[:, 0, 0])
+
 if __name__ == '__main__':  # pragma: no cover
     import time
     time0 = time.time()
@@ -1,18 +1,29 @@
 #pylint:  disable=C0111
 from __future__ import print_function
 import copy
-from struct import unpack, Struct, pack
+from struct import unpack, pack
 
 from six import iteritems
 from six.moves import zip, range
 
 import numpy as np
 import scipy
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.spatial
 
 
 from pyNastran.bdf.field_writer_8 import print_card_8
 from pyNastran.utils import is_binary_file
 from pyNastran.utils.log import get_logger2
+from pyNastran.utils.numpy_utils import unique_rows
+
+#: the 50 byte record of a binary STL facet
+STL_BINARY_DTYPE = np.dtype([
+    ('normal', '<f4', (3, )),
+    ('vertices', '<f4', (3, 3)),
+    ('attribute', '<u2'),
+])
 
 def read_stl(stl_filename, log=None, debug=False):
     """
@@ -120,7 +131,7 @@ class STL(object):
             #bvector = [0., 0., 0.]
             #cvector = [0., 0., 0.]
             nelements = self.elements.shape[0]
-            infile.write(pack('i', nelements))
+            infile.write(pack('<i', nelements))
             elements = self.elements
 
             p1 = self.nodes[elements[:, 0], :]
@@ -133,13 +144,12 @@ class STL(object):
             if normalize_normal_vectors:
                 n /= np.linalg.norm(n, axis=1)[:, np.newaxis]
 
-            s = Struct('12fH')
-            for eid, element in enumerate(elements):
-                data = s.pack(n[eid, 0], n[eid, 1], n[eid, 2],
-                              p1[eid, 0], p1[eid, 1], p1[eid, 2],
-                              p2[eid, 0], p2[eid, 1], p2[eid, 2],
-                              p3[eid, 0], p3[eid, 1], p3[eid, 2], 0)
-                infile.write(data)
+            facets = np.zeros(nelements, dtype=STL_BINARY_DTYPE)
+            facets['normal'] = n
+            facets['vertices'][:, 0, :] = p1
+            facets['vertices'][:, 1, :] = p2
+            facets['vertices'][:, 2, :] = p3
+            facets.tofile(infile)
 
     def read_binary_stl(self, stl_filename):
         """
@@ -151,59 +161,15 @@ class STL(object):
             the filename to read
         """
         with open(stl_filename, 'rb') as infile:
-            data = infile.read()
-
-        ndata = len(data)
-        j = 0
-        while j < ndata:
-            self.log.info('  read_binary_stl: j=%s ndata=%s' % (j, ndata))
-            self.header = data[j:j+80]
-            nelements, = unpack('i', data[j+80:j+84])
-            j += 84
-
-            inode = 0
-            nodes_dict = {}
+            self.header = infile.read(80)
+            nelements, = unpack('<i', infile.read(4))
             assert nelements > 0, 'nelements=%s' % nelements
-            elements = np.zeros((nelements, 3), 'int32')
-
-            s = Struct('12fH')
-            for ielement in range(nelements):
-                (nx, ny, nz, ax, ay, az, bx, by, bz,
-                 cx, cy, cz, i) = s.unpack(data[j:j+50])
-
-                t1 = (ax, ay, az)
-                t2 = (bx, by, bz)
-                t3 = (cx, cy, cz)
-                if t1 in nodes_dict:
-                    i1 = nodes_dict[t1]
-                else:
-                    i1 = inode
-                    nodes_dict[t1] = inode
-                    inode += 1
-
-                if t2 in nodes_dict:
-                    i2 = nodes_dict[t2]
-                else:
-                    i2 = inode
-                    nodes_dict[t2] = inode
-                    inode += 1
+            self.log.info('  read_binary_stl: nelements=%s' % nelements)
+            facets = np.fromfile(infile, dtype=STL_BINARY_DTYPE, count=nelements)
+        assert len(facets) == nelements, 'nfacets=%s nelements=%s' % (len(facets), nelements)
 
-                if t3 in nodes_dict:
-                    i3 = nodes_dict[t3]
-                else:
-                    i3 = inode
-                    nodes_dict[t3] = inode
-                    inode += 1
-                elements[ielement] = [i1, i2, i3]
-                j += 50
-        assert inode > 0, inode
-        nnodes = inode + 1 # accounting for indexing
-        self.elements = elements
-
-        nodes = np.zeros((nnodes, 3), 'float64')
-        for node, inode in iteritems(nodes_dict):
-            nodes[inode] = node
-        self.nodes = nodes
+        xyz = facets['vertices'].reshape(nelements * 3, 3)
+        self.nodes, self.elements = _weld_vertices(xyz)
 
 
     def _get_normals_data(self, elements, nodes=None):
@@ -381,37 +347,41 @@ class STL(object):
         return normals_at_nodes
 
     def equivalence_nodes(self, tol=1e-5):
-        nnodes = self.nodes.shape[0]
-
-        # build the kdtree
-        kdt = scipy.spatial.KDTree(self.nodes)
-
-        # find the node ids of interest
-        nids_new = np.unique(self.elements.ravel())
-        nids_new.sort()
-
-        # check the closest 10 nodes for equality
-        deq, ieq = kdt.query(self.nodes[nids_new, :], k=10, distance_upper_bound=tol)
-
-        # get the ids of the duplicate nodes
-        slots = np.where(ieq[:, 1:] < nnodes)
-        replacer = np.unique(ieq[slots])
+        """
+        Merges the nodes that are within tol of each other
 
-        # update the duplcated node id with it's partner
-        # we'll pick the minimum ID
-        for r in replacer:
-            ip = np.where(ieq[r, :] < nnodes)[0]
-            possible = ieq[r, ip]
+        The elements of a merged node point to the lowest node id of its
+        group; the nodes are not removed.
 
-            # node 11 can become node 10, but node 10 cannot become node 11
-            ip2 = np.where(r > possible)[0]
+        Parameters
+        ----------
+        tol : float; default=1e-5
+            the distance at which nodes are merged
+        """
+        nnodes = self.nodes.shape[0]
 
-            if len(ip2):
-                # replace the node ids
-                possible2 = possible[ip2]
-                r_new_nid = possible2.min()
-                ireplace = np.where(self.elements == r)
-                self.elements[ireplace] = r_new_nid
+        # find the node ids of interest
+        nids_used = np.unique(self.elements.ravel())
+
+        # find all the pairs of nodes that are within tol
+        kdt = scipy.spatial.cKDTree(self.nodes[nids_used, :])
+        pairs = kdt.query_pairs(tol, output_type='ndarray')
+        if len(pairs) == 0:
+            return
+        pairs = nids_used[pairs]
+
+        # a node can be close to a node that is close to another node,
+        # so the groups are the connected components of the pairs
+        graph = scipy.sparse.coo_matrix(
+            (np.ones(len(pairs), dtype='int8'), (pairs[:, 0], pairs[:, 1])),
+            shape=(nnodes, nnodes))
+        unused_ngroups, igroup = scipy.sparse.csgraph.connected_components(
+            graph, directed=False)
+
+        # node 11 can become node 10, but node 10 cannot become node 11
+        nid_min = np.full(igroup.max() + 1, nnodes, dtype='int32')
+        np.minimum.at(nid_min, igroup, np.arange(nnodes, dtype='int32'))
+        self.elements = nid_min[igroup][self.elements]
 
     def project_boundary_layer(self, nodes, elements, volume_bdfname):
         """
@@ -586,85 +556,39 @@ class STL(object):
         """
         Reads an STL that's in ASCII format
         """
+        vertex_lines = []
+        xyz_blocks = []
         with open(stl_filename, 'r') as infile:
-            line = infile.readline()
-            inode = 0
-            ielement = 0
-            nodes_dict = {}
-            elements = []
-            while line:
-                if 'solid' in line[:6].lower():
-                    line = infile.readline()  # facet
-                    while 'facet' in line.strip()[:5].lower():
-                        #facet normal -6.665299e-001 6.795624e-001 3.064844e-001
-                        #   outer loop
-                        #      vertex 8.142845e-002 2.731541e-001 1.190024e+001
-                        #      vertex 8.186898e-002 2.727136e-001 1.190215e+001
-                        #      vertex 8.467505e-002 2.754588e-001 1.190215e+001
-                        #   endloop
-                        #endfacet
-
-                        infile.readline() # outer loop
-                        L1 = infile.readline().strip()
-                        L2 = infile.readline().strip()
-                        L3 = infile.readline().strip()
-
-                        v1 = L1.split()[1:]
-                        v2 = L2.split()[1:]
-                        v3 = L3.split()[1:]
-                        infile.readline() # endloop
-                        infile.readline() # endfacet
-                        t1 = tuple(v1)
-                        t2 = tuple(v2)
-                        t3 = tuple(v3)
-
-                        assert len(v1) == 3, '%r' % L1
-                        assert len(v2) == 3, '%r' % L2
-                        assert len(v3) == 3, '%r' % L3
-
-                        if t1 in nodes_dict:
-                            i1 = nodes_dict[t1]
-                        else:
-                            i1 = inode
-                            nodes_dict[t1] = inode
-                            inode += 1
-
-                        if t2 in nodes_dict:
-                            i2 = nodes_dict[t2]
-                        else:
-                            i2 = inode
-                            nodes_dict[t2] = inode
-                            inode += 1
-
-                        if t3 in nodes_dict:
-                            i3 = nodes_dict[t3]
-                        else:
-                            i3 = inode
-                            nodes_dict[t3] = inode
-                            inode += 1
-                        element = [i1, i2, i3]
-                        elements.append(element)
-                        ielement += 1
-                        line = infile.readline()  # facet
-                    #print "end of solid..."
-                elif 'endsolid' in line.lower():
-                    line = infile.readline()
-                elif line.strip() == '':
-                    line = infile.readline()
+            #solid solid_name
+            #  facet normal -6.665299e-001 6.795624e-001 3.064844e-001
+            #    outer loop
+            #      vertex 8.142845e-002 2.731541e-001 1.190024e+001
+            #      vertex 8.186898e-002 2.727136e-001 1.190215e+001
+            #      vertex 8.467505e-002 2.754588e-001 1.190215e+001
+            #    endloop
+            #  endfacet
+            #endsolid
+            for line in infile:
+                sline = line.lstrip()
+                word = sline[:6].lower()
+                if word == 'vertex':
+                    vertex_lines.append(sline[6:])
+                    if len(vertex_lines) == 300000:
+                        xyz_blocks.append(_parse_vertex_lines(vertex_lines))
+                        vertex_lines = []
+                elif word[:5] in ['facet', 'outer', 'endlo', 'endfa', 'solid', 'endso', '']:
+                    continue
                 else:
                     self.log.error(line)
-                    #line = f.readline()
-                    raise NotImplementedError('multiple solids are not supported; line=%r' % line)
-                    #break
+                    raise NotImplementedError('unexpected line=%r' % line)
+        if vertex_lines:
+            xyz_blocks.append(_parse_vertex_lines(vertex_lines))
+        assert len(xyz_blocks) > 0, 'no vertices were found'
 
-        assert inode > 0, inode
-        nnodes = inode + 1 # accounting for indexing
-        self.elements = np.array(elements, 'int32')
-        nodes = np.zeros((nnodes, 3), 'float64')
-
-        for node, inode in iteritems(nodes_dict):
-            nodes[inode] = node
-        self.nodes = nodes
+        xyz = np.vstack(xyz_blocks)
+        nvertices = xyz.shape[0]
+        assert nvertices % 3 == 0, 'nvertices=%s is not a multiple of 3' % nvertices
+        self.nodes, self.elements = _weld_vertices(xyz)
 
     def scale_nodes(self, xscale, yscale, zscale):
         self.nodes[:, 0] *= xscale
@@ -752,6 +676,51 @@ class STL(object):
         self.elements = np.array(elements2 + elements3, dtype='int32')
 
 
+def _parse_vertex_lines(vertex_lines):
+    """converts the 'x y z' part of many vertex lines to an (n, 3) array"""
+    nvertices = len(vertex_lines)
+    xyz = np.fromstring(' '.join(vertex_lines), dtype='float64', sep=' ')
+    if len(xyz) != nvertices * 3:
+        raise SyntaxError('cannot parse the vertices; expected %s floats; found %s' % (
+            nvertices * 3, len(xyz)))
+    return xyz.reshape(nvertices, 3)
+
+
+def _weld_vertices(xyz):
+    """
+    Merges the identical vertices of a triangle soup
+
+    Parameters
+    ----------
+    xyz : (nelements*3, 3) float ndarray
+        the vertices of each triangle
+
+    Returns
+    -------
+    nodes : (nnodes, 3) float64 ndarray
+        the unique vertices in the order they first appear
+    elements : (nelements, 3) int32 ndarray
+        the node indices of each triangle
+    """
+    # -0.0 + 0.0 = 0.0, so -0.0 and 0.0 are the same vertex
+    xyz = np.asarray(xyz, dtype='float64') + 0.
+    unique_xyz, ifirst, inverse = unique_rows(
+        xyz, return_index=True, return_inverse=True)
+    assert len(unique_xyz) > 0, len(unique_xyz)
+
+    # number the nodes in the order they're first used
+    isort = np.argsort(ifirst)
+    nunique = len(isort)
+    inode = np.empty(nunique, dtype='int32')
+    inode[isort] = np.arange(nunique, dtype='int32')
+    elements = inode[inverse.ravel()].reshape(len(xyz) // 3, 3)
+
+    nnodes = nunique + 1 # accounting for indexing
+    nodes = np.zeros((nnodes, 3), 'float64')
+    nodes[:nunique, :] = unique_xyz[isort, :]
+    return nodes, elements
+
+
 def _rotate_model(stl):  # pragma: no cover
     nodes = stl.nodes
     elements = stl.elements
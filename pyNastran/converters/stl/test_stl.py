@@ -95,6 +95,27 @@ class TestSTL(unittest.TestCase):
         #cnormals = stl.get_normals()
         #nnormals = stl.get_normals_at_nodes(cnormals)
 
+    def test_stl_io_03(self):
+        """binary round trip and node equivalencing"""
+        log = get_logger(level='warning')
+        stl_filename = os.path.join(TEST_PATH, 'sphere.stl')
+        stl_bin_filename = os.path.join(TEST_PATH, 'sphere_bin.stl')
+        stl = read_stl(stl_filename, log=log, debug=False)
+        stl.write_stl(stl_bin_filename, is_binary=True)
+        stl_bin = read_stl(stl_bin_filename, log=log, debug=False)
+        os.remove(stl_bin_filename)
+
+        assert stl_bin.nodes.shape == stl.nodes.shape, stl_bin.nodes.shape
+        assert np.array_equal(stl_bin.elements, stl.elements)
+        assert np.allclose(stl_bin.nodes, stl.nodes, atol=1e-6)
+
+        # nudge a node, so it's no longer welded by the reader
+        nids = stl.elements[0].copy()
+        stl.nodes = np.vstack([stl.nodes, stl.nodes[nids[0]] + 1e-7])
+        stl.elements[0, 0] = stl.nodes.shape[0] - 1
+        stl.equivalence_nodes(tol=1e-5)
+        assert np.array_equal(stl.elements[0], nids), stl.elements[0]
+
     def test_stl_to_nastran_01(self):
         log = get_logger(level='warning')
         stl_filename = os.path.join(TEST_PATH, 'sphere.stl')
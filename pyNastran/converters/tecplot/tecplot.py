@@ -5,16 +5,18 @@ models from:
 from __future__ import print_function
 import os
 from struct import unpack
-from collections import defaultdict
 import itertools
 
-from six import iteritems, string_types, PY3
+from six import iteritems, string_types
 from numpy import (
-    array, vstack, hstack, where, unique, zeros, loadtxt, savetxt, intersect1d, in1d)
+    array, vstack, hstack, where, unique, zeros, ones, arange, tile, loadtxt, savetxt,
+    intersect1d, frombuffer, fromstring, bincount)
+from numpy import sort as np_sort
+from numpy.linalg import norm
 #import numpy as np
 
 from pyNastran.utils import is_binary_file
-#from pyNastran.utils.numpy_utils import unique_rows
+from pyNastran.utils.numpy_utils import unique_rows
 from pyNastran.utils.log import get_logger2
 from pyNastran.op2.fortran_format import FortranFormat
 
@@ -27,6 +29,99 @@ def read_tecplot(tecplot_filename, use_cols=None, dtype=None, log=None, debug=Fa
     tecplot.read_tecplot(tecplot_filename)
     return tecplot
 
+def write_tecplot_zones(tecplot_filename, zones, res_types=None, is_points=True,
+                        adjust_nids=True):
+    """
+    Writes a multi-zone ASCII Tecplot file
+
+    The zones are written as they're generated, so a file may be
+    converted without holding more than one zone in memory:
+
+    >>> model = Tecplot()
+    >>> zones = model.iter_zones(tecplot_filename_in, use_cols=['rho'])
+    >>> write_tecplot_zones(tecplot_filename_out, zones)
+
+    Parameters
+    ----------
+    tecplot_filename : str
+        the path to the output file
+    zones : iterable of Tecplot()
+        the zones (with 0-based node ids local to the zone)
+    res_types : str; List[str, str, ...]; default=None -> all
+        the results that will be written (must be consistent with
+        the variables of the first zone)
+    is_points : bool; default=True
+        write in POINT format vs. BLOCK format
+    adjust_nids : bool; default=True
+        element_ids are 0-based in binary and must be switched to
+        1-based in ASCII
+    """
+    zones = iter(zones)
+    try:
+        zone = next(zones)
+    except StopIteration:
+        raise RuntimeError('there are no zones to write')
+
+    zone.log.info('writing tecplot %s' % tecplot_filename)
+    with open(tecplot_filename, 'w') as tecplot_file:
+        res_types = zone._write_header(tecplot_file, res_types=res_types)
+        zone._write_zone(tecplot_file, res_types, is_points=is_points, adjust_nids=adjust_nids)
+        for zone in zones:
+            zone._write_zone(tecplot_file, res_types, is_points=is_points,
+                             adjust_nids=adjust_nids)
+
+#: the faces of a CTETRA
+TET_FACES = [
+    (0, 2, 1),
+    (0, 1, 3),
+    (1, 2, 3),
+    (0, 3, 2),
+]
+
+#: the faces of a CHEXA
+HEXA_FACES = [
+    (0, 1, 2, 3),  # btm
+    (4, 5, 6, 7),  # top
+    (0, 3, 7, 4),  # left
+    (1, 2, 6, 5),  # right
+    (0, 1, 5, 4),  # front
+    (3, 2, 6, 7),  # back
+]
+
+#: splits a CHEXA into 6 tets around the 0-6 diagonal
+HEXA_TO_TETS = [
+    (0, 5, 1, 6),
+    (0, 1, 2, 6),
+    (0, 2, 3, 6),
+    (0, 3, 7, 6),
+    (0, 7, 4, 6),
+    (0, 4, 5, 6),
+]
+
+#: the edges of a tet
+TET_EDGES = array([
+    (0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3),
+], dtype='int32')
+
+#: the cut edges of the triangles for each marching tetrahedra case;
+#: the case is the sum of 2**i for the nodes above the plane
+TET_CUT_EDGES = {
+    1: [(0, 1, 2)],
+    2: [(0, 3, 4)],
+    4: [(1, 3, 5)],
+    8: [(2, 4, 5)],
+    14: [(0, 1, 2)],
+    13: [(0, 3, 4)],
+    11: [(1, 3, 5)],
+    7: [(2, 4, 5)],
+    3: [(1, 2, 4), (1, 4, 3)],
+    12: [(1, 2, 4), (1, 4, 3)],
+    5: [(0, 2, 5), (0, 5, 3)],
+    10: [(0, 2, 5), (0, 5, 3)],
+    6: [(0, 4, 5), (0, 5, 1)],
+    9: [(0, 4, 5), (0, 5, 1)],
+}
+
 #class TecplotCommon(object):
     #def __init__(self, log=None, debug=False):
         #self.log = get_logger2(log, debug=debug)
@@ -167,87 +262,132 @@ class Tecplot(FortranFormat):
          - CHEXA
 
         .. note :: assumes single typed results
-        .. warning:: BLOCK option doesn't work if line length isn't the same...
+        .. seealso:: iter_zones
         """
+        quads_list = []
+        hexas_list = []
+        tris_list = []
+        tets_list = []
+
+        xyz_list = []
+        results_list = []
+
+        nnodes = 0
+        for zone in self._iter_zones_ascii(tecplot_filename, use_cols=self.use_cols):
+            xyz_list.append(zone.xyz)
+            results_list.append(zone.results)
+            for elements, elements_list in [(zone.hexa_elements, hexas_list),
+                                            (zone.tet_elements, tets_list),
+                                            (zone.quad_elements, quads_list),
+                                            (zone.tri_elements, tris_list)]:
+                if len(elements):
+                    elements_list.append(elements + nnodes)
+            nnodes += zone.nnodes
+            self.variables = zone.variables
+            self.log.debug('nnodes=%s nelements=%s' % (nnodes, zone.nelements))
+            del zone
+
+        if len(xyz_list) == 0:
+            # a table (self.A)
+            return
+
+        self.log.debug('stacking elements')
+        if len(hexas_list):
+            self.hexa_elements = vstack(hexas_list)
+        if len(tets_list):
+            self.tet_elements = vstack(tets_list)
+        if len(quads_list):
+            self.quad_elements = vstack(quads_list)
+        if len(tris_list):
+            self.tri_elements = vstack(tris_list)
+
+        self.log.debug('stacking nodes')
+        if len(xyz_list) == 1:
+            xyz = xyz_list[0]
+        else:
+            xyz = vstack(xyz_list)
+        if len(results_list) == 1:
+            results = results_list[0]
+        else:
+            results = vstack(results_list)
+
+        self.xyz = xyz
+        self.results = results
+
+    def iter_zones(self, tecplot_filename, use_cols=None):
+        """
+        Iterates over the zones of an ASCII/binary Tecplot file
+
+        Only one zone is in memory at a time, so a converted model can
+        be streamed to a new file (see ``write_tecplot_zones``).
+
+        Parameters
+        ----------
+        tecplot_filename : str
+            the file to read
+        use_cols : List[str]; default=None -> all
+            the result variables to read; x, y, z are always read
+
+        Yields
+        ------
+        zone : Tecplot()
+            the nodes, results, and elements of a single zone;
+            the node ids are 0-based and local to the zone
+        """
+        if is_binary_file(tecplot_filename):
+            return self._iter_zones_binary(tecplot_filename, use_cols=use_cols)
+        return self._iter_zones_ascii(tecplot_filename, use_cols=use_cols)
+
+    def _iter_zones_binary(self, tecplot_filename, use_cols=None):
+        """the binary reader only supports a single zone"""
+        zone = Tecplot(log=self.log, debug=self.debug)
+        zone.use_cols = use_cols
+        zone.read_tecplot_binary(tecplot_filename)
+        yield zone
+
+    def _iter_zones_ascii(self, tecplot_filename, use_cols=None):
+        """iterates over the zones of an ASCII Tecplot file"""
         self.tecplot_filename = tecplot_filename
         assert os.path.exists(tecplot_filename), tecplot_filename
 
-        nnodes = -1
-        nelements = -1
+        variables = None
         with open(tecplot_filename, 'r') as tecplot_file:
-            quads_list = []
-            hexas_list = []
-            tris_list = []
-            tets_list = []
-
-            xyz_list = []
-            results_list = []
-
             line = tecplot_file.readline().strip()
-            iblock = 0
             while 1:
-                header_lines, i, line = self.read_header_lines(tecplot_file, line)
-                #print(header_lines)
+                header_lines, unused_i, line = self.read_header_lines(tecplot_file, line)
                 headers_dict = _header_lines_to_header_dict(header_lines)
                 if headers_dict is None:
                     break
 
-                #print(headers_dict.keys())
+                if 'VARIABLES' in headers_dict:
+                    variables = [variable.strip(' \r\n\t"\'')
+                                 for variable in headers_dict['VARIABLES']]
+                    self.log.debug('variables = %s' % variables)
+
                 if 'ZONETYPE' in headers_dict:
                     zone_type = headers_dict['ZONETYPE'].upper() # FEBrick
                     data_packing = headers_dict['DATAPACKING'].upper() # block
-                    self._read_zonetype(zone_type, tecplot_file, iblock, headers_dict, line,
-                                        nnodes, nelements,
-                                        xyz_list, hexas_list, tets_list, quads_list, tris_list,
-                                        results_list,
-                                        data_packing=data_packing)
                 elif 'F' in headers_dict:
                     fe = headers_dict['F'] # FEPoint
                     assert isinstance(fe, str), headers_dict
                     zone_type = fe.upper() # FEPoint
                     assert zone_type == 'FEPOINT', zone_type
-                    self.log.debug('zone_type = %r' % zone_type[0])
-                    self._read_zonetype(zone_type, tecplot_file, iblock, headers_dict, line,
-                                        nnodes, nelements,
-                                        xyz_list, hexas_list, tets_list, quads_list, tris_list,
-                                        results_list,
-                                        fe=fe)
+                    data_packing = 'POINT'
                 elif (('ZONE' in headers_dict) and
                       (headers_dict['ZONE'] is None) and
                       ('T' in headers_dict)):
-                    A, line = self.read_table(tecplot_file, iblock, headers_dict, line)
-                    self.A = A
+                    self.A, line = self.read_table(tecplot_file, 0, headers_dict, line)
                     return
-
                 else:
                     msg = 'headers=%s\n' % str(headers_dict)
                     msg += 'line = %r' % line.strip()
                     raise NotImplementedError(msg)
 
-        self.log.debug('stacking elements')
-        if len(hexas_list):
-            self.hexa_elements = vstack(hexas_list)
-        if len(tets_list):
-            self.tet_elements = vstack(tets_list)
-        if len(quads_list):
-            self.quad_elements = vstack(quads_list)
-        if len(tris_list):
-            self.tri_elements = vstack(tris_list)
-
-        self.log.debug('stacking nodes')
-        if len(xyz_list) == 1:
-            xyz = xyz_list[0]
-        else:
-            xyz = vstack(xyz_list)
-        if len(results_list) == 1:
-            results = results_list[0]
-        else:
-            results = vstack(results_list)
-        #self.elements = elements - 1
-        #print(self.elements)
-
-        self.xyz = xyz
-        self.results = results
+                zone, line = self._read_zone_ascii(
+                    tecplot_file, headers_dict, line, variables,
+                    zone_type, data_packing, use_cols=use_cols)
+                del headers_dict
+                yield zone
 
     def read_table(self, tecplot_file, iblock, headers_dict, line):
         """
@@ -266,156 +406,95 @@ class Tecplot(FortranFormat):
                     usecols=use_cols, unpack=False, ndmin=0)
         return A, None
 
-    def _read_zonetype(self, zone_type, tecplot_file, iblock, headers_dict, line,
-                       nnodes, nelements,
-                       xyz_list, hexas_list, tets_list, quads_list, tris_list,
-                       results_list,
-                       data_packing=None, fe=None):
+    def _read_zone_ascii(self, tecplot_file, headers_dict, line, variables,
+                         zone_type, data_packing, use_cols=None):
         """
         reads:
           - ZONE E
           - ZONE T
 
         ZONE is a flag, T is title, E is number of elements
+
+        Parameters
+        ----------
+        tecplot_file : file
+            the open file
+        headers_dict : dict
+            the zone header
+        line : str
+            the first line of the zone's data
+        variables : List[str]
+            the variables in the file
+        zone_type : str
+            FEBRICK, FETETRAHEDRON, FEQUADRILATERAL, FETRIANGLE, FEPOINT
+        data_packing : str
+            POINT, BLOCK
+        use_cols : List[str]; default=None -> all
+            the result variables to read
+
+        Returns
+        -------
+        zone : Tecplot()
+            the zone
+        line : str
+            the first line after the zone
         """
-        if iblock == 0:
-            variables = headers_dict['VARIABLES']
-            self.variables = [variable.strip(' \r\n\t"\'') for variable in variables]
-            self.log.debug('self.variables = %s' % self.variables)
-            nresults = len(variables) - 3 # x, y, z, rho, u, v, w, p
-            self.log.debug('nresults = %s' % nresults)
+        assert variables is not None, 'VARIABLES was not found'
+        nvars = len(variables)
+        ires = _get_result_columns(variables, use_cols)
 
         self.log.debug(headers_dict)
-        nnodesi = int(headers_dict['N'])
-        nelementsi = int(headers_dict['E'])
-        self.log.info('nnodes=%s nelements=%s' % (nnodesi, nelementsi))
-        xyz = zeros((nnodesi, 3), dtype='float32')
-        results = zeros((nnodesi, nresults), dtype='float32')
+        nnodes = int(headers_dict['N'])
+        nelements = int(headers_dict['E'])
+        self.log.info('nnodes=%s nelements=%s' % (nnodes, nelements))
+
         if zone_type == 'FEBRICK':
             # hex
-            elements = zeros((nelementsi, 8), dtype='int32')
+            nnodes_per_element = 8
         elif zone_type in ('FEPOINT', 'FEQUADRILATERAL', 'FETETRAHEDRON'):
             # quads / tets
-            elements = zeros((nelementsi, 4), dtype='int32')
+            nnodes_per_element = 4
         elif zone_type == 'FETRIANGLE':
             # tris
-            elements = zeros((nelementsi, 3), dtype='int32')
-        #elif zone_type == 'FEBLOCK':
-            #pass
+            nnodes_per_element = 3
         else:
-            #if isinstance(zone_type, list):
-                #raise NotImplementedError(zone_type[0])
             raise NotImplementedError(zone_type)
 
-        sline = line.strip().split()
-        if zone_type in ('FEBRICK', 'FETETRAHEDRON'):
-            if data_packing == 'POINT':
-                for inode in range(nnodesi):
-                    if inode == 0:
-                        self.log.debug('zone_type=%s sline=%s' %(zone_type, sline))
-                    try:
-                        xyz[inode, :] = sline[:3]
-                        results[inode, :] = sline[3:]
-                    except ValueError:
-                        msg = 'i=%s line=%r\n' % (inode, line)
-                        msg += 'sline = %s' % str(sline)
-                        print(msg)
-                        raise
-
-                    line = tecplot_file.readline().strip()
-                    while len(line) == 0 or line[0] == '#':
-                        line = tecplot_file.readline().strip()
-                    sline = line.split()
-            elif data_packing == 'BLOCK':
-                result = []
-                iresult = 0
-                nresult = 0
-                nnodes_max = (3 + nresults) * nnodesi
-                while iresult < nnodes_max:
-                    result += sline
-                    nresult += len(sline)
-                    if iresult >= nnodes_max:
-                        self.log.debug('breaking...')
-                        #break
-                    line = tecplot_file.readline().strip()
-                    while line[0] == '#':
-                        line = tecplot_file.readline().strip()
-                    sline = line.split()
-                    if iresult == 0:
-                        self.log.debug('zone_type=%s sline=%s' % (zone_type, sline))
-                    iresult += len(sline)
-
-                for ires in range(3 + nresults):
-                    i0 = ires * nnodesi
-                    i1 = (ires + 1) * nnodesi #+ 1
-                    if len(result[i0:i1]) != nnodesi:
-                        msg = 'ires=%s len=%s nnodesi=%s' % (
-                            ires, len(result[i0:i1]), nnodesi)
-                        raise RuntimeError(msg)
-                    if ires in [0, 1, 2]:
-                        self.log.debug('ires=%s nnodesi=%s len(result)=%s' %
-                                       (ires, nnodesi, len(result)))
-                        xyz[:, ires] = result[i0:i1]
-                    else:
-                        results[:, ires - 3] = result[i0:i1]
-            else:
-                raise NotImplementedError(data_packing)
-        elif zone_type in ('FEPOINT', 'FEQUADRILATERAL', 'FETRIANGLE'):
-            sline = line.strip().split()
-            for inode in range(nnodesi):
-                #print('inode ', inode, sline)
-                xyz[inode, :] = sline[:3]
-                #if abs(xyz[inode, 1]) <= 5.0:
-                    #msg = 'inode=%s xyz=%s'  % (inode, xyz[inode, :])
-                    #raise RuntimeError(msg)
-
-                results[inode, :] = sline[3:]
-                line = tecplot_file.readline().strip()
-                while line[0] == '#':
-                    line = tecplot_file.readline().strip()
-                sline = line.split()
+        # the nodes/results are converted in a single call and only the
+        # requested variables are kept
+        values, line = _read_ascii_values(tecplot_file, line, nnodes * nvars, 'float32')
+        if data_packing == 'POINT':
+            values = values.reshape(nnodes, nvars)
+            xyz = values[:, :3].copy()
+            results = values[:, ires]
+        elif data_packing == 'BLOCK':
+            values = values.reshape(nvars, nnodes)
+            xyz = values[:3, :].T.copy()
+            results = values[ires, :].T.copy()
         else:
-            raise NotImplementedError(zone_type)
-
-        i = 0
-        #print(elements.shape)
-        #print('xyz[0 , :]', xyz[0, :])
-        #print('xyz[-1, :]', xyz[-1, :])
-        #print(sline)
-        assert '.' not in sline[0], sline
-
-        i = 0
-        for i in range(nelementsi):
-            try:
-                elements[i, :] = sline
-            except IndexError:
-                raise RuntimeError('i=%s sline=%s' % (i, str(sline)))
-            except ValueError:
-                raise RuntimeError('i=%s sline=%s' % (i, str(sline)))
-            line = tecplot_file.readline()
-            sline = line.strip().split()
-        #print(f.readline())
-
+            raise NotImplementedError(data_packing)
+        del values
+
+        elements, line = _read_ascii_values(
+            tecplot_file, line, nelements * nnodes_per_element, 'int32')
+        elements = elements.reshape(nelements, nnodes_per_element) - 1
+
+        zone = Tecplot(log=self.log, debug=self.debug)
+        zone.tecplot_filename = self.tecplot_filename
+        zone.variables = variables[:3] + [variables[i] for i in ires]
+        zone.xyz = xyz
+        zone.results = results
         if zone_type == 'FEBRICK':
-            hexas_list.append(elements + nnodes)
+            zone.hexa_elements = elements
         elif zone_type == 'FETETRAHEDRON':
-            tets_list.append(elements + nnodes)
+            zone.tet_elements = elements
         elif zone_type in ('FEPOINT', 'FEQUADRILATERAL'):
-            quads_list.append(elements + nnodes)
+            zone.quad_elements = elements
         elif zone_type == 'FETRIANGLE':
-            tris_list.append(elements + nnodes)
+            zone.tri_elements = elements
         else:
             raise NotImplementedError(zone_type)
-        xyz_list.append(xyz)
-        results_list.append(results)
-        nnodes += nnodesi
-        nelements += nelementsi
-        self.log.debug('nnodes=%s nelements=%s' % (nnodes, nelements))
-        del headers_dict
-        iblock += 1
-        if iblock == 10:
-            return
-        self.log.debug('final sline=%s' % sline)
+        return zone, line
 
     @property
     def nnodes(self):
@@ -568,8 +647,7 @@ class Tecplot(FortranFormat):
                 nbytes = ni * 4
                 data = self.f.read(nbytes)
                 self.n += nbytes
-                xyzvals = unpack(b'%sf' % ni, data)
-                xyz = array(xyzvals, dtype='float32').reshape(3, nnodes).T
+                xyz = frombuffer(data, dtype='<f4').reshape(3, nnodes).T
 
                 # the variables: [rho, u, v, w, p]
                 nvars = 5
@@ -578,8 +656,9 @@ class Tecplot(FortranFormat):
                 nbytes = ni * 4
                 data = self.f.read(nbytes)
                 self.n += nbytes
-                resvals = unpack(b'%sf' % ni, data)
-                results = array(resvals, dtype='float32').reshape(nvars, nnodes).T
+                ires = _get_result_columns(self.variables, self.use_cols, nxyz=0)
+                results = frombuffer(data, dtype='<f4').reshape(nvars, nnodes)[ires, :].T
+                self.variables = [self.variables[i] for i in ires]
 
 
                 # 7443 elements
@@ -594,10 +673,10 @@ class Tecplot(FortranFormat):
                     self.log.debug('nvals = %s' % nvals)
 
                 nbytes = nvals * 4
-                node_ids = unpack(b'%ii' % nvals, self.f.read(nbytes))
+                node_ids = frombuffer(self.f.read(nbytes), dtype='<i4')
                 self.n += nbytes
 
-                elements = array(node_ids).reshape(nelements, nnodes_per_element)
+                elements = node_ids.reshape(nelements, nnodes_per_element)
                 #print(elements)
 
                 #self.show_data(data, types='ifs', endian='<')
@@ -616,23 +695,203 @@ class Tecplot(FortranFormat):
         self.results = results
         self.log.debug('done...')
 
+    def write_tecplot(self, tecplot_filename, res_types=None, is_points=True,
+                      adjust_nids=True):
+        """
+        Only handles single type writing
+
+        Parameters
+        ----------
+        tecplot_filename : str
+            the path to the output file
+        res_types : str; List[str, str, ...]; default=None -> all
+            the results that will be written (must be consistent with
+            self.variables)
+        is_points : bool; default=True
+            write in POINT format vs. BLOCK format
+        adjust_nids : bool; default=True
+            element_ids are 0-based in binary and must be switched to
+            1-based in ASCII
+        """
+        write_tecplot_zones(tecplot_filename, [self], res_types=res_types,
+                            is_points=is_points, adjust_nids=adjust_nids)
+
+    def _get_result_names(self):
+        """gets the names of the columns in self.results"""
+        if self.results.ndim != 2:
+            return []
+        nresults = self.results.shape[1]
+        return self.variables[len(self.variables) - nresults:]
+
+    def _write_header(self, tecplot_file, res_types=None):
+        """
+        Writes the TITLE/VARIABLES header
+
+        Returns
+        -------
+        res_types : List[str]
+            the results that will be written
+        """
+        msg = 'TITLE     = "tecplot geometry and solution file"\n'
+        msg += 'VARIABLES = "x"\n'
+        msg += '"y"\n'
+        msg += '"z"\n'
+
+        result_names = self._get_result_names()
+        if res_types is None:
+            res_types = result_names
+        elif isinstance(res_types, string_types):
+            res_types = [res_types]
+
+        ivars = self._get_result_indices(res_types)
+        res_types = [result_names[ivar] for ivar in ivars]
+        for var in res_types:
+            msg += '"%s"\n' % var
+        tecplot_file.write(msg)
+        return res_types
+
+    def _get_result_indices(self, res_types):
+        """gets the sorted columns of self.results for the result names"""
+        result_names = self._get_result_names()
+        result_indices_to_write = []
+        for var in res_types:
+            if var not in result_names:
+                raise RuntimeError('var=%r not in variables=%s' % (var, result_names))
+            result_indices_to_write.append(result_names.index(var))
+        return unique(result_indices_to_write).tolist()
+
+    def _write_zone(self, tecplot_file, res_types, is_points=True, adjust_nids=True):
+        """
+        Writes a ZONE
+
+        Parameters
+        ----------
+        tecplot_file : file
+            the open file
+        res_types : List[str]
+            the results to write
+        is_points : bool; default=True
+            write in POINT format vs. BLOCK format
+        adjust_nids : bool; default=True
+            element_ids are 0-based in binary and must be switched to
+            1-based in ASCII
+        """
+        etype_elements = [
+            ('CHEXA', self.hexa_elements),
+            ('CTETRA', self.tet_elements),
+            ('CTRIA3', self.tri_elements),
+            ('CQUAD4', self.quad_elements),
+        ]
+        is_points = True
+        is_tets = False
+        is_hexas = False
+        is_tris = False
+        is_quads = False
+
+        nnodes = self.nnodes
+        for etype, elements in etype_elements:
+            if not len(elements):
+                continue
+            if etype == 'CHEXA':
+                is_hexas = True
+                zone_type = 'FEBrick'
+                efmt = ' %i %i %i %i %i %i %i %i'
+            elif etype == 'CTETRA':
+                is_tets = True
+                zone_type = 'FETETRAHEDRON'
+                efmt = ' %i %i %i %i'
+            elif etype == 'CTRIA3':
+                is_tris = True
+                zone_type = 'FETRIANGLE'
+                efmt = ' %i %i %i'
+            elif etype == 'CQUAD4':
+                is_quads = True
+                zone_type = 'FEQUADRILATERAL'
+                efmt = ' %i %i %i %i'
+            break
+        else:
+            raise RuntimeError('there are no elements to write')
+        self.log.info('is_hexas=%s is_tets=%s is_quads=%s is_tris=%s' %
+                      (is_hexas, is_tets, is_quads, is_tris))
+
+        nelements = elements.shape[0]
+        self.log.info('is_points = %s' % is_points)
+        if is_points:
+            msg = 'ZONE  n=%i, e=%i, ZONETYPE=%s, DATAPACKING=POINT\n' % (
+                nnodes, nelements, zone_type)
+        else:
+            msg = 'ZONE  n=%i, e=%i, ZONETYPE=%s, DATAPACKING=BLOCK\n' % (
+                nnodes, nelements, zone_type)
+        tecplot_file.write(msg)
+
+        # xyz
+        assert self.nnodes > 0, 'nnodes=%s' % self.nnodes
+        ivars = self._get_result_indices(res_types)
+        nresults = len(ivars)
+        if is_points:
+            if nresults:
+                res = self.results[:, ivars]
+                try:
+                    data = hstack([self.xyz, res])
+                except ValueError:
+                    msg = 'Cant hstack...\n'
+                    msg += 'xyz.shape=%s\n' % str(self.xyz.shape)
+                    msg += 'results.shape=%s\n' % str(self.results.shape)
+                    raise ValueError(msg)
+                fmt = ' %15.9E' * (3 + nresults)
+            else:
+                data = self.xyz
+                fmt = ' %15.9E %15.9E %15.9E'
+            savetxt(tecplot_file, data, fmt=fmt)
+        else:
+            #nvalues_per_line = 5
+            for ivar in range(3):
+                #tecplot_file.write('# ivar=%i\n' % ivar)
+                vals = self.xyz[:, ivar].ravel()
+                msg = ''
+                for ival, val in enumerate(vals):
+                    msg += ' %15.9E' % val
+                    if (ival + 1) % 3 == 0:
+                        tecplot_file.write(msg)
+                        msg = '\n'
+                tecplot_file.write(msg.rstrip() + '\n')
+
+            if nresults:
+                for ivar in ivars:
+                    #tecplot_file.write('# ivar=%i\n' % ivar)
+                    vals = self.results[:, ivar].ravel()
+                    msg = ''
+                    for ival, val in enumerate(vals):
+                        msg += ' %15.9E' % val
+                        if (ival + 1) % 5 == 0:
+                            tecplot_file.write(msg)
+                            msg = '\n'
+                    tecplot_file.write(msg.rstrip() + '\n')
+
+        if adjust_nids:
+            elements = elements + 1
+        self.log.info('inode: min=%s max=%s' % (elements.min(), elements.max()))
+        assert elements.min() >= 1, elements.min()
+        assert elements.max() <= nnodes, elements.max()
+        savetxt(tecplot_file, elements, fmt=efmt)
+
     def slice_x(self, xslice):
-        """TODO: doesn't remove unused nodes/renumber elements"""
+        """removes the elements that are entirely above x=xslice"""
         x = self.xyz[:, 0]
         self._slice_plane(x, xslice)
 
     def slice_y(self, yslice):
-        """TODO: doesn't remove unused nodes/renumber elements"""
+        """removes the elements that are entirely above y=yslice"""
         y = self.xyz[:, 1]
         self._slice_plane(y, yslice)
 
     def slice_z(self, zslice):
-        """TODO: doesn't remove unused nodes/renumber elements"""
+        """removes the elements that are entirely above z=zslice"""
         z = self.xyz[:, 2]
         self._slice_plane(z, zslice)
 
     def slice_xyz(self, xslice, yslice, zslice):
-        """TODO: doesn't remove unused nodes/renumber elements"""
+        """removes the elements that are entirely above the x/y/z planes"""
         x = self.xyz[:, 0]
         y = self.xyz[:, 1]
         z = self.xyz[:, 2]
@@ -663,360 +922,243 @@ class Tecplot(FortranFormat):
             self._slice_plane_inodes(nodes)
 
     def _slice_plane(self, y, slice_value):
-        """
-        - Only works for CHEXA
-        - Doesn't remove unused nodes/renumber elements
-        """
+        """removes the elements that are entirely above y=slice_value"""
         slice_value = float(slice_value)
         inodes = where(y < slice_value)[0]
         self._slice_plane_inodes(inodes)
 
     def _slice_plane_inodes(self, inodes):
         """
-        TODO: doesn't remove unused nodes/renumber elements
-        """
-        # old_num = inodes
-        # new_num = arange(self.xyz.shape[0], dtype='int32')
-        #print('old =', old_num)
-        #print('new =', new_num)
-
-        # lookup_table = dict( zip( old_num, new_num ) ) # create your translation dict
-        # vect_lookup = np.vectorize( lookup_table.get ) # create a function to do the translation
-
-        nhexas = self.hexa_elements.shape[0]
-        if nhexas:
-            #boolean_hexa = self.hexa_elements.ravel() == inodes
-            #boolean_hexa = (self.hexa_elements.ravel() == inodes)#.all(axis=1)
-            boolean_hexa = in1d(self.hexa_elements.ravel(), inodes).reshape(nhexas, 8)
-            # print(boolean_hexa)
-            # assert len(boolean_hexa) == self.hexa_elements.shape[0]
-            assert True in boolean_hexa
-            irow = where(boolean_hexa)[0]
-            isave = unique(irow)
-            nsave = len(isave)
-            self.hexa_elements = self.hexa_elements[isave, :]
-            # print(self.hexa_elements)
-            #self.hexa_elements =
-
-            # vect_lookup(self.hexa_elements) # Reassign the elements you want to change
-            self.hexa_elements.reshape(nsave, 8)
-
-        # print(boolean_hexa)
-        # for hexa in hexas:
-            # if
-        # self.hexa_elements
-
-    def write_tecplot(self, tecplot_filename, res_types=None, is_points=True,
-                      adjust_nids=True):
-        """
-        Only handles single type writing
+        Keeps the elements that use any of the nodes and removes the
+        unused nodes.
 
         Parameters
         ----------
-        tecplot_filename : str
-            the path to the output file
-        res_types : str; List[str, str, ...]; default=None -> all
-            the results that will be written (must be consistent with
-            self.variables)
-        is_points : bool; default=True
-            write in POINT format vs. BLOCK format
-        adjust_nids : bool; default=True
-            element_ids are 0-based in binary and must be switched to
-            1-based in ASCII
+        inodes : (n, ) int ndarray
+            the nodes to keep
         """
-        self.log.info('writing tecplot %s' % tecplot_filename)
-        with open(tecplot_filename, 'w') as tecplot_file:
-            is_results = bool(len(self.results))
-            msg = 'TITLE     = "tecplot geometry and solution file"\n'
-            msg += 'VARIABLES = "x"\n'
-            msg += '"y"\n'
-            msg += '"z"\n'
-            if res_types is None:
-                res_types = self.variables
-            elif isinstance(res_types, string_types):
-                res_types = [res_types]
-            result_indices_to_write = []
-            if is_results:
-                #msg += '"rho"\n'
-                #msg += '"u"\n'
-                #msg += '"v"\n'
-                #msg += '"w"\n'
-                #msg += '"p"\n'
-                # msg += 'ZONE T="%s"\n' % r'\"processor 1\"'
-                # print('res_types =', res_types)
-                # print('vars =', self.variables)
-                for ivar, var in enumerate(res_types):
-                    if var not in self.variables:
-                        raise RuntimeError('var=%r not in variables=%s' % (var, self.variables))
-                    result_indices_to_write.append(self.variables.index(var))
-                ivars = unique(result_indices_to_write)
-                ivars.sort()
-                for ivar in ivars:
-                    var = self.variables[ivar]
-                    msg += '"%s"\n' % var
-                # print('ivars =', ivars)
-            else:
-                assert len(res_types) == 0, len(res_types)
-                ivars = []
-            msg += 'ZONE '
-
-            etype_elements = [
-                ('CHEXA', self.hexa_elements),
-                ('CTETRA', self.tet_elements),
-                ('CTRIA3', self.tri_elements),
-                ('CQUAD4', self.quad_elements),
-            ]
-            is_points = True
-            is_tets = False
-            is_hexas = False
-            is_tris = False
-            is_quads = False
-
-            nnodes = self.nnodes
-            nelements = self.nelements
-            for etype, elements in etype_elements:
-                if not len(elements):
-                    continue
-                if etype == 'CHEXA' and len(elements):
-                    #print(etype)
-                    # is_points = False
-                    is_hexas = True
-                    #nnodes_per_element = 8
-                    zone_type = 'FEBrick'
-                elif etype == 'CTETRA' and len(elements):
-                    #print(etype)
-                    # is_points = False
-                    is_tets = True
-                    #nnodes_per_element = 4
-                    zone_type = 'FETETRAHEDRON'
-                elif etype == 'CTRIA3' and len(elements):
-                    #print(etype)
-                    # is_points = True
-                    is_tris = True
-                    #nnodes_per_element = 3
-                    zone_type = 'FETRIANGLE'
-                elif etype == 'CQUAD4' and len(elements):
-                    #print(etype)
-                    # is_points = True
-                    is_quads = True
-                    #nnodes_per_element = 4
-                    zone_type = 'FEQUADRILATERAL'
-                else:
-                    self.log.info('etype=%r' % etype)
-                    self.log.info(elements)
-                    continue
-                break
-
-            self.log.info('is_points = %s' % is_points)
-            if is_points:
-                msg += ' n=%i, e=%i, ZONETYPE=%s, DATAPACKING=POINT\n' % (
-                    nnodes, nelements, zone_type)
-            else:
-                msg += ' n=%i, e=%i, ZONETYPE=%s, DATAPACKING=BLOCK\n' % (
-                    nnodes, nelements, zone_type)
-            tecplot_file.write(msg)
-
-            # xyz
-            assert self.nnodes > 0, 'nnodes=%s' % self.nnodes
-            nresults = len(ivars)
-            if is_points:
-                if nresults:
-                    res = self.results[:, ivars]
-                    try:
-                        data = hstack([self.xyz, res])
-                    except ValueError:
-                        msg = 'Cant hstack...\n'
-                        msg += 'xyz.shape=%s\n' % str(self.xyz.shape)
-                        msg += 'results.shape=%s\n' % str(self.results.shape)
-                        raise ValueError(msg)
-                    fmt = ' %15.9E' * (3 + nresults)
-                else:
-                    data = self.xyz
-                    fmt = ' %15.9E %15.9E %15.9E'
-
-                if PY3:
-                    #vals = self.xyz[:, ivar].ravel()
-                    for vals in data:
-                        tecplot_file.write(fmt % tuple(vals))
-                else:
-                    savetxt(tecplot_file, data, fmt=fmt)
-            else:
-                #nvalues_per_line = 5
-                for ivar in range(3):
-                    #tecplot_file.write('# ivar=%i\n' % ivar)
-                    vals = self.xyz[:, ivar].ravel()
-                    msg = ''
-                    for ival, val in enumerate(vals):
-                        msg += ' %15.9E' % val
-                        if (ival + 1) % 3 == 0:
-                            tecplot_file.write(msg)
-                            msg = '\n'
-                    tecplot_file.write(msg.rstrip() + '\n')
-
-                if nresults:
-                    # print('nnodes_per_element =', nnodes_per_element)
-                    # for ivar in range(nnodes_per_element):
-                    for ivar in ivars:
-                        #tecplot_file.write('# ivar=%i\n' % ivar)
-                        vals = self.results[:, ivar].ravel()
-                        msg = ''
-                        for ival, val in enumerate(vals):
-                            msg += ' %15.9E' % val
-                            if (ival + 1) % 5 == 0:
-                                tecplot_file.write(msg)
-                                msg = '\n'
-                        tecplot_file.write(msg.rstrip() + '\n')
-
-            self.log.info('is_hexas=%s is_tets=%s is_quads=%s is_tris=%s' %
-                          (is_hexas, is_tets, is_quads, is_tris))
-            if is_hexas:
-                efmt = ' %i %i %i %i %i %i %i %i\n'
-                elements = self.hexa_elements
-            elif is_tets:
-                efmt = ' %i %i %i %i\n'
-                elements = self.tet_elements
-            elif is_quads:
-                efmt = ' %i %i %i %i\n'
-                elements = self.quad_elements
-            elif is_tris:
-                efmt = ' %i %i %i\n'
-                elements = self.tri_elements
-            else:
-                raise RuntimeError()
-
-            if adjust_nids:
-                elements += 1
-            self.log.info('inode: min=%s max=%s' % (elements.min(), elements.max()))
-            assert elements.min() >= 1, elements.min()
-            assert elements.max() <= nnodes, elements.max()
-            # assert elements.min() == 1, elements.min()
-            # assert elements.max() == nnodes, elements.max()
-
-            for element in elements:
-                tecplot_file.write(efmt % tuple(element))
-
-    def skin_elements(self):
-        tris = []
-        quads = []
+        is_kept = zeros(self.nnodes, dtype='bool')
+        is_kept[inodes] = True
+        for name in ['hexa_elements', 'tet_elements', 'quad_elements', 'tri_elements']:
+            elements = getattr(self, name)
+            if len(elements):
+                ikeep = is_kept[elements].any(axis=1)
+                setattr(self, name, elements[ikeep, :])
+        self._remove_unused_nodes()
+
+    def _remove_unused_nodes(self):
+        """removes the nodes that aren't used by an element and renumbers the elements"""
+        names = ['hexa_elements', 'tet_elements', 'quad_elements', 'tri_elements']
+        elements_list = [getattr(self, name) for name in names]
+        used_nodes = unique(hstack([elements.ravel() for elements in elements_list]))
+        inode_new = zeros(self.nnodes, dtype='int32')
+        inode_new[used_nodes] = arange(len(used_nodes), dtype='int32')
+
+        self.xyz = self.xyz[used_nodes, :]
+        if self.results.ndim == 2:
+            self.results = self.results[used_nodes, :]
+        for name, elements in zip(names, elements_list):
+            if len(elements):
+                setattr(self, name, inode_new[elements])
+
+    def _get_solid_faces(self):
+        """
+        Gets the faces of the CTETRAs and CHEXAs
+
+        Returns
+        -------
+        faces : (nfaces, 4) int ndarray
+            the faces; the CTETRA faces repeat the 3rd node
+        is_tri : (nfaces, ) bool ndarray
+            is this a CTETRA face
+        """
+        faces = []
+        is_tri = []
         if len(self.tet_elements):
-            faces1 = self.tet_elements[:, :3]
-            faces2 = self.tet_elements[:, 1:4]
-            faces3 = self.tet_elements[:, [2, 3, 0]]
-            tris.append(faces1)
-            tris.append(faces2)
-            tris.append(faces3)
-
+            tets = self.tet_elements
+            for face in TET_FACES:
+                faces.append(tets[:, face + (face[2], )])
+                is_tri.append(ones(tets.shape[0], dtype='bool'))
         if len(self.hexa_elements):
-            faces1 = self.hexa_elements[:, :4]
-            faces2 = self.hexa_elements[:, 4:7]
-            assert faces1.shape[1] == 4, faces1.shape
-            assert faces2.shape[1] == 4, faces2.shape
-            #faces3 = self.hexa_elements[:, [2, 3, 0]]
-            # TODO: others CHEXA faces...
-            quads.append(faces1)
-            quads.append(faces2)
-
-        # if tris:
-            # tris = vstack(tris)
-            # tris.sort(axis=0)
-            # tris = unique_rows(tris)
-        # if quads:
-            # quads = vstack(quads)
-            # quads.sort(axis=0)
-            # quads = unique_rows(tris)
+            hexas = self.hexa_elements
+            for face in HEXA_FACES:
+                faces.append(hexas[:, face])
+                is_tri.append(zeros(hexas.shape[0], dtype='bool'))
+        if len(faces) == 0:
+            return zeros((0, 4), dtype='int32'), zeros(0, dtype='bool')
+        return vstack(faces), hstack(is_tri)
+
+    def skin_elements(self):
+        """
+        Gets the exterior faces of the CTETRAs and CHEXAs
+
+        Returns
+        -------
+        tris : (ntris, 3) int ndarray
+            the free CTETRA faces
+        quads : (nquads, 4) int ndarray
+            the free CHEXA faces
+        """
+        faces, is_tri = self._get_solid_faces()
+        ifree = _get_free_face_indices(faces)
+        is_tri = is_tri[ifree]
+        free_faces = faces[ifree, :]
+        tris = free_faces[is_tri, :3]
+        quads = free_faces[~is_tri, :]
         return tris, quads
 
     def get_free_faces(self):
-        """get the free faces for hexa elements"""
+        """
+        Gets the free faces for the CTETRAs and CHEXAs
+
+        A face is free if it is used by a single element.  The faces of
+        degenerate CHEXAs with fewer than 3 unique nodes are skipped.
+
+        Returns
+        -------
+        free_faces : (nfaces, 4) int ndarray
+            the free faces; the CTETRA faces repeat the 3rd node
+        """
         self.log.info('start get_free_faces')
-        sort_face_to_element_map = defaultdict(list)
-        sort_face_to_face = {}
-        for ie, element in enumerate(self.hexa_elements):
-            btm = [element[0], element[1], element[2], element[3]]
-            top = [element[4], element[5], element[6], element[7]]
-            left = [element[0], element[3], element[7], element[4]]
-            right = [element[1], element[2], element[6], element[5]]
-            front = [element[0], element[1], element[5], element[4]]
-            back = [element[3], element[2], element[6], element[7]]
-            for face in [btm, top, left, right, front, back]:
-                if len(unique(face)) >= 3:
-                    sort_face = tuple(sorted(face))
-                    sort_face_to_element_map[sort_face].append(ie)
-                    sort_face_to_face[sort_face] = face
-
-        free_faces = []
-        for sort_face, eids in iteritems(sort_face_to_element_map):
-            if len(eids) == 1:
-                free_faces.append(sort_face_to_face[sort_face])
+        faces = self._get_solid_faces()[0]
+        free_faces = faces[_get_free_face_indices(faces), :]
         self.log.info('finished get_free_faces')
         return free_faces
 
-    def extract_y_slice(self, y0, tol=0.01, slice_filename=None):
+    def extract_slice(self, origin, normal, tol=0.0, slice_filename=None):
         """
-        doesn't work...
+        Cuts the CTETRAs and CHEXAs with a plane
+
+        The solids are split into tets, which are cut with marching
+        tetrahedra.  The nodes and results are linearly interpolated
+        along the cut edges.
+
+        Parameters
+        ----------
+        origin : (3, ) float ndarray
+            a point on the plane
+        normal : (3, ) float ndarray
+            the normal to the plane
+        tol : float; default=0.0
+            nodes within tol of the plane are treated as being on the plane
+        slice_filename : str; default=None
+            write the slice to a Tecplot file
+
+        Returns
+        -------
+        model : Tecplot()
+            the slice as a CTRIA3 surface zone
         """
         self.log.info('slicing...')
-        y = self.xyz[:, 1]
-        nodes = self.xyz
-        assert tol > 0.0, tol
-        elements = self.hexa_elements
+        origin = array(origin, dtype='float64')
+        normal = array(normal, dtype='float64')
+        normal /= norm(normal)
+        assert tol >= 0.0, tol
+
+        # signed distance to the plane
+        dist = (self.xyz - origin).dot(normal)
+        dist[abs(dist) <= tol] = 0.
+
+        tets = self._get_tets()
+        is_above = dist[tets] > 0.
+        cases = (is_above[:, 0] + 2 * is_above[:, 1] +
+                 4 * is_above[:, 2] + 8 * is_above[:, 3])
+
+        # the (tet, edge) of the 3 corners of each triangle
+        itets = []
+        iedges = []
+        for case, tri_edges in iteritems(TET_CUT_EDGES):
+            icase = where(cases == case)[0]
+            if len(icase) == 0:
+                continue
+            for edges in tri_edges:
+                itets.append(icase)
+                iedges.append(tile(edges, (len(icase), 1)))
+
+        model = Tecplot(log=self.log, debug=self.debug)
+        model.variables = self.variables
+        if len(itets) == 0:
+            self.log.warning('the plane does not cut the model')
+            return model
+        itets = hstack(itets)
+        iedges = vstack(iedges)
+
+        # the nodes of the cut edges; inode1 is above the plane
+        edges = TET_EDGES[iedges]
+        inode1 = tets[itets[:, None], edges[:, :, 0]]
+        inode2 = tets[itets[:, None], edges[:, :, 1]]
+        swap = dist[inode1] <= 0.
+        inode1[swap], inode2[swap] = inode2[swap], inode1[swap]
+
+        # an edge that ends on the plane is cut at its node
+        is_on_plane = dist[inode2] == 0.
+        inode1[is_on_plane] = inode2[is_on_plane]
+
+        # the triangles share the points on the cut edges
+        edge_keys = vstack([inode1.ravel(), inode2.ravel()]).T
+        unique_edges, ipoint = unique_rows(edge_keys, return_inverse=True)
+        tris = ipoint.reshape(len(itets), 3)
+
+        # remove the collapsed triangles
+        is_valid = ((tris[:, 0] != tris[:, 1]) & (tris[:, 1] != tris[:, 2]) &
+                    (tris[:, 0] != tris[:, 2]))
+        tris = tris[is_valid, :]
+
+        n1 = unique_edges[:, 0]
+        n2 = unique_edges[:, 1]
+        dist1 = dist[n1]
+        dist2 = dist[n2]
+        denom = dist1 - dist2
+        denom[n1 == n2] = 1.
+        percent = (dist1 / denom)[:, None]
+        percent[n1 == n2] = 0.
+
+        xyz = self.xyz
+        model.xyz = (xyz[n1] + percent * (xyz[n2] - xyz[n1])).astype(xyz.dtype)
         results = self.results
-
-        iy = where((y0 - tol <= y) & (y <= y0 + tol))[0]
-
-        self.log.debug(y[iy])
-        self.log.debug(nodes[iy, 1].min(), nodes[iy, 1].max())
-        #iy = where(y <= y0 + tol)[0]
-        assert len(iy) > 0, iy
-        #inode = iy + 1
-
-
-        # find all elements that have iy within tolerance
-        #slots = where(elements == iy)
-        #slots = where(element for element in elements
-                      #if any(iy in element))
-        #slots = where(iy == elements.ravel())[0]
-        ielements = unique([ie for ie, elem in enumerate(elements)
-                            for i in range(8)
-                            if i in iy])
-        #print(slots)
-        #ri, ci = slots
-        #ri = unique(hstack([where(element == iy)[0] for element in elements]))
-        #ri = [ie for ie, element in enumerate(elements)
-              #if [n for n in element
-                  #if n in iy]]
-        #ri = [where(element == iy)[0] for element in elements if where(element == iy)[0]]
-        #print(ri)
-        #ielements = unique(ri)
-        self.log.debug(ielements)
-        assert len(ielements) > 0, ielements
-
-        # find nodes
-        elements2 = elements[ielements, :]
-        inodes = unique(elements2)
-        assert len(inodes) > 0, inodes
-
-        # renumber the nodes
-        nidmap = {}
-        for inode, nid in enumerate(inodes):
-            nidmap[nid] = inode
-        elements3 = array(
-            [[nidmap[nid] for nid in element]
-             for element in elements2],
-            dtype='int32')
-
-        self.log.debug(inodes)
-        nodes2 = nodes[inodes, :]
-        results2 = results[inodes, :]
-        model = Tecplot()
-        model.xyz = nodes2
-        model.results = results2
-        model.hexa_elements = elements3
+        if results.ndim == 2:
+            model.results = (results[n1] + percent * (results[n2] - results[n1])).astype(
+                results.dtype)
+        model.tri_elements = tris.astype('int32')
+        model._remove_unused_nodes()
+        self.log.info('nnodes=%s ntris=%s' % (model.nnodes, model.nelements))
 
         if slice_filename:
             model.write_tecplot(slice_filename)
         return model
 
+    def extract_y_slice(self, y0, tol=0.01, slice_filename=None):
+        """
+        Cuts the CTETRAs and CHEXAs at y=y0
+
+        Parameters
+        ----------
+        y0 : float
+            the y location of the cut
+        tol : float; default=0.01
+            nodes within tol of the plane are treated as being on the plane
+        slice_filename : str; default=None
+            write the slice to a Tecplot file
+
+        Returns
+        -------
+        model : Tecplot()
+            the slice as a CTRIA3 surface zone
+        """
+        return self.extract_slice([0., y0, 0.], [0., 1., 0.], tol=tol,
+                                  slice_filename=slice_filename)
+
+    def _get_tets(self):
+        """splits the CTETRAs and CHEXAs into tets"""
+        tets = []
+        if len(self.tet_elements):
+            tets.append(self.tet_elements)
+        if len(self.hexa_elements):
+            hexas = self.hexa_elements
+            tets.extend([hexas[:, tet] for tet in HEXA_TO_TETS])
+        if len(tets) == 0:
+            return zeros((0, 4), dtype='int32')
+        return vstack(tets)
 
 
 def main():  # pragma: no cover
@@ -1196,6 +1338,119 @@ def main2():  # pragma: no cover
         plt.write_tecplot('processor_%i.plt' % iprocessor)
 
 
+def _read_ascii_values(tecplot_file, line, nvalues, dtype):
+    """
+    Reads a block of values that may span many lines
+
+    Parameters
+    ----------
+    tecplot_file : file
+        the open file
+    line : str
+        the first line of the block
+    nvalues : int
+        the number of values in the block
+    dtype : str
+        the numpy type
+
+    Returns
+    -------
+    values : (nvalues, ) ndarray
+        the values
+    line : str
+        the first line after the block
+    """
+    if nvalues == 0:
+        return zeros(0, dtype=dtype), line
+
+    lines = []
+    nread = 0
+    while 1:
+        if line and line[0] != '#':
+            lines.append(line)
+            nread += len(line.split())
+            if nread >= nvalues:
+                break
+        line = tecplot_file.readline()
+        if not line:
+            raise RuntimeError('end of file; expected %s values; found %s' % (nvalues, nread))
+        line = line.strip()
+
+    if nread != nvalues:
+        raise RuntimeError('expected %s values; found %s; the last line is %r' % (
+            nvalues, nread, line))
+    values = fromstring(' '.join(lines), dtype=dtype, sep=' ')
+    if len(values) != nvalues:
+        raise SyntaxError('cannot parse %s values; expected %s; found %s' % (
+            dtype, nvalues, len(values)))
+    line = tecplot_file.readline().strip()
+    return values, line
+
+
+def _get_result_columns(variables, use_cols, nxyz=3):
+    """
+    Gets the columns of the results to read
+
+    Parameters
+    ----------
+    variables : List[str]
+        the variables in the file
+    use_cols : List[str]; default=None -> all
+        the variables to read; x, y, z are skipped
+    nxyz : int; default=3
+        the number of leading variables that are x, y, z
+
+    Returns
+    -------
+    ires : List[int]
+        the sorted columns of the requested results
+    """
+    if use_cols is None:
+        return list(range(nxyz, len(variables)))
+    if isinstance(use_cols, string_types):
+        use_cols = [use_cols]
+
+    ires = []
+    for var in use_cols:
+        if var not in variables:
+            raise RuntimeError('var=%r not in variables=%s' % (var, variables))
+        ivar = variables.index(var)
+        if ivar >= nxyz:
+            ires.append(ivar)
+    return sorted(set(ires))
+
+
+def _get_free_face_indices(faces):
+    """
+    Gets the faces that are used by a single element
+
+    Parameters
+    ----------
+    faces : (nfaces, 4) int ndarray
+        the faces; a triangle repeats a node
+
+    Returns
+    -------
+    ifree : (nfree, ) int ndarray
+        the indices of the free faces
+    """
+    if len(faces) == 0:
+        return zeros(0, dtype='int32')
+
+    # the canonical face is the sorted unique nodes (padded with -1)
+    sorted_faces = np_sort(faces, axis=1)
+    is_repeated = sorted_faces[:, 1:] == sorted_faces[:, :-1]
+    sorted_faces[:, 1:][is_repeated] = -1
+    sorted_faces.sort(axis=1)
+
+    # faces with fewer than 3 unique nodes don't have an area
+    ivalid = where(sorted_faces[:, 1] >= 0)[0]
+    unused_unique_faces, iface = unique_rows(
+        sorted_faces[ivalid, :], return_inverse=True)
+    counts = bincount(iface)
+    return ivalid[counts[iface] == 1]
+
+
 def _header_lines_to_header_dict(header_lines):
     """parses the parsed header lines"""
     headers_dict = {}
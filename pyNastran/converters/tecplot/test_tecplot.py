@@ -1,7 +1,9 @@
 import os
 import unittest
 
-from pyNastran.converters.tecplot.tecplot import read_tecplot
+import numpy as np
+
+from pyNastran.converters.tecplot.tecplot import read_tecplot, write_tecplot_zones
 from pyNastran.converters.tecplot.tecplot_to_nastran import tecplot_to_nastran_filename
 from pyNastran.converters.nastran.nastran_to_tecplot import nastran_to_tecplot, nastran_to_tecplot_filename
 from pyNastran.utils.log import get_logger
@@ -35,6 +37,51 @@ class TestTecplot(unittest.TestCase):
         #os.remove(nastran_filename2)
         #os.remove(tecplot_filename)
 
+    def test_tecplot_03(self):
+        """streams zones with a subset of the results"""
+        log = get_logger(level='warning')
+        tecplot_filename1 = os.path.join(model_path, 'ascii', 'point_fetet_3d.dat')
+        tecplot_filename2 = os.path.join(model_path, 'ascii', 'point_fetet_3d_zones.dat')
+
+        # write the same zone twice
+        model = read_tecplot(tecplot_filename1, log=log)
+        zones = model.iter_zones(tecplot_filename1, use_cols=['U', 'W'])
+        write_tecplot_zones(tecplot_filename2, [next(zones), model], res_types=['U', 'W'])
+
+        zones = list(model.iter_zones(tecplot_filename2))
+        assert len(zones) == 2, len(zones)
+        for zone in zones:
+            assert zone.variables == ['x', 'y', 'z', 'U', 'W'], zone.variables
+            assert np.allclose(zone.xyz, model.xyz)
+            assert np.allclose(zone.results, model.results[:, [1, 3]])
+            assert np.array_equal(zone.tet_elements, model.tet_elements)
+
+        model2 = read_tecplot(tecplot_filename2, log=log)
+        os.remove(tecplot_filename2)
+        assert model2.nnodes == 2 * model.nnodes, model2.nnodes
+        assert np.array_equal(model2.tet_elements[20:, :], model.tet_elements + model.nnodes)
+
+    def test_tecplot_04(self):
+        """free faces and slicing"""
+        log = get_logger(level='warning')
+        tecplot_filename = os.path.join(model_path, 'ascii', 'block_febrick_3d.dat')
+        model = read_tecplot(tecplot_filename, log=log)
+        free_faces = model.get_free_faces()
+        tris, quads = model.skin_elements()
+        assert free_faces.shape == (16, 4), free_faces.shape
+        assert np.array_equal(free_faces, quads)
+        assert len(tris) == 0, tris
+
+        y0 = model.xyz[:, 1].mean()
+        slice_model = model.extract_y_slice(y0, tol=0.)
+        assert slice_model.nelements > 0
+        assert np.allclose(slice_model.xyz[:, 1], y0)
+        assert slice_model.results.shape == (slice_model.nnodes, 1), slice_model.results.shape
+
+        model.slice_y(y0)
+        assert model.xyz[model.hexa_elements, 1].min(axis=1).max() < y0
+        assert model.nnodes == len(np.unique(model.hexa_elements)), model.nnodes
+
     def _test_tecplot_02(self):
         nastran_filename1 = os.path.join(nastran_path, 'solid_bending', 'solid_bending.bdf')
         nastran_filename2 = os.path.join(nastran_path, 'solid_bending', 'solid_bending2.bdf')
@@ -8,6 +8,9 @@ from pyNastran.converters.fast.test_fast import TestFast
 from pyNastran.converters.panair.test_panair import TestPanair
 from pyNastran.converters.stl.test_stl import TestSTL
 from pyNastran.converters.tecplot.test_tecplot import TestTecplot
+from pyNastran.converters.usm3d.test_usm3d import TestUsm3d
+from pyNastran.converters.openfoam.test_openfoam import TestOpenFoam
+from pyNastran.converters.test_mesh_stream import TestMeshStream
 from pyNastran.converters.abaqus.test_unit_abaqus import TestAbaqus
 
 from pyNastran.converters.aflr.aflr2.test_bedge import TestBEdge
@@ -0,0 +1,98 @@
+"""
+tests the streaming format_converter pipeline
+"""
+import os
+import unittest
+
+import numpy as np
+
+import pyNastran
+from pyNastran.bdf.bdf import read_bdf
+from pyNastran.converters.cart3d.cart3d import read_cart3d
+from pyNastran.converters.stl.stl import read_stl
+from pyNastran.converters.aflr.ugrid.ugrid_reader import read_ugrid
+from pyNastran.converters.mesh_stream import (
+    read_cart3d_source, read_nastran_source, read_ugrid_source,
+    ScaledSource, FilteredSource, write_mesh_source)
+from pyNastran.converters.type_converter import run
+from pyNastran.utils.log import get_logger
+
+PKG_PATH = pyNastran.__path__[0]
+CART3D_PATH = os.path.join(PKG_PATH, 'converters', 'cart3d', 'models')
+MODEL_PATH = os.path.join(PKG_PATH, '..', 'models')
+
+
+class TestMeshStream(unittest.TestCase):
+
+    def test_mesh_stream_cart3d(self):
+        """tests the memmapped Cart3D source and the Cart3D/STL writers"""
+        log = get_logger(level='warning', encoding='utf-8')
+        cart3d_filename = os.path.join(CART3D_PATH, 'threePlugs.bin.tri')
+        cart3d_filename_ascii = os.path.join(CART3D_PATH, 'threePlugs_stream.tri')
+        cart3d_filename_bin = os.path.join(CART3D_PATH, 'threePlugs_stream.bin.tri')
+        stl_filename = os.path.join(CART3D_PATH, 'threePlugs_stream.stl')
+        model = read_cart3d(cart3d_filename, log=log)
+
+        source = read_cart3d_source(cart3d_filename, log=log)
+        assert isinstance(source.nodes, np.memmap)
+        assert source.nnodes == model.points.shape[0], source.nnodes
+        for is_binary, filename in [(False, cart3d_filename_ascii),
+                                    (True, cart3d_filename_bin)]:
+            write_mesh_source(source, 'cart3d', filename, is_binary=is_binary)
+            model2 = read_cart3d(filename, log=log)
+            assert np.allclose(model2.points, model.points, atol=1e-6)
+            assert np.array_equal(model2.elements, model.elements)
+            assert np.array_equal(model2.regions, model.regions)
+            os.remove(filename)
+
+        # scaling and region filters are pipeline stages
+        source2 = FilteredSource(ScaledSource(source, 2.), regions=[1])
+        nregion1 = (model.regions == 1).sum()
+        assert source2.get_element_counts()['tri3'] == nregion1, source2.get_element_counts()
+        write_mesh_source(source2, 'stl', stl_filename, is_binary=True)
+        stl = read_stl(stl_filename, log=log)
+        os.remove(stl_filename)
+        assert stl.elements.shape[0] == nregion1, stl.elements.shape
+        assert np.allclose(stl.nodes.max(), 2. * model.points[model.elements[model.regions == 1]].max())
+
+        data = {'--scale' : 1.0, '--binary' : False, '--regions' : None}
+        run('cart3d', cart3d_filename, 'stl', stl_filename, data)
+        stl = read_stl(stl_filename, log=log)
+        os.remove(stl_filename)
+        assert stl.elements.shape == model.elements.shape, stl.elements.shape
+        del source, source2
+
+    def test_mesh_stream_ugrid(self):
+        """tests Nastran -> UGRID -> Nastran"""
+        log = get_logger(level='warning', encoding='utf-8')
+        bdf_filename = os.path.join(MODEL_PATH, 'solid_bending', 'solid_bending.bdf')
+        ugrid_filename = os.path.join(MODEL_PATH, 'solid_bending', 'solid_bending_stream.b8.ugrid')
+        bdf_filename_out = os.path.join(MODEL_PATH, 'solid_bending', 'solid_bending_stream.bdf')
+
+        source = read_nastran_source(bdf_filename, log=log)
+        write_mesh_source(source, 'ugrid', ugrid_filename)
+        ugrid = read_ugrid(ugrid_filename, log=log)
+        assert np.allclose(ugrid.nodes, source.nodes)
+        assert np.array_equal(ugrid.tets - 1, source.elements['tet4'][0])
+
+        source2 = read_ugrid_source(ugrid_filename, log=log)
+        write_mesh_source(source2, 'nastran', bdf_filename_out)
+        del source2
+        os.remove(ugrid_filename)
+
+        model = read_bdf(bdf_filename, log=log)
+        model2 = read_bdf(bdf_filename_out, log=log)
+        os.remove(bdf_filename_out)
+        assert len(model2.nodes) == len(model.nodes), len(model2.nodes)
+        assert len(model2.elements) == len(model.elements), len(model2.elements)
+        assert model2.card_count['PSOLID'] == 1, model2.card_count
+
+        # the nodes are renumbered from 1
+        nids = sorted(model.nodes)
+        xyz = np.array([model.nodes[nid].get_position() for nid in nids])
+        xyz2 = np.array([model2.nodes[nid].get_position() for nid in sorted(model2.nodes)])
+        assert np.allclose(xyz, xyz2)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
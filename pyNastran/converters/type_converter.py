@@ -9,11 +9,41 @@ from docopt import docopt
 # stl_to_plot3d ???
 
 
+def process_source(source, fmt2, fname2, data):
+    """
+    Writes a mesh source through the streaming pipeline
+
+    The --scale and --regions options are applied as pipeline stages.
+    Cart3D/STL only support surfaces, so the volume elements are
+    filtered out.
+    """
+    from pyNastran.converters.mesh_stream import (
+        ScaledSource, FilteredSource, SHELL_TYPES, write_mesh_source)
+    scale = data['--scale']
+    if scale is not None and scale != 1.0:
+        source = ScaledSource(source, scale)
+
+    etypes = None
+    if fmt2 in ['stl', 'cart3d']:
+        etypes = SHELL_TYPES
+    regions = data.get('--regions')
+    if etypes is not None or regions is not None:
+        source = FilteredSource(source, etypes=etypes, regions=regions)
+    write_mesh_source(source, fmt2, fname2, is_binary=data.get('--binary', False))
+
+
 def process_nastran(bdf_filename, fmt2, fname2, data=None, debug=True):
     """
     Converts Nastran to STL/Cart3d/Tecplot/UGRID3d
     """
     assert fmt2 in ['stl', 'cart3d', 'tecplot', 'ugrid', 'nastran'], 'format2=%s' % fmt2
+    if fmt2 in ['stl', 'cart3d', 'ugrid']:
+        # the BDF isn't cross-referenced and no intermediate model is built
+        from pyNastran.converters.mesh_stream import read_nastran_source
+        source = read_nastran_source(bdf_filename)
+        process_source(source, fmt2, fname2, data)
+        return
+
     from pyNastran.bdf.bdf import BDF
     xref = True
     if fmt2 == 'ugrid':
@@ -55,6 +85,13 @@ def process_cart3d(cart3d_filename, fmt2, fname2, data):
     Converts Cart3d to STL/Nastran/Tecplot/Cart3d
     """
     assert fmt2 in ['stl', 'nastran', 'tecplot', 'cart3d'], 'format2=%s' % fmt2
+    if fmt2 in ['stl', 'nastran']:
+        # binary files are memmapped
+        from pyNastran.converters.mesh_stream import read_cart3d_source
+        source = read_cart3d_source(cart3d_filename)
+        process_source(source, fmt2, fname2, data)
+        return
+
     from pyNastran.converters.cart3d.cart3d import read_cart3d
 
     model = read_cart3d(cart3d_filename)
@@ -92,6 +129,14 @@ def process_stl(stl_filename, fmt2, fname2, data=None):
     from pyNastran.converters.stl.utils import merge_stl_files
 
     model = merge_stl_files(stl_filenames, stl_out_filename=None)
+    if fmt2 in ['nastran', 'cart3d']:
+        from collections import OrderedDict
+        from pyNastran.converters.mesh_stream import MeshSource
+        elements = OrderedDict([('tri3', (model.elements, 1))])
+        source = MeshSource(model.nodes, elements, log=model.log)
+        process_source(source, fmt2, fname2, data)
+        return
+
     scale = data['--scale']
     if scale is not None:
         assert isinstance(scale, float), 'scale=%r type=%r' % (scale, type(scale))
@@ -183,38 +228,17 @@ def process_ugrid(ugrid_filename, fmt2, fname2, data=None):
     Converts UGRID to Nastran/Cart3d/STL/Tecplot
     """
     assert fmt2 in ['stl', 'nastran', 'cart3d', 'tecplot'], 'format2=%s' % fmt2
-    read_shells = True
-    read_solids = True
-    if fmt2 in ['stl', 'cart3d']:
-        read_shells = True
-        read_solids = False
-
-
-    from pyNastran.converters.aflr.ugrid.ugrid_reader import UGRID
-    model = UGRID(read_shells=read_shells, read_solids=read_solids)
-    model.read_ugrid(ugrid_filename)
-    if fmt2 == 'nastran':
-        # ugrid_to_nastran(model, fname2
-        include_shells = True
-        include_solids = True
-        bdf_filename = fname2
-        model.write_bdf(bdf_filename, include_shells=include_shells, include_solids=include_solids)
-    elif fmt2 == 'cart3d':
-        include_shells = True
-        include_solids = False
-        bdf_filename = fname2 + '.bdf'
-        model.write_bdf(bdf_filename, include_shells=include_shells, include_solids=include_solids)
-        # ugrid_to_cart3d(model, fname2)
-        process_nastran(bdf_filename, 'cart3d', fname2, data=None)
-    elif fmt2 == 'stl':
-        include_shells = True
-        include_solids = False
-        bdf_filename = fname2 + '.bdf'
-        model.write_bdf(bdf_filename, include_shells=include_shells, include_solids=include_solids)
-        process_nastran(bdf_filename, 'cart3d', fname2, data=None)
-        # ugrid_to_stl(model, fname2)
+    read_solids = fmt2 in ['nastran', 'tecplot']
+    if fmt2 in ['nastran', 'cart3d', 'stl']:
+        # the nodes/solids are memmapped
+        from pyNastran.converters.mesh_stream import read_ugrid_source
+        source = read_ugrid_source(ugrid_filename, read_solids=read_solids)
+        process_source(source, fmt2, fname2, data)
     elif fmt2 == 'tecplot':
+        from pyNastran.converters.aflr.ugrid.ugrid_reader import UGRID
         from pyNastran.converters.aflr.ugrid.ugrid3d_to_tecplot import ugrid_to_tecplot
+        model = UGRID(read_shells=True, read_solids=read_solids)
+        model.read_ugrid(ugrid_filename)
         # ugrid_to_tecplot(model, fname2)
         tecplot = ugrid_to_tecplot(model)
         element_slice(tecplot, data)
@@ -246,9 +270,9 @@ def main():
     msg = "Usage:\n"
     msg += "  format_converter nastran   <INPUT> <format2> <OUTPUT> [-o <OP2>] --no_xref\n"
     msg += "  format_converter <format1> <INPUT> tecplot   <OUTPUT> [-r RESTYPE...] [-b] [--block] [-x <X>] [-y <Y>] [-z <Z>] [--scale SCALE]\n"
-    msg += "  format_converter <format1> <INPUT> stl       <OUTPUT> [-b]  [--scale SCALE]\n"
-    msg += "  format_converter cart3d    <INPUT> <format2> <OUTPUT> [-b]  [--scale SCALE]\n"
-    msg += "  format_converter <format1> <INPUT> <format2> <OUTPUT> [--scale SCALE]\n"
+    msg += "  format_converter <format1> <INPUT> stl       <OUTPUT> [-b]  [--scale SCALE] [--regions REGIONS]\n"
+    msg += "  format_converter cart3d    <INPUT> <format2> <OUTPUT> [-b]  [--scale SCALE] [--regions REGIONS]\n"
+    msg += "  format_converter <format1> <INPUT> <format2> <OUTPUT> [--scale SCALE] [--regions REGIONS]\n"
     #msg += "  format_converter nastran  <INPUT> <format2> <OUTPUT>\n"
     #msg += "  format_converter cart3d   <INPUT> <format2> <OUTPUT>\n"
     msg += '  format_converter -h | --help\n'
@@ -279,6 +303,11 @@ def main():
     msg += "  --scale SCALE  Apply a scale factor to the XYZ locations (default=1.0)\n"
     msg += "  -b, --binary   writes the STL in binary (not supported for Tecplot)\n"
 
+    msg += "\n"
+    msg += "Nastran/Cart3d/STL/UGRID Output Options:\n"
+    msg += "  --regions REGIONS  Only writes the elements in these comma separated\n"
+    msg += "                     regions/property ids (e.g., 1,2,5)\n"
+
     msg += "\n"
     msg += "Info:\n"
     msg += "  -h, --help     show this help message and exit\n"
@@ -291,6 +320,8 @@ def main():
     msg += "  UGRID outfiles must be of the form model.b8.ugrid, where\n"
     msg += "    b8, b4, lb8, lb4 are valid choices and periods are important\n"
     msg += "  Scale has only been tested on STL -> STL\n"
+    msg += "  Nastran/Cart3d/STL/UGRID -> Nastran/Cart3d/STL/UGRID write the mesh in chunks;\n"
+    msg += "    Cart3d/STL only write the surface elements\n"
 
     import pyNastran
     ver = str(pyNastran.__version__)
@@ -324,6 +355,8 @@ def main():
         data['--scale'] = eval(data['--scale'])
     else:
         data['--scale'] = 1.0
+    if data['--regions']:
+        data['--regions'] = [int(region) for region in data['--regions'].split(',')]
 
     print(data)
     input_filename = data['<INPUT>']
@@ -0,0 +1,61 @@
+"""
+tests non-gui related Usm3d class/interface
+"""
+import os
+import unittest
+
+import numpy as np
+
+import pyNastran
+from pyNastran.converters.usm3d.usm3d_reader import Usm3d
+from pyNastran.utils.log import get_logger
+
+
+PKG_PATH = pyNastran.__path__[0]
+MODEL_PATH = os.path.join(PKG_PATH, 'converters', 'usm3d', 'box')
+
+
+class TestUsm3d(unittest.TestCase):
+
+    def test_usm3d_cogsg_flo_01(self):
+        """tests the box.cogsg/box.flo with all and some of the nodes"""
+        log = get_logger(level='warning', encoding='utf-8')
+        cogsg_filename = os.path.join(MODEL_PATH, 'box.cogsg')
+        flo_filename = os.path.join(MODEL_PATH, 'box.flo')
+
+        model = Usm3d(log=log)
+        nodes, tets = model.read_cogsg(cogsg_filename)
+        nnodes = nodes.shape[0]
+        assert tets.shape == (63926, 4), tets.shape
+        assert tets.min() == 0, tets.min()
+        assert tets.max() == nnodes - 1, tets.max()
+
+        node_ids, loads = model.read_flo(flo_filename, n=nnodes)
+        assert np.array_equal(node_ids, np.arange(1, nnodes + 1)), node_ids
+
+        node_ids2, loads2 = model.read_flo(flo_filename, node_ids=[100, 1, 5])
+        assert np.array_equal(node_ids2, [100, 1, 5]), node_ids2
+        for name in ['Cp', 'Mach', 'rho']:
+            assert np.array_equal(loads2[name], loads[name][[99, 0, 4]]), name
+
+    def test_usm3d_flo_02(self):
+        """tests a *.flo with Nastran-esque exponents and 6 values on a line"""
+        log = get_logger(level='warning', encoding='utf-8')
+        flo_filename = os.path.join(MODEL_PATH, 'exponents.flo')
+        with open(flo_filename, 'w') as flo_file:
+            flo_file.write(
+                '   0.8447000\n'
+                '  1  0.99  0.0000000E+00  0.0  0.0  1.786356\n'
+                '  2  0.98  5.0-100  0.0  1.0D-01  1.783912\n'
+                '  3  0.97  0.0  0.0  0.0  1.783912\n'
+            )
+        model = Usm3d(log=log)
+        node_ids, loads = model.read_flo(flo_filename, n=3)
+        os.remove(flo_filename)
+        assert np.array_equal(node_ids, [1, 2, 3]), node_ids
+        assert np.allclose(loads['rhoW'], [0., 0.1, 0.]), loads['rhoW']
+        assert np.allclose(loads['rho'], [0.99, 0.98, 0.97]), loads['rho']
+
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
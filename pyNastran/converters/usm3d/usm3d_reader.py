@@ -10,6 +10,9 @@ Defines:
 """
 from __future__ import print_function
 import os
+import re
+import warnings
+from itertools import islice
 from struct import pack, unpack
 
 from six.moves import range
@@ -17,6 +20,11 @@ from numpy import array, zeros, where
 import numpy as np
 from pyNastran.utils.log import get_logger2
 
+#: 5.0-100 -> 5.0E-100
+NASTRAN_EXPONENT = re.compile(r'(?<=[0-9.])([+-][0-9]+)(?![0-9.])')
+#: 5.0D-100 -> 5.0E-100
+FORTRAN_EXPONENT = re.compile(r'(?<=[0-9.])[dD](?=[+-]?[0-9])')
+
 
 class Usm3d(object):
     """
@@ -278,21 +286,31 @@ class Usm3d(object):
         with open(cogsg_filename, 'rb') as cogsg_file:
             # nelements * 4 * 4 + 32 ???
             dummy = cogsg_file.read(4)  # 1022848
-            dummy_int, = unpack('>i', dummy)
-            #assert dummy_int == 1022848, 'dummy_int = %s' % dummy_int
 
             # file header
             if self.precision == 'single':
-                sformat = '>6if'
+                sformat = '6if'
                 nbytes = 6 * 4 + 4
             elif self.precision == 'double':
-                sformat = '>6id'
+                sformat = '6id'
                 nbytes = 6 * 4 + 8
             else:
                 raise RuntimeError('invalid precision format')
             data = cogsg_file.read(nbytes)
 
-            (inew, ne, npoints, nb, npv, nev, tc) = unpack(sformat, data)
+            # the record marker is the size of the header and the tets
+            endian = '>'
+            for endiani in '><':
+                dummy_int, = unpack(endiani + 'i', dummy)
+                (inew, ne, npoints, nb, npv, nev, tc) = unpack(endiani + sformat, data)
+                if dummy_int == nbytes + ne * 4 * 4:
+                    endian = endiani
+                    break
+            else:
+                self.log.warning('cannot determine the endian of %r; assuming big' % (
+                    cogsg_filename))
+            dummy_int, = unpack(endian + 'i', dummy)
+            (inew, ne, npoints, nb, npv, nev, tc) = unpack(endian + sformat, data)
             self.header = {
                 'dummy'    : dummy_int,
                 'inew'     : inew, # dummy int
@@ -313,7 +331,7 @@ class Usm3d(object):
             #del ne, np
 
             if 1:
-                nodes, tets = self._read_cogsg_volume(cogsg_file)
+                nodes, tets = self._read_cogsg_volume(cogsg_file, endian=endian)
                 return nodes, tets
             #else:
             #----------------------------------------------------------------------
@@ -409,35 +427,25 @@ class Usm3d(object):
         nodes_vol = np.array(nodes_vol)
         nodes_vol = nodes_vol.reshape((tets, 3))
 
-    def _read_cogsg_volume(self, cogsg_file):
+    def _read_cogsg_volume(self, cogsg_file, endian='>'):
+        """
+        Reads the tets and nodes of a *.cogsg file
+
+        The tets and the x, y, z coordinates are stored as columns.
+        """
         # volume cells
         self.log.debug('tell volume = %s' % cogsg_file.tell())
         # surface + volume cells ???
         nelements = self.header['nElements']
-        str_format = '>%si' % nelements
-
-
-        self.log.debug("fv.tell = %s" % cogsg_file.tell())
-        use_fromstring = True
-
-        if use_fromstring:
-            ndata = 4 * (4 * nelements)
-            data = cogsg_file.read(ndata)
-
-            # the 4 means that we make a (nelements, 4) array?
-            elements = np.fromstring(data, dtype='>4f') - 1
-        else:
-            elements = np.zeros((nelements, 4), 'int32')
-            for i in range(4): #  tets
-                data = cogsg_file.read(4 * nelements)
-                elements[:, i] = unpack(str_format, data)
-            elements -= 1
-
+        int_dtype = endian + 'i4'
+        elements = np.fromfile(cogsg_file, dtype=int_dtype, count=4 * nelements)
+        assert len(elements) == 4 * nelements, 'nelements=%s nvalues=%s' % (
+            nelements, len(elements))
+        elements = np.ascontiguousarray(elements.reshape(4, nelements).T, dtype='int32') - 1
         assert elements.shape == (nelements, 4), elements.shape
 
-        dummy2 = cogsg_file.read(4)
-        self.log.debug("dummy2 = %s %s" % (unpack('>i', dummy2), unpack('>f', dummy2)))
-        dummy_int2, = unpack('>i', dummy2)
+        dummy_int2, = np.fromfile(cogsg_file, dtype=int_dtype, count=1)
+        self.log.debug("dummy2 = %s" % dummy_int2)
 
         # 32 = dummy_int2 - 4 * nelements * 4
         assert self.header['dummy'] == dummy_int2
@@ -445,33 +453,19 @@ class Usm3d(object):
         #-----------------------------------
         # nodes
         nnodes = self.header['nPoints']
-        str_format = '>%sd' % nnodes
-
-        dummy3 = cogsg_file.read(4)  # nnodes * 3 * 8
-        dummy3_int, = unpack('>i', dummy3)
+        dummy3_int, = np.fromfile(cogsg_file, dtype=int_dtype, count=1)  # nnodes * 3 * 8
         #assert dummy3_int == 298560
-        self.log.debug("dummy3 = %i" % unpack('>i', dummy3)) #, unpack('>f', dummy3)
-
-        if use_fromstring:
-            data_length = 8 * nnodes
-            data = cogsg_file.read(3 * data_length)
-            assert self.precision == 'double', self.precision
-            nodes = np.fromstring(data, '>d').reshape(3, nnodes).T
+        self.log.debug("dummy3 = %i" % dummy3_int)
 
-            # the ravel creates a copy that we can then use to put in
-            # a contigous order
-            nodes = np.asarray(nodes.ravel(), dtype='<d').reshape(nnodes, 3)
-        else:
-            nodes = zeros((nnodes, 3), 'float64')
-            for i in range(3): #  x, y, z
-                data = cogsg_file.read(8 * nnodes)
-                assert len(data) == (8 * nnodes)
-                nodes[:, i] = unpack(str_format, data)
+        assert self.precision == 'double', self.precision
+        nodes = np.fromfile(cogsg_file, dtype=endian + 'f8', count=3 * nnodes)
+        assert len(nodes) == 3 * nnodes, 'nnodes=%s nvalues=%s' % (nnodes, len(nodes))
 
+        # create a copy in a contiguous order
+        nodes = np.ascontiguousarray(nodes.reshape(3, nnodes).T, dtype='float64')
 
-        dummy4 = cogsg_file.read(4) # nnodes * 3 * 8
-        dummy4_int, = unpack('>i', dummy4)
-        #print("dummy4 = ", unpack('>i', dummy4), unpack('>f', dummy4))
+        dummy4_int, = np.fromfile(cogsg_file, dtype=int_dtype, count=1)  # nnodes * 3 * 8
+        #print("dummy4 = ", dummy4_int)
 
         assert dummy3_int == dummy4_int
         self.nodes = nodes
@@ -496,6 +490,8 @@ class Usm3d(object):
             node_ids must be set to None.
         node_ids : List[int]; default=None
             the specific points to read (n must be set to None).
+            The results are in the order of node_ids and only the
+            file up to max(node_ids) is read.
 
         nvars = 5
           - (nodeID,rho,rhoU,rhoV,rhoW) = sline
@@ -505,7 +501,7 @@ class Usm3d(object):
           - (nodeID,rho,rhoU,rhoV,rhoW,e) = line
 
         Also, stupid Nastran-esque float formatting is sometimes used,
-        so 5.0-100 exists, which is 5.0E-100.  We just assume it's 0.
+        so 5.0-100 exists, which is 5.0E-100.
 
         Returns
         -------
@@ -519,143 +515,42 @@ class Usm3d(object):
         """
         result_names = ['Mach', 'U', 'V', 'W', 'T', 'rho', 'rhoU', 'rhoV', 'rhoW', 'p', 'Cp']
 
-        is_sparse = None
         if n is None:
             assert node_ids is not None, node_ids
             assert len(node_ids) > 0, node_ids
-            n = len(node_ids)
-            is_sparse = True
+            inodes = np.asarray(node_ids, dtype='int32') - 1
+            nmax = inodes.max() + 1
         else:
             assert node_ids is None, node_ids
-            is_sparse = False
-
-        #formatCode = 2
-        node_id = np.zeros(n, 'int32')
-        rho = np.zeros(n, 'float32')
-        rhoU = np.zeros(n, 'float32')
-        rhoV = np.zeros(n, 'float32')
-        rhoW = np.zeros(n, 'float32')
-        e = np.zeros(n, 'float32')
+            inodes = None
+            nmax = n
 
         with open(flo_filename, 'r') as flo_file:
             line = flo_file.readline().strip()
-            try:
-                #file is messsed up
-                mach = float(line)
-            except:
-                raise
-                #loads['Cp'] = e  # it's 0 anyways...
-                #return node_id, loads
-
+            mach = float(line)
 
             # determine the number of variables on each line
-            sline1 = flo_file.readline().strip().split()
-            nvars = None
-            if len(sline1) == 6:
-                nvars = 6
-                rhoi, rhoui, rhovi, rhowi, ei = parse_floats(sline1[1:], 5)
-            else:
-                nvars = 5
-                rhoi, rhoui, rhovi, rhowi = parse_floats(sline1[1:], 4)
-                sline2 = flo_file.readline().strip().split()
-                ei = parse_floats(sline2, 1)[0]
-
-            # set the i=0 values
-            if not is_sparse:
-                nmax = n
-                i = 0
-                node_id[i] = sline1[0]
-                rho[i] = rhoi
-                rhoU[i] = rhoui
-                rhoV[i] = rhovi
-                rhoW[i] = rhowi
-                e[i] = ei
+            line1 = flo_file.readline()
+            nvars = len(line1.split())
+            if nvars == 6:
+                nlines_per_node = 1
             else:
-                ni = 0
-                node_ids_minus_1 = array(node_ids) - 1
-                nmax = node_ids_minus_1.max() + 1
-                if 0 in node_ids_minus_1:
-                    i = 0
-                    node_id[i] = sline1[0]
-                    rho[i] = rhoi
-                    rhoU[i] = rhoui
-                    rhoV[i] = rhovi
-                    rhoW[i] = rhowi
-                    e[i] = ei
-                    ni += 1
-
-            # loop over the rest of the data in the flo file
-            if node_ids is None:
-                ni = n
-                # extract nodes 1, 2, ... 10, but not 11+
-                if nvars == 6:  # sequential nvars=6
-                    for i in range(1, n):
-                        sline1 = flo_file.readline().strip().split()
-                        rhoi, rhoui, rhovi, rhowi, ei = parse_floats(sline1[1:], 5)
-                        node_id[i] = sline1[0]
-                        rho[i] = rhoi
-                        rhoU[i] = rhoui
-                        rhoV[i] = rhovi
-                        rhoW[i] = rhowi
-                        e[i] = ei
-                        assert len(sline1) == 6, 'len(sline1)=%s' % len(sline1)
-                else:  # sequential nvars=5
-                    for i in range(1, n):
-                        sline1 = flo_file.readline().strip().split()
-                        rhoi, rhoui, rhovi, rhowi = parse_floats(sline1[1:], 4)
-                        assert len(sline1) == 5, 'len(sline1)=%s' % len(sline1)
-
-                        sline2 = flo_file.readline().strip().split()
-                        ei = parse_floats(sline2, 1)[0]
-
-                        node_id[i] = sline1[0]
-                        rho[i] = rhoi
-                        rhoU[i] = rhoui
-                        rhoV[i] = rhovi
-                        rhoW[i] = rhowi
-                        e[i] = ei
-                        assert len(sline2) == 1, 'len(sline2)=%s' % len(sline2)
-            else:
-                # extract node 1, 2, and 10
-                if nvars == 6:  # dynamic nvars=6
-                    for i in range(1, nmax):
-                        if i in node_ids_minus_1:
-                            sline1 = flo_file.readline().strip().split()
-                            rhoi, rhoui, rhovi, rhowi, ei = parse_floats(sline1[1:], 5)
-
-                            node_id[ni] = sline1[0]
-                            rho[ni] = rhoi
-                            rhoU[ni] = rhoui
-                            rhoV[ni] = rhovi
-                            rhoW[ni] = rhowi
-                            e[ni] = ei
-                            assert len(sline1) == 6, 'len(sline1)=%s' % len(sline1)
-                            ni += 1
-                        else:
-                            line1 = flo_file.readline()
-                else:  # dynamic nvars=5
-                    for i in range(1, nmax):
-                        if i in node_ids_minus_1:
-                            sline1 = flo_file.readline().strip().split()
-                            rhoi, rhoui, rhovi, rhowi = parse_floats(sline1[1:], 4)
-                            assert len(sline1) == 5, 'len(sline1)=%s' % len(sline1)
-
-                            sline2 = flo_file.readline().strip().split()
-                            ei = parse_float(sline2[1])
-
-                            node_id[ni] = sline1[0]
-                            rho[ni] = rhoi
-                            rhoU[ni] = rhoui
-                            rhoV[ni] = rhovi
-                            rhoW[ni] = rhowi
-                            e[ni] = ei
-                            assert len(sline2) == 1, 'len(sline2)=%s' % len(sline2)
-                            ni += 1
-                        else:
-                            line1 = flo_file.readline()
-                            line2 = flo_file.readline()
-
-        assert len(rho) == ni
+                assert nvars == 5, 'nvars=%s line=%r' % (nvars, line1)
+                nlines_per_node = 2
+
+            # only read the nodes we need
+            lines = [line1] + list(islice(flo_file, nmax * nlines_per_node - 1))
+        data = _parse_flo_floats(''.join(lines), nmax * 6).reshape(nmax, 6)
+        if inodes is not None:
+            data = data[inodes, :]
+
+        # node_id, rhoi, rhoui, rhovi, rhowi, ei
+        node_id = data[:, 0].astype('int32')
+        rho = data[:, 1].astype('float32')
+        rhoU = data[:, 2].astype('float32')
+        rhoV = data[:, 3].astype('float32')
+        rhoW = data[:, 4].astype('float32')
+        e = data[:, 5].astype('float32')
 
         # llimit the minimum density (to prevent division errors)
         rho_min = 0.001
@@ -725,6 +620,40 @@ class Usm3d(object):
         #val = 0.0
     #return val
 
+def _parse_flo_floats(data, nvalues):
+    """
+    Parses the whitespace separated values of a *.flo file
+
+    The well-formed values are parsed with np.fromstring.  If that
+    fails, Nastran-esque exponents (5.0-100) and Fortran D exponents
+    are fixed up and the remaining bad values are assumed to be 0.0.
+
+    Parameters
+    ----------
+    data : str
+        the text of the nodes
+    nvalues : int
+        the number of values to parse
+
+    Returns
+    -------
+    values : (nvalues, ) float64 ndarray
+        the values
+    """
+    with warnings.catch_warnings():
+        # a bad value stops the parsing
+        warnings.simplefilter('ignore', DeprecationWarning)
+        values = np.fromstring(data, dtype='float64', sep=' ')
+        if len(values) != nvalues:
+            data = NASTRAN_EXPONENT.sub(r'E\1', FORTRAN_EXPONENT.sub('E', data))
+            values = np.fromstring(data, dtype='float64', sep=' ')
+
+    if len(values) != nvalues:
+        values = array(parse_floats(data.split(), nvalues), dtype='float64')
+    if len(values) != nvalues:
+        raise RuntimeError('expected %i values; found %i' % (nvalues, len(values)))
+    return values
+
 def parse_floats(sline, n):
     """floats a series of values"""
     vals = []
@@ -19,14 +19,16 @@ import numpy as np
 from numpy import (array, zeros, ones, arange,
                    eye, searchsorted, array_equal, diag, fill_diagonal,
                    nan, nan_to_num)
-from numpy.linalg import solve, eigh, eig  # type: ignore
+from numpy.linalg import eigh, eig  # type: ignore
 
-from scipy.sparse import dok_matrix  # type: ignore
+from scipy.sparse import coo_matrix, issparse  # type: ignore
+from scipy.sparse.linalg import splu, spsolve, eigsh  # type: ignore
 
 # pyNastran
 from pyNastran.bdf.bdf_interface.dev.matrices import make_gpwg
 from pyNastran.dev.bdf_vectorized.solver.utils import (
-    triple, reverse_dict, partition_dense_symmetric, partition_dense_vector, remove_dofs)
+    triple, reverse_dict, partition_sparse_symmetric, partition_dense_vector, remove_dofs,
+    get_gf_transform)
 #from pyNastran.f06.f06_writer import sorted_bulk_data_header
 from pyNastran.utils.dev import list_print
 from pyNastran.utils.mathematics import print_matrix, print_annotated_matrix
@@ -40,6 +42,7 @@ from pyNastran.utils.log import get_logger2
     #RealAppliedLoadsVectorArray, AppliedLoadsVectorArray)
 
 from pyNastran.op2.tables.oug.oug_displacements import RealDisplacementArray
+from pyNastran.op2.tables.oug.oug_eigenvectors import RealEigenvectorArray
 #from pyNastran.op2.tables.oqg_constraintForces.oqg_spcForces import SPCForcesObject
 #from pyNastran.op2.tables.oqg_constraintForces.oqg_mpcForces import MPCForcesObject
 from pyNastran.f06.dev.tables.oload_resultant import Resultant
@@ -69,10 +72,30 @@ from pyNastran.op2.tables.opg_appliedLoads.opg_load_vector import (
     RealLoadVectorArray,
 )
 
+#: matrices with more dofs than this aren't written to the log/f06
+NDOFS_PRINT_MAX = 100
+
 def partition_dense_matrix(a, b, c=None):
     raise NotImplementedError('partition_dense_matrix a=%s b=%s c=%s' % (str(a), str(b), str(c)))
 
 
+def _build_sparse_matrix(triplets, ndofs):
+    """
+    Builds a CSR matrix from the (rows, cols, values) triplets, where
+    duplicate (row, col) entries are summed
+    """
+    rows, cols, values = triplets
+    if rows:
+        rows = np.hstack(rows)
+        cols = np.hstack(cols)
+        values = np.hstack(values)
+    else:
+        rows = cols = np.zeros(0, dtype='int32')
+        values = np.zeros(0, dtype='float64')
+    A = coo_matrix((values, (rows, cols)), shape=(ndofs, ndofs), dtype='float64')
+    return A.tocsr()
+
+
 class Solver(OP2):
     """
     Goals:
@@ -329,7 +352,8 @@ class Solver(OP2):
         #self.iUks = None
         self.Kgg = None
         self.Mgg = None
-        self.Mgg_sparse = None
+        self._kgg_triplets = None
+        self._mgg_triplets = None
         #------------------------------
         self.Us = None
         self.iUs = None
@@ -400,28 +424,27 @@ class Solver(OP2):
         pass
 
     def _solve(self, K, F, dofs):  # can be overwritten
-        r"""solves \f$ [K]{x} = {F}\f$ for \f${x}\f$"""
+        r"""solves \f$ [K]{x} = {F}\f$ for \f${x}\f$, where [K] is sparse"""
         self.log.info("--------------")
-        self.log.info("Kaa_norm / %s = \n" % self.knorm + list_print(K / self.knorm))
+        self._log_matrix("Kaa_norm / %s" % self.knorm, K / self.knorm)
         self.log.info("--------------")
         self.log.info("Fa/%g = %s" % (self.fnorm, F / self.fnorm))
         if F[0] == 0.0:
             assert max(F) != min(F), 'no load is applied...'
         self.log.info("--------------")
 
+        K = K.tocsc()
         try:
-            U = scipy.sparse.linalg.spsolve(K, F)
-            #U = solve(K, F) # numpy
-        except:
+            # splu raises on a singular matrix; spsolve just warns
+            U = splu(K).solve(F)
+        except RuntimeError:
             failed = []
-            faileds = []
-            for i, iu in enumerate(dofs):
+            faileds = np.where(K.diagonal() == 0.0)[0]
+            for i in faileds:
                 #absF = abs(F)
-                nid, dof = self.IDtoNidComponents[iu]
+                nid, dof = self.IDtoNidComponents[dofs[i]]
                 #if absF[iu] == 0.0 and ??:
-                if K[i, i] == 0.0:
-                    failed.append([nid, dof])
-                    faileds.append(i)
+                failed.append([nid, dof])
             msg = self.make_grid_point_singularity_table(failed)
             self.f06_file.write(msg)
             self.f06_file.flush()
@@ -434,13 +457,12 @@ class Solver(OP2):
 
                 if value in [1, 'YES']:
                     # figure out what are the DOFs that are removed
-                    ilist = list(set(range(len(dofs))).difference(set(faileds)))
-                    ilist.sort()
+                    ilist = np.setdiff1d(np.arange(len(dofs)), faileds)
 
                     # remove the DOFs and solve
                     K2 = K[ilist, :][:, ilist]
                     F2 = F[ilist]
-                    U2 = solve(K2, F2)
+                    U2 = spsolve(K2, F2)
 
                     # put the removed DOFs back in and set their displacement to 0.0
                     U = zeros(len(F), 'float64')
@@ -452,6 +474,19 @@ class Solver(OP2):
         self.f06_file.flush()
         return U
 
+    def _log_matrix(self, name, A, IDtoNidComponents=None):
+        """logs a (sparse) matrix, but only if it's small enough to print"""
+        ndofs = A.shape[0]
+        if ndofs > NDOFS_PRINT_MAX:
+            self.log.info('%s; shape=%s nnz=%s' % (name, str(A.shape), A.nnz))
+            return
+        A = A.toarray() if issparse(A) else A
+        if IDtoNidComponents is None:
+            self.log.info('%s =\n%s' % (name, print_matrix(A)))
+        else:
+            self.log.info('%s =\n%s' % (name, print_annotated_matrix(
+                A, IDtoNidComponents, IDtoNidComponents)))
+
     def run_solver(self):
         """the main interface to the solver"""
         fargs = self.fargs
@@ -523,7 +558,7 @@ class Solver(OP2):
         for (isub, subcase) in sorted(iteritems(cc.subcases)):
             self.subcase_key[isub] = [isub]
             self.log.info(subcase)
-            if 'LOAD' in subcase:
+            if 'LOAD' in subcase or 'METHOD' in subcase:
                 analysis_cases.append(subcase)
                 #print('analyzing subcase = \n%s' % subcase)
             #else:
@@ -548,11 +583,14 @@ class Solver(OP2):
             self.log.info('starting case')
             self.run_case(self.model, case)
 
-        self.f06_file.write('Kgg / %s =\n%s\n\n' % (self.knorm, list_print(self.Kgg / self.knorm)))
-        self.f06_file.write('Fg =\n%s\n\n' % list_print(self.Fg))
+        if self.model.sol == 101 and self.Kgg.shape[0] <= NDOFS_PRINT_MAX:
+            self.f06_file.write('Kgg / %s =\n%s\n\n' % (
+                self.knorm, list_print(self.Kgg.toarray() / self.knorm)))
+            self.f06_file.write('Fg =\n%s\n\n' % list_print(self.Fg))
 
-        self.f06_file.write('Kaa / %s =\n%s\n\n' % (self.knorm, list_print(self.Kaa / self.knorm)))
-        self.f06_file.write('Fa =\n%s\n\n' % list_print(self.Fa))
+            self.f06_file.write('Kaa / %s =\n%s\n\n' % (
+                self.knorm, list_print(self.Kaa.toarray() / self.knorm)))
+            self.f06_file.write('Fa =\n%s\n\n' % list_print(self.Fa))
 
         self.f06_file.close()
         if self.op2_file is not None:
@@ -562,7 +600,7 @@ class Solver(OP2):
     def run_case(self, model, case):
         sols = {
             101: self.run_sol_101,
-            #103: self.run_sol_103,
+            103: self.run_sol_103,
         }
 
         isubcase = case.id
@@ -717,7 +755,7 @@ class Solver(OP2):
     def get_Mgg(self, model, ndofs, force_calcs=False):
         Mgg = None
         if force_calcs:
-            Mgg, Mgg_sparse = self.assemble_global_mass_matrix(model, ndofs, self.nidComponentToID)
+            Mgg = self.assemble_global_mass_matrix(model, ndofs, self.nidComponentToID)
             model.params['GRDPNT'] = 0
 
         if 'GRDPNT' in model.params:
@@ -731,72 +769,149 @@ class Solver(OP2):
         return Mgg
 
     def run_sol_103(self, model, case):
-        self.end_options['SEMR'] = True
-        raise NotImplementedError()
-        #"""
-        #ug = un+um All structural DOF including scalar DOF
-        #um DOF eliminated by multipoint constraints and rigid elements
-        #un = uf+us All structural DOF not constrained by multipoint constraints
-        #us DOF eliminated by single-point constraints
-        #uf = ua+uo Unconstrained (free) structural DOF
-        #uo DOF omitted by static condensation (Guyan Reduction)
-        #ua = ur+ul DOF used in real eigenvalue analysis
-        #ur DOF to which determinate reactions are applied for the solution of free body models
-        #ul The remaining structural DOF used in static analysis (points left over)
-        #ue Extra DOF introduced in dynamic analysis
-        #ud = ua+ue DOF used in dynamic analysis by the direct method
-        #up = ug+ue The g-set plus EXTRA points for dynamic analysis
-        #uz DOF representing modal coordinates
-        #uh = ue+uz DOF used in dynamic analysis by the modal method
-
-        #SPC Forces
-        #qs = Kfs * Uf + Kss * Ys
-        #qs = Kfs * Uf + Kss * (Ys + Ys_dot*dt + Ys_dotdot*dt*dt)  # where *dt means integration
-        #"""
-        #assert model.sol == 103, 'model.sol=%s is not 101' % (model.sol)
-        #if 'WTMASS' in model.params:
-            ## converts weight units to mass
-            #wtmass = model.params['WTMASS'].value1
-        #else:
-            #wtmass = 1.0
+        """
+        Runs a real eigenvalue analysis
 
-        #if 'COUPMASS' in model.params:
-            #coupled_mass = model.params['COUPMASS'].value1
-            #lumped_mass = False
-        #else:
-            #coupled_mass = -1
-            #lumped_mass = True
+        ug = un + um   All structural DOF
+        um             DOF eliminated by multipoint constraints
+        un = uf + us   All structural DOF not constrained by MPCs
+        us             DOF eliminated by single-point constraints
+        uf = ua        Unconstrained (free) structural DOF (no ASET/OMIT)
 
-        #if 'METHOD' in case:
-            #imethod = model.subcase.get_parameter('METHOD')
-            #raise NotImplementedError('METHOD')
-            ##self.eigb[imethod]
-            ##self.eigc[imethod]
-            ##self.eigr[imethod]
-            ##self.eigrl[imethod]
+        The set reduction is done with a sparse transformation matrix, so
+        Kaa/Maa stay sparse and the modes are found with a shift-invert
+        Lanczos solve (scipy.sparse.linalg.eigsh).
+        """
+        assert model.sol == 103, 'model.sol=%s is not 103' % model.sol
+        self.log.info('case = %s' % case)
+        if 'WTMASS' in model.params:
+            # converts weight units to mass
+            wtmass = model.params['WTMASS'].values[0]
+        else:
+            wtmass = 1.0
 
-        #Mgg = self.get_Mgg(model, ndofs, force_calcs=True)
-        ## analysis
-        #(Kgg, Fg, n) = self.setup_sol_101(model, case)
+        # the (GridID,componentID) -> internalID
+        (self.nidComponentToID, ndofs) = self.build_nid_component_to_id(model)
+        self.IDtoNidComponents = reverse_dict(self.nidComponentToID)
+        self.apply_SPCs(model, case, self.nidComponentToID)
+        self.apply_MPCs(model, case, self.nidComponentToID)
+        self.build_dof_sets()
+
+        self.log.info('building Kgg')
+        Kgg = self.assemble_global_stiffness_matrix(model, ndofs, self.nidComponentToID)
+        self.log.info('building Mgg')
+        Mgg = self.assemble_global_mass_matrix(model, ndofs, self.nidComponentToID)
+        if wtmass != 1.0:
+            Mgg = Mgg * wtmass
+
+        # g -> n -> f=a
+        Tga, a_dofs = get_gf_transform(ndofs, self.iUs, self.iUm, self.jUm, self.Um)
+        Kaa = Tga.T.dot(Kgg).dot(Tga).tocsc()
+        Maa = Tga.T.dot(Mgg).dot(Tga).tocsc()
+        self.Kaa = Kaa
+        self.log.info('Kaa.shape = %s; nnz=%s' % (str(Kaa.shape), Kaa.nnz))
 
-        #self.build_dof_sets()
-        #Lambda, Ua = self.solve_sol_103(Kgg, Mgg)
+        imethod = case.get_parameter('METHOD')[0]
+        method = model.Method(imethod)
+        eigenvalues, phi_a = self.solve_sol_103(Kaa, Maa, method)
+
+        # back to the g-set
+        phi_g = Tga.dot(phi_a)
+        self._store_eigenvectors(model, eigenvalues, phi_g, case)
+
+        self.write_f06(self.f06_file, end_flag=True, quiet=True, close=False)
+        self.write_op2(self.op2_file, packing=True)
+        self.write_op2(self.op2_pack_file, packing=False)
+        self.log.info('finished SOL 103')
 
-        #dofsAll = {i for i in range(n)}
-        #dofsA = remove_dofs(dofsAll, self.iUs)
-        #dofsA.sort()
-        #U = zeros(n, 'float64')
+    def solve_sol_103(self, Kaa, Maa, method):
+        """
+        Solves [K]{phi} = lambda [M]{phi} with a shift-invert Lanczos
 
-        ## TODO handle MPCs
-        #for (i, iu) in enumerate(self.iUs):
-            #U[iu] = self.Us[i]
-        #for (i, iu) in enumerate(dofsA):
-            #U[iu] = Ua[i]
+        Parameters
+        ----------
+        Kaa / Maa : (na, na) scipy.sparse matrix
+            the reduced stiffness/mass matrices
+        method : EIGRL
+            defines the number of modes (ND), the frequency range (V1, V2)
+            and the normalization (MASS/MAX)
+
+        Returns
+        -------
+        eigenvalues : (nmodes, ) float ndarray
+            the sorted eigenvalues (omega^2)
+        phi : (na, nmodes) float ndarray
+            the mode shapes
+        """
+        if method.type != 'EIGRL':
+            raise NotImplementedError('METHOD=%s; only EIGRL is supported' % method.type)
 
-        #if self.is_displacement:
-            #self._store_displacements(model, U, case)
-        #q = U
+        na = Kaa.shape[0]
+        nmodes = 10 if method.nd is None else method.nd
+        nmodes = min(nmodes, na - 1)
 
+        two_pi = 2 * np.pi
+        if method.v1 is not None:
+            shift = (two_pi * method.v1) ** 2
+        else:
+            # shift below 0.0, so rigid body modes don't make the shifted
+            # matrix singular
+            diag_kaa = Kaa.diagonal()
+            diag_maa = Maa.diagonal()
+            is_mass = diag_maa > 0.
+            shift = -1e-6 * (diag_kaa[is_mass] / diag_maa[is_mass]).mean()
+        self.log.info('solving for %s modes; shift=%g' % (nmodes, shift))
+
+        eigenvalues, phi = eigsh(Kaa, k=nmodes, M=Maa, sigma=shift, which='LM')
+        isort = np.argsort(eigenvalues)
+        eigenvalues = eigenvalues[isort]
+        phi = phi[:, isort]
+
+        if method.v2 is not None:
+            is_in_range = eigenvalues <= (two_pi * method.v2) ** 2
+            eigenvalues = eigenvalues[is_in_range]
+            phi = phi[:, is_in_range]
+
+        # eigsh returns mass normalized modes
+        if method.norm == 'MAX':
+            imax = np.abs(phi).argmax(axis=0)
+            phi = phi / phi[imax, np.arange(phi.shape[1])]
+        return eigenvalues, phi
+
+    def _store_eigenvectors(self, model, eigenvalues, phi, case):
+        """fills the eigenvector object"""
+        isubcase = case.id
+        nmodes = len(eigenvalues)
+        modes = np.arange(1, nmodes + 1, dtype='int32')
+        data_code = {
+            'log': self.log, 'analysis_code': 2,
+            'device_code': 1, 'sort_code': 0,
+            'sort_bits': [0, 0, 0], 'num_wide': 8, 'table_name': 'OUGV1',
+            'nonlinear_factor': 1, 'data_names':['mode', 'eign', 'mode_cycle'],
+            'tCode' : 7, 'table_code': 7,
+        }
+        # the (nid, component) of each g-set DOF; SPOINTs only have component 1
+        nid_components = np.array(list(self.nidComponentToID.keys()), dtype='int32')
+        idofs = np.array(list(self.nidComponentToID.values()), dtype='int32')
+        nids, inodes = np.unique(nid_components[:, 0], return_inverse=True)
+        nnodes = len(nids)
+
+        eigenvectors = RealEigenvectorArray(data_code, True, isubcase, dt=None)
+        eigenvectors.build_data(nmodes, nnodes, nnodes,
+                                nmodes, nnodes, float_fmt='float32')
+        eigenvectors._times[:] = modes
+        eigenvectors.modes = modes.tolist()
+        eigenvectors.eigns = eigenvalues.tolist()
+        eigenvectors.mode_cycles = (np.sqrt(np.abs(eigenvalues)) / (2 * np.pi)).tolist()
+
+        eigenvectors.node_gridtype[:, 0] = nids
+        eigenvectors.node_gridtype[:, 1] = 1 # GRID
+        if model.spoint.n:
+            is_spoint = np.in1d(nids, list(model.spoint.spoint))
+            eigenvectors.node_gridtype[is_spoint, 1] = 2 # SPOINT
+        eigenvectors.data[:, :, :] = 0.
+        eigenvectors.data[:, inodes, nid_components[:, 1] - 1] = phi[idofs, :].T
+        self.eigenvectors[isubcase] = eigenvectors
 
     def run_sol_101(self, model, case):
         #print("case = ", case)
@@ -1656,7 +1771,7 @@ class Solver(OP2):
         Fg = self.assemble_forces(model, ndofs, case, self.nidComponentToID, xyz_cid0)
 
         self.log.info('building Kgg')
-        Kgg, Kgg_sparse = self.assemble_global_stiffness_matrix(model, ndofs, self.nidComponentToID)
+        Kgg = self.assemble_global_stiffness_matrix(model, ndofs, self.nidComponentToID)
 
         self.log.info('ready to run...')
         return Kgg, Fg, ndofs
@@ -1753,23 +1868,28 @@ class Solver(OP2):
         self.Fg = Fg
 
         self._save_applied_load(Fg)
-        for (i, j, a) in zip(self.iUm, self.jUm, self.Um):
-            self.log.info("Kgg[%s, %s] = %s" % (i, j, a))
-            Kgg[i, j] = a
+        if len(self.iUm):
+            # setting values changes the sparsity structure, which is
+            # cheap for a lil_matrix and expensive for a csr_matrix
+            Kgg = Kgg.tolil()
+            for (i, j, a) in zip(self.iUm, self.jUm, self.Um):
+                self.log.info("Kgg[%s, %s] = %s" % (i, j, a))
+                Kgg[i, j] = a
+            Kgg = Kgg.tocsr()
+            self.Kgg = Kgg
 
         self.IDtoNidComponents = reverse_dict(self.nidComponentToID)
         self.log.info("IDtoNidComponents = %s" % self.IDtoNidComponents)
-        self.log.info("Kgg =\n" + print_annotated_matrix(Kgg, self.IDtoNidComponents,
-                                                         self.IDtoNidComponents))
+        self._log_matrix("Kgg", Kgg, self.IDtoNidComponents)
         #print("Kgg = \n", Kgg)
         #print("iSize = ", i)
 
         #(Kaa, Fa) = self.Partition(Kgg)
         #sys.exit('verify Kgg')
 
-        self.log.info("Kgg/%g = \n%s" % (self.knorm, print_matrix(Kgg / self.knorm)))
-        Kaa, dofs2 = partition_dense_symmetric(Kgg, self.iUs)
-        self.log.info("Kaa/%g = \n%s" % (self.knorm, print_matrix(Kaa / self.knorm)))
+        self._log_matrix("Kgg/%g" % self.knorm, Kgg / self.knorm)
+        Kaa, dofs2 = partition_sparse_symmetric(Kgg, self.iUs)
+        self._log_matrix("Kaa/%g" % self.knorm, Kaa / self.knorm)
         #print("Kaa.shape = ",Kaa.shape)
 
         #sys.exit('verify Kaa')
@@ -1834,74 +1954,61 @@ class Solver(OP2):
         index0s *= 6
         return node_ids, index0s
 
+    def _get_global_dofs(self, dofs):
+        """maps the element (nid, component)/dof ids to the global dof ids"""
+        nid_component_to_id = self.nidComponentToID
+        return np.array([nid_component_to_id[dof] if isinstance(dof, tuple) else dof
+                         for dof in dofs], dtype='int32')
+
     def add_stiffness(self, K, dofs, nijv):
-        #print('self.IDtoNidComponents = %s' % self.IDtoNidComponents) # None
-        self.log.debug('self.nidComponentToID')
-        for k, value in sorted(self.nidComponentToID.items()):
-            self.log.debug('  %s : %s' % (k, value))
-        #nidComponentToID
-
-        Kgg = self.Kgg
-        kabs = np.abs(K)
-        #print(type(Kgg))
+        """
+        Adds the nonzero terms of an element stiffness matrix to the
+        Kgg (row, column, value) triplets; duplicates are summed when
+        Kgg is built
+        """
         self.log.debug('Ki =\n\n%s' % K)
-
-        for i, dof1 in enumerate(dofs):
-            if isinstance(dof1, tuple):
-                dof1i = self.nidComponentToID[dof1]
-            else:
-                dof1i = dof1
-
-            for j, dof2 in enumerate(dofs):
-                if kabs[i, j] > 0.0:
-                    self.log.debug('  i=%s j=%s dof1=%s dof2=%s Ke[i,j]=%s' % (
-                        i, j, dof1, dof2, K[i, j] / self.knorm))
-
-                    if isinstance(dof2, tuple):
-                        dof2i = self.nidComponentToID[dof2]
-                    else:
-                        dof2i = dof2
-                    #assert isinstance(dof1i, int), dof1i
-                    #assert isinstance(dof2i, int), dof2i
-                    Kgg[dof1i, dof2i] += K[i, j]
-                    #Kgg[dof1i, dof2i] += K[i, j]
-                    #print('Kgg[%s,%s]=%s' % (dof1, dof2, str(Kgg[dof1i, dof2i])) )
-        self.log.info('Kggi =\n%s' % Kgg)
+        self._add_triplets(self._kgg_triplets, K, dofs)
 
     def add_mass(self, M, dofs, nijv):
-        Mgg = self.Mgg
-        Mgg_sparse = self.Mgg_sparse
-        for i, dof1 in enumerate(dofs):
-            dof1i = self.nidComponentToID[dof1]
-            for j, dof2 in enumerate(dofs):
-                if abs(M[i, j]) > 0.0:
-                    dof2i = self.nidComponentToID[dof2]
-                    Mgg[dof1i, dof2i] += M[i, j]
-                    Mgg_sparse[dof1i, dof2i] += M[i, j]
-
-    def assemble_global_stiffness_matrix(self, model, i, Dofs):
-        self.Kgg = zeros((i, i), 'float64')
-        self.log.info("Kgg.shape = %s" % str(self.Kgg.shape))
-
-        dof_mapper = []
-
-        nnodes = model.grid.n
-        nspoints = model.spoint.n
-        assert nnodes > 0
-        self.log.info("nnodes = %s" % nnodes)
-        #ndofs = 6 * nnodes + nspoints
-
-        i = 0
-        nids = model.grid.node_id
-        #nids.sort()
-        self.log.info('nids = %s %s' %(nids, i))
-        #dof_ids = arange(0, 6*nnodes, 6)
-
-        #dofs_0 = [nid=2, 1] -> searchsorted(nids, nid)[0]
-
-        #for nid in sorted(self.nodes.iterkeys()):
-            #nid_dof_mapper[]
-
+        """
+        Adds the nonzero terms of an element mass matrix to the
+        Mgg (row, column, value) triplets
+        """
+        self._add_triplets(self._mgg_triplets, M, dofs)
+
+    def _add_triplets(self, triplets, K, dofs):
+        """adds the nonzero terms of an element matrix to the triplets"""
+        K = np.asarray(K)
+        i, j = np.nonzero(K)
+        dofs = self._get_global_dofs(dofs)
+        rows, cols, values = triplets
+        rows.append(dofs[i])
+        cols.append(dofs[j])
+        values.append(K[i, j])
+
+    def _add_element_matrices(self, triplets, model, elements, matrix_type, index0s):
+        """
+        Adds the stiffness/mass matrices for one element type, so the
+        triplets for all the elements are added in one batch
+        """
+        if not elements.n:
+            return
+        self.log.info('start calculating %s for %s' % (matrix_type, elements.type))
+        get_matrix = getattr(elements, 'get_%s_matrix' % matrix_type)
+        rows = []
+        cols = []
+        values = []
+        element_triplets = (rows, cols, values)
+        for i in range(elements.n):
+            K, dofs, nijv = get_matrix(i, model, self.positions, index0s)
+            self._add_triplets(element_triplets, K, dofs)
+
+        triplets[0].append(np.hstack(rows))
+        triplets[1].append(np.hstack(cols))
+        triplets[2].append(np.hstack(values))
+
+    def _get_positions_index0s(self, model):
+        """gets the node positions and the first global dof of each node"""
         self.log.info('start calculating xyz_cid0')
         self.positions = {}
         index0s = {}
@@ -1910,189 +2017,103 @@ class Solver(OP2):
             self.positions[nid] = model.grid.xyz[i]
             index0s[nid] = 6 * i
         self.log.info('end calculating xyz_cid0')
+        return index0s
+
+    def assemble_global_stiffness_matrix(self, model, ndofs, Dofs):
+        """
+        Builds the sparse global stiffness matrix
+
+        Each element type adds (row, column, value) triplets, which are
+        summed into a CSR matrix, so the dense ndofs x ndofs matrix is
+        never built.
 
-        # spring
-        if model.celas1.n:
-            self.log.info('start calculating Kcelas1')
-            for i in range(model.celas1.n):
-                K, dofs, nijv = model.celas1.get_stiffness_matrix(
-                    i, model, self.positions, index0s)
-                self.log.info("Kcelas1 =\n%s" % K)
-                self.add_stiffness(K, dofs, nijv)
-
-        if model.celas2.n:
-            self.log.info('start calculating Kcelas2')
-            for i in range(model.celas2.n):
-                K, dofs, nijv = model.celas2.get_stiffness_matrix(
-                    i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-        if model.celas3.n:
-            self.log.info('start calculating Kcelas3')
-            for i in range(model.celas3.n):
-                K, dofs, nijv = model.celas3.get_stiffness_matrix(
-                    i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-        if model.celas4.n:
-            self.log.info('start calculating Kcelas4')
-            for i in range(model.celas4.n):
-                K, dofs, nijv = model.celas4.get_stiffness_matrix(
-                    i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-        # conrod
-        if model.conrod.n:
-            self.log.info('start calculating Kconrod')
-            for i in range(model.conrod.n):
-                #self.conrod_stress = {}
-                K, dofs, nijv = model.conrod.get_stiffness_matrix(i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-        # crod
-        if model.crod.n:
-            self.log.info('start calculating Kcrod')
-            for i in range(model.crod.n):
-                K, dofs, nijv = model.crod.get_stiffness_matrix(i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-        # ctube
-        if model.ctube.n:
-            self.log.info('start calculating Kctube')
-            for i in range(model.crod.n):
-                K, dofs, nijv = model.ctube.get_stiffness_matrix(i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-        # shells
-        if model.ctria3.n:
-            for i in range(model.ctria3.n):
-                K, dofs, nijv = model.ctria3.get_stiffness_matrix(
-                    i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-        if model.cquad4.n:
-            for i in range(model.cquad4.n):
-                K, dofs, nijv = model.cquad4.get_stiffness_matrix(
-                    i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-        # solids
-        if model.ctetra4.n:
-            #K, dofs, nijv = model.ctetra4.get_stiffness_matrices(
-            #    model, xyz_cid0, index0s)
-            for i in range(model.ctetra4.n):
-                K, dofs, nijv = model.ctetra4.get_stiffness_matrix(
-                    i, model, self.positions, index0s)
-                self.add_stiffness(K, dofs, nijv)
-
-
-        #Kgg_sparse = coo_matrix((entries, (rows, cols)), shape=(i, i))
-        Kgg_sparse = None
-        Kgg = self.Kgg
-        return Kgg, Kgg_sparse
+        Returns
+        -------
+        Kgg : (ndofs, ndofs) scipy.sparse.csr_matrix
+            the global stiffness matrix
+        """
+        self._kgg_triplets = ([], [], [])
+
+        nnodes = model.grid.n
+        assert nnodes > 0
+        self.log.info("nnodes = %s" % nnodes)
+        index0s = self._get_positions_index0s(model)
+
+        elements = [
+            # springs
+            model.celas1, model.celas2, model.celas3, model.celas4,
+            # rods
+            model.conrod, model.crod, model.ctube,
+            # shells
+            model.ctria3, model.cquad4,
+            # solids
+            model.ctetra4,
+        ]
+        for elementsi in elements:
+            self._add_element_matrices(self._kgg_triplets, model, elementsi,
+                                       'stiffness', index0s)
+
+        self.Kgg = _build_sparse_matrix(self._kgg_triplets, ndofs)
+        self._kgg_triplets = None
+        self.log.info("Kgg.shape = %s; nnz=%s" % (str(self.Kgg.shape), self.Kgg.nnz))
+        return self.Kgg
 
     #def assemble_global_damping_matrix(self, model, i, Dofs):
 
     def assemble_global_mass_matrix(self, model, ndofs, Dofs):
-        self.Mgg = zeros((ndofs, ndofs), 'float64')
-        self.Mgg_sparse = dok_matrix((ndofs, ndofs), dtype='float64')
+        """
+        Builds the sparse global mass matrix
 
-        dof_mapper = []
+        Returns
+        -------
+        Mgg : (ndofs, ndofs) scipy.sparse.csr_matrix
+            the global mass matrix
+        """
+        self._mgg_triplets = ([], [], [])
 
         nnodes = model.grid.n
-        nspoints = model.spoint.n
         assert nnodes > 0, nnodes
-
-        i = 0
-        nids = model.grid.node_id
-
-        self.positions = {}
-        index0s = {}
-        for i in range(model.grid.n):
-            nid = model.grid.node_id[i]
-            self.positions[nid] = model.grid.xyz[i]
-            index0s[nid] = 6 * i
+        index0s = self._get_positions_index0s(model)
 
         # mass
         conm1 = model.mass.conm1
         for i in range(conm1.n):
             M = conm1.get_mass_matrix(i)
-            i0 = index[conm1.node_id[i]]
+            i0 = index0s[conm1.node_id[i]]
             coord_id = conm1.coord_id[i]
             if coord_id != 0:
                 msg = 'CONM1 doesnt support coord_id != 0 for element %i; coord_id=%i' % (
-                    model.conm1.element_id[i], coord_id)
+                    conm1.element_id[i], coord_id)
                 raise RuntimeError(msg)
             # CONM1 doesn't consider coord ID
-            self.Mgg[i0:i0+6, i0:i0+6] += M[:, :]
-            for ii1, i01 in arange(i0, i0+6):
-                for ii2, i02 in arange(i0, i0+6):
-                    self.Mgg_sparse[i01, i02] = M[ii1, ii2]
-        for i in range(model.mass.conm2.n):
-            M, dofs, nijv = model.conm1.get_mass_matrix(i, model, self.positions, index0s)
-            self.add_mass(M, dofs, nijv)
-
-        #if 0:
-            ## cmass
-            #for i in range(model.cmass1.n):
-                #M, dofs, nijv = model.cmass1.get_mass_matrix(i, model, self.positions, index0s)
-                #self.add_mass(M, dofs, nijv)
-            #for i in range(model.cmass2.n):
-                #M, dofs, nijv = model.cmass2.get_mass_matrix(i, model, self.positions, index0s)
-                #self.add_mass(M, dofs, nijv)
-            #for i in range(model.cmass3.n):
-                #M, dofs, nijv = model.cmass3.get_mass_matrix(i, model, self.positions, index0s)
-                #self.add_mass(M, dofs, nijv)
-            #for i in range(model.cmass4.n):
-                #M, dofs, nijv = model.cmass4.get_mass_matrix(i, model, self.positions, index0s)
-                #self.add_mass(M, dofs, nijv)
-
-        # conrod
-        for i in range(model.conrod.n):
-            M, dofs, nijv = model.conrod.get_mass_matrix(i, model, self.positions, index0s)
-            self.add_mass(M, dofs, nijv)
-        # crod
-        for i in range(model.crod.n):
-            M, dofs, nijv = model.crod.get_mass_matrix(i, model, self.positions, index0s)
-            self.add_mass(M, dofs, nijv)
-        #if 0:
-            ## ctube
-            #for i in range(model.ctube.n):
-                #M, dofs, nijv = model.ctube.get_mass_matrix(i, model, self.positions, index0s)
-                #self.add_mass(M, dofs, nijv)
-
-        # shells
-        for i in range(model.elements_shell.ctria3.n):
-            M, dofs, nijv = model.elements_shell.ctria3.get_mass_matrix(
-                i, model, self.positions, index0s)
-            self.add_mass(M, dofs, nijv)
-        for i in range(model.elements_shell.cquad4.n):
-            M, dofs, nijv = model.elements_shell.cquad4.get_mass_matrix(
-                i, model, self.positions, index0s)
-            self.add_mass(M, dofs, nijv)
-
-        # solids
+            self._add_triplets(self._mgg_triplets, M, arange(i0, i0 + 6))
+
+        elements = [
+            model.mass.conm2,
+            # cmass
+            #model.cmass1, model.cmass2, model.cmass3, model.cmass4,
+            # rods
+            model.conrod, model.crod,
+            #model.ctube,
+            # shells
+            model.elements_shell.ctria3, model.elements_shell.cquad4,
+        ]
         nsolids = model.elements_solid.n
         if nsolids:
             solid = model.elements_solid
-            for i in range(solid.ctetra4.n):
-                M, dofs, nijv = solid.ctetra4.get_mass_matrix(i, model, self.positions, index0s)
-                self.add_mass(M, dofs, nijv)
-            for i in range(solid.cpenta6.n):
-                M, dofs, nijv = solid.ctetra4.get_mass_matrix(i, model, self.positions, index0s)
-                self.add_mass(M, dofs, nijv)
-            for i in range(solid.chexa8.n):
-                M, dofs, nijv = solid.ctetra4.get_mass_matrix(i, model, self.positions, index0s)
-                self.add_mass(M, dofs, nijv)
+            elements += [solid.ctetra4, solid.cpenta6, solid.chexa8]
         # ctetra10
         # cpenta15
         # chexa20
 
-        #Mgg_sparse = coo_matrix((entries, (rows, cols)), shape=(i, i))
-        Mgg_sparse = None
-        Mgg = self.Mgg
+        for elementsi in elements:
+            self._add_element_matrices(self._mgg_triplets, model, elementsi,
+                                       'mass', index0s)
+
+        self.Mgg = _build_sparse_matrix(self._mgg_triplets, ndofs)
+        self._mgg_triplets = None
         self.log.info('returning Mgg')
-        return Mgg, Mgg_sparse
+        return self.Mgg
 
     def apply_SPCs(self, model, case, nidComponentToID):
         has_spcs = False
@@ -2144,7 +2165,8 @@ class Solver(OP2):
             mpc_id = case.get_parameter('MPC')[0]
             mpcs = model.MPC(mpc_id)
 
-            iconstraint = mp_index
+            # i is the MPC equation; the first term is the dependent dof
+            iconstraint = 0
             for mpc in mpcs:
                 if mpc.type == 'MPC':
                     for constraints in mpc.constraints:
@@ -2152,11 +2174,12 @@ class Solver(OP2):
                         for (G, C, A) in constraints:
                             key = (G, C)
                             j = nidComponentToID[key]
-                            iconstraint += 1
 
                             self.Ump.append(A)
                             self.iUmp.append(i)
                             self.jUmp.append(j)
+                        iconstraint += 1
+                        is_mpc = True
                 else:
                     raise NotImplementedError(mpc.type)
         return is_mpc
@@ -0,0 +1,36 @@
+"""tests the pyNastran solver utilities"""
+from __future__ import print_function, unicode_literals
+import unittest
+
+import numpy as np
+from scipy.sparse import diags
+
+from pyNastran.dev.bdf_vectorized.solver.utils import get_gf_transform
+
+
+class TestSolverUtils(unittest.TestCase):
+    """tests the pyNastran solver utilities"""
+
+    def test_gf_transform(self):
+        """tests the sparse g-set to f-set reduction"""
+        # SPC dof 0; MPC:  u5 - u4 = 0
+        Tgf, f_dofs = get_gf_transform(6, [0], [0, 0], [5, 4], [1., -1.])
+        assert np.array_equal(f_dofs, [1, 2, 3, 4]), f_dofs
+        expected = np.zeros((6, 4))
+        expected[[1, 2, 3, 4, 5], [0, 1, 2, 3, 3]] = 1.
+        assert np.array_equal(Tgf.toarray(), expected), Tgf.toarray()
+
+        # a spring chain
+        Kgg = diags([2. * np.ones(6), -np.ones(5), -np.ones(5)], [0, 1, -1]).tocsr()
+        Kff = Tgf.T.dot(Kgg).dot(Tgf).toarray()
+        assert Kff.shape == (4, 4), Kff.shape
+        assert np.allclose(Kff[3, 3], 2. + 2. - 2.), Kff
+
+    def test_gf_transform_no_constraints(self):
+        """no SPCs/MPCs is an identity transformation"""
+        Tgf, f_dofs = get_gf_transform(4, [], [], [], [])
+        assert np.array_equal(f_dofs, [0, 1, 2, 3]), f_dofs
+        assert np.array_equal(Tgf.toarray(), np.eye(4)), Tgf.toarray()
+
+if __name__ == '__main__':  # pragma: no cover
+    unittest.main()
@@ -1,6 +1,8 @@
 from six import iteritems
 from six.moves import zip, range
-from numpy import dot, ndarray, zeros
+from numpy import (array, arange, dot, ndarray, ones, where, zeros, full, searchsorted,
+                   unique, hstack, in1d)
+from scipy.sparse import coo_matrix  # type: ignore
 
 def partition_sparse(Is, Js, Vs):
     I2 = []
@@ -38,6 +40,148 @@ def partition_dense_symmetric(A, dofs_in):
     return (A2, dofs)
 
 
+def partition_sparse_symmetric(A, dofs_in):
+    """
+    Removes the dofs_in rows/columns from a sparse symmetric matrix
+
+    Parameters
+    ----------
+    A : (n, n) scipy.sparse matrix
+        the matrix to partition
+    dofs_in : List[int]
+        the dofs to remove
+
+    Returns
+    -------
+    A2 : (m, m) scipy.sparse.csr_matrix
+        the partitioned matrix
+    dofs : (m, ) int ndarray
+        the dofs that were kept
+    """
+    nall = A.shape[0]
+    is_kept = ones(nall, dtype='bool')
+    is_kept[array(list(dofs_in), dtype='int32')] = False
+    dofs = where(is_kept)[0]
+
+    A2 = A.tocsr()[dofs, :][:, dofs]
+    A2.data[abs(A2.data) < 1e-8] = 0.
+    A2.eliminate_zeros()
+    return A2, dofs
+
+
+def get_selection_matrix(nall, dofs):
+    """
+    Builds the sparse operator that expands a subset of dofs to the
+    full set (u_all = S @ u_dofs), so u_dofs = S.T @ u_all and
+    K_dofs = S.T @ K_all @ S
+
+    Parameters
+    ----------
+    nall : int
+        the number of dofs in the full set
+    dofs : (ndofs, ) int ndarray
+        the dofs in the subset
+
+    Returns
+    -------
+    S : (nall, ndofs) scipy.sparse.csr_matrix
+        the selection operator
+    """
+    ndofs = len(dofs)
+    S = coo_matrix((ones(ndofs, dtype='float64'), (dofs, arange(ndofs))),
+                   shape=(nall, ndofs))
+    return S.tocsr()
+
+
+def get_mpc_transform(ndofs, mpc_ids, mpc_dofs, mpc_coeffs):
+    """
+    Builds the sparse constraint transformation from the independent
+    (n-set) dofs to the full (g-set) dofs, so u_g = T @ u_n
+
+    The first term of each MPC equation is the dependent (m-set) dof:
+
+        A_m*u_m + sum(A_k*u_k) = 0
+        u_m = -sum(A_k*u_k) / A_m
+
+    Parameters
+    ----------
+    ndofs : int
+        the number of dofs in the g-set
+    mpc_ids : (nterms, ) int ndarray
+        the equation id of each term
+    mpc_dofs : (nterms, ) int ndarray
+        the g-set dof of each term
+    mpc_coeffs : (nterms, ) float ndarray
+        the coefficient of each term
+
+    Returns
+    -------
+    T : (ndofs, nn) scipy.sparse.csr_matrix
+        the transformation matrix
+    n_dofs : (nn, ) int ndarray
+        the g-set dofs of the n-set
+    """
+    mpc_ids = array(mpc_ids, dtype='int32')
+    mpc_dofs = array(mpc_dofs, dtype='int32')
+    mpc_coeffs = array(mpc_coeffs, dtype='float64')
+    if len(mpc_ids) == 0:
+        n_dofs = arange(ndofs, dtype='int32')
+        return get_selection_matrix(ndofs, n_dofs), n_dofs
+
+    # the terms are stored in order, so the first one is dependent
+    equation_ids, ifirst = unique(mpc_ids, return_index=True)
+    is_dependent = zeros(len(mpc_ids), dtype='bool')
+    is_dependent[ifirst] = True
+    m_dofs = mpc_dofs[ifirst]
+    if len(unique(m_dofs)) != len(m_dofs):
+        raise RuntimeError('a dof is dependent in multiple MPC equations; m_dofs=%s' % m_dofs)
+
+    is_m = zeros(ndofs, dtype='bool')
+    is_m[m_dofs] = True
+    n_dofs = where(~is_m)[0]
+    n_index = full(ndofs, -1, dtype='int32')
+    n_index[n_dofs] = arange(len(n_dofs))
+
+    is_independent = ~is_dependent
+    independent_dofs = mpc_dofs[is_independent]
+    if is_m[independent_dofs].any():
+        raise RuntimeError('dependent dofs=%s are independent in another MPC equation' % (
+            independent_dofs[is_m[independent_dofs]]))
+
+    iequation = searchsorted(equation_ids, mpc_ids[is_independent])
+    values = -mpc_coeffs[is_independent] / mpc_coeffs[ifirst][iequation]
+
+    nn = len(n_dofs)
+    rows = hstack([n_dofs, m_dofs[iequation]])
+    cols = hstack([arange(nn), n_index[independent_dofs]])
+    data = hstack([ones(nn, dtype='float64'), values])
+    T = coo_matrix((data, (rows, cols)), shape=(ndofs, nn))
+    return T.tocsr(), n_dofs
+
+
+def get_gf_transform(ndofs, spc_dofs, mpc_ids, mpc_dofs, mpc_coeffs):
+    """
+    Builds the sparse g-set to f-set reduction, so u_g = T @ u_f and
+    K_ff = T.T @ K_gg @ T
+
+    The MPCs are eliminated first (g -> n), then the SPC'd dofs are
+    removed (n -> f).  The SPCs must be zero (e.g., for a modal
+    analysis).  Rigid elements (e.g., RBE2) aren't included, so they
+    must be written as MPCs.
+
+    Returns
+    -------
+    T : (ndofs, nf) scipy.sparse.csr_matrix
+        the transformation matrix
+    f_dofs : (nf, ) int ndarray
+        the g-set dofs of the f-set
+    """
+    Tgn, n_dofs = get_mpc_transform(ndofs, mpc_ids, mpc_dofs, mpc_coeffs)
+    is_f = ~in1d(n_dofs, array(list(spc_dofs), dtype='int32'))
+    Tgf = Tgn[:, where(is_f)[0]]
+    return Tgf, n_dofs[is_f]
+
+
 def partition_dense_vector(F, dofs_in):
     nAll = F.shape[0]
     #print("partition_dense_vector:  dofs_in = %s" % sorted(dofs_in))
@@ -1,2 +1,5 @@
 class NoGeometry(RuntimeError):
     pass
+
+class LoadCancelled(RuntimeError):
+    pass
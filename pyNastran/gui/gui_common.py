@@ -25,7 +25,8 @@ from qtpy import QtCore, QtGui #, API
 from qtpy.QtWidgets import (
     QMessageBox, QWidget,
     QMainWindow, QDockWidget, QFrame, QHBoxLayout, QAction, QFileDialog)
-from pyNastran.gui.gui_utils.vtk_utils import numpy_to_vtk_points
+from pyNastran.gui.gui_utils.vtk_utils import (
+    numpy_to_vtk_points, set_lod_mappers, update_lod_mappers)
 
 
 import vtk
@@ -47,6 +48,7 @@ from pyNastran.gui.qt_files.gui_qt_common import GuiCommon
 from pyNastran.gui.qt_files.scalar_bar import ScalarBar
 from pyNastran.gui.qt_files.alt_geometry_storage import AltGeometry
 from pyNastran.gui.qt_files.coord_properties import CoordProperties
+from pyNastran.gui.qt_files.load_worker import LoadWorker
 
 
 from pyNastran.gui.gui_interface.legend.interface import set_legend_menu
@@ -165,6 +167,14 @@ class GuiCommon2(QMainWindow, GuiCommon):
         self.display_units = ['', '', '']
         self.recent_files = []
 
+        # the background file reader (see ``_start_load_worker``)
+        self.load_worker = None
+
+        # level of detail rendering for large models (see ``on_lod``)
+        self.use_lod = True
+        self.use_lod_decimate = False
+        self.lod_actors = []
+
     #def dragEnterEvent(self, e):
         #print(e)
         #print('drag event')
@@ -415,6 +425,8 @@ class GuiCommon2(QMainWindow, GuiCommon):
                 'anti_alias_2' : False,
                 'anti_alias_4' : False,
                 'anti_alias_8' : False,
+                'lod' : True,
+                'lod_decimate' : False,
 
                 'rotation_center' : False,
                 'measure_distance' : False,
@@ -427,8 +439,9 @@ class GuiCommon2(QMainWindow, GuiCommon):
             file_tools = [
 
                 ('exit', '&Exit', 'texit.png', 'Ctrl+Q', 'Exit application', self.closeEvent), # QtGui.qApp.quit
-                ('load_geometry', 'Load &Geometry...', 'load_geometry.png', 'Ctrl+O', 'Loads a geometry input file', self.on_load_geometry),
-                ('load_results', 'Load &Results...', 'load_results.png', 'Ctrl+R', 'Loads a results file', self.on_load_results),
+                ('load_geometry', 'Load &Geometry...', 'load_geometry.png', 'Ctrl+O', 'Loads a geometry input file', self.on_load_geometry_button),
+                ('load_results', 'Load &Results...', 'load_results.png', 'Ctrl+R', 'Loads a results file', self.on_load_results_button),
+                ('cancel_load', 'Cancel Load', '', None, 'Cancels the file that is being loaded', self.on_cancel_load),
 
                 ('load_csv_user_geom', 'Load CSV User Geometry...', '', None, 'Loads custom geometry file', self.on_load_user_geom),
                 ('load_csv_user_points', 'Load CSV User Points...', 'user_points.png', None, 'Loads CSV points', self.on_load_csv_points),
@@ -450,6 +463,8 @@ class GuiCommon2(QMainWindow, GuiCommon):
                 ('wireframe', 'Wireframe Model', 'twireframe.png', 'w', 'Show Model as a Wireframe Model', self.on_wireframe),
                 ('surface', 'Surface Model', 'tsolid.png', 's', 'Show Model as a Surface Model', self.on_surface),
                 ('geo_properties', 'Edit Geometry Properties...', '', None, 'Change Model Color/Opacity/Line Width', self.edit_geometry_properties),
+                ('lod', 'Level of Detail Rendering', '', None, 'Render the outer skin of large models while rotating', self.on_lod),
+                ('lod_decimate', 'Decimated Level of Detail', '', None, 'Render a decimated skin of large models while rotating', self.on_lod_decimate),
                 ('modify_groups', 'Modify Groups...', '', None, 'Create/Edit/Delete Groups', self.on_set_modify_groups),
 
                 ('create_groups_by_visible_result', 'Create Groups By Visible Result', '', None, 'Create Groups', self.create_groups_by_visible_result),
@@ -609,7 +624,7 @@ class GuiCommon2(QMainWindow, GuiCommon):
                           'create_groups_by_visible_result']
         menu_view += [
             '', 'clipping', #'axis',
-            'edges', 'edges_black',]
+            'edges', 'edges_black', '', 'lod', 'lod_decimate',]
         if self.html_logging:
             self.actions['log_dock_widget'] = self.log_dock_widget.toggleViewAction()
             self.actions['log_dock_widget'].setStatusTip("Show/Hide application log")
@@ -621,7 +636,7 @@ class GuiCommon2(QMainWindow, GuiCommon):
             menu_window += ['python_dock_widget']
 
         menu_file = [
-            'load_geometry', 'load_results', '',
+            'load_geometry', 'load_results', 'cancel_load', '',
             'load_custom_result', '',
             'load_csv_user_points', 'load_csv_user_geom', 'script', '', 'exit']
         toolbar_tools = ['reload', 'load_geometry', 'load_results',
@@ -802,7 +817,7 @@ class GuiCommon2(QMainWindow, GuiCommon):
         self.actions['reswidget'].setStatusTip("Show/Hide results selection")
         return self.actions
 
-    def _logg_msg(self, typ, msg):
+    def _logg_msg(self, typ, msg, add_fname=True):
         """
         Add message to log widget trying to choose right color for it.
 
@@ -812,6 +827,10 @@ class GuiCommon2(QMainWindow, GuiCommon):
             {DEBUG, INFO, GUI ERROR, COMMAND, WARNING}
         msg : str
             message to be displayed
+        add_fname : bool; default=True
+            prepend the filename/line number of the caller;
+            False for messages from the LoadWorker, which aren't
+            called from the logger
         """
         if not self.html_logging:
             print(typ, msg)
@@ -826,12 +845,13 @@ class GuiCommon2(QMainWindow, GuiCommon):
         elif typ == 'COMMAND' and not self.show_command:
             return
 
-        _fr = sys._getframe(4)  # jump to get out of the logger code
-        n = _fr.f_lineno
-        filename = os.path.basename(_fr.f_globals['__file__'])
+        if add_fname:
+            _fr = sys._getframe(4)  # jump to get out of the logger code
+            n = _fr.f_lineno
+            filename = os.path.basename(_fr.f_globals['__file__'])
 
-        #if typ in ['GUI', 'COMMAND']:
-        msg = '   fname=%-25s:%-4s   %s\n' % (filename, n, msg)
+            #if typ in ['GUI', 'COMMAND']:
+            msg = '   fname=%-25s:%-4s   %s\n' % (filename, n, msg)
 
         tim = datetime.datetime.now().strftime('[%Y-%m-%d %H:%M:%S]')
         msg = cgi.escape(msg)
@@ -1787,6 +1807,37 @@ class GuiCommon2(QMainWindow, GuiCommon):
         self.log_command('self.on_run_script(%r)' % python_file)
         return is_failed
 
+    def on_lod(self):
+        """turns the level of detail rendering on/off"""
+        self.use_lod = not self.use_lod
+        self._update_lod_actors()
+
+    def on_lod_decimate(self):
+        """turns the decimated level of detail on/off"""
+        self.use_lod_decimate = not self.use_lod_decimate
+        self._update_lod_actors()
+
+    def _add_lod_actor(self, actor):
+        """
+        Renders the skin of the actor's grid while rotating large models
+
+        The picking is done on the full grid, so the cell ids are unchanged.
+        """
+        self.lod_actors.append(actor)
+        set_lod_mappers(actor, actor.GetMapper().GetInput(),
+                        use_lod=self.use_lod, decimate=self.use_lod_decimate)
+
+    def _update_lod_actors(self):
+        """updates the level of detail mappers after a setting changes"""
+        for actor in self.lod_actors:
+            set_lod_mappers(actor, actor.GetMapper().GetInput(),
+                            use_lod=self.use_lod, decimate=self.use_lod_decimate)
+
+    def _on_render_start(self, vtk_obj, event):
+        """copies the result coloring to the level of detail mappers"""
+        for actor in self.lod_actors:
+            update_lod_mappers(actor)
+
     def on_show_info(self):
         """sets a flag for showing/hiding INFO messages"""
         self.show_info = not self.show_info
@@ -2485,7 +2536,8 @@ class GuiCommon2(QMainWindow, GuiCommon):
                                 plot=True, raise_error=True):
         """action version of ``on_load_geometry``"""
         self.on_load_geometry(infile_name=None, geometry_format=None,
-                              name='main', plot=True, raise_error=True)
+                              name='main', plot=True, raise_error=True,
+                              background=True)
 
     def _load_geometry_filename(self, geometry_format, infile_name):
         """gets the filename and format"""
@@ -2556,7 +2608,7 @@ class GuiCommon2(QMainWindow, GuiCommon):
         return is_failed, (infile_name, load_function, filter_index, formats)
 
     def on_load_geometry(self, infile_name=None, geometry_format=None, name='main',
-                         plot=True, raise_error=True):
+                         plot=True, raise_error=True, background=False):
         """
         Loads a baseline geometry
 
@@ -2571,13 +2623,43 @@ class GuiCommon2(QMainWindow, GuiCommon):
             If you're calling the on_load_results method immediately after, set it to False
         raise_error : bool; default=True
             stop the code if True
+        background : bool; default=False
+            read the file on a background thread, so the GUI stays
+            responsive; the VTK grid is still built on the main thread.
+            Requires a ``read_<format>_geometry(filename, log)`` method;
+            otherwise, the file is loaded normally.
         """
+        if self._is_loading():
+            return
         is_failed, out = self._load_geometry_filename(
             geometry_format, infile_name)
         if is_failed:
             return
 
         infile_name, load_function, filter_index, formats = out
+        read_function = None
+        if background and load_function is not None and filter_index >= 0:
+            geometry_format = formats[filter_index].lower()
+            read_function = getattr(self, 'read_%s_geometry' % geometry_format, None)
+
+        if read_function is not None and os.path.exists(infile_name):
+            def on_finished(models):
+                """builds the geometry on the main thread"""
+                self._load_geometry(infile_name, load_function, filter_index, formats,
+                                    geometry_format, name, plot, raise_error=False,
+                                    model=models[0])
+            self._start_load_worker(read_function, [infile_name], on_finished)
+            return
+        self._load_geometry(infile_name, load_function, filter_index, formats,
+                            geometry_format, name, plot, raise_error)
+
+    def _load_geometry(self, infile_name, load_function, filter_index, formats,
+                       geometry_format, name, plot, raise_error, model=None):
+        """
+        Loads a baseline geometry from a filename (or a model that was
+        read by the LoadWorker); see ``on_load_geometry``
+        """
+        has_results = False
         if load_function is not None:
             self.last_dir = os.path.split(infile_name)[0]
 
@@ -2623,7 +2705,10 @@ class GuiCommon2(QMainWindow, GuiCommon):
             #if args[-1] == 'plot':
             try:
                 time0 = time.time()
-                has_results = load_function(infile_name, name=name, plot=plot) # self.last_dir,
+                if model is None:
+                    has_results = load_function(infile_name, name=name, plot=plot) # self.last_dir,
+                else:
+                    has_results = load_function(infile_name, name=name, plot=plot, model=model)
                 dt = time.time() - time0
                 print('dt_load = %.2f sec = %.2f min' % (dt, dt / 60.))
                 #else:
@@ -2680,6 +2765,7 @@ class GuiCommon2(QMainWindow, GuiCommon):
             geom_actor = vtk.vtkLODActor()
             geom_actor.DragableOff()
             geom_actor.SetMapper(grid_mapper)
+            self._add_lod_actor(geom_actor)
             self.rend.AddActor(geom_actor)
 
             self.grid = grid
@@ -2893,7 +2979,11 @@ class GuiCommon2(QMainWindow, GuiCommon):
         self._add_cases_to_form(A, fmt_dict, headers, result_type2,
                                 out_filename_short, update=True, is_scalar=True)
 
-    def on_load_results(self, out_filename=None):
+    def on_load_results_button(self):
+        """action version of ``on_load_results``"""
+        self.on_load_results(out_filename=None, background=True)
+
+    def on_load_results(self, out_filename=None, background=False):
         """
         Loads a results file.  Must have called on_load_geometry first.
 
@@ -2901,7 +2991,14 @@ class GuiCommon2(QMainWindow, GuiCommon):
         ----------
         out_filename : str / None
             the path to the results file
+        background : bool; default=False
+            read the file on a background thread, so the GUI stays
+            responsive; the results are still added on the main thread.
+            Requires a ``read_<format>_results(filename, log)`` method;
+            otherwise, the file is loaded normally.
         """
+        if self._is_loading():
+            return
         geometry_format = self.format
         if self.format is None:
             msg = 'on_load_results failed:  You need to load a file first...'
@@ -2953,21 +3050,132 @@ class GuiCommon2(QMainWindow, GuiCommon):
                 self.log_error(msg)
                 return
                 #raise IOError(msg)
-            self.last_dir = os.path.split(out_filenamei)[0]
-            try:
-                load_function(out_filenamei)
-            except Exception: #  as e
-                msg = traceback.format_exc()
-                self.log_error(msg)
-                #return
-                raise
 
-            self.out_filename = out_filenamei
-            msg = '%s - %s - %s' % (self.format, self.infile_name, out_filenamei)
-            self.window_title = msg
-            print("on_load_results(%r)" % out_filenamei)
-            self.out_filename = out_filenamei
-            self.log_command("on_load_results(%r)" % out_filenamei)
+        read_function = None
+        if background:
+            read_function = getattr(self, 'read_%s_results' % geometry_format, None)
+
+        if read_function is not None:
+            def on_finished(models):
+                """adds the results on the main thread"""
+                for out_filenamei, model in zip(out_filename, models):
+                    try:
+                        self._load_results(load_function, out_filenamei, model=model)
+                    except Exception:
+                        # the traceback was logged
+                        return
+            self._start_load_worker(read_function, out_filename, on_finished)
+            return
+
+        for out_filenamei in out_filename:
+            self._load_results(load_function, out_filenamei)
+
+    def _load_results(self, load_function, out_filename, model=None):
+        """
+        Loads a results file (or a model that was read by the
+        LoadWorker); see ``on_load_results``
+        """
+        self.last_dir = os.path.split(out_filename)[0]
+        try:
+            if model is None:
+                load_function(out_filename)
+            else:
+                load_function(model)
+        except Exception: #  as e
+            msg = traceback.format_exc()
+            self.log_error(msg)
+            #return
+            raise
+
+        self.out_filename = out_filename
+        msg = '%s - %s - %s' % (self.format, self.infile_name, out_filename)
+        self.window_title = msg
+        print("on_load_results(%r)" % out_filename)
+        self.out_filename = out_filename
+        self.log_command("on_load_results(%r)" % out_filename)
+
+    def _is_loading(self):
+        """is the LoadWorker reading a file"""
+        if self.load_worker is not None:
+            self.log_error('a file is already being loaded; cancel it first')
+            return True
+        return False
+
+    def _start_load_worker(self, read_function, filenames, on_finished):
+        """
+        Reads the files on a background thread
+
+        Parameters
+        ----------
+        read_function : function
+            ``model = read_function(filename, log)``; must not touch the GUI
+        filenames : List[str]
+            the files to read
+        on_finished : function
+            ``on_finished(models)``; called on the main thread once all
+            the files are read
+        """
+        self.log_info('reading %s in the background; use File->Cancel Load to stop' % (
+            ', '.join(repr(filename) for filename in filenames)))
+        worker = LoadWorker(read_function, filenames, parent=self)
+        worker.on_finished = on_finished
+        worker.time0 = time.time()
+        worker.log_message.connect(self._on_load_worker_log)
+        worker.load_finished.connect(self._on_load_worker_finished)
+        worker.load_failed.connect(self._on_load_worker_failed)
+        worker.load_cancelled.connect(self._on_load_worker_cancelled)
+
+        # lets the user know we're not hung
+        self.load_timer = QtCore.QTimer(self)
+        self.load_timer.timeout.connect(self._on_load_worker_heartbeat)
+        self.load_timer.start(5000)
+
+        self.load_worker = worker
+        worker.start()
+
+    def _stop_load_worker(self):
+        """cleans up the LoadWorker; returns it"""
+        worker = self.load_worker
+        self.load_timer.stop()
+        worker.wait()
+        self.load_worker = None
+        return worker
+
+    def _on_load_worker_log(self, typ, msg):
+        """writes a LoadWorker message to the log widget"""
+        self._logg_msg(typ, msg, add_fname=False)
+
+    def _on_load_worker_heartbeat(self):
+        """the LoadWorker is still reading"""
+        dt = time.time() - self.load_worker.time0
+        self.log_info('still reading %s; dt=%.0f sec' % (
+            ', '.join(repr(filename) for filename in self.load_worker.filenames), dt))
+
+    def _on_load_worker_finished(self, models):
+        """builds the VTK objects from the models on the main thread"""
+        worker = self._stop_load_worker()
+        dt = time.time() - worker.time0
+        self.log_info('dt_read = %.2f sec = %.2f min' % (dt, dt / 60.))
+        worker.on_finished(models)
+
+    def _on_load_worker_failed(self, msg):
+        """the LoadWorker raised an error"""
+        self._stop_load_worker()
+        self.log_error(msg)
+
+    def _on_load_worker_cancelled(self):
+        """the LoadWorker was cancelled"""
+        worker = self._stop_load_worker()
+        self.log_info('cancelled loading %s' % (
+            ', '.join(repr(filename) for filename in worker.filenames)))
+
+    def on_cancel_load(self):
+        """cancels the file being read by the LoadWorker"""
+        if self.load_worker is None:
+            self.log_info('no file is being loaded')
+            return
+        self.log_info('cancelling the load...')
+        self.load_worker.cancel()
 
     def setup_gui(self):
         """
@@ -3884,7 +4092,8 @@ class GuiCommon2(QMainWindow, GuiCommon):
 
         phases, icases, isteps, scales, analysis_time = setup_animation(
             scale, istep=istep,
-            animate_scale=True, animate_phase=False, animate_time=False,
+            animate_scale=animate_scale, animate_phase=animate_phase,
+            animate_time=animate_time,
             icase=icase,
             icase_start=icase_start, icase_end=icase_end, icase_delta=icase_delta,
             time=time, onesided=True,
@@ -3897,6 +4106,14 @@ class GuiCommon2(QMainWindow, GuiCommon):
         if len(icases) == 1:
             pass
         elif animate_in_gui:
+            # compute the deflected shapes up front, so the frames just
+            # swap the points
+            try:
+                self.get_animation_cache(icases, scales, phases)
+            except (AttributeError, KeyError):
+                self.log_error('Invalid Case %i' % icases[0])
+                return
+
             class vtkAnimationCallback(object):
                 """
                 http://www.vtk.org/Wiki/VTK/Examples/Python/Animation
@@ -3914,16 +4131,10 @@ class GuiCommon2(QMainWindow, GuiCommon):
                     #j = next(self.cycler)
                     istep = isteps[i]
                     icase = icases[i]
-                    scale = scales[i]
-                    phase = phases[i]
                     if icase != self.icase0:
                         #self.cycle_results(case=icase)
                         parent.cycle_results_explicit(icase, explicit=True)
-                    try:
-                        parent.update_grid_by_icase_scale_phase(icase, scale, phase=phase)
-                    except AttributeError:
-                        parent.log_error('Invalid Case %i' % icase)
-                        parent.stop_animation()
+                    parent.update_grid_by_animation_frame(i)
                     self.icase0 = icase
 
                     parent.vtk_interactor.Render()
@@ -4054,13 +4265,16 @@ class GuiCommon2(QMainWindow, GuiCommon):
         fmt = gif_filename[:-4] + '_%%0%ii.png' % (len(str(nframes)))
         icase0 = -1
         if make_images:
-            for istep, icase, scale, phase in zip(isteps, icases, scales, phases):
+            # the frames are shared with the in-gui animation
+            self.get_animation_cache(icases, scales, phases)
+            for iframe, (istep, icase) in enumerate(zip(isteps, icases)):
                 png_filename = fmt % istep
 
                 if icase != icase0:
                     #self.cycle_results(case=icase)
                     self.cycle_results_explicit(icase, explicit=True)
-                self.update_grid_by_icase_scale_phase(icase, scale, phase=phase)
+                    icase0 = icase
+                self.update_grid_by_animation_frame(iframe)
                 #self.update_grid_by_icase_scale_phase(icase, scale, phase=phase)  # old
                 self.on_take_screenshot(fname=png_filename, magnify=magnify)
                 png_filenames.append(png_filename)
@@ -4155,6 +4369,10 @@ class GuiCommon2(QMainWindow, GuiCommon):
         self.geom_actor = vtk.vtkLODActor()
         self.geom_actor.DragableOff()
         self.geom_actor.SetMapper(self.grid_mapper)
+
+        # while rotating, large models render the outer skin
+        self._add_lod_actor(self.geom_actor)
+        self.rend.AddObserver('StartEvent', self._on_render_start)
         #geometryActor.AddPosition(2, 0, 2)
         #geometryActor.GetProperty().SetDiffuseColor(0, 0, 1) # blue
         #self.geom_actor.GetProperty().SetDiffuseColor(1, 0, 0)  # red
@@ -204,7 +204,7 @@ class AnimationWindow(PyDialog):
         self.gif = QLabel("Gif Filename:")
         self.gif_edit = QLineEdit(str(self._default_name + '.gif'))
         self.gif_button = QPushButton('Default')
-        self.gif_edit.setToolTip('Name of the gif')
+        self.gif_edit.setToolTip('Name of the gif (or *.mp4)')
         self.gif_button.setToolTip('Sets the name of the gif to %s.gif' % self._default_name)
 
         # scale / phase
@@ -704,9 +704,12 @@ class AnimationWindow(PyDialog):
 
         gif_filename = None
         if not stop_animation and not animate_in_gui and gifbase is not None:
-            if gifbase.lower().endswith('.gif'):
-                gifbase = gifbase[:-4]
-            gif_filename = os.path.join(output_dir, gifbase + '.gif')
+            if gifbase.lower().endswith('.mp4'):
+                gif_filename = os.path.join(output_dir, gifbase)
+            else:
+                if gifbase.lower().endswith('.gif'):
+                    gifbase = gifbase[:-4]
+                gif_filename = os.path.join(output_dir, gifbase + '.gif')
 
         animate_scale = self.animate_scale_radio.isChecked()
         animate_phase = self.animate_phase_radio.isChecked()
@@ -0,0 +1,227 @@
+"""
+defines:
+ - AnimationCache
+"""
+from __future__ import print_function, division
+import os
+import tempfile
+from six import iteritems
+import numpy as np
+
+
+class AnimationCache(object):
+    """
+    Stores the deflected node locations of the animation frames
+
+    The frames are computed once in a few vectorized operations, so
+    playing an animation (or writing a gif) only has to swap the VTK
+    points.  If all the frames don't fit in max_memory, the frames are
+    stored in a ring buffer and the next block of frames is computed
+    when playback reaches it.  Alternatively, the frames may be stored
+    on disk with a memmap.
+    """
+    def __init__(self, max_memory=1000., memmap_dirname=None):
+        """
+        Creates the AnimationCache
+
+        Parameters
+        ----------
+        max_memory : float; default=1000.
+            the max size of the frames (MB); unused for memmaps
+        memmap_dirname : str; default=None
+            None : store the frames in memory
+            str : store all the frames in a memmap in the directory
+        """
+        self.max_memory = max_memory
+        self.memmap_dirname = memmap_dirname
+
+        self.key = None
+        self.result_cases = None
+        self.icases = None
+        self.scales = None
+        self.phases = None
+        self.xyz_nominal = None
+
+        #: (nslots, nnodes, 3) float32 ndarray
+        self.frames = None
+
+        #: the frame stored in each slot; -1 is empty
+        self.slot_frame = None
+        self.memmap_filename = None
+
+    @property
+    def nframes(self):
+        """the number of frames in the animation"""
+        return 0 if self.icases is None else len(self.icases)
+
+    @property
+    def nslots(self):
+        """the number of frames that can be stored at once"""
+        return 0 if self.frames is None else self.frames.shape[0]
+
+    def is_valid(self, result_cases, icases, scales, phases):
+        """are the frames for the same animation"""
+        return self.key == _get_key(result_cases, icases, scales, phases)
+
+    def build(self, result_cases, icases, scales, phases):
+        """
+        Computes the frames of an animation
+
+        Parameters
+        ----------
+        result_cases : dict[icase] = (obj, (i, res_name))
+            the GUI results
+        icases : List[int]
+            the result case of each frame
+        scales : List[float]
+            the deflection scale factor of each frame; true scale
+        phases : List[float]
+            the phase angle (degrees) of each frame; unused for real results
+        """
+        self.clear()
+        nframes = len(icases)
+        assert nframes > 0, 'nframes=%s' % nframes
+        assert len(scales) == nframes, 'nscales=%s nframes=%s' % (len(scales), nframes)
+        assert len(phases) == nframes, 'nphases=%s nframes=%s' % (len(phases), nframes)
+        self.key = _get_key(result_cases, icases, scales, phases)
+        self.result_cases = result_cases
+        self.icases = np.asarray(icases, dtype='int32')
+        self.scales = np.asarray(scales, dtype='float64')
+        self.phases = np.asarray(phases, dtype='float64')
+
+        obj, (i, res_name) = result_cases[self.icases[0]]
+        self.xyz_nominal, deflected_xyz = _get_vector_results(
+            obj, i, res_name, self.scales[:1], self.phases[:1])
+        nnodes = deflected_xyz.shape[1]
+        frame_nbytes = nnodes * 3 * 4
+
+        if self.memmap_dirname is not None:
+            nslots = nframes
+            fd, self.memmap_filename = tempfile.mkstemp(
+                suffix='.animation', dir=self.memmap_dirname)
+            os.close(fd)
+            self.frames = np.memmap(self.memmap_filename, dtype='float32', mode='w+',
+                                    shape=(nslots, nnodes, 3))
+        else:
+            nslots = int(min(nframes, max(1, self.max_memory * 1e6 // frame_nbytes)))
+            self.frames = np.empty((nslots, nnodes, 3), dtype='float32')
+        self.slot_frame = np.full(nslots, -1, dtype='int32')
+        self._fill(0)
+
+    def get_frame(self, iframe):
+        """
+        Gets the deflected node locations for a frame
+
+        Parameters
+        ----------
+        iframe : int
+            the frame number
+
+        Returns
+        -------
+        xyz : (nnodes, 3) float32 ndarray
+            the deflected state; a view of the cache, which is
+            overwritten when the ring buffer wraps
+        """
+        iframe = iframe % self.nframes
+        islot = iframe % self.nslots
+        if self.slot_frame[islot] != iframe:
+            self._fill(iframe)
+        return self.frames[islot]
+
+    def _fill(self, iframe0):
+        """computes the next nslots frames starting at iframe0"""
+        nslots = self.nslots
+        iframes = np.arange(iframe0, min(iframe0 + nslots, self.nframes))
+        islots = iframes % nslots
+
+        # compute the frames that use the same result object together
+        icases = self.icases[iframes]
+        groups = {}
+        for j, icase in enumerate(icases):
+            obj, (i, res_name) = self.result_cases[icase]
+            key = (id(obj), res_name)
+            if key not in groups:
+                groups[key] = (obj, res_name, [], [])
+            groups[key][2].append(j)
+            groups[key][3].append(i)
+
+        nnodes = self.frames.shape[1]
+        # limit the size of the float64 temporary arrays to ~64 MB
+        nchunk = max(1, int(64e6 // (nnodes * 3 * 8)))
+        for unused_key, (obj, res_name, jframes, ires) in iteritems(groups):
+            jframes = np.array(jframes, dtype='int32')
+            ires = np.array(ires, dtype='int32')
+            for j0 in range(0, len(jframes), nchunk):
+                jframesi = jframes[j0:j0 + nchunk]
+                iframesi = iframes[jframesi]
+                unused_xyz, deflected_xyz = _get_vector_results(
+                    obj, ires[j0:j0 + nchunk], res_name,
+                    self.scales[iframesi], self.phases[iframesi])
+                self.frames[islots[jframesi]] = deflected_xyz
+        self.slot_frame[islots] = iframes
+
+    def clear(self):
+        """frees the frames"""
+        self.key = None
+        self.result_cases = None
+        self.icases = None
+        self.scales = None
+        self.phases = None
+        self.xyz_nominal = None
+        self.frames = None
+        self.slot_frame = None
+        if self.memmap_filename is not None:
+            try:
+                os.remove(self.memmap_filename)
+            except OSError:  # pragma: no cover
+                # windows won't delete an open file
+                pass
+            self.memmap_filename = None
+
+    def __repr__(self):
+        return 'AnimationCache(nframes=%s, nslots=%s, memmap_filename=%r)' % (
+            self.nframes, self.nslots, self.memmap_filename)
+
+
+def _get_key(result_cases, icases, scales, phases):
+    """the parameters that define an animation"""
+    obj_ids = tuple(id(result_cases[icase][0]) for icase in np.unique(icases))
+    return (obj_ids, tuple(icases), tuple(scales), tuple(phases))
+
+
+def _get_vector_results(obj, i, res_name, scales, phases):
+    """
+    Gets the deflected states of many frames
+
+    Parameters
+    ----------
+    obj : GuiResult
+        the result object
+    i : int / (nframes, ) int ndarray
+        the result index in obj for each frame
+    res_name : str
+        the result name
+    scales : (nframes, ) float ndarray
+        the deflection scale factors
+    phases : (nframes, ) float ndarray
+        the phase angles (degrees)
+
+    Returns
+    -------
+    xyz : (nnodes, 3) float ndarray
+        the nominal state
+    deflected_xyz : (nframes, nnodes, 3) float ndarray
+        the deflected states
+    """
+    nframes = len(scales)
+    i = np.broadcast_to(i, (nframes, ))
+    if hasattr(obj, 'get_vector_results_by_scales_phases'):
+        return obj.get_vector_results_by_scales_phases(i, res_name, scales, phases)
+
+    deflected_xyz = []
+    for ii, scale, phase in zip(i, scales, phases):
+        xyz, deflected_xyzi = obj.get_vector_result_by_scale_phase(
+            ii, res_name, scale, phase)
+        deflected_xyz.append(deflected_xyzi)
+    return xyz, np.array(deflected_xyz)
@@ -2,8 +2,11 @@
 defines:
  - GuiResultCommon
  - GuiResult
+ - ResultCache
+ - LazyGuiResult
 """
 from __future__ import print_function
+from collections import OrderedDict
 import numpy as np
 
 REAL_TYPES = ['<i4', '<i8', '<f4', '<f8',
@@ -447,3 +450,219 @@ class GuiResult(GuiResultCommon):
         msg = 'GuiResult\n'
         msg += '    uname=%r\n' % self.uname
         return msg
+
+
+class ResultCache(object):
+    """
+    Least recently used cache for the LazyGuiResults
+
+    The scalars for a group (e.g., the stresses at a time step) are
+    computed together, so the cache stores a dictionary of scalars for
+    each group.  Cold groups are evicted once there are more than
+    maxsize groups.
+    """
+    def __init__(self, maxsize=20):
+        """
+        Creates the ResultCache
+
+        Parameters
+        ----------
+        maxsize : int; default=20
+            the max number of groups to keep
+        """
+        self.maxsize = maxsize
+        self._results = OrderedDict()
+
+    def get(self, group, get_results):
+        """
+        Gets the results for a group and computes them if necessary
+
+        Parameters
+        ----------
+        group : hashable
+            the key for the group (e.g., ('Stress', key, itime))
+        get_results : function
+            get_results() returns the dictionary of scalars for the group
+
+        Returns
+        -------
+        results : dict[name] = (n,) ndarray
+            the scalars for the group
+        """
+        try:
+            results = self._results.pop(group)
+        except KeyError:
+            results = get_results()
+            while len(self._results) >= self.maxsize:
+                self._results.popitem(last=False)
+        self._results[group] = results
+        return results
+
+    def set(self, group, results):
+        """stores results that have already been computed"""
+        self._results.pop(group, None)
+        while len(self._results) >= self.maxsize:
+            self._results.popitem(last=False)
+        self._results[group] = results
+
+    def clear(self):
+        """empties the cache"""
+        self._results.clear()
+
+    def __len__(self):
+        return len(self._results)
+
+    def __repr__(self):
+        return 'ResultCache(maxsize=%s, ngroups=%s)' % (self.maxsize, len(self._results))
+
+
+class LazyGuiResult(GuiResult):
+    """
+    A GuiResult that is computed the first time it's displayed
+
+    Only the callback and the (key, itime) are stored.  The scalar is
+    pulled from the ResultCache, so it's recomputed if it was evicted.
+    """
+    def __init__(self, subcase_id, header, title, location, get_results,
+                 group, key, itime, name, cache,
+                 nlabels=None, labelsize=None, ncolors=None, colormap='jet',
+                 data_format=None, uname='LazyGuiResult'):
+        """
+        subcase_id : int
+            the flag that points to self.subcases for a message
+        header : str
+            the sidebar word
+        title : str
+            the legend title
+        location : str
+            node, centroid
+        get_results : function
+            get_results(key, itime) returns a dictionary of the scalars
+            for the group (e.g., all the stresses at a time step)
+        group : str
+            the type of result (e.g., 'Stress')
+        key : tuple
+            the OP2 result key
+        itime : int
+            the time step
+        name : str
+            the key of the scalar in the dictionary
+        cache : ResultCache
+            the cache that stores the computed groups
+        data_format : str
+            the type of data result (e.g. '%i', '%.2f', '%.3f')
+        uname : str
+            some unique name for ...
+        """
+        GuiResultCommon.__init__(self)
+        self.subcase_id = subcase_id
+        self.title = title
+        self.header = header
+        self.location = location
+        assert location in ['node', 'centroid'], location
+        self.uname = uname
+
+        self.get_results = get_results
+        self.group = group
+        self.key = key
+        self.itime = itime
+        self.name = name
+        self.cache = cache
+
+        # the data type and min/max are set on the first load
+        self.data_type = None
+        self.is_real = True
+        self.is_complex = False
+        self.nlabels = nlabels
+        self.labelsize = labelsize
+        self.ncolors = ncolors
+        self.colormap = colormap
+
+        if data_format is None:
+            data_format = '%.2f'
+        self.data_format = data_format
+        self.title_default = self.title
+        self.header_default = self.header
+        self.data_format_default = self.data_format
+
+        self.min_default = None
+        self.max_default = None
+        self.min_value = None
+        self.max_value = None
+
+    @property
+    def is_loaded(self):
+        """has the result been computed"""
+        return self.data_type is not None
+
+    @property
+    def scalar(self):
+        """gets the scalar from the cache and computes it if necessary"""
+        results = self.cache.get((self.group, self.key, self.itime), self._get_results)
+        scalar = results[self.name]
+        if self.data_type is None:
+            self._set_defaults(scalar)
+
+        if self.data_type not in INT_TYPES:
+            # handling VTK NaN oddinty
+            ifinite = np.isfinite(scalar)
+            if not np.all(ifinite):
+                scalar[~ifinite] = np.nan
+        return scalar
+
+    def _get_results(self):
+        """calls the callback for the group"""
+        return self.get_results(self.key, self.itime)
+
+    def _set_defaults(self, scalar):
+        """sets the data type and the min/max on the first load"""
+        assert scalar.shape[0] == scalar.size, 'shape=%s size=%s' % (str(scalar.shape), scalar.size)
+        self.data_type = scalar.dtype.str
+        if self.data_type in INT_TYPES:
+            self.data_format = '%i'
+            self.data_format_default = self.data_format
+            self.min_default = scalar.min()
+            self.max_default = scalar.max()
+        else:
+            ifinite = np.isfinite(scalar)
+            if ifinite.any():
+                self.min_default = scalar[ifinite].min()
+                self.max_default = scalar[ifinite].max()
+            else:
+                self.min_default = np.nan
+                self.max_default = np.nan
+        if self.min_value is None:
+            self.min_value = self.min_default
+            self.max_value = self.max_default
+
+    def _load(self):
+        """computes the result if it hasn't been computed"""
+        if self.data_type is None:
+            self.scalar
+
+    def get_data_type(self, i, name):
+        self._load()
+        return self.data_type
+
+    def get_data_format(self, i, name):
+        self._load()
+        return self.data_format
+
+    def get_min_max(self, i, name):
+        self._load()
+        return self.min_value, self.max_value
+
+    def get_default_data_format(self, i, name):
+        self._load()
+        return self.data_format_default
+
+    def get_default_min_max(self, i, name):
+        self._load()
+        return self.min_default, self.max_default
+
+    def __repr__(self):
+        msg = 'LazyGuiResult\n'
+        msg += '    uname=%r\n' % self.uname
+        msg += '    group=%r itime=%s name=%r is_loaded=%s\n' % (
+            self.group, self.itime, self.name, self.is_loaded)
+        return msg
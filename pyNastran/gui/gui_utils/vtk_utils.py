@@ -1,6 +1,10 @@
 """
 defines:
  - create_vtk_cells_of_constant_element_type(grid, elements, etype)
+ - create_vtk_cells_of_constant_element_types(grid, elements_list, etypes_list,
+                                              ielements_list=None)
+ - set_lod_mappers(actor, grid, use_lod=True, decimate=False)
+ - update_lod_mappers(actor)
 """
 
 import numpy as np
@@ -96,7 +100,7 @@ def create_vtk_cells_of_constant_element_type(grid, elements, etype):
     grid.SetCells(vtk_cell_types, vtk_cell_offsets, vtk_cells)
 
 def create_vtk_cells_of_constant_element_types(grid, elements_list,
-                                               etypes_list):
+                                               etypes_list, ielements_list=None):
     """
     Adding constant type elements is overly complicated enough as in
     ``create_vtk_cells_of_constant_element_type``.  Now we extend
@@ -111,8 +115,12 @@ def create_vtk_cells_of_constant_element_types(grid, elements_list,
         etype : int
             the VTK flag as defined in
             ``create_vtk_cells_of_constant_element_type``
+    ielements_list : List[ielements, ...]; default=None
+        ielements : (nelements, ) int ndarray
+            the position of each element in the grid
+        None : the element types are stacked in the order they're given
     """
-    if isinstance(etypes_list, list) and len(etypes_list) == 1:
+    if ielements_list is None and isinstance(etypes_list, list) and len(etypes_list) == 1:
         return create_vtk_cells_of_constant_element_type(
             grid, elements_list[0], etypes_list[0])
 
@@ -125,47 +133,128 @@ def create_vtk_cells_of_constant_element_types(grid, elements_list,
         msg = 'elements_list[0].dtype=%s' % str(elements_list[0].dtype)
         raise NotImplementedError(msg)
 
-    cell_offsets_list2 = []
-    cell_types_list2 = []
-    elements_list2 = []
-    nelements = 0
-    noffsets = 0
-    for element, etype in zip(elements_list, etypes_list):
-        nelement, nnodes_per_element = element.shape
-
-        nnodesp1 = nnodes_per_element + 1  # TODO: was 4; for a tri???
-        cell_offset = np.arange(0, nelement, dtype='int32') * nnodesp1 + noffsets
-        noffset = nelement * nnodesp1
-
-        cell_type = np.ones(nelement, dtype='int32') * etype
-        assert len(cell_offset) == nelement
-
-        nnodesp1 = nnodes_per_element + 1
-        element_vtk = np.zeros((nelement, nnodesp1), dtype=dtype)
-        element_vtk[:, 0] = nnodes_per_element # 3 nodes/tri
-        element_vtk[:, 1:] = element
+    if ielements_list is None:
+        ielements_list = []
+        nelements = 0
+        for element in elements_list:
+            nelement = element.shape[0]
+            ielements_list.append(np.arange(nelements, nelements + nelement))
+            nelements += nelement
+    else:
+        nelements = sum(len(ielement) for ielement in ielements_list)
 
-        cell_offsets_list2.append(cell_offset)
-        cell_types_list2.append(cell_type)
-        elements_list2.append(element_vtk.ravel())
-        nelements += nelement
-        noffsets += noffset
+    # the number of nodes per element defines where each element starts
+    nnodes = np.zeros(nelements, dtype=dtype)
+    cell_types_array = np.zeros(nelements, dtype='uint8')
+    for element, etype, ielement in zip(elements_list, etypes_list, ielements_list):
+        nnodes[ielement] = element.shape[1]
+        cell_types_array[ielement] = etype
+    cell_offsets_array = np.cumsum(nnodes + 1, dtype=dtype) - (nnodes + 1)
 
-    cell_types_array = np.hstack(cell_types_list2)
-    cell_offsets_array = np.hstack(cell_offsets_list2)
-    elements_array = np.hstack(elements_list2)
+    # each element is stored as [nnodes, n1, n2, ...]
+    elements_array = np.zeros(nnodes.sum() + nelements, dtype=dtype)
+    for element, ielement in zip(elements_list, ielements_list):
+        nnodes_per_element = element.shape[1]
+        cell_offset = cell_offsets_array[ielement]
+        elements_array[cell_offset] = nnodes_per_element
+        inodes = cell_offset[:, np.newaxis] + np.arange(1, nnodes_per_element + 1)
+        elements_array[inodes] = element
 
     # Create the array of cells
-    cells_id_type = numpy_to_vtkIdTypeArray(elements_array.ravel(), deep=1)
+    cells_id_type = numpy_to_vtkIdTypeArray(elements_array, deep=1)
     vtk_cells = vtk.vtkCellArray()
     vtk_cells.SetCells(nelements, cells_id_type)
 
     # Cell types
     vtk_cell_types = numpy_to_vtk(
-        cell_types_array, deep=0,
+        cell_types_array, deep=1,
         array_type=vtk.vtkUnsignedCharArray().GetDataType())
 
-    vtk_cell_offsets = numpy_to_vtk(cell_offsets_array, deep=0,
+    vtk_cell_offsets = numpy_to_vtk(cell_offsets_array, deep=1,
                                     array_type=vtk.VTK_ID_TYPE)
 
     grid.SetCells(vtk_cell_types, vtk_cell_offsets, vtk_cells)
+
+
+def set_lod_mappers(actor, grid, use_lod=True, decimate=False, ndivisions=100):
+    """
+    Sets the level of detail (LOD) mappers of a vtkLODActor, which are
+    rendered instead of the full grid while the user is interacting
+    with (e.g., rotating) a model that is too slow to render.  The full
+    grid is rendered once the interaction stops.
+
+    Parameters
+    ----------
+    actor : vtkLODActor
+        the actor to render with the full grid mapper
+    grid : vtkUnstructuredGrid
+        the grid that feeds the full grid mapper
+    use_lod : bool; default=True
+        render the outer skin of the model (solids are reduced to their
+        free faces); False renders the full grid
+    decimate : bool; default=False
+        also add a decimated skin, which is even faster to render
+    ndivisions : int; default=100
+        the number of bins in each direction for the decimated skin
+
+    Returns
+    -------
+    mappers : List[vtkPolyDataMapper]
+        the LOD mappers
+
+    The results are passed through to the skin, so contours are shown,
+    and the ``vtkOriginalCellIds`` cell array maps the skin back to the
+    cell ids of the grid.  Picking uses the full grid.
+    """
+    lod_mappers = actor.GetLODMappers()
+    lod_mappers.RemoveAllItems()
+    if not use_lod:
+        return []
+
+    skin_filter = vtk.vtkDataSetSurfaceFilter()
+    skin_filter.SetInputData(grid)
+    skin_filter.PassThroughCellIdsOn()
+
+    skin_mapper = vtk.vtkPolyDataMapper()
+    skin_mapper.SetInputConnection(skin_filter.GetOutputPort())
+    mappers = [skin_mapper]
+
+    if decimate:
+        tri_filter = vtk.vtkTriangleFilter()
+        tri_filter.SetInputConnection(skin_filter.GetOutputPort())
+
+        decimate_filter = vtk.vtkQuadricClustering()
+        decimate_filter.SetInputConnection(tri_filter.GetOutputPort())
+        decimate_filter.SetNumberOfDivisions(ndivisions, ndivisions, ndivisions)
+        decimate_filter.AutoAdjustNumberOfDivisionsOn()
+        decimate_filter.CopyCellDataOn()
+
+        decimate_mapper = vtk.vtkPolyDataMapper()
+        decimate_mapper.SetInputConnection(decimate_filter.GetOutputPort())
+        mappers.append(decimate_mapper)
+
+    for mapper in mappers:
+        actor.AddLODMapper(mapper)
+    update_lod_mappers(actor)
+    return mappers
+
+
+def update_lod_mappers(actor):
+    """
+    Copies the coloring (e.g., the lookup table, scalar range) from the
+    full grid mapper to the LOD mappers of a vtkLODActor
+    """
+    mapper = actor.GetMapper()
+    lod_mappers = actor.GetLODMappers()
+    for i in range(lod_mappers.GetNumberOfItems()):
+        # ShallowCopy isn't used because it copies the input of a
+        # vtkPolyDataMapper
+        lod_mapper = lod_mappers.GetItemAsObject(i)
+        lod_mapper.SetLookupTable(mapper.GetLookupTable())
+        lod_mapper.SetScalarVisibility(mapper.GetScalarVisibility())
+        lod_mapper.SetScalarRange(mapper.GetScalarRange())
+        lod_mapper.SetScalarMode(mapper.GetScalarMode())
+        lod_mapper.SetColorMode(mapper.GetColorMode())
+        lod_mapper.SetUseLookupTableScalarRange(mapper.GetUseLookupTableScalarRange())
+        lod_mapper.SetInterpolateScalarsBeforeMapping(
+            mapper.GetInterpolateScalarsBeforeMapping())
@@ -184,6 +184,7 @@ def write_gif(gif_filename, png_filenames, time=2.0,
     ----------
     gif_filename : str
         path to the output gif & png folder
+        a *.mp4 file requires the imageio ffmpeg plugin
     png_filenames : List[str]
         the pictures to make the gif from
     time : float; default=2.0
@@ -232,10 +233,13 @@ def write_gif(gif_filename, png_filenames, time=2.0,
         images = []
         for png_filename in png_filenames:
             images.append(imageio.imread(png_filename))
-        if nrepeat is True:
-            nrepeat = 0
-        imageio.mimsave(gif_filename, images, duration=duration,
-                        loop=nrepeat)
+        if gif_filename.lower().endswith('.mp4'):
+            imageio.mimsave(gif_filename, images, fps=1. / duration)
+        else:
+            if nrepeat is True:
+                nrepeat = 0
+            imageio.mimsave(gif_filename, images, duration=duration,
+                            loop=nrepeat)
 
     if delete_images:
         for png_filename in png_filenames:
@@ -12,6 +12,7 @@ from vtk.util.numpy_support import numpy_to_vtk
 
 from pyNastran.utils import integer_types
 from pyNastran.gui.gui_objects.names_storage import NamesStorage
+from pyNastran.gui.gui_objects.animation_cache import AnimationCache
 from pyNastran.gui.testing_methods import GuiAttributes
 from pyNastran.gui.gui_utils.vtk_utils import numpy_to_vtk_points
 from pyNastran.gui import IS_DEV
@@ -29,6 +30,9 @@ class GuiCommon(GuiAttributes):
         self._group_shown = {}
         self._names_storage = NamesStorage()
 
+        # the deflected frames of the last animation
+        self.animation_cache = AnimationCache()
+
         self.vtk_version = [int(i) for i in vtk.VTK_VERSION.split('.')[:1]]
         print('vtk_version = %s' % (self.vtk_version))
         if self.vtk_version[0] < 7 and not IS_DEV:  # TODO: should check for 7.1
@@ -492,6 +496,47 @@ class GuiCommon(GuiAttributes):
         self._xyz_nominal = xyz_nominal
         self._update_grid(vector_data)
 
+    def get_animation_cache(self, icases, scales, phases):
+        """
+        Gets the deflected frames of an animation, which are computed
+        the first time the animation is played
+
+        Parameters
+        ----------
+        icases : List[int]
+            the result case of each frame
+        scales : List[float]
+            the deflection scale factor of each frame; true scale
+        phases : List[float]
+            the phase angle (degrees) of each frame; unused for real results
+
+        Returns
+        -------
+        animation_cache : AnimationCache()
+            the frames
+        """
+        cache = self.animation_cache
+        if not cache.is_valid(self.result_cases, icases, scales, phases):
+            cache.build(self.result_cases, icases, scales, phases)
+        return cache
+
+    def update_grid_by_animation_frame(self, iframe):
+        """
+        Updates to the deflection state of an animation frame
+
+        Parameters
+        ----------
+        iframe : int
+            the frame number in ``self.animation_cache``
+        """
+        cache = self.animation_cache
+        self._is_displaced = True
+        self._xyz_nominal = cache.xyz_nominal
+
+        # the cache holds a reference to the frame, so VTK can use it
+        # without a copy
+        self._update_grid(cache.get_frame(iframe), deep=0)
+
     def final_grid_update(self, name, grid_result,
                           name_vector, grid_result_vector,
                           key, subtitle, label):
@@ -653,14 +698,14 @@ class GuiCommon(GuiAttributes):
         grid.Modified()
         self.grid_selected.Modified()
 
-    def _update_grid(self, nodes):
+    def _update_grid(self, nodes, deep=1):
         """deflects the geometry"""
         grid = self.grid
         points = grid.GetPoints()
         #inan = np.where(nodes.ravel() == np.nan)[0]
         #if len(inan) > 0:
             #raise RuntimeError('nan in nodes...')
-        numpy_to_vtk_points(nodes, points=points, dtype='<f', deep=1)
+        numpy_to_vtk_points(nodes, points=points, dtype='<f', deep=deep)
         grid.Modified()
         self.grid_selected.Modified()
         self._update_follower_grids(nodes)
@@ -670,9 +715,8 @@ class GuiCommon(GuiAttributes):
         for name, nids in iteritems(self.follower_nodes):
             grid = self.alt_grids[name]
             points = grid.GetPoints()
-            for j, nid in enumerate(nids):
-                i = self.nid_map[nid]
-                points.SetPoint(j, *nodes[i, :])
+            inids = np.array([self.nid_map[nid] for nid in nids], dtype='int32')
+            numpy_to_vtk_points(nodes[inids, :], points=points, dtype='<f', deep=1)
             grid.Modified()
 
     def _get_icase(self, result_name):
@@ -0,0 +1,84 @@
+"""
+defines:
+ - LoadWorker(read_function, filenames, parent=None)
+
+The LoadWorker reads a geometry/results file on a background thread, so
+the GUI stays responsive for large models.  The parsed model is handed
+back to the main thread, which is the only place VTK objects are built.
+"""
+from __future__ import print_function, unicode_literals
+import traceback
+
+from qtpy import QtCore
+
+from pyNastran.utils.log import SimpleLogger
+from pyNastran.gui.errors import LoadCancelled
+
+
+class LoadWorker(QtCore.QThread):
+    """
+    Reads files with ``read_function(filename, log)`` on a QThread
+
+    Signals
+    -------
+    log_message(typ, msg)
+        a message from the reader; routed to the log widget
+    load_finished(models)
+        a list of the values returned by read_function
+    load_failed(traceback_msg)
+        the reader raised an exception
+    load_cancelled()
+        the user cancelled the load
+
+    Cancelling is cooperative; the reader stops at the next message it
+    logs, so the main thread never has to kill the thread.
+    """
+    log_message = QtCore.Signal(str, str)
+    load_finished = QtCore.Signal(object)
+    load_failed = QtCore.Signal(str)
+    load_cancelled = QtCore.Signal()
+
+    def __init__(self, read_function, filenames, parent=None):
+        """
+        Creates the LoadWorker
+
+        Parameters
+        ----------
+        read_function : function
+            the reader; ``model = read_function(filename, log)``
+            the reader must not touch the GUI
+        filenames : List[str]
+            the files to read
+        parent : QObject; default=None
+            the parent
+        """
+        super(LoadWorker, self).__init__(parent)
+        self.read_function = read_function
+        self.filenames = filenames
+        self.is_cancelled = False
+        self.log = SimpleLogger('debug', 'utf-8', self._log_func)
+
+    def _log_func(self, typ, msg):
+        """sends the message to the main thread or stops the reader"""
+        if self.is_cancelled:
+            raise LoadCancelled('the load was cancelled')
+        self.log_message.emit(typ, msg)
+
+    def cancel(self):
+        """requests the reader stop"""
+        self.is_cancelled = True
+
+    def run(self):
+        """reads the files; called by ``start``"""
+        models = []
+        try:
+            for filename in self.filenames:
+                models.append(self.read_function(filename, self.log))
+                if self.is_cancelled:
+                    raise LoadCancelled('the load was cancelled')
+        except LoadCancelled:
+            self.load_cancelled.emit()
+        except Exception:
+            self.load_failed.emit(traceback.format_exc())
+        else:
+            self.load_finished.emit(models)
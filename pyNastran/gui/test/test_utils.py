@@ -2,8 +2,16 @@ from __future__ import print_function
 import os
 import unittest
 
+import numpy as np
+import vtk
+from vtk.util.numpy_support import vtk_to_numpy
+
 import pyNastran
+from pyNastran.gui.gui_utils.vtk_utils import (
+    numpy_to_vtk_points, create_vtk_cells_of_constant_element_type,
+    set_lod_mappers, update_lod_mappers)
 from pyNastran.gui.gui_utils.utils import load_csv, load_deflection_csv, load_user_geom
+from pyNastran.gui.gui_objects.gui_result import LazyGuiResult, ResultCache
 
 PKG_PATH = pyNastran.__path__[0]
 MODEL_PATH = os.path.join(PKG_PATH, '..', 'models')
@@ -52,5 +60,75 @@ class GuiUtils(unittest.TestCase):
         csv_filename = os.path.join(MODEL_PATH, 'custom_geom.csv')
         load_user_geom(csv_filename)
 
+    def test_gui_lazy_result(self):
+        """tests that a LazyGuiResult is computed on the first display"""
+        calls = []
+        def get_results(key, itime):
+            calls.append((key, itime))
+            oxx = np.array([1., 2., np.inf], dtype='float32') * (itime + 1)
+            is_on = np.array([1, 1, 0], dtype='int8')
+            return {'oxx' : oxx, 'is_on' : is_on}
+
+        cache = ResultCache(maxsize=1)
+        res0 = LazyGuiResult(1, 'oxx', 'oxx', 'centroid', get_results,
+                             'Stress', 'key', 0, 'oxx', cache)
+        is_on0 = LazyGuiResult(1, 'is_on', 'is_on', 'centroid', get_results,
+                               'Stress', 'key', 0, 'is_on', cache)
+        res1 = LazyGuiResult(1, 'oxx', 'oxx', 'centroid', get_results,
+                             'Stress', 'key', 1, 'oxx', cache)
+        assert len(calls) == 0, calls
+        assert not res0.is_loaded
+
+        assert res0.get_min_max(0, 'oxx') == (1., 2.)
+        assert np.isnan(res0.get_scalar(0, 'oxx')[2])
+        assert is_on0.get_data_format(0, 'is_on') == '%i'
+        assert len(calls) == 1, calls  # the group is computed once
+
+        assert res1.get_default_min_max(0, 'oxx') == (2., 4.)
+        res0.get_scalar(0, 'oxx')  # evicted
+        assert calls == [('key', 0), ('key', 1), ('key', 0)], calls
+        assert len(cache) == 1, cache
+
+    def test_gui_lod(self):
+        """tests the skin/decimated level of detail mappers"""
+        # 2 stacked hexas; the shared face isn't on the skin
+        xyz = np.array([
+            [0., 0., 0.], [1., 0., 0.], [1., 1., 0.], [0., 1., 0.],
+            [0., 0., 1.], [1., 0., 1.], [1., 1., 1.], [0., 1., 1.],
+            [0., 0., 2.], [1., 0., 2.], [1., 1., 2.], [0., 1., 2.],
+        ])
+        grid = vtk.vtkUnstructuredGrid()
+        grid.SetPoints(numpy_to_vtk_points(xyz))
+        hexas = np.array([
+            [0, 1, 2, 3, 4, 5, 6, 7],
+            [4, 5, 6, 7, 8, 9, 10, 11],
+        ])
+        create_vtk_cells_of_constant_element_type(grid, hexas, 12)
+
+        grid_mapper = vtk.vtkDataSetMapper()
+        grid_mapper.SetInputData(grid)
+        grid_mapper.SetScalarRange(1., 2.)
+        actor = vtk.vtkLODActor()
+        actor.SetMapper(grid_mapper)
+
+        mappers = set_lod_mappers(actor, grid, decimate=True)
+        assert len(mappers) == 2, mappers
+        assert actor.GetLODMappers().GetNumberOfItems() == 2
+
+        skin_mapper = mappers[0]
+        skin_mapper.Update()
+        skin = skin_mapper.GetInput()
+        assert skin.GetNumberOfCells() == 10, skin.GetNumberOfCells()
+        cell_ids = vtk_to_numpy(skin.GetCellData().GetArray('vtkOriginalCellIds'))
+        assert np.array_equal(np.bincount(cell_ids), [5, 5]), cell_ids
+
+        grid_mapper.SetScalarRange(3., 4.)
+        update_lod_mappers(actor)
+        assert skin_mapper.GetScalarRange() == (3., 4.)
+        assert skin_mapper.GetInput() is skin
+
+        assert set_lod_mappers(actor, grid, use_lod=False) == []
+        assert actor.GetLODMappers().GetNumberOfItems() == 0
+
 if __name__ == '__main__':  # pragma: no cover
     unittest.main()
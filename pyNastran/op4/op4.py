@@ -5,16 +5,17 @@ from __future__ import print_function
 import sys
 import os
 import io
-from struct import pack, unpack, Struct
+import mmap
+from struct import pack, unpack, unpack_from, Struct
 from six import string_types, iteritems, PY2, PY3
 from six.moves import range
 
 import numpy as np
 from numpy import array, zeros, float32, float64, complex64, complex128, ndarray
-from scipy.sparse import coo_matrix  # type: ignore
+from scipy.sparse import coo_matrix, csc_matrix, issparse  # type: ignore
 
 from pyNastran.utils import is_binary_file as file_is_binary
-from pyNastran.utils.mathematics import print_matrix #, print_annotated_matrix
+#from pyNastran.utils.mathematics import print_matrix, print_annotated_matrix
 from pyNastran.utils.log import get_logger2
 
 
@@ -613,29 +614,6 @@ class OP4(object):
             self.log.info('  IS=%s L=%s irow=%s' % (IS, L, irow))
         return irow, iline
 
-    def _get_irow_small_binary(self, op4, data):
-        """
-        Returns
-        -------
-        irow : int
-           the row id
-        L : int
-            the row length
-        """
-        if len(data) == 0:
-            data = op4.read(4)
-            self.n += 4
-
-        IS, = unpack(self._endian + 'i', data)
-        L = IS // 65536 - 1
-        irow = IS - 65536 * (L + 1)
-        if self.debug:
-            self.log.info('small_mat-next row')
-            self.log.info("  IS=%s L=%s irow=%s" % (IS, L, irow))
-            assert IS > 0, IS
-            assert L > 0, L
-        return irow, L
-
     def _get_irow_big_ascii(self, op4, iline, line, sline, irow):
         sline = line.strip().split()
         if len(sline) == 2:
@@ -650,185 +628,192 @@ class OP4(object):
             self.log.debug("idummy=%s irow=%s" % (idummy, irow))
         return irow, iline
 
-    def _get_irow_big_binary(self, op4, data):
-        """
-        Returns
-        -------
-        irow : int
-           the row id
-        L : int
-            ???
-        """
-        if len(data) == 0:
-            data = op4.read(8)
-            self.n += 8
-        idummy, irow = unpack(self._endian + '2i', data)
-        if self.debug:
-            self.log.debug("idummy=%s irow=%s" % (idummy, irow))
-            assert irow < 100, irow
-        return (irow, idummy - 1)
-
 #--------------------------------------------------------------------------
     def read_op4_binary(self, op4_filename, matrix_names=None, precision='default'):
-        """matrix_names must be a list or None, but basically the same"""
+        """
+        Reads a binary OP4
+
+        The file is memory mapped.  The column records of each matrix are
+        found with a quick scan of the record headers, so matrices that
+        aren't in ``matrix_names`` are skipped without being decoded, and
+        the scan stops once all the requested matrices have been read.
+
+        matrix_names must be a list or None, but basically the same
+        """
         with io.open(op4_filename, mode='rb') as op4:
             self.n = 0
             self._endian = self._determine_endian(op4)
-
-            matrices = {}
-            name = 'dummyName'
-            while name is not None:
-                #print "i =", i
-                # checks for the end of the file
-                assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-                n = self.n
-                data1 = op4.read(1)
-                op4.seek(n)
-                if len(data1) == 0:
+            mdata = mmap.mmap(op4.fileno(), 0, access=mmap.ACCESS_READ)
+
+        matrices = {}
+        try:
+            nbytes = len(mdata)
+            nmatrices = None if matrix_names is None else len(set(matrix_names))
+            while self.n < nbytes:
+                (name, form, matrix_type, nrows, ncols, is_big_mat,
+                 columns) = self._scan_matrix_binary(mdata)
+
+                if not _is_matrix_name(name, matrix_names):
+                    continue
+                if not columns:
+                    # there are no column records, so don't allocate a
+                    # (possibly huge) dense matrix of zeros
+                    dtype = get_dtype(matrix_type, precision)
+                    A = coo_matrix((nrows, ncols), dtype=dtype)
+                elif columns[0][2] == 0:
+                    A = self._read_sparse_binary(mdata, nrows, ncols, matrix_type,
+                                                 is_big_mat, columns, precision)
+                else:
+                    A = self._read_dense_binary(mdata, nrows, ncols, matrix_type,
+                                                columns, precision)
+                matrices[name] = (form, A)
+                if nmatrices is not None and len(matrices) == nmatrices:
                     break
-                #self.show(f, 60)
-
-                (name, form, matrix) = self._read_matrix_binary(op4, precision, matrix_names)
-                #print print_matrix(matrix)
-                if name is not None:
-                    if matrix_names is None or name in matrix_names:  # save the matrix
-                        matrices[name] = (form, matrix)
-
-                #print "not op4.closed = ",not op4.closed,form,name
-                # if not op4.closed or form is not None:
-                #     data = op4.read(4)
-                #     self.n += 4
-                #     if len(data) == 0:
-                #         break
-                #     (record_length,) = unpack(self._endian + 'i', data)
-                #     print("record_length = %s" % record_length)
-                #     if record_length == 24:
-                #         self.n -= 4
-                #         op4.seek(self.n)
-                #     else:
-                #         data = op4.read(4)
-                #         if len(data) == 0:
-                #             break
-                #         (record_length2,) = unpack(self._endian + 'i', data)
-                #         assert record_length2 == 24
-                #         op4.seek(self.n)
-                #
+        finally:
+            mdata.close()
         return matrices
 
-    def read_start_marker(self, op4):
-        if self.debug:
-            self.log.info('--------------------------------------')
-        #self.show(op4, 60)
-        data = op4.read(4)
-        self.n += 4
-        record_length, = unpack(self._endian + 'i', data)
-
-        record_length = 16
-        data = op4.read(record_length)
-        self.n += record_length
-        assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-
-        if record_length == 16:
-            a, icol, irow, nwords = unpack(self._endian + '4i', data)
-            if self.debug:
-                self.log.info("a=%s icol=%s irow=%s nwords=%s" % (a, icol, irow, nwords))
-        else:
-            raise NotImplementedError('record_length=%s' % record_length)
-        return (a, icol, irow, nwords)
+    def _scan_matrix_binary(self, mdata):
+        """
+        Reads the matrix header and finds the column records without
+        decoding the values
 
-    def _read_matrix_binary(self, op4, precision, matrix_names):
-        """reads a matrix"""
-        #self.show(f, 60)
-        if self.debug:
-            self.log.info("*************************")
-        data = op4.read(4)
-        self.n += 4
-        (record_length,) = unpack(self._endian + 'i', data)
-        assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-        if self.debug:
-            self.log.info("record_length = %s" % record_length)
+        Each column record is:
+            [record_length, icol, irow, nwords, values..., record_length]
+        The matrix ends with a dummy record where icol=ncols+1.
 
+        Returns
+        -------
+        name, form, matrix_type, nrows, ncols, is_big_mat
+            the matrix header
+        columns : List[(int, int, int, int)]
+            (record_offset, icol, irow, nwords) for each column record,
+            where the values start at record_offset + 16
+        """
+        endian = self._endian
+        n = self.n
+        record_length, = unpack_from(endian + 'i', mdata, n)
         if record_length == 24:
-            data = op4.read(record_length)
-            self.n += record_length
-
-            (ncols, nrows, form, Type, name) = unpack(
-                self._endian + '4i8s', data)
-            if self.debug:
-                self.log.info("nrows=%s ncols=%s form=%s Type=%s name=%r" % (
-                    nrows, ncols, form, Type, name))
+            (ncols, nrows, form, matrix_type, name) = unpack_from(
+                endian + '4i8s', mdata, n + 4)
         elif record_length == 48:
-            data = op4.read(record_length)
-            self.n += record_length
-
-            #self._show_data(data, types='ifdlqILQs', endian=None)
-            (ncols, nrows, form, Type, name) = unpack(
-                self._endian + '4Q16s', data)
-            if self.debug:
-                self.log.info("nrows=%s ncols=%s form=%s Type=%s name=%r" % (
-                    nrows, ncols, form, Type, name))
+            (ncols, nrows, form, matrix_type, name) = unpack_from(
+                endian + '4Q16s', mdata, n + 4)
         else:
-            #msg = record_length #+ self.print_block(data)
-            msg = 'record_length=%s filename=%r' % (record_length, op4.name)
+            msg = 'record_length=%s n=%s' % (record_length, n)
             raise NotImplementedError(msg)
-
+        n += record_length + 8
         name = name.strip()
         if self.debug:
-            if Type == 1:
-                self.log.info("Type = Real, Single Precision")
-            elif Type == 2:
-                self.log.info("Type = Real, Double Precision")
-            elif Type == 3:
-                self.log.info("Type = Complex, Single Precision")
-            elif Type == 4:
-                self.log.info("Type = Complex, Double Precision")
-
+            self.log.info("nrows=%s ncols=%s form=%s Type=%s name=%r" % (
+                nrows, ncols, form, matrix_type, name))
         is_big_mat, nrows = get_big_mat_nrows(nrows)
 
-        if self.debug:
-            self.log.info('is_big_matrix = %s' % is_big_mat)
-
-        # jump forward to get irow (needed for check on is_sparse),
-        # then jump back
-        nsave = self.n
-        irow = self.read_start_marker(op4)[2]
-        op4.seek(nsave)
-        self.n = nsave
+        columns = []
+        icol_end = ncols + 1
+        struct_markers = Struct(endian + '4i')
+        while 1:
+            record_length, icol, irow, nwords = struct_markers.unpack_from(mdata, n)
+            if icol == icol_end:
+                n += record_length + 8
+                break
+            columns.append((n, icol, irow, (record_length - 12) // 4))
+            n += record_length + 8
+        self.n = n
+        return name, form, matrix_type, nrows, ncols, is_big_mat, columns
+
+    def _read_dense_binary(self, mdata, nrows, ncols, matrix_type, columns,
+                           precision='default'):
+        """decodes the column records of a dense real/complex matrix"""
+        dtype = get_dtype(matrix_type, precision)
+        value_dtype, nwords_per_value = _get_binary_value_dtype(matrix_type, self._endian)
+        A = zeros((nrows, ncols), dtype=dtype)
+        for (n, icol, irow, nwords) in columns:
+            nvalues = nwords // nwords_per_value
+            values = np.frombuffer(mdata, dtype=value_dtype, count=nvalues, offset=n + 16)
+            A[irow-1:irow-1+nvalues, icol-1] = values
+        return A
 
-        #(nwords_per_value, nbytes_per_value, data_format, dtype) = self._get_matrix_info(Type)
-        data_format, dtype = self._get_matrix_info(Type)[2:]
+    def _read_sparse_binary(self, mdata, nrows, ncols, matrix_type, is_big_mat,
+                            columns, precision='default'):
+        """
+        Decodes the column records of a sparse real/complex matrix
 
-        is_sparse = False
-        if irow == 0:
-            is_sparse = True
+        Each column is a series of strings of consecutive rows:
+         - small: [IS, values...], where IS = irow + 65536 * (L + 1)
+         - BIGMAT: [L + 1, irow, values...]
+        where L is the number of words in the string.
 
-        assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-        if Type in [1, 2]:  # real
-            A = self._read_real_binary(op4, nrows, ncols, Type, is_sparse, is_big_mat)
-        elif Type in [3, 4]:  # complex
-            A = self._read_complex_binary(op4, nrows, ncols, Type, is_sparse, is_big_mat)
-        else:
-            raise TypeError("Type=%s" % Type)
-
-        #try:
-            #print_matrix(A.todense())
-        #except:
-            #pass
-
-        if data_format in ['d', 'dd']:
-            op4.read(8)
-            self.n += 8
-        elif data_format in ['f', 'ff']:
-            op4.read(4)
-            self.n += 4
-        else:
-            raise NotImplementedError(data_format)
-        #f.read(record_length); self.n+=record_length
-        #self.show(f, 10)
-        #f.read(4); self.n+=4
+        The CSC arrays are preallocated from the record sizes (an upper
+        bound on the number of nonzeros), so each column's values are
+        decoded with a single frombuffer and written in place.
 
-        assert self.n == op4.tell(), 'n=%s op4.tell=%s' % (self.n, op4.tell())
-        return (name, form, A)
+        Returns
+        -------
+        A : coo_matrix
+            the matrix
+        """
+        endian = self._endian
+        dtype = get_dtype(matrix_type, precision)
+        value_dtype, nwords_per_value = _get_binary_value_dtype(matrix_type, endian)
+        word_dtype = endian + 'i4'
+        nheader_words = 2 if is_big_mat else 1
+        struct_header = Struct(endian + '%ii' % nheader_words)
+
+        nnz_max = sum(column[3] for column in columns) // nwords_per_value
+        data = zeros(nnz_max, dtype=dtype)
+        indices = zeros(nnz_max, dtype='int32')
+        indptr = zeros(ncols + 1, dtype='int32')
+
+        inz = 0
+        jcol_last = -1
+        for (n, icol, irow, nwords) in columns:
+            # skips over the empty columns; a column may have multiple records
+            jcol = icol - 1
+            indptr[jcol_last+1:jcol+1] = inz
+
+            # find the string headers
+            n0 = n + 16
+            iword = 0
+            iheaders = []
+            irows = []
+            nvalues = []
+            while iword < nwords:
+                if is_big_mat:
+                    nwords_string, irowi = struct_header.unpack_from(mdata, n0 + 4 * iword)
+                    nwords_string -= 1
+                else:
+                    IS, = struct_header.unpack_from(mdata, n0 + 4 * iword)
+                    nwords_string = IS // 65536 - 1
+                    irowi = IS - 65536 * (nwords_string + 1)
+                iheaders.append(iword)
+                irows.append(irowi)
+                nvalues.append(nwords_string // nwords_per_value)
+                iword += nheader_words + nwords_string
+
+            # drop the string headers and decode all the values at once
+            words = np.frombuffer(mdata, dtype=word_dtype, count=nwords, offset=n0)
+            is_value = np.ones(nwords, dtype='bool')
+            iheaders = np.array(iheaders, dtype='int32')
+            for iheader in range(nheader_words):
+                is_value[iheaders + iheader] = False
+            values = words[is_value].view(value_dtype)
+
+            nvalues = np.array(nvalues, dtype='int32')
+            nvalues_col = len(values)
+            istart = np.cumsum(nvalues) - nvalues
+            rows = np.repeat(np.array(irows, dtype='int32') - 1 - istart, nvalues)
+            rows += np.arange(nvalues_col, dtype='int32')
+
+            data[inz:inz+nvalues_col] = values
+            indices[inz:inz+nvalues_col] = rows
+            inz += nvalues_col
+            indptr[jcol+1] = inz
+            jcol_last = jcol
+        indptr[jcol_last+1:] = inz
+
+        A = csc_matrix((data[:inz], indices[:inz], indptr), shape=(nrows, ncols))
+        return A.tocoo(copy=False)
 
     def _get_matrix_info(self, matrix_type, debug=True):
         if matrix_type == 1:
@@ -857,158 +842,6 @@ class OP4(object):
             self.log.info('  dtype = %s ' % dtype)
         return (nwords_per_value, nbytes_per_value, data_format, dtype)
 
-    def _read_real_dense_binary(self, op4, nrows, ncols, matrix_type, is_big_mat):
-        if self.debug:
-            self.log.info('_read_real_dense_binary')
-        out = self._get_matrix_info(matrix_type, debug=False)
-        (nwords_per_value, _nbytes_per_value, data_format, dtype) = out
-        A = zeros((nrows, ncols), dtype=dtype)
-
-        icol = -1  # dummy value so the loop starts
-        while icol < ncols + 1:  # if isDense
-            assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-            (icol, irow, nwords) = self.get_markers_dense(op4)
-            L = nwords
-            if icol == ncols + 1:
-                break
-            if L == -1:
-                break
-
-            record_length = 4 * nwords
-            data = op4.read(record_length)
-            self.n += record_length
-            nvalues = L // nwords_per_value
-            str_values = self._endian + '%i%s' % (nvalues, data_format)
-            A[irow-1:irow-1+nvalues, icol-1] = unpack(str_values, data)
-            if self.debug:
-                self.log.info('A[%s:%s, %s] = %s' % (
-                    irow - 1,
-                    irow - 1 + nvalues,
-                    icol-1,
-                    A[irow-1:irow-1+nvalues, icol-1]))
-        #assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-        op4.read(4)
-        self.n += 4
-        return A
-
-
-    def _read_real_binary(self, op4, nrows, ncols, matrix_type, is_sparse, is_big_mat):
-        if is_sparse:
-            A = self._read_real_sparse_binary(op4, nrows, ncols, matrix_type, is_big_mat)
-        else:
-            A = self._read_real_dense_binary(op4, nrows, ncols, matrix_type, is_big_mat)
-        return A
-
-    def _read_real_sparse_binary(self, op4, nrows, ncols, matrix_type, is_big_mat):
-        if self.debug:
-            self.log.info('_read_real_sparse_binary')
-        out = self._get_matrix_info(matrix_type, debug=False)
-        (nwords_per_value, nbytes_per_value, data_format, dtype) = out
-        rows = []
-        cols = []
-        entries = []
-
-        data = ''
-        icol = -1  # dummy value so the loop starts
-        while icol < ncols + 1:  # if isDense
-            #if record_length==0:
-            assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-            (icol, irow, nwords) = self.get_markers_sparse(op4, is_big_mat)
-            L = nwords
-
-            if icol == ncols + 1:
-                if self.debug:
-                    self.log.info('breaking on icol=%s ncol+1=%s' % (icol, ncols + 1))
-                break
-
-            if is_big_mat:
-                irow, L = self._get_irow_big_binary(op4, data[:8])
-                data = data[8:]
-            else:
-                irow, L = self._get_irow_small_binary(op4, data[:4])
-                data = data[4:]
-
-            if L == -1:
-                if self.debug:
-                    self.log.info('breaking on L=-1')
-                break
-
-            if self.debug:
-                self.log.info("  next icol")
-                self.log.info("    n=%s icol=%s irow=%s nwords=%s" % (
-                    self.n, icol, irow, nwords))
-                self._show(op4, 100, types='qd')
-                self.log.info('**************************************************')
-
-            #if nwords == 0 and is_big_mat:
-                #self.n -= 4
-                #op4.seek(self.n)
-                #break
-
-            record_length = 4 * nwords
-            data = op4.read(record_length)
-            self.n += record_length
-            if self.debug:
-                self.log.info("  data_format=%s record_length=%s n_next=%s" % (
-                    data_format, record_length, self.n))
-            #if icol == ncols + 1:
-                #break
-
-            i = 0
-            while len(data) > 0:
-                if i > 0:
-                    if is_big_mat:
-                        (irow, L) = self._get_irow_big_binary(op4, data[0:8])
-                        data = data[8:]
-                    else:
-                        (irow, L) = self._get_irow_small_binary(op4, data[0:4])
-                        data = data[4:]
-                    assert irow > 0
-                nvalues = L // nwords_per_value
-                str_values = self._endian + '%i%s' % (nvalues, data_format)
-
-                if self.debug:
-                    self.log.info('irow=%s L=%s nwords_per_value=%s nvalues=%s '
-                                  'nbytes_per_value=%s' % (irow, L, nwords_per_value,
-                                                           nvalues, nbytes_per_value))
-                    self.log.info('str_values = %r' % str_values)
-
-                value_list = unpack(str_values, data[0:nvalues * nbytes_per_value])
-                assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-
-                #irow -= 1
-                #icol -= 1
-                if self.debug:
-                    self.log.info('rows = %s' % list(i+irow-1 for i in range(nvalues)))
-                    self.log.info('cols = %s ' % ([icol-1] * nvalues))
-                    self.log.info('value_list = %s' % str(value_list))
-
-                rows.extend([i+irow-1 for i in range(nvalues)])
-                irow += nvalues
-                cols.extend([icol-1] * nvalues)
-                entries.extend(value_list)
-
-                record_length -= nvalues * nbytes_per_value
-                data = data[nvalues * nbytes_per_value:]
-                if self.debug:
-                    self.log.info("  record_length=%s nbytes_per_value=%s len(data)=%s" % (
-                        record_length, nbytes_per_value, len(data)))
-                    ##print(A)
-                    #print("********")  # ,data
-                    #print(self.print_block(data))
-                i += 1
-            #print "-------------------------------"
-
-        #if rows == []:  # NULL matrix
-            #raise NotImplementedError()
-
-        A = coo_matrix((entries, (rows, cols)), shape=(nrows, ncols),
-                       dtype=dtype)
-        op4.read(4)
-        self.n += 4
-
-        return A
-
     def _show(self, op4, n, types='ifs', endian=None):
         """
         Shows binary data
@@ -1124,252 +957,6 @@ class OP4(object):
         f.seek(self.n)
         return self._write_data(fout, data, types=types)
 
-    def _read_complex_dense_binary(self, op4, nrows, ncols, matrix_type, is_big_mat):
-        """reads a dense complex binary matrix"""
-        if self.debug:
-            self.log.info('_read_complex_dense_binary')
-        out = self._get_matrix_info(matrix_type, debug=False)
-        (nwords_per_value, nbytes_per_value, data_format, dtype) = out
-
-        A = zeros((nrows, ncols), dtype=dtype)
-        record_length = 0
-        icol = -1  # dummy value so the loop starts
-        while icol < ncols + 1:  # if isDense
-            #if record_length==0:
-            assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-            (icol, irow, nwords) = self.get_markers_dense(op4)
-            if self.debug:
-                self.log.info("N=%s icol=%s irow=%s nwords=%s" % (
-                    self.n, icol, irow, nwords))
-                self.log.info("-----------")
-
-            L = nwords
-            if icol == ncols + 1:
-                if self.debug:
-                    self.log.info('breaking...icol=%s ncols+1=%s' % (
-                        icol, ncols + 1))
-                break
-
-            if L == -1:
-                if self.debug:
-                    self.log.info('breaking...nwords (L) = %s' % nwords)
-                break
-
-            if self.debug:
-                self.log.info("  n=%s icol=%s irow=%s nwords=%s" % (
-                    self.n, icol, irow, nwords))
-
-            #if nwords == 0 and is_big_mat:
-                #self.n -=4
-                #f.seek(self.n)
-                #break
-
-            record_length = 4 * nwords
-            data = op4.read(record_length)
-            self.n += record_length
-            if self.debug:
-                self.log.info("data_format=%s record_length=%s n_next=%s" % (
-                    data_format, record_length, self.n))
-            if icol == ncols + 1:
-                continue
-
-            nvalues = nwords // nwords_per_value
-            #nread = nwords // 4
-            while record_length >= nbytes_per_value:
-                if self.debug:
-                    self.log.info("inner while...")
-                    self.log.info("nwords  = %s" % nwords)
-                    self.log.info("nvalues = %s" % nvalues)
-                    self.log.info("nwords_per_value = %s" % nwords_per_value)
-
-                #if nvalues == 0:
-                    #assert icol == ncols + 1
-                    #break
-
-                # we have more 2x values for complex numbers
-                str_values = self._endian + '%i%s' % (nvalues * 2, data_format)
-                if self.debug:
-                    self.log.info("str_values = %s" % str_values)
-                    self.log.info("nvalues*nbytes_per_value=%s len(data)=%s" % (
-                        nvalues * nbytes_per_value, len(data)))
-                value_list = unpack(str_values, data[0:nvalues * nbytes_per_value])
-                assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-                #self.show(op4, 4)
-                #print self.print_block(data)
-                if self.debug:
-                    self.log.info("value_list = %s" % str(value_list))
-
-                #irow -= 1
-                #icol -= 1
-                irow -= 1
-                icol -= 1
-                for i, value in enumerate(value_list):
-                    if i % 2 == 0:
-                        real_value = value
-                    else:
-                        ai = complex(real_value, value)
-                        if self.debug:
-                            self.log.info("A[%s,%s] = %s" % (irow, icol, ai))
-                        A[irow, icol] = ai
-                        irow += 1
-
-                record_length -= nvalues * nbytes_per_value
-                data = data[nvalues * nbytes_per_value:]
-                if self.debug:
-                    self.log.info("record_length=%s nbytes_per_value=%s" % (
-                        record_length, nbytes_per_value))
-                    self.log.info(print_matrix(A))
-                    self.log.info("******** %s" % data)
-
-        op4.read(4)
-        self.n += 4
-        return A
-
-    def _read_complex_binary(self, op4, nrows, ncols, matrix_type, is_sparse, is_big_mat):
-        """reads a complex binary matrix"""
-        if is_sparse:
-            A = self._read_complex_sparse_binary(op4, nrows, ncols, matrix_type, is_big_mat)
-        else:
-            A = self._read_complex_dense_binary(op4, nrows, ncols, matrix_type, is_big_mat)
-        return A
-
-    def _read_complex_sparse_binary(self, op4, nrows, ncols, matrix_type, is_big_mat):
-        """reads a sparse complex binary matrix"""
-        if self.debug:
-            self.log.info('_read_complex_sparse_binary')
-        out = self._get_matrix_info(matrix_type, debug=False)
-        (nwords_per_value, nbytes_per_value, data_format, dtype) = out
-        rows = []
-        cols = []
-        entries = []
-        record_length = 0
-        data = ''
-        icol = -1  # dummy value so the loop starts
-        while icol < ncols + 1:  # if isDense
-            #if record_length == 0:
-            assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-            (icol, irow, nwords) = self.get_markers_sparse(op4, is_big_mat)
-            if self.debug:
-                self.log.info("n=%s icol=%s irow=%s nwords=%s" % (
-                    self.n, icol, irow, nwords))
-                self.log.info("-----------")
-
-            L = nwords
-            if icol == ncols + 1:
-                break
-
-            if is_big_mat:
-                (irow, L) = self._get_irow_big_binary(op4, data[:8])
-                data = data[8:]
-            else:
-                (irow, L) = self._get_irow_small_binary(op4, data[:4])
-                data = data[4:]
-
-            if L == -1:
-                if self.debug:
-                    self.log.info('breaking on L=-1')
-                break
-
-            if self.debug:
-                self.log.info("n=%s icol=%s irow=%s nwords=%s" % (
-                    self.n, icol, irow, nwords))
-                self._show(op4, 100, types='qf')
-                self.log.info('\n\n')
-
-            #if nwords == 0 and is_big_mat:
-                #self.n -= 4
-                #op4.seek(self.n)
-                #break
-
-            record_length = 4 * nwords
-            data = op4.read(record_length)
-            self.n += record_length
-            if self.debug:
-                self.log.info("data_format=%s record_length=%s n_next=%s" % (
-                    data_format, record_length, self.n))
-            if icol == ncols + 1:
-                continue
-
-            nvalues = nwords // nwords_per_value
-            while record_length >= nbytes_per_value:
-                if self.debug:
-                    self.log.info("inner while...")
-                    self.log.info("nwords  = %s" % nwords)
-                    self.log.info("nvalues = %s" % nvalues)
-                    self.log.info("nwords_per_value = %s" % nwords_per_value)
-
-                #if nvalues == 0:
-                    #assert icol == ncols + 1
-                    #break
-
-                # we have 2x values for complex
-                str_values = self._endian + '%i%s' % (nvalues * 2, data_format)
-                if self.debug:
-                    self.log.info("  str_values = %s" % str_values)
-                    self.log.info("  nvalues*nbytes_per_value=%s len(data)=%s" % (
-                        nvalues * nbytes_per_value, len(data)))
-                value_list = unpack(str_values, data[0:nvalues * nbytes_per_value])
-                assert self.n == op4.tell(), 'n=%s tell=%s' % (self.n, op4.tell())
-                #self.show(op4, 4)
-                #print(self.print_block(data))
-                if self.debug:
-                    self.log.info("  value_list = %s" % str(value_list))
-
-                #irow -= 1
-                #icol -= 1
-                irow -= 1
-                icol -= 1
-
-                cols += [icol] * nvalues
-                rows += [i + irow for i in range(nvalues)]
-                for i, value in enumerate(value_list):
-                    if i % 2 == 0:
-                        real_value = value
-                    else:
-                        if self.debug:
-                            self.log.info("  A[%s,%s] = %s" % (
-                                irow, icol, complex(real_value, value)))
-                        #A[irow, icol] = complex(real_value, value)
-                        entries.append(complex(real_value, value))
-                        irow += 1
-
-                record_length -= nvalues * nbytes_per_value
-                data = data[nvalues * nbytes_per_value:]
-                #print("record_length=%s nbytes_per_value=%s" % (record_length, nbytes_per_value))
-                #print(print_matrix(A))
-                #print("********", data)
-
-        A = coo_matrix((entries, (rows, cols)), shape=(nrows, ncols), dtype=dtype)
-        op4.read(4)
-        self.n += 4
-        return A
-
-    def get_markers_sparse(self, op4, is_big_mat):
-        if is_big_mat:
-            (a, icol, irow, nwords) = self.read_start_marker(op4)
-            #irow = self._get_irow_big(op4)
-            nwords -= 2
-            #if nwords > 1:
-               #nwords -= 2
-            #else:
-               #print("nwords0 = %s" % nwords)
-               #nwords = 0
-        else:
-            a, icol, irow, nwords = self.read_start_marker(op4)
-            if irow != 0:
-                assert nwords == 1, 'nwords=%s' % nwords
-
-            #irow = self._get_irow_small(f)
-            nwords -= 1
-        return icol, irow, nwords
-
-    def get_markers_dense(self, op4):
-        a, icol, irow, nwords = self.read_start_marker(op4)
-        if self.debug:
-            self.log.info("n=%s a=%s icol=%s irow=%s nwords=%s"% (
-                self.n, a, icol, irow, nwords))
-        return icol, irow, nwords
-
     def write_op4(self, op4_filename, matrices, name_order=None,
                   precision='default', is_binary=True):
         """
@@ -1381,7 +968,7 @@ class OP4(object):
             The filename to write
             String -> opens a file (closed at the end)
             file   -> no file is opened and it's not closed
-        matrices : Dict[str] = (form, np.ndarray)
+        matrices : Dict[str] = (form, np.ndarray / scipy.sparse matrix)
             the matrices to write
 
         name_order: str / List[str]; default=None -> sorted based on name
@@ -1405,6 +992,7 @@ class OP4(object):
         }
 
         .. todo::  This method is not even close to being done
+        .. note:: sparse matrices may be written in binary or ASCII
         """
         if precision not in ('single', 'double', 'default'):
             msg = "precision=%r and must be 'single', 'double', or 'default'" % precision
@@ -1419,7 +1007,7 @@ class OP4(object):
                 wb = 'wb'
             else:
                 wb = 'w'
-            with open(op4_filename, 'w') as op4:
+            with open(op4_filename, wb) as op4:
                 self._write_op4_file(op4, name_order, is_binary, precision, matrices)
         else:
             op4 = op4_filename
@@ -1444,13 +1032,15 @@ class OP4(object):
             if not form in (1, 2, 3, 6, 8, 9):
                 raise ValueError('form=%r and must be in [1, 2, 3, 6, 8, 9]' % form)
 
-            if isinstance(matrix, coo_matrix):
+            if issparse(matrix):
                 #write_DMIG(f, name, matrix, form, precision='default')
                 if is_binary:
-                    raise NotImplementedError('sparse binary op4 writing not implemented')
+                    self._write_sparse_matrix_binary(
+                        op4, name, matrix, form=form,
+                        precision=precision, is_big_mat=is_big_mat)
                 else:
                     _write_sparse_matrix_ascii(
-                        op4, name, matrix, form=form,
+                        op4, name, matrix.tocoo(), form=form,
                         precision=precision, is_big_mat=is_big_mat)
             elif isinstance(matrix, ndarray):
                 if is_binary:
@@ -1461,7 +1051,7 @@ class OP4(object):
                         op4, name, matrix, form=form, precision=precision)
             else:
                 msg = ('Matrix type=%r is not supported.  '
-                       'types=[coo_matrix, ndarray]' % type(matrix))
+                       'types=[scipy.sparse matrix, ndarray]' % type(matrix))
                 raise NotImplementedError(msg)
 
 
@@ -1588,6 +1178,78 @@ class OP4(object):
             msg = pack(self._endian + '4id', 24, ncols + 1, 1, 1, 1.0)
         op4.write(msg)
 
+    def _write_sparse_matrix_binary(self, op4, name, A, form=2, precision='default',
+                                    is_big_mat=False, nnz_chunk=1000000):
+        """
+        Writes a sparse matrix to a binary OP4
+
+        Each column is written as a record of strings of consecutive rows:
+         - small: [IS, values...], where IS = irow + 65536 * (L + 1)
+         - BIGMAT: [L + 1, irow, values...]
+        where L is the number of words in the string.  BIGMAT is used
+        if is_big_mat=True or there are more than 65535 rows.
+
+        The records are built directly from the CSC indptr/indices/data
+        arrays, so there are no per-entry loops.
+
+        Parameters
+        ----------
+        op4 : file
+            a binary file object
+        name : str
+            the name of the matrix
+        A : scipy.sparse matrix
+            the matrix to write
+        form : int; default=2
+            the matrix form
+        precision : str; default='default'
+            {'default', 'single', 'double'}
+        is_big_mat : bool; default=False
+            should the BIGMAT format be used
+        nnz_chunk : int; default=1000000
+            the approximate number of nonzeros to write at a time, which
+            limits the memory usage
+        """
+        if isinstance(name, bytes):
+            name = name.decode('ascii')
+        assert len(name) <= 8, 'name=%r is too long; 8 characters max' % name
+        endian = self._endian if self._endian else '='
+
+        A = A.tocsc()
+        A.sum_duplicates()  # sorts the indices too
+        (nrows, ncols) = A.shape
+        if nrows > 65535:
+            is_big_mat = True
+
+        matrix_type = _get_type_nwv(A, precision)[0]
+        value_dtype, nwords_per_value = _get_binary_value_dtype(matrix_type, endian)
+
+        nrows_header = -nrows if is_big_mat else nrows
+        op4.write(pack(endian + 'i4i8si', 24, ncols, nrows_header, form, matrix_type,
+                       ('%-8s' % name).encode('ascii'), 24))
+
+        indptr = A.indptr
+        icol_start = 0
+        while icol_start < ncols:
+            # the column chunk has at least 1 column and ~nnz_chunk nonzeros
+            icol_end = np.searchsorted(indptr, indptr[icol_start] + nnz_chunk, side='right') - 1
+            icol_end = min(max(icol_end, icol_start + 1), ncols)
+            i0 = indptr[icol_start]
+            i1 = indptr[icol_end]
+            if i1 > i0:
+                buffer = _get_sparse_binary_records(
+                    indptr[icol_start:icol_end+1] - i0, A.indices[i0:i1],
+                    A.data[i0:i1].astype(value_dtype), icol_start,
+                    nwords_per_value, is_big_mat, endian)
+                op4.write(buffer.tobytes())
+            icol_start = icol_end
+
+        # end of the matrix
+        if matrix_type in [1, 3]:
+            op4.write(pack(endian + '4ifi', 16, ncols + 1, 1, 1, 1.0, 16))
+        else:
+            op4.write(pack(endian + '4idi', 20, ncols + 1, 1, 1, 1.0, 20))
+
     def _get_start_end_row(self, A, nrows):
         """find the starting and ending points of the matrix"""
         istart = None
@@ -1705,7 +1367,7 @@ def _write_sparse_matrix_ascii(op4, name, A, form=2, is_big_mat=False,
     assert isinstance(name, string_types), 'name=%s' % name
     #A = A.tolil() # list-of-lists sparse matrix
     #print dir(A)
-    matrix_type, nwords_per_value = _get_type_nwv(A.data[0], precision)
+    matrix_type, nwords_per_value = _get_type_nwv(A.data, precision)
     if matrix_type in [3, 4]:
         complex_factor = 2
     else: # 1, 2
@@ -1807,6 +1469,88 @@ def _write_sparse_matrix_ascii(op4, name, A, form=2, is_big_mat=False,
     op4.write('%8i%8i%8i\n' % (ncols + 1, 1, 1))
     op4.write(' 1.0000000000000000E+00\n')
 
+def _get_sparse_binary_records(indptr, indices, data, icol0, nwords_per_value,
+                               is_big_mat, endian):
+    """
+    Builds the Fortran records for a block of sparse columns
+
+    Parameters
+    ----------
+    indptr : (ncols + 1, ) int ndarray
+        the CSC column pointer for the block (starting at 0)
+    indices : (nnz, ) int ndarray
+        the sorted 0-based row of each value
+    data : (nnz, ) ndarray
+        the values, which are already cast to the OP4 dtype
+    icol0 : int
+        the 0-based column of the first column in the block
+
+    Returns
+    -------
+    buffer : (nwords, ) int32 ndarray
+        the records as 4-byte words
+    """
+    nnz = len(indices)
+    ncols = len(indptr) - 1
+    nheader_words = 2 if is_big_mat else 1
+    ncol_values = np.diff(indptr)
+    jcol = np.repeat(np.arange(ncols), ncol_values)
+
+    # a new string starts when the column changes or rows aren't consecutive
+    is_start = np.ones(nnz, dtype='bool')
+    is_start[1:] = (jcol[1:] != jcol[:-1]) | (indices[1:] != indices[:-1] + 1)
+    if not is_big_mat:
+        # IS = irow + 65536 * (L + 1) has to fit in an int32
+        nvalues_max = 32766 // nwords_per_value
+        irun_start = np.where(is_start)[0]
+        irun = np.cumsum(is_start) - 1
+        is_start |= (np.arange(nnz) - irun_start[irun]) % nvalues_max == 0
+
+    istring_start = np.where(is_start)[0]
+    istring = np.cumsum(is_start) - 1
+    nvalues_string = np.diff(np.append(istring_start, nnz))
+    nwords_string = nheader_words + nvalues_string * nwords_per_value
+    jcol_string = jcol[istring_start]
+
+    # each non-empty column is:
+    #   [record_length, icol, irow=0, nwords, strings..., record_length]
+    is_col = ncol_values > 0
+    col_nwords = np.zeros(ncols, dtype='int64')
+    np.add.at(col_nwords, jcol_string, nwords_string)
+    col_nwords_record = np.where(is_col, col_nwords + 5, 0)
+    icol_record = np.cumsum(col_nwords_record) - col_nwords_record
+
+    # the word where each string starts
+    string_offset = np.cumsum(nwords_string) - nwords_string
+    ifirst_string = np.searchsorted(jcol_string, jcol_string)
+    string_offset -= string_offset[ifirst_string]
+    istring_word = icol_record[jcol_string] + 4 + string_offset
+
+    buffer = np.zeros(col_nwords_record.sum(), dtype=endian + 'i4')
+    icols = np.where(is_col)[0]
+    irecord = icol_record[icols]
+    record_length = 4 * (col_nwords[icols] + 3)
+    buffer[irecord] = record_length
+    buffer[irecord + 1] = icols + icol0 + 1
+    buffer[irecord + 3] = col_nwords[icols]
+    buffer[irecord + 4 + col_nwords[icols]] = record_length
+
+    irow_string = indices[istring_start] + 1
+    if is_big_mat:
+        buffer[istring_word] = nvalues_string * nwords_per_value + 1
+        buffer[istring_word + 1] = irow_string
+    else:
+        buffer[istring_word] = irow_string + 65536 * (nvalues_string * nwords_per_value + 1)
+
+    # the first word of each value
+    ivalue_word = (istring_word[istring] + nheader_words +
+                   (np.arange(nnz) - istring_start[istring]) * nwords_per_value)
+    value_words = data.view(endian + 'i4').reshape(nnz, nwords_per_value)
+    for iword in range(nwords_per_value):
+        buffer[ivalue_word + iword] = value_words[:, iword]
+    return buffer
+
+
 def get_big_mat_nrows(nrows):
     """
     Parameters
@@ -1838,6 +1582,33 @@ def get_big_mat_nrows(nrows):
     return is_big_mat, nrows
 
 
+def _is_matrix_name(name, matrix_names):
+    """is the (bytes) matrix name one of the requested matrices"""
+    if matrix_names is None:
+        return True
+    if name in matrix_names:
+        return True
+    if isinstance(name, bytes):
+        return name.decode('latin1') in matrix_names
+    return False
+
+
+def _get_binary_value_dtype(matrix_type, endian):
+    """
+    Gets the numpy dtype of a value in a binary OP4 and the number of
+    4-byte words it takes up
+    """
+    if matrix_type == 1:
+        return np.dtype(endian + 'f4'), 1
+    elif matrix_type == 2:
+        return np.dtype(endian + 'f8'), 2
+    elif matrix_type == 3:
+        return np.dtype(endian + 'c8'), 2
+    elif matrix_type == 4:
+        return np.dtype(endian + 'c16'), 4
+    raise TypeError('matrix_type=%s' % matrix_type)
+
+
 def get_dtype(matrix_type, precision='default'):
     """reset the type if 'default' not selected"""
     if precision == 'single':
@@ -7,6 +7,7 @@ from six import iteritems, PY2
 import numpy as np
 from numpy import ones, reshape, arange
 from numpy import ndarray, eye, array_equal, zeros
+from scipy.sparse import coo_matrix, issparse
 from pyNastran.op4.op4 import OP4, read_op4
 
 import pyNastran.op4.test
@@ -34,6 +35,26 @@ class TestOP4(unittest.TestCase):
                     pass
                     #print(matrix)
 
+    def test_op4_binary_matrix_names(self):
+        """tests reading a subset of the matrices in a binary OP4"""
+        for fname in ['mat_b_dn.op4', 'mat_b_s1.op4', 'mat_b_s2.op4']:
+            op4_filename = os.path.join(OP4_PATH, fname)
+            matrices = read_op4(op4_filename)
+            matrices2 = read_op4(op4_filename, matrix_names=['LOW', 'RND1CD'])
+            self.assertEqual(sorted(matrices2.keys()), [b'LOW', b'RND1CD'])
+            for name, (form, matrix) in matrices2.items():
+                form_expected, matrix_expected = matrices[name]
+                self.assertEqual(form, form_expected)
+                if isinstance(matrix, ndarray):
+                    self.assertTrue(array_equal(matrix, matrix_expected))
+                else:
+                    self.assertTrue(array_equal(matrix.toarray(), matrix_expected.toarray()))
+
+            form, strings = matrices[b'STRINGS']
+            if not isinstance(strings, ndarray):
+                strings = strings.toarray()
+            self.assertTrue(array_equal(strings, get_matrices()))
+
     @staticmethod
     def test_op4_ascii():
         fnames = [
@@ -224,6 +245,45 @@ class TestOP4(unittest.TestCase):
             del A1b, A2b, A3b
             del form1b, form2b, form3b
 
+    def test_sparse_binary(self):
+        """tests reading/writing sparse binary matrices"""
+        A = coo_matrix(get_matrices().astype('float32'))
+        B = A.astype('float64').tocsc()
+        C = (B * (1. + 2.j)).tocsr()
+        D = C.astype('complex64')
+        matrices = {
+            'A': (2, A),
+            'B': (2, B),
+            'C': (2, C),
+            'D': (2, D),
+        }
+        op4 = OP4(debug=False)
+        for is_big_mat in [False, True]:
+            op4_filename = os.path.join(OP4_PATH, 'sparse_binary.op4')
+            with open(op4_filename, 'wb') as op4_file:
+                for name, (form, matrix) in sorted(iteritems(matrices)):
+                    op4._write_sparse_matrix_binary(op4_file, name, matrix, form=form,
+                                                    is_big_mat=is_big_mat, nnz_chunk=10)
+            matrices2 = op4.read_op4(op4_filename)
+            for name, (form, matrix) in sorted(iteritems(matrices)):
+                form2, matrix2 = matrices2[name.encode('ascii')]
+                self.assertEqual(form, form2)
+                self.assertEqual(matrix.dtype, matrix2.dtype)
+                self.assertTrue(array_equal(matrix.toarray(), matrix2.toarray()))
+
+        # a matrix without any nonzeros doesn't have column records
+        with open(op4_filename, 'wb') as op4_file:
+            op4._write_sparse_matrix_binary(op4_file, 'EMPTY', coo_matrix((1000, 2000)), form=2)
+        form2, matrix2 = op4.read_op4(op4_filename)[b'EMPTY']
+        self.assertTrue(issparse(matrix2))
+        self.assertEqual(matrix2.shape, (1000, 2000))
+        self.assertEqual(matrix2.nnz, 0)
+
+        op4.write_op4(op4_filename, matrices, name_order=['A', 'C'], is_binary=True)
+        matrices2 = op4.read_op4(op4_filename)
+        self.assertEqual(sorted(matrices2.keys()), [b'A', b'C'])
+        os.remove(op4_filename)
+
     #def test_compress_column(self):
         #compress_column([14, 15, 16, 20, 21, 22, 26, 27, 28])
 